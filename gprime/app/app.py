@@ -38,6 +38,7 @@ from .forms import *
 from .forms.actionform import import_file
 from ..db import DbTxn
 from ..version import VERSION
+from ..utils.etag import get_template_version
 
 from tornado.web import Application, url, StaticFileHandler
 
@@ -62,15 +63,26 @@ class GPrimeApp(Application):
     """
     Main webapp class
     """
-    def __init__(self, options, database, **kwargs):
+    def __init__(self, options, database, executor=None, jobs=None,
+                 **kwargs):
+        """
+        executor - DatabaseExecutor to run the handlers in, or None to
+                   run them on the IOLoop
+        jobs - JobQueue running the reports, exports and imports, or None
+        """
         import gprime.const
         self.options = options
         self.prefix = self.options.prefix
         self.user_data = {} # user to user_data map
-        self.database = database
+        self._database = database
+        self.executor = executor
+        self.jobs = jobs
         self.sitename = options.sitename
-        settings = kwargs
-        settings.update(self.default_settings())
+        settings = self.default_settings()
+        settings.update(kwargs)
+        # For the validators of the pages:
+        self.template_version = get_template_version(
+            settings["template_path"])
         handlers = [
             (self.make_url(r"/(.*)/attribute_list/(.*)"),
              AttributeHandler, "attribute_list", self.make_env({})),
@@ -102,6 +114,8 @@ class GPrimeApp(Application):
              LogoutHandler, "logout", self.make_env({})),
             (self.make_url(r'/action/?(.*)'),
              ActionHandler, "action", self.make_env({})),
+            (self.make_url(r'/job/?(.*)'),
+             JobHandler, "job", self.make_env({})),
             (self.make_url(r'/person/(.*)/name/(.*)/surname/(.*)'),
              SurnameHandler, "surname", self.make_env({})),
             (self.make_url(r'/person/(.*)/name/(.*)/?(.*)'),
@@ -164,6 +178,15 @@ class GPrimeApp(Application):
                               name=handler[2])
                           for handler in handlers], **settings)
 
+    @property
+    def database(self):
+        """
+        The database of the calling thread.
+        """
+        if self.executor:
+            return self.executor.get_database()
+        return self._database
+
     def make_url(self, pattern):
         if pattern == "/" and self.prefix:
             return self.prefix
@@ -184,6 +207,17 @@ class GPrimeApp(Application):
         if user in self.user_data:
             del self.user_data[user]
 
+    def sync_changes(self, database):
+        """
+        Forget the cached objects and user data changed by other
+        processes, with --processes.
+        """
+        for (obj_class, handle) in database.sync_cache():
+            if obj_class == "*":
+                self.user_data.clear()
+            elif obj_class == "User":
+                self.clear_user_data(handle)
+
     def get_translate_func(self, user):
         from gprime.utils.locale import Locale, _
         def func(*args, **kwargs):
@@ -206,6 +240,18 @@ class GPrimeApp(Application):
             return self.user_data[user]["_"](*args, **kwargs)
         return func
 
+    def get_language(self, user):
+        if user not in self.user_data:
+            try:
+                user_data = self.database.get_user_data(user)
+            except:
+                user_data = {}
+            if user_data:
+                self.user_data[user] = user_data
+            else:
+                self.user_data[user] = {}
+        return self.user_data[user].get("language") or "en"
+
     def get_css(self, user):
         if user not in self.user_data:
             try:
@@ -404,6 +450,35 @@ def run_app():
            help="Show the version of gprime (%s)" % VERSION, type=bool)
     define("info", default=False,
            help="Show information about the database", type=bool)
+    define("index-report", default=False,
+           help="Show the suggested indexes for the selects made so far",
+           type=bool)
+    define("create-indexes", default=False,
+           help="Create the suggested indexes", type=bool)
+    define("auto-index", default=None,
+           help="Create suggested indexes that would have saved at least this many seconds, on exit",
+           type=float)
+    define("codec", default=None,
+           help="Store the object data with this codec: json, binary, or compressed",
+           type=str)
+    define("workers", default=4,
+           help="Number of threads running requests, each with its own database connection; 0 to run them on the IOLoop",
+           type=int)
+    define("max-queue", default=32,
+           help="Number of requests running or waiting for a thread before refusing more",
+           type=int)
+    define("request-timeout", default=30,
+           help="Seconds that a request may run in a thread before it is interrupted",
+           type=float)
+    define("processes", default=1,
+           help="Number of server processes sharing the port, each with its own database connections; 0 for one per CPU",
+           type=int)
+    define("job-workers", default=2,
+           help="Number of reports, exports and imports run at a time, each in a process of its own, by each server process; 0 to run none",
+           type=int)
+    define("job-retention", default=24,
+           help="Hours that the finished reports, exports and imports are kept, with their files",
+           type=float)
     # Let's go!
     # Really, just need the config-file:
     tornado.options.parse_command_line()
@@ -442,6 +517,7 @@ def run_app():
     users_dir = os.path.join(options.site_dir, "users")
     media_dir = os.path.join(options.site_dir, "media")
     media_cache_dir = os.path.join(options.site_dir, "media", "cache")
+    jobs_dir = os.path.join(options.site_dir, "jobs")
     if options.create:
         options.server = False
         # Make the site_dir:
@@ -458,6 +534,15 @@ def run_app():
                     os.path.join(media_dir, "image-missing.png"))
     ## Open the database:
     database = DbState().open_database(database_dir)
+    if options.auto_index is not None:
+        database.set_feature("auto-index", options.auto_index)
+    if options.codec:
+        options.server = False
+        if not hasattr(database, "set_codec"):
+            raise Exception("The database backend has no codecs")
+        database.set_codec(options.codec,
+                           lambda percent: print("%3d%%" % percent, end="\r"))
+        print("Database codec is now: %s" % database.codec.name)
     if options.add_user:
         options.server = False
         if options.user is None:
@@ -521,6 +606,18 @@ def run_app():
             data = database.get_user_data(user)
             for key in data:
                 print("    %s: %s" % (key, data[key]))
+    elif options.index_report or options.create_indexes:
+        options.server = False
+        advisor = database.get_index_advisor()
+        for line in advisor.get_report():
+            print(line)
+        if options.create_indexes:
+            for suggestion in advisor.get_suggestions():
+                if suggestion["kind"]:
+                    print("Creating %s on %s.%s..." % (suggestion["kind"],
+                                                       suggestion["table"],
+                                                       suggestion["field"]))
+                    advisor.create(suggestion)
     elif options.import_file:
         options.server = False
         user = User()
@@ -572,17 +669,65 @@ def run_app():
                 template_filename = os.path.join(dirpath, filename)
                 tornado.log.logging.info("   watching: " + os.path.relpath(template_filename))
                 tornado.autoreload.watch(template_filename)
-    app = GPrimeApp(options, database)
-    app.listen(options.port)
+    # Shared with other server processes, or with the processes of
+    # the jobs:
+    shared = options.processes != 1 or options.job_workers > 0
+    def open_database():
+        new_database = DbState().open_database(database_dir)
+        if shared and hasattr(new_database, "enable_multiprocess"):
+            new_database.enable_multiprocess()
+        return new_database
+    # The same in every process, so that each accepts the cookies of the
+    # others:
+    cookie_secret = base64.b64encode(uuid.uuid4().bytes + uuid.uuid4().bytes)
+    if options.processes != 1:
+        import tornado.netutil
+        import tornado.process
+        import tornado.httpserver
+        if options.debug:
+            raise Exception("--debug can't be used with --processes")
+        if not hasattr(database, "enable_multiprocess"):
+            raise Exception("The database backend can't be shared by processes")
+        database.enable_multiprocess()
+        database.close()
+        sockets = tornado.netutil.bind_sockets(options.port)
+        # Each process opens its own database, after the fork:
+        tornado.process.fork_processes(options.processes)
+        database = open_database()
+    elif shared and hasattr(database, "enable_multiprocess"):
+        database.enable_multiprocess()
+    if options.workers > 0:
+        from gprime.db.executor import DatabaseExecutor
+        executor = DatabaseExecutor(database, open_database,
+                                    options.workers, options.max_queue)
+    else:
+        executor = None
+    if options.job_workers > 0:
+        from gprime.cli.jobs import JobQueue
+        jobs = JobQueue(open_database, database_dir, jobs_dir,
+                        options.job_workers, options.job_retention * 60 * 60,
+                        options.site_dir)
+        jobs.start()
+    else:
+        jobs = None
+    app = GPrimeApp(options, database, executor, jobs,
+                    cookie_secret=cookie_secret)
+    if options.processes != 1:
+        server = tornado.httpserver.HTTPServer(app)
+        server.add_sockets(sockets)
+    else:
+        app.listen(options.port)
     tornado.log.logging.info("Starting with the folowing settings:")
     tornado.log.logging.info("    DATA_DIR = " + gprime.const.DATA_DIR)
     tornado.log.logging.info("    serving  = http://%s:%s%s" % (options.hostname, options.port, options.prefix))
     for key in ["port", "site_dir", "hostname", "sitename",
-                "debug", "xsrf", "config_file"]:
+                "debug", "xsrf", "config_file", "workers", "processes",
+                "job_workers"]:
         tornado.log.logging.info("    " + key + " = " + repr(getattr(options, key)))
     tornado.log.logging.info("Control+C twice to stop server. Running...")
-    # Open up a browser window:
-    if options.open_browser:
+    # Open up a browser window, from the first process only:
+    if options.open_browser and (options.processes == 1 or
+                                 tornado.process.task_id() == 0):
         try:
             browser = webbrowser.get(None)
         except webbrowser.Error as e:
@@ -592,7 +737,10 @@ def run_app():
             b = lambda : browser.open("http://%s:%s%s" % (options.hostname, options.port, app.make_url("/")), new=2)
             threading.Thread(target=b).start()
 
-    app.init_signal()
+    if options.processes == 1:
+        app.init_signal()
+    else:
+        signal.signal(signal.SIGTERM, app._signal_stop)
 
     if sys.platform.startswith('win'):
         # add no-op to wake every 5s
@@ -606,6 +754,10 @@ def run_app():
     except KeyboardInterrupt:
         tornado.log.logging.info("gPrime received interrupt...")
     tornado.log.logging.info("gPrime shutting down...")
+    if app.jobs:
+        app.jobs.stop()
+    if app.executor:
+        app.executor.shutdown()
     if app.database:
         tornado.log.logging.info("gPrime closing database...")
         app.database.close()
@@ -868,6 +868,21 @@ class DictionaryDb(DbGeneric):
     def get_note_gids(self):
         return [x.gid for x in self._note_dict.values()]
 
+    def get_raw_data_from_handles(self, table, handles):
+        """
+        Return a list of the raw data of the objects of table with the
+        passed handles, in the same order, with None for those that do
+        not exist.
+        """
+        objects = getattr(self, "_%s_dict" % table.lower())
+        raw_data = []
+        for handle in handles:
+            if isinstance(handle, bytes):
+                handle = str(handle, "utf-8")
+            obj = objects.get(handle)
+            raw_data.append(None if obj is None else obj.to_struct())
+        return raw_data
+
     def _get_raw_person_data(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
@@ -26,9 +26,9 @@ import os
 from .forms import Form, Column, Row
 
 # Gramps imports:
-from gprime.cli.plug import BasePluginManager, run_report
+from gprime.cli.plug import BasePluginManager
+from gprime.cli.jobs import import_file, export_file, upload
 from ..dictionarydb import DictionaryDb
-from gprime.cli.user import User
 
 # Classes:
 class Action(object):
@@ -170,6 +170,9 @@ class ActionForm(Form):
     # Does the interator support a sort_handles flag?
     sort = True
 
+    # The actions can't be ordered, so page by offset:
+    keyset_pages = False
+
     def __init__(self, handler, instance=None):
         self.gramps_database = handler.database
         handler.database = DictionaryDb()
@@ -219,140 +222,38 @@ class ActionForm(Form):
         return action.name
 
     def run_action(self, action, handler):
+        """
+        Queue the report, export or import as a job of the user, to be
+        run in the background, and show the user's jobs.
+        """
         options, options_help = self.get_plugin_options(action.handle)
         args = {}
         for key, default_value in options.items():
             args[key] = handler.get_argument(key)
-        if action.ptype == "Report":
-            output_file = "/tmp/%s.pdf" % action.name
-            clr = run_report(self.gramps_database,
-                             action.handle,
-                             username=self.handler.current_user,
-                             of=output_file,
-                             off="pdf", **args)
-            # can check for results with clr
-            if clr:
-                download_to_user(output_file, self.handler)
-            else:
-                handler.send_message("Error in report")
-                handler.redirect(self.handler.app.make_url("/action"))
-        elif action.ptype == "Import":
-            filename = upload(args["i"], "/tmp/%s-%s-%s.%s" % (str(profile.user.username),
-                                                                 str(handle),
-                                                                 timestamp(),
-                                                                 args["iff"]))
-            if filename is not None:
-                result = import_file(self.gramps_database, filename, User()) # callback
-                if result:
-                    handler.redirect(self.handler.app.make_url("/action"))
-                else:
-                    handler.send_message("Error in import")
-                    handler.redirect(self.handler.app.make_url("/action"))
-        elif action.ptype == "Export":
+        files = None
+        if action.ptype == "Import":
+            # An uploaded file, or else the URL of the file:
             pmgr = BasePluginManager.get_instance()
             pdata = pmgr.get_plugin(action.handle)
-            output_file = "/tmp/export." + pdata.extension
-            result = export_file(self.gramps_database, output_file, User()) # callback
-            if result:
-                download_to_user(output_file, self.handler)
+            uploads = handler.request.files.get("i")
+            if uploads:
+                args["i"] = "import." + pdata.extension
+                files = {args["i"]: uploads[0]["body"]}
             else:
-                handler.send_message("Error in export")
-                handler.redirect(self.handler.app.make_url("/action"))
-
-def download_to_user(file_name, header, content_type='application/octet-stream'):
-    buf_size = 4096
-    header.set_header('Content-Type', content_type)
-    header.set_header('Content-Disposition', 'attachment; filename=' + os.path.basename(file_name))
-    with open(file_name, 'rb') as f:
-        while True:
-            data = f.read(buf_size)
-            if not data:
-                break
-            header.write(data)
-    header.finish()
-
-## Copied from django-webapp; need to integrate:
-
-def import_file(db, filename, user):
-    """
-    Import a file (such as a GEDCOM file) into the given db.
-
-    >>> import_file(DbDjango(), "/home/user/Untitled_1.ged", User())
+                args["i"] = handler.get_argument("i")
+        if handler.app.jobs is None:
+            handler.send_message("Jobs are not enabled")
+            handler.redirect(handler.app.make_url("/action"))
+            return
+        handler.app.jobs.submit(self.gramps_database, handler.current_user,
+                                action.ptype, action.handle, action.name,
+                                args, files)
+        handler.send_message("%s is queued" % action.name)
+        handler.redirect(handler.app.make_url("/job/"))
+
+def download_to_user(file_name, handler, content_type='application/octet-stream'):
     """
-    from gprime.dbstate import DbState
-    from gprime.cli.grampscli import CLIManager
-    dbstate = DbState()
-    climanager = CLIManager(dbstate, setloader=False, user=user) # do not load db_loader
-    climanager.do_reg_plugins(dbstate, None)
-    pmgr = BasePluginManager.get_instance()
-    (name, ext) = os.path.splitext(os.path.basename(filename))
-    format = ext[1:].lower()
-    import_list = pmgr.get_reg_importers()
-    for pdata in import_list:
-        if format == pdata.extension:
-            mod = pmgr.load_plugin(pdata)
-            if not mod:
-                for item in pmgr.get_fail_list():
-                    name, error_tuple, pdata = item
-                    # (filename, (exception-type, exception, traceback), pdata)
-                    etype, exception, traceback = error_tuple
-                    print("ERROR:", name, exception)
-                return False
-            import_function = getattr(mod, pdata.import_function)
-            retval = import_function(db, filename, user)
-            return retval
-    return False
-
-def upload(url, filename=None):
-    from urllib.request import Request, urlopen
-    from urllib.parse import urlsplit
-    import shutil
-    def getFilename(url,openUrl):
-        if 'Content-Disposition' in openUrl.info():
-            # If the response has Content-Disposition, try to get filename from it
-            cd = dict([x.strip().split('=') if '=' in x else (x.strip(),'')
-                                        for x in openUrl.info().split(';')])
-            if 'filename' in cd:
-                fname = cd['filename'].strip("\"'")
-                if fname: return fname
-        # if no filename was found above, parse it out of the final URL.
-        return os.path.basename(urlsplit(openUrl.url)[2])
-    r = urlopen(Request(url))
-    success = None
-    try:
-        filename = filename or "/tmp/%s" % getFilename(url,r)
-        with open(filename, 'wb') as f:
-            shutil.copyfileobj(r,f)
-        success = filename
-    finally:
-        r.close()
-    return success
-
-def export_file(db, filename, user):
+    Send the file to the user, as an attachment, streamed in blocks.
     """
-    Export the db to a file (such as a GEDCOM file).
-
-    >>> export_file(DbDjango(), "/home/user/Untitled_1.ged", User())
-    """
-    from gprime.dbstate import DbState
-    from gprime.cli.grampscli import CLIManager
-    dbstate = DbState()
-    climanager = CLIManager(dbstate, setloader=False, user=user) # do not load db_loader
-    climanager.do_reg_plugins(dbstate, None)
-    pmgr = BasePluginManager.get_instance()
-    (name, ext) = os.path.splitext(os.path.basename(filename))
-    format = ext[1:].lower()
-    export_list = pmgr.get_reg_exporters()
-    for pdata in export_list:
-        if format == pdata.extension:
-            mod = pmgr.load_plugin(pdata)
-            if not mod:
-                for item in pmgr.get_fail_list():
-                    name, error_tuple, pdata = item
-                    etype, exception, traceback = error_tuple
-                    print("ERROR:", name, exception)
-                return False
-            export_function = getattr(mod, pdata.export_function)
-            export_function(db, filename, user)
-            return True
-    return False
+    handler.set_header('Content-Disposition', 'attachment; filename=' + os.path.basename(file_name))
+    handler.stream_file(file_name, content_type)
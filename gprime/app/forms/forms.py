@@ -25,6 +25,7 @@ import time
 import json
 import html
 import re
+import urllib.parse
 
 from gprime.display.name import NameDisplay
 from gprime.datehandler import displayer, parser
@@ -66,6 +67,7 @@ class Form(object):
     link = None
     where = None
     page_size = 25
+    keyset_pages = True
     count_width = 5
     table = None
 
@@ -82,6 +84,7 @@ class Form(object):
             self._class = None
             self.schema = None
         self.where = None
+        self.text_search = None
         self.log = logging.getLogger(".Form")
         self.set_post_process_functions()
         self.sa = SimpleAccess(self.database)
@@ -144,17 +147,98 @@ class Form(object):
         records = self.rows.total
         matching = len(self.rows)
         total_pages = math.ceil(records / self.page_size)
+        # Link to the previous and next pages by keyset, so that they
+        # don't have to go through all of the rows before them:
+        if page - 1 <= 1:
+            previous_page = self.make_query(page=1)
+        else:
+            previous_page = self.make_query(page=page - 1,
+                                            before=self.make_keyset(self.rows[:1]))
+        # An estimated total may be short; the next page of a full one
+        # is then after it, not the last page:
+        if page + 1 < total_pages or (self.rows.estimated and
+                                      matching == self.page_size):
+            next_page = self.make_query(page=page + 1,
+                                        after=self.make_keyset(self.rows[-1:]))
+        else:
+            next_page = self.make_query(page=total_pages, before=self.make_last_keyset())
         return ("""<div align="center" style="background-color: lightgray; border: 1px solid black; border-radius:5px; margin: 0px 1px; padding: 1px;">""" +
                 self.make_button("<<", self.make_url(self.make_query(page=1))) +
                 " | " +
-                self.make_button("<", "/" + self.view + (self.make_query(page=max(page - 1, 1)))) +
+                self.make_button("<", "/" + self.view + previous_page) +
                 (" | <b>Page</b> %s of %s | " % (page, total_pages)) +
-                self.make_button(">", "/" + self.view + self.make_query(page=min(page + 1, total_pages))) +
+                self.make_button(">", "/" + self.view + next_page) +
                 " | " +
-                self.make_button(">>", "/" + self.view + self.make_query(page=total_pages)) +
-                (" | <b>Showing</b> %s/%s <b>of</b> %s <b>in</b> %.4g seconds" % (matching, records, total, round(self.rows.time, 4))) +
+                self.make_button(">>", "/" + self.view + self.make_query(page=total_pages, before=self.make_last_keyset())) +
+                (" | <b>Showing</b> %s/%s%s <b>of</b> %s <b>in</b> %.4g seconds" % (matching, "~" if self.rows.estimated else "", records, total, round(self.rows.time, 4))) +
                 "</div>")
 
+    def get_order_by(self):
+        """
+        The order_by of the rows, with the field names resolved.
+        """
+        return [(self._class.get_field_alias(field), direction)
+                for (field, direction) in self.order_by]
+
+    def get_keyset_fields(self):
+        """
+        The fields that locate a row in the order of the rows: the
+        order_by fields, and the handle to break ties.
+        """
+        fields = [field for (field, direction) in self.get_order_by()]
+        if "handle" not in fields:
+            fields.append("handle")
+        return fields
+
+    def make_keyset(self, rows):
+        """
+        Return the keyset of the first of the rows for a URL query, or
+        None, if there isn't one (then the page is selected by offset).
+        """
+        if not rows or not self.keyset_pages:
+            return None
+        values = [rows[0][field] for field in self.get_keyset_fields()]
+        if None in values:
+            return None # can't compare to NULL
+        return urllib.parse.quote(json.dumps(values))
+
+    def make_last_keyset(self):
+        """
+        Return the keyset of the last page (before the end of the
+        rows) for a URL query, or None.
+        """
+        if not self.keyset_pages:
+            return None
+        return urllib.parse.quote(json.dumps([]))
+
+    def get_keyset_argument(self):
+        """
+        Return ("after"|"before", values) from the URL query, or None.
+        """
+        if not self.keyset_pages:
+            return None
+        for direction in ["after", "before"]:
+            argument = self.handler.get_argument(direction, None)
+            if argument:
+                try:
+                    values = json.loads(argument)
+                except ValueError:
+                    return None
+                if isinstance(values, list):
+                    return (direction, values)
+        return None
+
+    def get_text_search(self, search):
+        """
+        Return the words of a free-text search, to look up in the
+        full-text search index, or None if search is not one (or the
+        table has no search fields).
+        """
+        if (self._class is None or not self._class.get_search_fields() or
+                any(char in search for char in "|,^&=%")):
+            return None
+        return search.strip()
+
     def parse_where(self, search_pair):
         """
         search_pair: field OP value | search_pair OR search_pair
@@ -269,6 +353,11 @@ class Form(object):
                 self.select_fields = self.original_select_fields
                 select_where = None
             if where:
+                self.text_search = self.get_text_search(where)
+            if self.text_search:
+                # Ranked, so the pages are selected by offset:
+                self.keyset_pages = False
+            elif where:
                 where = self.parse_where(where)
                 if len(where) == 2:
                     self.where = where
@@ -287,18 +376,41 @@ class Form(object):
         self.log.debug("search: " + search)
         self.log.debug("where: " + str(self.where))
         self.log.debug("select: " + str(self.select_fields))
-        queryset = self.database.get_queryset_by_table_name(self.table)
-        queryset.limit(start=self.page * self.page_size, count=self.page_size)
-        queryset.order_by = self.order_by
-        queryset.where_by = self.where
         class Result(list):
             time = 0
             total = 0
+            estimated = False
         start_time = time.time()
-        self.rows = Result(queryset.select(*(self.get_select_fields() + self.env_fields)))
         queryset = self.database.get_queryset_by_table_name(self.table)
+        if self.text_search:
+            queryset.search(self.text_search) # best matches first
+        else:
+            queryset.order_by = self.get_order_by()
         queryset.where_by = self.where
-        self.rows.total = queryset.count()
+        keyset = self.get_keyset_argument()
+        last_page = False
+        if keyset is None:
+            queryset.limit(start=self.page * self.page_size, count=self.page_size)
+        elif keyset[0] == "after":
+            queryset.after(*keyset[1]).limit(count=self.page_size)
+        elif keyset[1]:
+            queryset.before(*keyset[1]).limit(count=self.page_size)
+        else: # the last page; cut down once the total is known
+            queryset.before().limit(count=self.page_size)
+            last_page = True
+        fields = self.get_select_fields() + self.env_fields
+        fields += [field for field in self.get_keyset_fields()
+                   if field not in fields]
+        # The page, and the total, in as few queries as the database can:
+        rows, total, estimated = queryset.select_page(*fields)
+        if last_page and total and not estimated:
+            rows = rows[-((total - 1) % self.page_size + 1):]
+        elif estimated and not last_page:
+            # At least the rows up to the end of this page:
+            total = max(total, self.page * self.page_size + len(rows))
+        self.rows = Result(rows)
+        self.rows.total = total
+        self.rows.estimated = estimated
         self.rows.time = time.time() - start_time
         return ""
 
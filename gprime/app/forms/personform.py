@@ -90,9 +90,35 @@ class PersonForm(Form):
     # Other fields needed to select:
     env_fields = [
         "handle",
-        "event_ref_list",
     ]
 
+    def select(self, page=1, search=None):
+        retval = super().select(page, search)
+        # The birth and death dates of the page, without the people:
+        handles = [row["handle"] for row in self.rows]
+        self.summaries = dict(zip(
+            handles, self.database.get_person_summaries(handles)))
+        return retval
+
+    def set_post_process_functions(self):
+        super().set_post_process_functions()
+        self.post_process_functions.update({
+            "birth_ref_index": self.summary_date("birth_date"),
+            "death_ref_index": self.summary_date("death_date"),
+        })
+
+    def summary_date(self, key):
+        """
+        Return a function for the birth or death date of the row, from
+        the summary of the person.
+        """
+        def get_date(index, env):
+            summary = self.summaries.get(env["handle"])
+            if summary and summary[key] is not None:
+                return summary[key]
+            return ""
+        return get_date
+
     def delete(self):
         person_handle = self.instance.handle
         with DbTxn(self._("Delete person"), self.database) as transaction:
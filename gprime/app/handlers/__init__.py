@@ -24,6 +24,7 @@ from .familyhandler import FamilyHandler
 from .imagehandler import ImageHandler
 from .jsonhandler import JsonHandler
 from .actionhandler import ActionHandler
+from .jobhandler import JobHandler
 from .notehandler import NoteHandler
 from .citationhandler import CitationHandler
 from .eventhandler import EventHandler
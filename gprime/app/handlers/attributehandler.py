@@ -20,11 +20,12 @@
 
 import tornado.web
 
-from .handlers import BaseHandler
+from .handlers import BaseHandler, in_executor
 from ..forms import AttributeForm
 
 class AttributeHandler(BaseHandler):
     @tornado.web.authenticated
+    @in_executor
     def get(self, prefix="", suffix=""):
         """
         prefix = 'person/b2cfa6ca14d1f274465'
@@ -55,6 +56,7 @@ class AttributeHandler(BaseHandler):
         return
 
     @tornado.web.authenticated
+    @in_executor
     def post(self, prefix="", suffix=""):
         """
         prefix = 'person/b2cfa6ca14d1f274465'
@@ -25,11 +25,12 @@ import tornado.web
 import json
 import html
 
-from .handlers import BaseHandler
+from .handlers import BaseHandler, in_executor
 from ..forms import EventForm
 
 class EventHandler(BaseHandler):
     @tornado.web.authenticated
+    @in_executor
     def get(self, path=""):
         """
         HANDLE
@@ -55,6 +56,9 @@ class EventHandler(BaseHandler):
                     form = EventForm(self, instance=event)
                     form.delete()
                     return
+                elif action == "view" and self.not_modified(
+                        event.change, self.database.get_last_change()):
+                    return
                 else:
                     self.render("event.html",
                                 **self.get_template_dict(tview=_("event detail"),
@@ -84,6 +88,7 @@ class EventHandler(BaseHandler):
                 )
 
     @tornado.web.authenticated
+    @in_executor
     def post(self, path):
         _ = self.app.get_translate_func(self.current_user)
         page = int(self.get_argument("page", 1) or 1)
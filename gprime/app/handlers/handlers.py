@@ -19,20 +19,89 @@
 #
 
 import tornado.web
+import tornado.iostream
+import os
 import sys
+import zlib
 import logging
 import hmac
 import json
+import asyncio
+import functools
+import threading
+import time
 from passlib.hash import sha256_crypt as crypt
 
 from gprime.utils.locale import Locale, _
 from gprime.const import VERSION
+from gprime.db.executor import ExecutorBusy
+from gprime.utils.etag import make_etag, format_http_date, is_not_modified
+
+# Content types that are worth compressing, by stream_file:
+COMPRESSIBLE_TYPES = ["text/", "application/json", "application/ld+json",
+                      "application/xml", "application/javascript"]
 
 template_functions = {}
 exec("from gprime.app.template_functions import *",
      globals(), template_functions)
 
+class RequestAbandoned(Exception):
+    """
+    Raised in a handler running in the executor, when it writes after
+    its request has been given up.
+    """
+
+def in_executor(method):
+    """
+    Decorator for the get and post methods of a BaseHandler, to run them
+    on the database executor of the app, with the database of the thread,
+    if the app has an executor. The request fails with 503 if the
+    executor is busy, or if it takes longer than the handler's deadline;
+    its query is then interrupted. The changes made by other processes
+    are synced first. A file given to stream_file is sent once the
+    method has returned, from the IOLoop, with no deadline.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        executor = self.app.executor
+        if executor is None:
+            self.app.sync_changes(self.database)
+            result = method(self, *args, **kwargs)
+            if self._stream is not None:
+                await self._send_stream()
+            return result
+        database = self.database
+        def run():
+            self._worker_ident = threading.get_ident()
+            self.database = executor.get_database()
+            self.app.sync_changes(self.database)
+            return method(self, *args, **kwargs)
+        try:
+            future = executor.submit(run)
+        except ExecutorBusy:
+            raise tornado.web.HTTPError(503, "Server busy")
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(future),
+                                   self.get_deadline())
+        except asyncio.TimeoutError:
+            with self._worker_lock:
+                self._abandoned = True
+            executor.interrupt(future)
+            raise tornado.web.HTTPError(503, "Request took too long")
+        finally:
+            self.database = database
+            self._worker_ident = None
+        if self._stream is not None:
+            await self._send_stream()
+    return wrapper
+
 class BaseHandler(tornado.web.RequestHandler):
+    # Seconds that a request may take in the executor; None for the
+    # --request-timeout option:
+    deadline = None
+    # Bytes read and sent at a time by stream_file:
+    BLOCK_SIZE = 64 * 1024
+
     def __init__(self, *args, **kwargs):
         self.log = logging.getLogger(".Handler")
         self.database = None
@@ -42,8 +111,144 @@ class BaseHandler(tornado.web.RequestHandler):
             if name in kwargs:
                 setattr(self, name, kwargs[name])
                 del kwargs[name]
+        # Running in the executor:
+        self._worker_ident = None
+        self._worker_lock = threading.Lock()
+        self._abandoned = False
+        self._finish_deferred = False
+        # File given to stream_file, and its compressor, if any:
+        self._stream = None
         super().__init__(*args, **kwargs)
 
+    def get_deadline(self):
+        """
+        Return the seconds that the request may take in the executor.
+        """
+        if self.deadline is not None:
+            return self.deadline
+        return self.opts.request_timeout
+
+    def in_worker(self):
+        """
+        Return True if called by the method running in the executor.
+        """
+        return threading.get_ident() == self._worker_ident
+
+    def write(self, chunk):
+        if self.in_worker():
+            with self._worker_lock:
+                if self._abandoned:
+                    raise RequestAbandoned()
+                if self._finish_deferred:
+                    raise RuntimeError("Cannot write() after finish()")
+                return super().write(chunk)
+        return super().write(chunk)
+
+    def finish(self, chunk=None):
+        """
+        Finish the request. Only the IOLoop may send the response, so
+        in the executor the chunk is written, and the request is finished
+        when the method returns.
+        """
+        if self.in_worker():
+            if chunk is not None:
+                self.write(chunk)
+            self._finish_deferred = True
+            return None
+        return super().finish(chunk)
+
+    def stream_file(self, filename, content_type, compress=None):
+        """
+        Send the file as the response, once the method run by
+        in_executor returns: read in blocks of BLOCK_SIZE, each sent to
+        the client before the next is read, so that a download holds one
+        block in memory, whatever the size of the file. The blocks are
+        compressed with gzip if the client accepts it, and if compress,
+        which by default is True for the COMPRESSIBLE_TYPES.
+        """
+        if compress is None:
+            compress = any(content_type.startswith(compressible)
+                           for compressible in COMPRESSIBLE_TYPES)
+        accept = self.request.headers.get("Accept-Encoding", "")
+        fp = open(filename, "rb")
+        self.set_header("Content-Type", content_type)
+        if compress:
+            self.set_header("Vary", "Accept-Encoding")
+        if compress and "gzip" in accept:
+            self.set_header("Content-Encoding", "gzip")
+            compressor = zlib.compressobj(6, zlib.DEFLATED,
+                                          16 + zlib.MAX_WBITS)
+        else:
+            self.set_header("Content-Length", os.fstat(fp.fileno()).st_size)
+            compressor = None
+        self._stream = (fp, compressor)
+
+    async def _send_stream(self):
+        (fp, compressor) = self._stream
+        try:
+            while True:
+                block = fp.read(self.BLOCK_SIZE)
+                if not block:
+                    break
+                if compressor is not None:
+                    block = compressor.compress(block)
+                    if not block:
+                        continue
+                self.write(block)
+                # Until sent, for the client to set the pace:
+                await self.flush()
+            if compressor is not None:
+                self.write(compressor.flush())
+            self.finish()
+        except tornado.iostream.StreamClosedError:
+            # The client has gone
+            pass
+        finally:
+            fp.close()
+            self._stream = None
+
+    def on_finish(self):
+        if self._stream is not None:
+            # Not sent, after an error:
+            self._stream[0].close()
+            self._stream = None
+
+    def not_modified(self, *stamps):
+        """
+        Set the ETag and Last-Modified of the response to a GET, from the
+        stamps of what it shows, such as the change of the objects, and
+        the user's settings and the template version. Returns True, having
+        answered 304 Not Modified, if the client's copy is still valid.
+        Numeric stamps are seconds since the epoch; if any is 0, or a
+        message is waiting to be shown, the response isn't validated.
+        """
+        if (self.request.method not in ("GET", "HEAD") or
+                not all(stamps) or
+                self.get_cookie("gprime-messages")):
+            return False
+        user = self.current_user
+        etag = make_etag(stamps, user,
+                         self.app.get_language(user),
+                         self.app.get_css(user),
+                         sorted(self.app.get_permissions(user)),
+                         self.app.template_version,
+                         self.get_cookie("_xsrf", ""))
+        times = [stamp for stamp in stamps if isinstance(stamp, (int, float))]
+        # Not in the future, if stamps were moved past the clock:
+        last_modified = min(max(times), time.time()) if times else None
+        self.set_header("Etag", etag)
+        if last_modified is not None:
+            self.set_header("Last-Modified", format_http_date(last_modified))
+        # Per user, and to be validated each time:
+        self.set_header("Cache-Control", "private, no-cache")
+        if is_not_modified(self.request.headers.get("If-None-Match"),
+                           self.request.headers.get("If-Modified-Since"),
+                           etag, last_modified):
+            self.set_status(304)
+            self.finish()
+            return True
+        return False
+
     def get_template_namespace(self):
         ns = super(BaseHandler, self).get_template_namespace()
         ns['_T_'] = lambda *x: '"{0}"'.format(ns['_'](*x))
@@ -126,6 +331,7 @@ class BaseHandler(tornado.web.RequestHandler):
 
 class HomeHandler(BaseHandler):
     @tornado.web.authenticated
+    @in_executor
     def get(self):
         self.render('home.html', **self.get_template_dict())
 
@@ -133,6 +339,8 @@ class LoginHandler(BaseHandler):
     def get(self):
         self.render('login.html',
                     **self.get_template_dict())
+
+    @in_executor
     def post(self):
         getusername = self.get_argument("username")
         getpassword = self.get_argument("password")
@@ -32,7 +32,8 @@ import io
 import re
 from PIL import Image
 
-from .handlers import BaseHandler
+from gprime.utils.file import write_file
+from .handlers import BaseHandler, in_executor
 
 class Abort(Exception):
     """
@@ -619,9 +620,7 @@ class FileSystemCacher(object):
         if not path.startswith(self.directory):
             path = os.path.join(self.directory, path)
 
-        fh = open(path, 'wb')
-        fh.write(data)
-        fh.close()
+        write_file(path, data, "wb")
 
     def exists(self, path):
         if not path.startswith(self.directory):
@@ -659,10 +658,8 @@ class FileSystemCacher(object):
             path = os.path.join(self.directory, path)
         if not mt:
             mt = self.generate_media_type(path)
-        fh = open(path, "rb")
-        data = fh.read()
-        fh.close()
-        return self.application.send(data, status=status, ct=mt)
+        self.application.set_status(status)
+        return self.application.stream_file(path, mt)
 
 class Config(object):
     def __init__(self, info):
@@ -826,10 +823,8 @@ class ImageHandler(BaseHandler):
     def send_file(self, filename, mt, status=200):
         if not filename.startswith(self.CACHEDIR):
             filename = os.path.join(self.CACHEDIR, filename)
-        fh = open(filename, "rb")
-        data = fh.read()
-        fh.close()
-        return self.send(data, status=status, ct=mt)
+        self.set_status(status)
+        return self.stream_file(filename, mt)
 
     def send(self, data, status=200, ct="text/plain"):
         self.set_header("Content-Type", ct)
@@ -964,9 +959,7 @@ class ImageHandler(BaseHandler):
         except OSError:
             # directory already exists
             pass
-        fh = open(os.path.join(self.CACHEDIR, infoId, 'info.json'), 'w')
-        fh.write(data)
-        fh.close()
+        write_file(os.path.join(self.CACHEDIR, infoId, 'info.json'), data)
         return info
 
     def watermark(self, image):
@@ -974,6 +967,7 @@ class ImageHandler(BaseHandler):
         return image
 
     @tornado.web.authenticated
+    @in_executor
     def get(self, path):
         """
         Path is an IIIF image server set of parameters:
@@ -1068,6 +1062,11 @@ class ImageHandler(BaseHandler):
                 # Block access to images
                 return self.error_msg('auth', 'Not authenticated', status=401)
 
+        if (mimetype.endswith('json') and
+                self.not_modified(os.path.getmtime(filename), mimetype)):
+            # info.json, of an image that hasn't changed since
+            return
+
         if os.path.exists(self.CACHEDIR + fp):
             # Will only ever be canonical, otherwise would redirect
             self.set_header('Link',
@@ -1133,7 +1132,7 @@ class ImageHandler(BaseHandler):
 
         # MUCH quicker to load JSON than the image to find h/w
         # Does json already exist?
-        if os.path.exists(self.CACHEDIR+infoId):
+        if os.path.exists(os.path.join(self.CACHEDIR, infoId, 'info.json')):
             # load JSON info file or image?
             fh = open(os.path.join(self.CACHEDIR, infoId, 'info.json'))
             info = json.load(fh)
@@ -1384,9 +1383,7 @@ class ImageHandler(BaseHandler):
             pth = os.path.join(self.CACHEDIR, *paths[:p])
             if not os.path.exists(pth):
                 os.makedirs(pth, exist_ok=True)
-        fh = open(self.CACHEDIR + fn, 'wb')
-        fh.write(contents)
-        fh.close()
+        write_file(self.CACHEDIR + fn, contents, "wb")
 
         return self.send(contents, ct=mimetype)
 
@@ -0,0 +1,119 @@
+#
+# gPrime - a web-based genealogy program
+#
+# Copyright (c) 2017 gPrime Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import os
+import json
+import time
+import mimetypes
+
+from .handlers import BaseHandler, in_executor
+from ..forms.actionform import download_to_user
+from gprime.cli.jobs import get_job_progress, get_job_output
+
+import tornado.web
+
+# Content types of the outputs of the jobs that mimetypes may not know,
+# by extension:
+CONTENT_TYPES = {
+    ".ged": "text/vnd.familysearch.gedcom",
+    ".gramps": "application/x-gramps-xml", # gzipped XML
+    ".gpkg": "application/x-gramps-package",
+}
+
+class JobHandler(BaseHandler):
+    """
+    The background jobs of the user:
+
+    /job/ - list of the jobs
+    /job/HANDLE - progress of the job, as JSON
+    /job/HANDLE/download - output file of the job
+    /job/HANDLE/cancel - post to cancel the job
+    """
+    def get_jobs_dir(self):
+        return os.path.join(self.opts.site_dir, "jobs")
+
+    def get_job(self, handle):
+        """
+        Return the job of the user, or raise 404.
+        """
+        job = self.database.get_job(handle)
+        if job is None or job["username"] != self.current_user:
+            raise tornado.web.HTTPError(404)
+        return job
+
+    @tornado.web.authenticated
+    @in_executor
+    def get(self, path=""):
+        _ = self.app.get_translate_func(self.current_user)
+        if "/" in path:
+            handle, action = path.split("/", 1)
+        else:
+            handle, action = path, "progress"
+        if not handle:
+            jobs = []
+            for job in self.database.get_jobs(self.current_user):
+                (percentage, message) = get_job_progress(self.get_jobs_dir(),
+                                                         job)
+                queued = time.strftime("%Y-%m-%d %H:%M",
+                                       time.localtime(job["created"]))
+                jobs.append((job, queued, percentage, message))
+            active = any(job["status"] in ["queued", "running", "cancelling"]
+                         for (job, queued, percentage, message) in jobs)
+            self.render("jobs.html",
+                        **self.get_template_dict(tview=_("jobs"),
+                                                 jobs=jobs,
+                                                 active=active))
+            return
+        job = self.get_job(handle)
+        if action == "download":
+            filename = get_job_output(self.get_jobs_dir(), job)
+            if filename is None:
+                raise tornado.web.HTTPError(404)
+            content_type = (
+                CONTENT_TYPES.get(os.path.splitext(filename)[1]) or
+                mimetypes.guess_type(filename)[0] or
+                "application/octet-stream")
+            download_to_user(filename, self, content_type)
+        elif action == "progress":
+            (percentage, message) = get_job_progress(self.get_jobs_dir(), job)
+            self.set_header('Content-Type', 'application/json')
+            self.write(json.dumps({"handle": job["handle"],
+                                   "name": job["name"],
+                                   "status": job["status"],
+                                   "percentage": percentage,
+                                   "message": message}))
+        else:
+            raise tornado.web.HTTPError(404)
+
+    @tornado.web.authenticated
+    @in_executor
+    def post(self, path=""):
+        if "/" in path:
+            handle, action = path.split("/", 1)
+        else:
+            handle, action = path, ""
+        job = self.get_job(handle)
+        if action != "cancel":
+            raise tornado.web.HTTPError(404)
+        if self.app.jobs is not None:
+            self.app.jobs.cancel(self.database, job["handle"])
+        else:
+            self.database.cancel_job(job["handle"])
+        self.redirect(self.app.make_url("/job/"))
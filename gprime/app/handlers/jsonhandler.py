@@ -22,7 +22,7 @@ import tornado.web
 import simplejson
 import re
 
-from .handlers import BaseHandler
+from .handlers import BaseHandler, in_executor
 from gprime.lib.gendertype import GenderType
 
 class JsonHandler(BaseHandler):
@@ -30,11 +30,16 @@ class JsonHandler(BaseHandler):
     Process an Ajax/Json query request.
     """
     @tornado.web.authenticated
+    @in_executor
     def get(self):
         field = self.get_argument("field", None)
         query = self.get_argument("q", "").strip()
         page = int(self.get_argument("p", "1"))
         size = int(self.get_argument("s", "10"))
+        after = self.get_argument("after", None)
+        # The results may be of any of the objects:
+        if self.not_modified(self.database.get_last_change()):
+            return
         if field in ["mother", "father"]:
             table = "Person"
             fields = ["primary_name.first_name",
@@ -91,6 +96,20 @@ class JsonHandler(BaseHandler):
                              'primary_name.first_name',
                              'gid']
             return_pattern = "%(primary_name.surname_list.0.surname)s, %(primary_name.first_name)s [%(gid)s]"
+        elif field == "surname":
+            # The surnames, and their numbers of people, from the index:
+            counts = self.database.get_surname_counts(
+                prefix=query,
+                after=simplejson.loads(after) if after else None,
+                count=size)
+            response_data = {"results": [{"id": surname,
+                                          "name": "%s (%s)" % (surname, count)}
+                                         for (surname, count) in counts]}
+            if len(counts) == size:
+                response_data["after"] = simplejson.dumps(counts[-1][0])
+            self.set_header('Content-Type', 'application/json')
+            self.write(simplejson.dumps(response_data))
+            return
         elif field == "person":
             pass
         elif field == "place":
@@ -100,19 +119,27 @@ class JsonHandler(BaseHandler):
         ## ------------
         self.log.debug("received json query: " + str(where))
         queryset = self.database.get_queryset_by_table_name(table)
-        queryset.limit(start=(page - 1) * size, count=size)
+        if after:
+            # Keyset of the last row of the previous page:
+            queryset.after(*simplejson.loads(after)).limit(count=size)
+        else:
+            queryset.limit(start=(page - 1) * size, count=size)
         queryset.where_by = where
         queryset.order_by = order_by
-        class Result(list):
-            total = 0
-        rows = Result(queryset.select("handle", *return_fields))
-        queryset = self.database.get_queryset_by_table_name(table)
-        queryset.where_by = where
-        rows.total = queryset.count()
-        response_data = {"results": [], "total": rows.total}
+        order_fields = [field for (field, direction) in order_by]
+        rows, total, estimated = queryset.select_page(
+            "handle", *(return_fields + order_fields))
+        response_data = {"results": [], "total": total}
+        if estimated:
+            response_data["estimated"] = True
         for row in rows:
             name = return_pattern % row
             response_data["results"].append({"id": row["handle"], "name": name})
+        if rows:
+            ## The keyset for the next page, as "after":
+            keyset = [rows[-1][field] for field in order_fields + ["handle"]]
+            if None not in keyset:
+                response_data["after"] = simplejson.dumps(keyset)
         self.set_header('Content-Type', 'application/json')
         self.log.debug("results: " + simplejson.dumps(response_data))
         self.write(simplejson.dumps(response_data))
@@ -25,11 +25,12 @@ import tornado.web
 import json
 import html
 
-from .handlers import BaseHandler
+from .handlers import BaseHandler, in_executor
 from ..forms import PersonForm
 
 class PersonHandler(BaseHandler):
     @tornado.web.authenticated
+    @in_executor
     def get(self, path=""):
         """
         person
@@ -63,6 +64,9 @@ class PersonHandler(BaseHandler):
                     form = PersonForm(self, instance=person)
                     form.delete()
                     return
+                elif action == "view" and self.not_modified(
+                        person.change, self.database.get_last_change()):
+                    return
                 else:
                     ## Action can be edit or view
                     self.render("person.html",
@@ -95,6 +99,7 @@ class PersonHandler(BaseHandler):
         )
 
     @tornado.web.authenticated
+    @in_executor
     def post(self, path):
         """
         """
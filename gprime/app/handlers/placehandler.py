@@ -25,11 +25,12 @@ import tornado.web
 import json
 import html
 
-from .handlers import BaseHandler
+from .handlers import BaseHandler, in_executor
 from ..forms import PlaceForm
 
 class PlaceHandler(BaseHandler):
     @tornado.web.authenticated
+    @in_executor
     def get(self, path=""):
         """
         HANDLE
@@ -55,6 +56,9 @@ class PlaceHandler(BaseHandler):
                     form = PlaceForm(self, instance=place)
                     form.delete()
                     return
+                elif action == "view" and self.not_modified(
+                        place.change, self.database.get_last_change()):
+                    return
                 else:
                     self.render("place.html",
                                 **self.get_template_dict(tview=_("place detail"),
@@ -84,6 +88,7 @@ class PlaceHandler(BaseHandler):
                 )
 
     @tornado.web.authenticated
+    @in_executor
     def post(self, path):
         _ = self.app.get_translate_func(self.current_user)
         if "/" in path:
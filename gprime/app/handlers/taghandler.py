@@ -25,11 +25,12 @@ import tornado.web
 import json
 import html
 
-from .handlers import BaseHandler
+from .handlers import BaseHandler, in_executor
 from ..forms import TagForm
 
 class TagHandler(BaseHandler):
     @tornado.web.authenticated
+    @in_executor
     def get(self, path=""):
         """
         HANDLE
@@ -55,6 +56,9 @@ class TagHandler(BaseHandler):
                     form = TagForm(self, instance=tag)
                     form.delete()
                     return
+                elif action == "view" and self.not_modified(
+                        tag.change, self.database.get_last_change()):
+                    return
                 else:
                     self.render("tag.html",
                                 **self.get_template_dict(tview=_("tag detail"),
@@ -84,6 +88,7 @@ class TagHandler(BaseHandler):
                 )
 
     @tornado.web.authenticated
+    @in_executor
     def post(self, path):
         _ = self.app.get_translate_func(self.current_user)
         page = int(self.get_argument("page", 1) or 1)
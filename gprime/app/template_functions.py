@@ -32,6 +32,7 @@ import tornado.log
 # Globals and functions:
 TAB_HEIGHT = 200
 name_display = NameDisplay().display
+name_display_name = NameDisplay().display_name
 date_display = displayer.display
 
 def nbsp(string):
@@ -309,8 +310,9 @@ def enclosed_by_table(form, user, action, placeref_list):
     )
     if user or form.instance.public:
         count = 1
-        for ref in placeref_list:
-            place = form.database.get_place_from_handle(ref.ref)
+        places = form.database.get_places_from_handles(
+            [ref.ref for ref in placeref_list])
+        for (ref, place) in zip(placeref_list, places):
             table.append_row(place.gid,
                              place.name.value,
                              place.place_type,
@@ -397,16 +399,16 @@ def citation_table(form, user, action, citation_list, path=""):
     )
     if user or form.instance.public:
         count = 1
-        for citation_ref in citation_list:
-            if citation_ref:
-                citation = form.database.get_citation_from_handle(citation_ref)
-                table.append_row(citation.gid,
-                                 citation.confidence,
-                                 citation.page,
-                                 goto=form.handler.app.make_url(citation.make_url()),
-                                 edit="%scitation_list/%s" % (path, count))
-                has_data = True
-                count += 1
+        for citation in form.database.get_citations_from_handles(
+                [citation_ref for citation_ref in citation_list
+                 if citation_ref]):
+            table.append_row(citation.gid,
+                             citation.confidence,
+                             citation.page,
+                             goto=form.handler.app.make_url(citation.make_url()),
+                             edit="%scitation_list/%s" % (path, count))
+            has_data = True
+            count += 1
     retval += """<div style="background-color: lightgray; padding: 2px 0px 0px 2px">"""
     if user and action == "view":
         if form.handler.app.can_add(user):
@@ -445,9 +447,9 @@ def repository_table(form, user, action, reporef_list):
     )
     if user or form.instance.public:
         count = 1
-        for repo_ref in reporef_list:
-            handle = repo_ref.ref
-            repo = form.database.get_repository_from_handle(handle)
+        repos = form.database.get_repositories_from_handles(
+            [repo_ref.ref for repo_ref in reporef_list])
+        for (repo_ref, repo) in zip(reporef_list, repos):
             table.append_row(repo.gid,
                              repo.name,
                              repo_ref.call_number,
@@ -493,8 +495,7 @@ def note_table(form, user, action, note_list, path=""):
     )
     if user or form.instance.public:
         count = 1
-        for handle in note_list:
-            note = form.database.get_note_from_handle(handle)
+        for note in form.database.get_notes_from_handles(note_list):
             table.append_row(note.gid,
                              str(note.type.string),
                              note.text.string[:50],
@@ -623,8 +624,9 @@ def media_table(form, user, action, media_list):
     )
     count = 1
     if user or form.instance.public:
-        for media_ref in media_list:
-            media = form.database.get_media_from_handle(media_ref.ref)
+        media_objects = form.database.get_media_from_handles(
+            [media_ref.ref for media_ref in media_list])
+        for (media_ref, media) in zip(media_list, media_objects):
             table.append_row(media.desc,
                              media.mime,
                              media.path,
@@ -904,6 +906,24 @@ def person_reference_table(form, user, action):
         retval += """ <SCRIPT LANGUAGE="JavaScript">setHasData("%s", 1)</SCRIPT>\n""" % cssid
     return retval
 
+def get_backlink_objects(database, handle):
+    """
+    Return a list of (obj_type, obj) of the objects that refer to
+    handle, getting those of each type together.
+    """
+    ref_pairs = list(database.find_backlink_handles(handle))
+    handles = {}
+    for (obj_type, ref_handle) in ref_pairs:
+        handles.setdefault(obj_type, []).append(ref_handle)
+    objects = {}
+    for (obj_type, type_handles) in handles.items():
+        objects.update(zip(((obj_type, ref_handle)
+                            for ref_handle in type_handles),
+                           database.get_objects_from_handles(obj_type,
+                                                             type_handles)))
+    return [(obj_type, objects[(obj_type, ref_handle)])
+            for (obj_type, ref_handle) in ref_pairs]
+
 def reference_table(form, user, action):
     from gprime.simple import SimpleAccess
     sa = SimpleAccess(form.database)
@@ -918,9 +938,8 @@ def reference_table(form, user, action):
         (form._("Reference"), 69),
         (form._("ID"), 10),
         )
-    for ref_pair in form.database.find_backlink_handles(form.instance.handle):
-        obj_type, handle = ref_pair
-        obj = form.database.get_table_func(obj_type, "handle_func")(handle)
+    for (obj_type, obj) in get_backlink_objects(form.database,
+                                                form.instance.handle):
         table.append_row(obj_type, sa.describe(obj), obj.gid,
                          goto=form.handler.app.make_url(obj.make_url()),
                          edit=None)
@@ -947,16 +966,17 @@ def children_table(form, user, action):
         (form._("Birth Date"), 19),
     )
     count = 1
-    for childref in form.instance.child_ref_list:
-        handle = childref.ref
-        child = form.database.get_person_from_handle(handle)
+    children = form.database.get_person_summaries(
+        [childref.ref for childref in form.instance.child_ref_list])
+    for (childref, child) in zip(form.instance.child_ref_list, children):
+        birth_date = child["birth_date"]
         table.append_row(str(count),
-                         "[%s]" % child.gid,
-                         name_display(child),
-                         render_gender(child.gender),
+                         "[%s]" % child["gid"],
+                         name_display_name(child["primary_name"]),
+                         render_gender(child["gender"]),
                          childref.frel.string,
                          childref.mrel.string,
-                         form.birth_date(child),
+                         date_display(birth_date) if birth_date else "",
                          goto=form.make_url("child_ref_list", count),
                          edit="child_ref_list/%s" % count)
         has_data = True
@@ -0,0 +1,108 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the handlers, served by Tornado """
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import tornado.web
+import tornado.testing
+
+from gprime.dbstate import DbState
+from gprime.db import DbTxn
+from gprime.db.executor import DatabaseExecutor
+from gprime.lib import Person, Surname
+from gprime.cli.jobs import get_job_dir
+from gprime.app.app import GPrimeApp
+
+class HandlersTest(tornado.testing.AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.database_dir = os.path.join(self.tmpdir, "database")
+        self.db = DbState().create_database(self.database_dir, "Test")
+        self.db.add_user("user", "", {"add", "edit", "delete"}, {})
+        person = Person()
+        person.primary_name.first_name = "Served"
+        person.primary_name.add_surname(Surname())
+        with DbTxn("Add", self.db) as trans:
+            self.db.add_person(person, trans)
+        self.handle = person.handle
+        self.executor = DatabaseExecutor(
+            self.db, lambda: DbState().open_database(self.database_dir), 2)
+        options = SimpleNamespace(
+            prefix="", sitename="gPrime", site_dir=self.tmpdir,
+            hostname="localhost", port=8000, debug=False, xsrf=False,
+            request_timeout=30, database="Test")
+        # As given to every process, with --processes:
+        return GPrimeApp(options, self.db, self.executor,
+                         cookie_secret="secret")
+
+    def tearDown(self):
+        super().tearDown()
+        self.executor.shutdown()
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def fetch_as_user(self, path, **kwargs):
+        cookie = tornado.web.create_signed_value("secret", "user", "user")
+        headers = kwargs.pop("headers", {})
+        headers["Cookie"] = "user=" + cookie.decode()
+        return self.fetch(path, headers=headers, follow_redirects=False,
+                          **kwargs)
+
+    def test_view(self):
+        response = self.fetch_as_user("/person/" + self.handle)
+        self.assertEqual(response.code, 200)
+        self.assertIn(b"Served", response.body)
+        # Not logged in:
+        response = self.fetch("/person/" + self.handle,
+                              follow_redirects=False)
+        self.assertEqual(response.code, 302)
+
+    def test_download(self):
+        self.db.add_job("job", "user", "Export", "ex_ged", "GEDCOM", {})
+        self.db.claim_job("worker")
+        os.makedirs(get_job_dir(os.path.join(self.tmpdir, "jobs"), "job"))
+        data = b"0 HEAD\n" * 100000
+        with open(os.path.join(self.tmpdir, "jobs", "job", "Test.ged"),
+                  "wb") as fp:
+            fp.write(data)
+        self.db.finish_job("job", "done", filename="Test.ged")
+        # Without gzip, as the client sends Accept-Encoding otherwise:
+        response = self.fetch_as_user("/job/job/download",
+                                      decompress_response=False)
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.body, data)
+        self.assertEqual(response.headers["Content-Length"], str(len(data)))
+        response = self.fetch_as_user(
+            "/job/job/download", headers={"Accept-Encoding": "gzip"},
+            decompress_response=False)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertLess(len(response.body), len(data))
+        self.assertEqual(gzip.decompress(response.body), data)
+
+if __name__ == "__main__":
+    unittest.main()
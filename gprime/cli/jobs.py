@@ -0,0 +1,572 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Background jobs: the reports, exports and imports started from the web
+pages. They are queued in the job table of the database, and each is
+run in a process of its own, so that it neither holds up the server nor
+adds to its memory. The files of a job, its output and its progress,
+are in a directory of its own, under the jobs directory of the site.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import threading
+import multiprocessing
+from urllib.parse import urlsplit
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.utils.id import create_id
+from gprime.utils.file import write_file
+from gprime.cli.user import User
+from gprime.cli.plug import BasePluginManager, run_report
+
+LOG = logging.getLogger(".cli.jobs")
+
+# Files in the directory of a job:
+PROGRESS_FILE = ".progress"
+CANCEL_FILE = ".cancel"
+# Directory of the files marking the JobQueues alive, in the jobs
+# directory:
+WORKERS_DIR = ".workers"
+
+#-------------------------------------------------------------------------
+#
+# Files of the jobs
+#
+#-------------------------------------------------------------------------
+def get_job_dir(jobs_dir, handle):
+    """
+    Return the directory of the files of the job.
+    """
+    return os.path.join(jobs_dir, handle)
+
+def get_job_output(jobs_dir, job):
+    """
+    Return the path of the output file of the finished job, or None if
+    it has none.
+    """
+    if job["status"] != "done" or not job["filename"]:
+        return None
+    path = os.path.join(get_job_dir(jobs_dir, job["handle"]), job["filename"])
+    if os.path.isfile(path):
+        return path
+    return None
+
+def get_job_progress(jobs_dir, job):
+    """
+    Return the progress of the job, as (percentage, message): of a
+    running job as last reported by its progress hooks, or else of its
+    status.
+    """
+    if job["status"] == "done":
+        return (100, job["message"])
+    elif job["status"] not in ["running", "cancelling"]:
+        return (0, job["message"])
+    try:
+        with open(os.path.join(get_job_dir(jobs_dir, job["handle"]),
+                               PROGRESS_FILE)) as fp:
+            progress = json.load(fp)
+        return (progress["percentage"], progress["message"])
+    except (OSError, ValueError):
+        return (0, "")
+
+def make_filename(name, extension):
+    """
+    Return a file name made of name, without characters that have a
+    meaning in paths, and the extension.
+    """
+    name = re.sub(r"[^\w.-]+", "_", name).strip("._") or "output"
+    return "%s.%s" % (name, extension)
+
+#-------------------------------------------------------------------------
+#
+# JobUser
+#
+#-------------------------------------------------------------------------
+class JobCancelled(Exception):
+    """
+    Raised by the progress hooks of a JobUser once its job is cancelled.
+    """
+
+class JobUser(User):
+    """
+    The User of a job: writes the progress reported to it to the progress
+    file of the job, at most every interval seconds, and raises
+    JobCancelled from the progress hooks when the job is cancelled.
+    Prompts are accepted, and errors kept in errors.
+    """
+    def __init__(self, directory, interval=1.0):
+        super().__init__(auto_accept=True)
+        self.directory = directory
+        self.interval = interval
+        self.percentage = 0
+        self.message = ""
+        self.errors = []
+        self.cancelled = False
+        self._written = 0
+
+    def begin_progress(self, title, message, steps):
+        self.steps = steps
+        self.current_step = 0
+        self.message = message or title
+        self.report(force=True)
+
+    def step_progress(self):
+        self.current_step += 1
+        if self.steps:
+            self.percentage = min(100 * self.current_step // self.steps, 100)
+        self.report()
+
+    def end_progress(self):
+        if self.steps:
+            self.percentage = 100
+        self.report(force=True)
+
+    def callback(self, percentage, text=None):
+        self.percentage = int(percentage)
+        if text:
+            self.message = text
+        self.report()
+
+    def warn(self, title, warning=""):
+        LOG.warning("%s %s", title, warning)
+
+    def notify_error(self, title, error=""):
+        self.errors.append(("%s %s" % (title, error)).strip())
+
+    def notify_db_error(self, error):
+        self.errors.append(error)
+
+    def report(self, force=False):
+        """
+        Write the progress, and check for cancellation.
+        """
+        now = time.monotonic()
+        if not force and now - self._written < self.interval:
+            return
+        self._written = now
+        if os.path.exists(os.path.join(self.directory, CANCEL_FILE)):
+            self.cancelled = True
+            raise JobCancelled()
+        write_file(os.path.join(self.directory, PROGRESS_FILE),
+                   json.dumps({"percentage": self.percentage,
+                               "message": self.message}))
+
+#-------------------------------------------------------------------------
+#
+# Running jobs
+#
+#-------------------------------------------------------------------------
+def run_job(handle, database_dir, jobs_dir, site_dir=None):
+    """
+    Run the job: open the database, run the report, export or import
+    with its files in the directory of the job, and set its outcome in
+    the job table. Run by a JobQueue in a process of its own.
+    """
+    import gprime.const
+    from gprime.dbstate import DbState
+    if site_dir is not None:
+        gprime.const.set_site_dir(site_dir)
+    database = DbState().open_database(database_dir)
+    if hasattr(database, "enable_multiprocess"):
+        # For the caches of the server to see the changes:
+        database.enable_multiprocess()
+    try:
+        job = database.get_job(handle)
+        directory = get_job_dir(jobs_dir, handle)
+        os.makedirs(directory, exist_ok=True)
+        user = JobUser(directory)
+        try:
+            filename = _RUNNERS[job["kind"]](database, job, directory, user)
+        except Exception as exc:
+            if not user.cancelled:
+                LOG.warning("Job %s failed", handle, exc_info=True)
+                database.finish_job(handle, "failed",
+                                    str(exc) or exc.__class__.__name__)
+                return
+        if user.cancelled:
+            # Caught by the plugin
+            shutil.rmtree(directory, ignore_errors=True)
+            database.finish_job(handle, "cancelled")
+        else:
+            database.finish_job(handle, "done", "", filename)
+    finally:
+        database.close()
+
+def _run_report(database, job, directory, user):
+    filename = make_filename(job["name"], "pdf")
+    clr = run_report(database, job["plugin"],
+                     username=job["username"],
+                     user=user,
+                     of=os.path.join(directory, filename),
+                     off="pdf", **job["options"])
+    if not clr:
+        raise Exception("; ".join(user.errors) or "Error in report")
+    return filename
+
+def _run_export(database, job, directory, user):
+    pdata = get_plugin(job["plugin"], user)
+    filename = make_filename(database.get_dbname() or "export",
+                             pdata.extension)
+    if (not export_file(database, os.path.join(directory, filename), user)
+            or user.errors):
+        raise Exception("; ".join(user.errors) or "Error in export")
+    return filename
+
+def _run_import(database, job, directory, user):
+    source = job["options"].get("i", "")
+    if urlsplit(source).scheme:
+        pdata = get_plugin(job["plugin"], user)
+        filename = upload(source, os.path.join(directory,
+                                               "import." + pdata.extension))
+    else:
+        filename = os.path.join(directory, os.path.basename(source))
+    if import_file(database, filename, user) is False or user.errors:
+        raise Exception("; ".join(user.errors) or "Error in import")
+    return ""
+
+_RUNNERS = {
+    "Report": _run_report,
+    "Export": _run_export,
+    "Import": _run_import,
+}
+
+def get_plugin(pid, user):
+    """
+    Return the registered plugin with the id pid.
+    """
+    from gprime.dbstate import DbState
+    from gprime.cli.grampscli import CLIManager
+    dbstate = DbState()
+    climanager = CLIManager(dbstate, setloader=False, user=user) # do not load db_loader
+    climanager.do_reg_plugins(dbstate, None)
+    pdata = BasePluginManager.get_instance().get_plugin(pid)
+    if pdata is None:
+        raise Exception("No plugin %r" % pid)
+    return pdata
+
+def import_file(db, filename, user):
+    """
+    Import a file (such as a GEDCOM file) into the given db.
+
+    >>> import_file(DbDjango(), "/home/user/Untitled_1.ged", User())
+    """
+    from gprime.dbstate import DbState
+    from gprime.cli.grampscli import CLIManager
+    dbstate = DbState()
+    climanager = CLIManager(dbstate, setloader=False, user=user) # do not load db_loader
+    climanager.do_reg_plugins(dbstate, None)
+    pmgr = BasePluginManager.get_instance()
+    (name, ext) = os.path.splitext(os.path.basename(filename))
+    format = ext[1:].lower()
+    import_list = pmgr.get_reg_importers()
+    for pdata in import_list:
+        if format == pdata.extension:
+            mod = pmgr.load_plugin(pdata)
+            if not mod:
+                for item in pmgr.get_fail_list():
+                    name, error_tuple, pdata = item
+                    # (filename, (exception-type, exception, traceback), pdata)
+                    etype, exception, traceback = error_tuple
+                    print("ERROR:", name, exception)
+                return False
+            import_function = getattr(mod, pdata.import_function)
+            retval = import_function(db, filename, user)
+            return retval
+    return False
+
+def upload(url, filename=None):
+    from urllib.request import Request, urlopen
+    def getFilename(url,openUrl):
+        if 'Content-Disposition' in openUrl.info():
+            # If the response has Content-Disposition, try to get filename from it
+            cd = dict([x.strip().split('=') if '=' in x else (x.strip(),'')
+                                        for x in openUrl.info().split(';')])
+            if 'filename' in cd:
+                fname = cd['filename'].strip("\"'")
+                if fname: return fname
+        # if no filename was found above, parse it out of the final URL.
+        return os.path.basename(urlsplit(openUrl.url)[2])
+    r = urlopen(Request(url))
+    success = None
+    try:
+        filename = filename or "/tmp/%s" % getFilename(url,r)
+        with open(filename, 'wb') as f:
+            shutil.copyfileobj(r,f)
+        success = filename
+    finally:
+        r.close()
+    return success
+
+def export_file(db, filename, user):
+    """
+    Export the db to a file (such as a GEDCOM file).
+
+    >>> export_file(DbDjango(), "/home/user/Untitled_1.ged", User())
+    """
+    from gprime.dbstate import DbState
+    from gprime.cli.grampscli import CLIManager
+    dbstate = DbState()
+    climanager = CLIManager(dbstate, setloader=False, user=user) # do not load db_loader
+    climanager.do_reg_plugins(dbstate, None)
+    pmgr = BasePluginManager.get_instance()
+    (name, ext) = os.path.splitext(os.path.basename(filename))
+    format = ext[1:].lower()
+    export_list = pmgr.get_reg_exporters()
+    for pdata in export_list:
+        if format == pdata.extension:
+            mod = pmgr.load_plugin(pdata)
+            if not mod:
+                for item in pmgr.get_fail_list():
+                    name, error_tuple, pdata = item
+                    etype, exception, traceback = error_tuple
+                    print("ERROR:", name, exception)
+                return False
+            export_function = getattr(mod, pdata.export_function)
+            export_function(db, filename, user)
+            return True
+    return False
+
+#-------------------------------------------------------------------------
+#
+# JobQueue
+#
+#-------------------------------------------------------------------------
+class JobQueue:
+    """
+    Runs the queued jobs of the job table, at most max_workers at a time,
+    each in a new process, from a thread that claims them. Each server
+    process may have a JobQueue on the same database; each job is run by
+    one of them. The jobs finished more than retention seconds ago are
+    removed, with their files.
+    """
+    # Seconds between looks at the job table, unless woken:
+    POLL_SECONDS = 1.0
+    # Seconds that a cancelled job may take to stop on its own, before
+    # its process is terminated:
+    CANCEL_SECONDS = 30
+    # Seconds after which a JobQueue that has not marked itself alive is
+    # taken to have stopped, and its running jobs are failed:
+    STALE_SECONDS = 5 * 60
+    # Seconds between removals of finished jobs:
+    CLEAN_SECONDS = 60
+
+    def __init__(self, open_database, database_dir, jobs_dir, max_workers=2,
+                 retention=24 * 60 * 60, site_dir=None):
+        """
+        open_database - function returning a new database on the data of
+                        database_dir, for the thread of the queue
+        """
+        self.open_database = open_database
+        self.database_dir = database_dir
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self.retention = retention
+        self.site_dir = site_dir
+        self.worker = "%s-%s" % (os.getpid(), create_id())
+        # Spawned, not forked, as the server has threads and connections:
+        self.context = multiprocessing.get_context("spawn")
+        self.processes = {} # handle: process running the job
+        self.cancelled = {} # handle: time the cancel was seen
+        self.event = threading.Event()
+        self.thread = None
+        self.stopping = False
+        self._cleaned = 0
+        os.makedirs(os.path.join(self.jobs_dir, WORKERS_DIR), exist_ok=True)
+
+    def start(self):
+        """
+        Start the thread running the jobs.
+        """
+        self.thread = threading.Thread(target=self._run, name="jobs",
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop the thread and the running jobs, which are queued again,
+        except imports, which fail.
+        """
+        if self.thread is not None:
+            self.stopping = True
+            self.event.set()
+            self.thread.join()
+            self.thread = None
+
+    def wake(self):
+        """
+        Have the thread look at the job table now.
+        """
+        self.event.set()
+
+    def submit(self, database, username, kind, plugin, name, options,
+               files=None):
+        """
+        Queue a job, and return its handle. database is the database of
+        the calling thread; files a {file name: bytes} dict of the input
+        files of the job, such as the file to import.
+        """
+        handle = create_id()
+        if files:
+            directory = get_job_dir(self.jobs_dir, handle)
+            os.makedirs(directory)
+            for (filename, data) in files.items():
+                write_file(os.path.join(directory, os.path.basename(filename)),
+                           data, "wb")
+        database.add_job(handle, username, kind, plugin, name, options)
+        self.wake()
+        return handle
+
+    def cancel(self, database, handle):
+        """
+        Cancel the job, and return its new status. database is the
+        database of the calling thread.
+        """
+        status = database.cancel_job(handle)
+        self.wake()
+        return status
+
+    def _run(self):
+        database = self.open_database()
+        try:
+            while not self.stopping:
+                try:
+                    self.poll(database)
+                except Exception:
+                    LOG.warning("Error running the jobs", exc_info=True)
+                self.event.wait(self.POLL_SECONDS)
+                self.event.clear()
+        finally:
+            try:
+                self._stop_jobs(database)
+            finally:
+                database.close()
+
+    def poll(self, database):
+        """
+        Handle the jobs that have finished or are cancelled, and start
+        the queued ones.
+        """
+        now = time.time()
+        write_file(self._get_alive_file(self.worker), str(now))
+        self._reap(database)
+        for job in database.get_jobs(status="cancelling"):
+            if job["handle"] in self.processes:
+                self._cancel(job["handle"], now)
+        while len(self.processes) < self.max_workers:
+            job = database.claim_job(self.worker)
+            if job is None:
+                break
+            self._start(job)
+        if now - self._cleaned > self.CLEAN_SECONDS:
+            self._cleaned = now
+            self._fail_stale(database, now)
+            for handle in database.remove_jobs(now - self.retention):
+                shutil.rmtree(get_job_dir(self.jobs_dir, handle),
+                              ignore_errors=True)
+
+    def _start(self, job):
+        os.makedirs(get_job_dir(self.jobs_dir, job["handle"]), exist_ok=True)
+        process = self.context.Process(
+            target=run_job, name="job-%s" % job["handle"],
+            args=(job["handle"], self.database_dir, self.jobs_dir,
+                  self.site_dir),
+            daemon=True)
+        process.start()
+        self.processes[job["handle"]] = process
+
+    def _reap(self, database):
+        for (handle, process) in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[handle]
+            self.cancelled.pop(handle, None)
+            job = database.get_job(handle)
+            if job and job["status"] == "cancelling":
+                database.finish_job(handle, "cancelled")
+            elif job and job["status"] == "running":
+                database.finish_job(handle, "failed",
+                                    "Stopped, with exit code %s" %
+                                    process.exitcode)
+
+    def _cancel(self, handle, now):
+        if handle not in self.cancelled:
+            self.cancelled[handle] = now
+            write_file(os.path.join(get_job_dir(self.jobs_dir, handle),
+                                    CANCEL_FILE), "")
+        elif now - self.cancelled[handle] > self.CANCEL_SECONDS:
+            LOG.warning("Terminating the cancelled job %s", handle)
+            self.processes[handle].terminate()
+
+    def _get_alive_file(self, worker):
+        return os.path.join(self.jobs_dir, WORKERS_DIR, worker)
+
+    def _fail_stale(self, database, now):
+        """
+        Fail the running jobs of the JobQueues that have stopped without
+        stopping their jobs.
+        """
+        stale = set()
+        for status in ["running", "cancelling"]:
+            for job in database.get_jobs(status=status):
+                try:
+                    alive = os.path.getmtime(
+                        self._get_alive_file(job["worker"]))
+                except OSError:
+                    alive = 0
+                if now - alive > self.STALE_SECONDS:
+                    database.finish_job(job["handle"], "failed", "Interrupted")
+                    stale.add(job["worker"])
+        for worker in stale:
+            try:
+                os.unlink(self._get_alive_file(worker))
+            except OSError:
+                pass
+
+    def _stop_jobs(self, database):
+        for (handle, process) in self.processes.items():
+            process.terminate()
+        for (handle, process) in self.processes.items():
+            process.join()
+            job = database.get_job(handle)
+            if job and job["kind"] == "Import" and job["status"] == "running":
+                # Possibly partly imported
+                database.finish_job(handle, "failed", "Interrupted")
+        self.processes.clear()
+        database.requeue_jobs(self.worker)
+        try:
+            os.unlink(self._get_alive_file(self.worker))
+        except OSError:
+            pass
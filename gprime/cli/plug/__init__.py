@@ -639,9 +639,10 @@ class CommandLineReport:
 #
 #------------------------------------------------------------------------
 def cl_report(database, name, category, report_class, options_class,
-              options_str_dict, username):
+              options_str_dict, username, user=None):
     """
-    function to actually run the selected report
+    function to actually run the selected report, with the User user to
+    report its progress to, if given
     """
 
     err_msg = _("Failed to write report. ")
@@ -674,7 +675,8 @@ def cl_report(database, name, category, report_class, options_class,
         if (clr.css_filename is not None
                 and hasattr(clr.option_class.handler.doc, 'set_css_filename')):
             clr.option_class.handler.doc.set_css_filename(clr.css_filename)
-        my_report = report_class(database, clr.option_class, User())
+        my_report = report_class(database, clr.option_class,
+                                 user if user is not None else User())
         my_report.doc.init()
         my_report.begin_report()
         my_report.write_report()
@@ -698,7 +700,7 @@ def cl_report(database, name, category, report_class, options_class,
             except:
                 traceback.print_exc()
 
-def run_report(db, name, username=None, **options_str_dict):
+def run_report(db, name, username=None, user=None, **options_str_dict):
     """
     Given a database, run a given report.
 
@@ -706,6 +708,8 @@ def run_report(db, name, username=None, **options_str_dict):
 
     name is the name of a report
 
+    user is the User the report reports its progress to, if given
+
     options_str_dict is the same kind of options
     given at the command line. For example:
 
@@ -740,7 +744,7 @@ def run_report(db, name, username=None, **options_str_dict):
             else:
                 clr = cl_report(db, name, category,
                                 report_class, options_class,
-                                options_str_dict, username)
+                                options_str_dict, username, user)
                 return clr
     return clr
 
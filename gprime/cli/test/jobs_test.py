@@ -0,0 +1,134 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the background jobs """
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from gprime.dbstate import DbState
+from gprime.db import DbTxn
+from gprime.lib import Person, Surname
+from gprime.cli.jobs import (JobQueue, JobUser, JobCancelled, run_job,
+                             get_job_dir, get_job_output, get_job_progress,
+                             CANCEL_FILE)
+
+class JobTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.database_dir = os.path.join(self.tmpdir, "database")
+        self.jobs_dir = os.path.join(self.tmpdir, "jobs")
+        self.db = DbState().create_database(self.database_dir, "Test")
+        with DbTxn("Add", self.db) as trans:
+            for i in range(20):
+                person = Person()
+                person.primary_name.first_name = "Person %d" % i
+                person.primary_name.add_surname(Surname())
+                self.db.add_person(person, trans)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_table(self):
+        self.db.add_job("a", "user", "Export", "ex_ged", "GEDCOM", {})
+        self.db.add_job("b", "other", "Report", "ancestor_report",
+                        "Ancestors", {"pid": "I0001"})
+        self.assertEqual([job["handle"] for job in self.db.get_jobs("user")],
+                         ["a"])
+        self.assertEqual(self.db.get_job("b")["options"], {"pid": "I0001"})
+        # Claimed by one worker only:
+        self.assertEqual(self.db.claim_job("one")["handle"], "a")
+        self.assertEqual(self.db.claim_job("two")["handle"], "b")
+        self.assertIsNone(self.db.claim_job("one"))
+        self.assertEqual(self.db.cancel_job("a"), "cancelling")
+        self.db.requeue_jobs("one")
+        self.db.requeue_jobs("two")
+        self.assertEqual(self.db.get_job("a")["status"], "cancelled")
+        self.assertEqual(self.db.get_job("b")["status"], "queued")
+        self.assertEqual(self.db.cancel_job("b"), "cancelled")
+        self.assertEqual(self.db.remove_jobs(time.time() - 60), [])
+        self.assertEqual(sorted(self.db.remove_jobs(time.time() + 60)),
+                         ["a", "b"])
+        self.assertEqual(self.db.get_jobs(), [])
+
+    def test_run(self):
+        self.db.add_job("export", "user", "Export", "ex_ged", "GEDCOM", {})
+        run_job("export", self.database_dir, self.jobs_dir)
+        job = self.db.get_job("export")
+        self.assertEqual((job["status"], job["filename"]), ("done", "Test.ged"))
+        self.assertEqual(get_job_progress(self.jobs_dir, job), (100, ""))
+        with open(get_job_output(self.jobs_dir, job)) as fp:
+            self.assertIn("Person 19", fp.read())
+        self.db.add_job("report", "user", "Report", "no_report", "None", {})
+        run_job("report", self.database_dir, self.jobs_dir)
+        job = self.db.get_job("report")
+        self.assertEqual((job["status"], job["message"]),
+                         ("failed", "Error in report"))
+        self.assertIsNone(get_job_output(self.jobs_dir, job))
+
+    def test_cancel(self):
+        directory = get_job_dir(self.jobs_dir, "export")
+        user = JobUser(directory)
+        os.makedirs(directory)
+        user.begin_progress("Export", "Exporting", 2)
+        user.step_progress()
+        self.assertEqual(get_job_progress(self.jobs_dir, {
+            "handle": "export", "status": "running"}), (0, "Exporting"))
+        with open(os.path.join(directory, CANCEL_FILE), "w"):
+            pass
+        with self.assertRaises(JobCancelled):
+            user.end_progress()
+        # Cancelled from the progress hooks of the exporter:
+        self.db.add_job("export", "user", "Export", "ex_gramps", "XML", {})
+        run_job("export", self.database_dir, self.jobs_dir)
+        self.assertEqual(self.db.get_job("export")["status"], "cancelled")
+        self.assertFalse(os.path.exists(directory))
+
+    def test_queue(self):
+        queue = JobQueue(lambda: DbState().open_database(self.database_dir),
+                         self.database_dir, self.jobs_dir, 1, 60)
+        queue.POLL_SECONDS = 0.1
+        queue.start()
+        try:
+            handle = queue.submit(self.db, "user", "Export", "ex_ged",
+                                  "GEDCOM", {})
+            deadline = time.time() + 120
+            while (self.db.get_job(handle)["status"] in ["queued", "running"]
+                   and time.time() < deadline):
+                time.sleep(0.1)
+            job = self.db.get_job(handle)
+            self.assertEqual(job["status"], "done")
+            self.assertIsNotNone(get_job_output(self.jobs_dir, job))
+        finally:
+            queue.stop()
+        # Past the retention:
+        queue.retention = -60
+        queue._cleaned = 0
+        queue.poll(self.db)
+        self.assertIsNone(self.db.get_job(handle))
+        self.assertFalse(os.path.exists(get_job_dir(self.jobs_dir, handle)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,9 +31,10 @@ from this class.
 #
 #-------------------------------------------------------------------------
 import re
+import json
 import time
-from operator import itemgetter
 import logging
+from itertools import islice
 
 #-------------------------------------------------------------------------
 #
@@ -47,6 +48,7 @@ from ..lib.childreftype import ChildRefType
 from ..lib.childref import ChildRef
 from .txn import DbTxn
 from .exceptions import DbTransactionCancel
+from ..errors import HandleError
 
 _LOG = logging.getLogger(DBLOGNAME)
 
@@ -60,6 +62,41 @@ def eval_order_by(order_by, obj, db):
         values.append(obj.get_field(field, db, ignore_errors=True))
     return values
 
+def get_search_words(text):
+    """
+    Return the lower case words of text, as matched by a search.
+    """
+    return re.findall(r"\w+", text.lower())
+
+def _get_field_values(value, chain):
+    """
+    Return the values at the attribute path chain (no joins) from value,
+    of all items of the lists on the way.
+    """
+    if isinstance(value, (list, tuple)):
+        if chain and chain[0].isdigit():
+            position = int(chain[0])
+            if position < len(value):
+                return _get_field_values(value[position], chain[1:])
+            return []
+        return [item for part in value
+                for item in _get_field_values(part, chain)]
+    elif value is None:
+        return []
+    elif not chain:
+        return [value]
+    return _get_field_values(getattr(value, chain[0], None), chain[1:])
+
+def get_search_text(obj):
+    """
+    Return the text of the search fields of the primary object obj, for
+    the full-text search index.
+    """
+    # Not with get_field, which is slow for the many objects of an import:
+    return " ".join([str(value) for field in obj.get_search_fields()
+                     for value in _get_field_values(obj, field.split("."))
+                     if value])
+
 def sort_objects(objects, order_by, db):
     """
     Python-based sorting.
@@ -74,7 +111,8 @@ def sort_objects(objects, order_by, db):
     # next we sort by fields and direction
     pos = len(order_by) - 1
     for (field, order) in reversed(order_by): # sort the lasts parts first
-        sorted_items.sort(key=itemgetter(pos), reverse=(order=="DESC"))
+        sorted_items.sort(key=lambda item: item[0][pos],
+                          reverse=(order=="DESC"))
         pos -= 1
     for (order_by_values, handle) in sorted_items:
         yield map_items[handle]
@@ -91,6 +129,8 @@ class DbReadBase:
     database interfaces.  All methods raise NotImplementedError
     and must be implemented in the derived class as required.
     """
+    # Number of rows of a select whose fields are got together:
+    PREFETCH_ROWS = 100
 
     def __init__(self):
         """
@@ -833,6 +873,24 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def get_surname_counts(self, prefix="", after=None, count=None):
+        """
+        Return a sorted list of (surname, number of people) of the
+        primary surnames of the people: those that start with prefix,
+        whatever the case, and sort after after, if given, at most count
+        of them.
+
+        Meant for paging through the surnames, and for completing them.
+        """
+        counts = {}
+        for person in self.iter_people():
+            surname_list = person.get_primary_name().get_surname_list()
+            surname = surname_list[0].surname if surname_list else ""
+            if (surname.lower().startswith(prefix.lower()) and
+                    (after is None or surname > after)):
+                counts[surname] = counts.get(surname, 0) + 1
+        return sorted(counts.items())[:count]
+
     def get_tag_cursor(self):
         """
         Return a reference to a cursor over Tag objects
@@ -847,6 +905,197 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def get_objects_from_handles(self, table, handles, ignore_errors=False):
+        """
+        Return a list of the objects of table ("Person", "Family", ...)
+        with the passed handles, in the same order.
+
+        If any of them do not exist, a HandleError naming them is raised,
+        or, if ignore_errors is True, they are None in the list.
+
+        This implementation gets them one at a time; databases override
+        it to get them together.
+        """
+        handle_func = self.get_table_func(table, "handle_func")
+        objects = []
+        missing = []
+        for handle in handles:
+            try:
+                obj = handle_func(handle)
+            except HandleError:
+                obj = None
+                missing.append(handle)
+            objects.append(obj)
+        if missing and not ignore_errors:
+            raise HandleError("%s handles not found: %s" %
+                              (table, ", ".join(map(str, missing))))
+        return objects
+
+    def get_raw_data_from_handles(self, table, handles):
+        """
+        Return a list of the raw data (structs) of the objects of table
+        with the passed handles, in the same order, with None for those
+        that do not exist.
+        """
+        return [None if obj is None else obj.to_struct()
+                for obj in self.get_objects_from_handles(table, handles,
+                                                         True)]
+
+    def get_people_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Person objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Person", handles, ignore_errors)
+
+    def get_families_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Family objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Family", handles, ignore_errors)
+
+    def get_events_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Event objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Event", handles, ignore_errors)
+
+    def get_places_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Place objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Place", handles, ignore_errors)
+
+    def get_sources_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Source objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Source", handles, ignore_errors)
+
+    def get_citations_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Citation objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Citation", handles,
+                                             ignore_errors)
+
+    def get_media_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Media objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Media", handles, ignore_errors)
+
+    def get_repositories_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Repository objects with the passed handles;
+        see get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Repository", handles,
+                                             ignore_errors)
+
+    def get_notes_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Note objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Note", handles, ignore_errors)
+
+    def get_tags_from_handles(self, handles, ignore_errors=False):
+        """
+        Return a list of the Tag objects with the passed handles; see
+        get_objects_from_handles.
+        """
+        return self.get_objects_from_handles("Tag", handles, ignore_errors)
+
+    def get_person_summary(self, handle):
+        """
+        Return the summary of a person, or None if there is no such
+        person; see get_person_summaries.
+        """
+        return self.get_person_summaries([handle])[0]
+
+    def get_person_summaries(self, handles):
+        """
+        Return a list of the summaries of the people with the passed
+        handles, in the same order, with None for those that do not
+        exist. A summary is a dictionary of the values that lists of
+        people show:
+
+        handle, gid, gender
+        primary_name - the Name
+        surname, first_name - of the primary name
+        birth_date, death_date - the Date of the birth and death events,
+                                 or None
+        birth_sortval, death_sortval - their sort values, or None
+        parent_family_handle - of the main parents' family, or None
+        father_handle, mother_handle - of that family, or None
+
+        This implementation makes them from the objects; databases may
+        keep them, so that they are got without the objects.
+        """
+        return self._make_person_summaries(handles)
+
+    def _make_person_summaries(self, handles):
+        """
+        Make the summaries of get_person_summaries from the people, and
+        their birth and death events and parents' families, getting each
+        together.
+        """
+        people = self.get_people_from_handles(handles, ignore_errors=True)
+        event_handles = set()
+        family_handles = set()
+        for person in people:
+            if person is None:
+                continue
+            for ref in [person.get_birth_ref(), person.get_death_ref()]:
+                if ref and ref.ref:
+                    event_handles.add(ref.ref)
+            family_handle = person.get_main_parents_family_handle()
+            if family_handle:
+                family_handles.add(family_handle)
+        event_handles = list(event_handles)
+        events = dict(zip(event_handles,
+                          self.get_events_from_handles(event_handles, True)))
+        family_handles = list(family_handles)
+        families = dict(zip(family_handles,
+                            self.get_families_from_handles(family_handles,
+                                                           True)))
+        summaries = []
+        for person in people:
+            if person is None:
+                summaries.append(None)
+                continue
+            name = person.get_primary_name()
+            surname_list = name.get_surname_list()
+            family_handle = person.get_main_parents_family_handle() or None
+            family = families.get(family_handle)
+            summary = {
+                "handle": person.handle,
+                "gid": person.gid,
+                "gender": person.gender,
+                "primary_name": name,
+                "surname": surname_list[0].surname if surname_list else "",
+                "first_name": name.first_name,
+                "parent_family_handle": family_handle,
+                "father_handle": family and family.father_handle or None,
+                "mother_handle": family and family.mother_handle or None,
+            }
+            for (key, ref) in [("birth", person.get_birth_ref()),
+                               ("death", person.get_death_ref())]:
+                event = events.get(ref.ref) if ref else None
+                date = event.get_date_object() if event else None
+                summary[key + "_date"] = date
+                summary[key + "_sortval"] = (None if date is None
+                                             else date.get_sort_value())
+            summaries.append(summary)
+        return summaries
+
     def get_tag_from_name(self, val):
         """
         Find a Tag in the database from the passed Tag name.
@@ -1031,6 +1280,16 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def iter_raw_json(self, table, order_by=None):
+        """
+        Return an iterator over the objects of table (Person, Family,
+        etc.) as JSON text with sorted keys, ordered as by order_by (see
+        iter_items). Databases that keep the objects as JSON give it as
+        it is, without making the objects.
+        """
+        for obj in self.get_table_func(table, "iter_func")(order_by=order_by):
+            yield json.dumps(obj.to_struct(), sort_keys=True)
+
     def iter_repositories(self, order_by=None):
         """
         Return an iterator over objects for Repositories in the database
@@ -1214,8 +1473,31 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def _search(self, table, text):
+        """
+        Return {handle: rank} of the objects of table with text in their
+        search fields: each word of text starts a word of theirs. The
+        lower the rank, the better the match.
+        """
+        class_ = self.get_table_func(table, "class_func")
+        if not class_.get_search_fields():
+            raise Exception("%s has no search fields" % table)
+        words = get_search_words(text)
+        ranks = {}
+        if not words:
+            return ranks
+        for obj in self.get_table_func(table, "iter_func")():
+            obj_words = get_search_words(get_search_text(obj))
+            matches = [len([obj_word for obj_word in obj_words
+                            if obj_word.startswith(word)])
+                       for word in words]
+            if all(matches):
+                # the more of the words that match, the better:
+                ranks[obj.handle] = -sum(matches) / len(obj_words)
+        return ranks
+
     def _select(self, table, fields=None, start=0, limit=-1,
-                where=None, order_by=None):
+                where=None, order_by=None, search=None):
         """
         Default implementation of a select for those databases
         that don't support SQL. Returns a list of dicts, total,
@@ -1230,6 +1512,9 @@ class DbReadBase:
                  ["OR",  [where, where, ...]]      |
                  ["NOT",  where]
         order_by - [[fieldname, "ASC" | "DESC"], ...]
+        search - text; only objects that match it in their search fields
+                 (see _search) are selected, best matches first if there
+                 is no order_by
         """
         def compare(v, op, value):
             """
@@ -1241,6 +1526,8 @@ class DbReadBase:
                     if compare(item, op, value):
                         return True
                 return False
+            if op in [">", ">=", "<", "<="] and (v is None or value is None):
+                return False # as with NULL in SQL
             if op in ["=", "=="]:
                 matched = v == value
             elif op == ">":
@@ -1281,24 +1568,34 @@ class DbReadBase:
                 raise Exception("invalid select operator: '%s'" % op)
             return True if matched else False
 
-        def evaluate_values(condition, item, db, table, env):
+        def get_names(condition, names):
             """
-            Evaluates the names in all conditions.
+            Add the {hashed name: name} of all conditions to names.
             """
             if len(condition) == 2: # ["AND" [...]] | ["OR" [...]] | ["NOT" expr]
                 connector, exprs = condition
                 if connector in ["AND", "OR"]:
                     for expr in exprs:
-                        evaluate_values(expr, item, db, table, env)
+                        get_names(expr, names)
                 else: # "NOT"
-                    evaluate_values(exprs, item, db, table, env)
+                    get_names(exprs, names)
             elif len(condition) == 3: # (name, op, value)
                 (name, op, value) = condition
                 # just the ones we need for where
-                hname = self._hash_name(table, name)
-                if hname not in env:
-                    value = item.get_field(name, db, ignore_errors=True)
+                names.setdefault(self._hash_name(table, name), name)
+            return names
+
+        def evaluate_values(items):
+            """
+            Return the env {hashed name: value} of the names of the
+            where of each of the items, joining together.
+            """
+            envs = [{} for item in items]
+            for (hname, name) in where_names.items():
+                values = class_func.get_field_values(items, name, self, True)
+                for (env, value) in zip(envs, values):
                     env[hname] = value
+            return envs
 
         def evaluate_truth(condition, item, db, table, env):
             if len(condition) == 2: # ["AND"|"OR" [...]]
@@ -1331,35 +1628,54 @@ class DbReadBase:
             fields.remove("*")
             fields.extend(self.get_table_func(table,"class_func").get_schema().keys())
         get_count_only = (fields is not None and fields[0] == "count(1)")
+        class_func = self.get_table_func(table, "class_func")
+        if fields and not get_count_only:
+            make_rows = lambda items: self._get_rows(class_func, fields,
+                                                     items)
+        else:
+            make_rows = lambda items: items
         position = 0
         selected = 0
         if get_count_only:
-            if where or limit != -1 or start != 0:
+            if where or limit != -1 or start != 0 or search is not None:
                 # no need to order for a count
                 data = self.get_table_func(table,"iter_func")()
             else:
                 yield self.get_table_func(table,"count_func")()
         else:
             data = self.get_table_func(table, "iter_func")(order_by=order_by)
+        if search is not None:
+            ranks = self._search(table, search)
+            if order_by or get_count_only:
+                data = (item for item in data if item.handle in ranks)
+            else:
+                handle_func = self.get_table_func(table, "handle_func")
+                data = (handle_func(handle) for handle in
+                        sorted(ranks, key=lambda handle: (ranks[handle],
+                                                          handle)))
+        # The items are taken PREFETCH_ROWS at a time, so that the
+        # objects of the joins of their fields are got together:
+        page = []
         if where:
-            for item in data:
+            data = iter(data)
+            where_names = get_names(where, {})
+            while True:
+                items = list(islice(data, self.PREFETCH_ROWS))
+                if not items:
+                    break
                 # Go through all fliters and evaluate the fields:
-                env = {}
-                evaluate_values(where, item, self, table, env)
-                matched = evaluate_truth(where, item, self, table, env)
-                if matched:
-                    if ((selected < limit) or (limit == -1)) and start <= position:
-                        selected += 1
-                        if not get_count_only:
-                            if fields:
-                                row = {}
-                                for field in fields:
-                                    value = item.get_field(field, self, ignore_errors=True)
-                                    row[field.replace("__", ".")] = value
-                                yield row
-                            else:
-                                yield item
-                    position += 1
+                envs = evaluate_values(items)
+                for (item, env) in zip(items, envs):
+                    matched = evaluate_truth(where, item, self, table, env)
+                    if matched:
+                        if ((selected < limit) or (limit == -1)) and start <= position:
+                            selected += 1
+                            if not get_count_only:
+                                page.append(item)
+                        position += 1
+                if page:
+                    yield from make_rows(page)
+                    page = []
             if get_count_only:
                 yield selected
         else: # no where
@@ -1369,18 +1685,62 @@ class DbReadBase:
                         break
                     selected += 1
                     if not get_count_only:
-                        if fields:
-                            row = {}
-                            for field in fields:
-                                value = item.get_field(field, self, ignore_errors=True)
-                                row[field.replace("__", ".")] = value
-                            yield row
-                        else:
-                            yield item
+                        page.append(item)
+                        if len(page) >= self.PREFETCH_ROWS:
+                            yield from make_rows(page)
+                            page = []
                 position += 1
+            if page:
+                yield from make_rows(page)
             if get_count_only:
                 yield selected
 
+    def _get_rows(self, class_func, fields, items):
+        """
+        Return the rows {field: value} of the fields of the items, the
+        objects of class_func, getting the objects of each join of all
+        of them together (see TableObject.get_field_values).
+        """
+        rows = [{} for item in items]
+        for field in fields:
+            name = field.replace("__", ".")
+            values = class_func.get_field_values(items, field, self, True)
+            for (row, value) in zip(rows, values):
+                row[name] = value
+        return rows
+
+    def _count(self, table, where=None, search=None):
+        """
+        Return the number of rows of table that match where and search
+        (see _select), and whether it is an estimate, as (count,
+        estimated).
+        """
+        if not where and search is None:
+            return (self.get_table_func(table, "count_func")(), False)
+        return (next(self._select(table, ["count(1)"], where=where,
+                                  search=search)), False)
+
+    def _select_page(self, table, fields=None, start=0, limit=-1,
+                     where=None, order_by=None, search=None):
+        """
+        Return a page of a select (see _select) as a list, with the
+        number of rows the select has without start and limit, as
+        (rows, total, estimated); estimated is True if the total is an
+        estimate. An estimate is kept to the rows that the page shows
+        there are; a page short of the limit has the exact total.
+        """
+        rows = list(self._select(table, fields, start, limit, where,
+                                 order_by, search))
+        (total, estimated) = self._count(table, where, search)
+        if estimated and (rows or not start):
+            if limit < 0 or len(rows) < limit: # the last page
+                (total, estimated) = (start + len(rows), False)
+            else:
+                total = max(total, start + len(rows))
+        elif estimated: # after the last page
+            total = min(total, start)
+        return (rows, total, estimated)
+
     def _hash_name(self, table, name):
         """
         Used in SQL functions to eval expressions involving selected
@@ -2020,6 +2380,8 @@ class QuerySet:
         self.order_by = None
         self.limit_by = -1
         self.start = 0
+        self.keyset = None
+        self.search_text = None
         self.needs_to_run = False
         self._class = self.database.get_table_func(self.table, "class_func")
 
@@ -2057,6 +2419,77 @@ class QuerySet:
         self.needs_to_run = True
         return self
 
+    def after(self, *values):
+        """
+        Select the rows that come after the given values of the
+        order_by fields (keyset, or "seek", pagination). The handle is
+        always the last order_by field, to break ties, so the values are
+        those of the last row of the previous page followed by its
+        handle. Unlike limit(start=...), this doesn't need to go through
+        the rows of all of the previous pages.
+        """
+        self.keyset = (values, False)
+        self.needs_to_run = True
+        return self
+
+    def before(self, *values):
+        """
+        Select the rows that come before the given values of the
+        order_by fields, like after(); the rows are still returned in
+        order_by order. With no values, select the last rows.
+        """
+        self.keyset = (values, True)
+        self.needs_to_run = True
+        return self
+
+    def search(self, text):
+        """
+        Select the objects with text in their search fields (names,
+        notes, places, and sources), using the full-text search index of
+        the database if it has one. Without an order, the best matches
+        come first.
+        """
+        self.search_text = text
+        self.needs_to_run = True
+        return self
+
+    def _get_keyset_criteria(self):
+        """
+        Return the order_by and where_by that select the keyset.
+        """
+        values, reverse = self.keyset
+        order_by = list(self.order_by or [])
+        if "handle" not in [field for (field, direction) in order_by]:
+            order_by.append(("handle", "ASC"))
+        if reverse:
+            order_by = [(field, "ASC" if direction.upper() == "DESC" else "DESC")
+                        for (field, direction) in order_by]
+        where_by = self.where_by
+        if values:
+            if len(values) != len(order_by):
+                raise Exception("keyset needs a value for each of %s" %
+                                [field for (field, direction) in order_by])
+            # (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...
+            or_expr = []
+            for i in range(len(order_by)):
+                (field, direction) = order_by[i]
+                and_expr = [(order_by[j][0], "=", values[j]) for j in range(i)]
+                and_expr.append((field,
+                                 "<" if direction.upper() == "DESC" else ">",
+                                 values[i]))
+                or_expr.append(["AND", and_expr])
+            # The first condition lets an index on the first field be used:
+            (field, direction) = order_by[0]
+            keyset_where = ["AND", [
+                (field, "<=" if direction.upper() == "DESC" else ">=",
+                 values[0]),
+                ["OR", or_expr]]]
+            if where_by:
+                where_by = ["AND", [where_by, keyset_where]]
+            else:
+                where_by = keyset_where
+        return order_by, where_by
+
     def _add_where_clause(self, *args):
         """
         Add a condition to the where clause.
@@ -2085,30 +2518,54 @@ class QuerySet:
         elif self.generator:
             return len(list(self.generator))
         else:
+            where_by = self.where_by
+            if self.keyset is not None:
+                where_by = self._get_keyset_criteria()[1]
             generator = self.database._select(self.table,
                                               ["count(1)"],
-                                              where=self.where_by,
+                                              where=where_by,
                                               start=self.start,
-                                              limit=self.limit_by)
+                                              limit=self.limit_by,
+                                              search=self.search_text)
             return next(generator)
 
     def _generate(self, args=None):
         """
         Create a generator from current options.
         """
-        generator = self.database._select(self.table,
-                                          args,
-                                          order_by=self.order_by,
-                                          where=self.where_by,
-                                          start=self.start,
-                                          limit=self.limit_by)
-        # Reset all criteria
+        if self.keyset is None:
+            generator = self.database._select(self.table,
+                                              args,
+                                              order_by=self.order_by,
+                                              where=self.where_by,
+                                              start=self.start,
+                                              limit=self.limit_by,
+                                              search=self.search_text)
+        else:
+            order_by, where_by = self._get_keyset_criteria()
+            generator = self.database._select(self.table,
+                                              args,
+                                              order_by=order_by,
+                                              where=where_by,
+                                              start=self.start,
+                                              limit=self.limit_by,
+                                              search=self.search_text)
+            if self.keyset[1]: # before; back in order_by order
+                generator = iter(list(generator)[::-1])
+        self._reset()
+        return generator
+
+    def _reset(self):
+        """
+        Reset all criteria.
+        """
         self.where_by = None
         self.order_by = None
         self.limit_by = -1
         self.start = 0
+        self.keyset = None
+        self.search_text = None
         self.needs_to_run = False
-        return generator
 
     def select(self, *args):
         """
@@ -2121,8 +2578,16 @@ class QuerySet:
             raise Exception("Queries in invalid order")
         elif self.generator:
             if args: # there is a generator, with args
-                for i in self.generator:
-                    yield [i.get_field(arg) for arg in args]
+                # PREFETCH_ROWS at a time, joining together:
+                while True:
+                    items = list(islice(self.generator,
+                                        self.database.PREFETCH_ROWS))
+                    if not items:
+                        break
+                    columns = [self._class.get_field_values(
+                        items, arg, self.database) for arg in args]
+                    for row in zip(*columns):
+                        yield list(row)
             else: # generator, no args
                 for i in self.generator:
                     yield i
@@ -2131,6 +2596,34 @@ class QuerySet:
             for i in self.generator:
                 yield i
 
+    def select_page(self, *args):
+        """
+        Get the rows of select, with the number of rows that match the
+        where (and search) whatever the limit and keyset, as (rows,
+        total, estimated); estimated is True if the total is an
+        estimate. The database may get both with one query.
+        """
+        if len(args) == 0:
+            args = None
+        if self.generator:
+            # Filtered or mapped in Python, so counted here:
+            rows = list(self.select(*(args or [])))
+            return (rows, len(rows), False)
+        elif self.keyset is None:
+            (rows, total, estimated) = self.database._select_page(
+                self.table, args, order_by=self.order_by,
+                where=self.where_by, start=self.start, limit=self.limit_by,
+                search=self.search_text)
+            self._reset()
+            return (rows, total, estimated)
+        else:
+            (total, estimated) = self.database._count(
+                self.table, self.where_by, self.search_text)
+            rows = list(self._generate(args))
+            # Where the keyset is among the rows isn't known:
+            return (rows, max(total, len(rows)) if estimated else total,
+                    estimated)
+
     def proxy(self, proxy_name, *args, **kwargs):
         """
         Apply a named proxy to the db.
@@ -0,0 +1,133 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Cache of the raw data of primary objects, for the databases.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import threading
+from contextlib import nullcontext
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.utils.lru import LRU, ThreadSafeLRU
+
+#-------------------------------------------------------------------------
+#
+# DbCache class
+#
+#-------------------------------------------------------------------------
+class DbCache:
+    """
+    The recently read structs of primary objects, by (table, handle),
+    with the number of hits, misses, evictions and invalidations.
+
+    The structs are shared by all that get them, and must not be
+    changed.
+
+    The generation counts the changes written to the cache, so that a
+    struct read from the database is not kept if the row was written
+    while it was being read.
+    """
+    def __init__(self, size, max_bytes=None, thread_safe=False):
+        """
+        size - number of structs to keep; 0 or 1 to disable
+        max_bytes - limit on the bytes used by the structs, or None
+        thread_safe - True if shared by databases used by several threads
+        """
+        self.size = size
+        self.max_bytes = max_bytes
+        self.thread_safe = thread_safe
+        if thread_safe:
+            self.data = ThreadSafeLRU(size, max_bytes)
+            self.lock = threading.Lock()
+        else:
+            self.data = LRU(size, max_bytes)
+            self.lock = nullcontext()
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, table, handle):
+        """
+        Return the struct of handle in table, or None.
+        """
+        return self.data.get((table, handle))
+
+    def put(self, table, handle, struct, generation=None):
+        """
+        Keep the struct of handle in table, as written. If generation is
+        given, the struct was read from the database when the cache was
+        at that generation, and is not kept if the cache has changed
+        since.
+        """
+        with self.lock:
+            if generation is None:
+                self.generation += 1
+            elif generation != self.generation:
+                return
+            self.data[(table, handle)] = struct
+
+    def invalidate(self, table, handle):
+        """
+        Forget the struct of handle in table, if it is kept.
+        """
+        key = (table, handle)
+        with self.lock:
+            self.generation += 1
+            if key in self.data:
+                del self.data[key]
+                self.invalidations += 1
+
+    def get_stats(self):
+        """
+        Return a dictionary of the hits, misses, hit rate, evictions,
+        invalidations, the number of structs kept, of the size, and
+        their bytes, if limited.
+        """
+        stats = self.data.get_stats()
+        stats["invalidations"] = self.invalidations
+        stats["size"] = self.size
+        if self.max_bytes is None:
+            del stats["weight"]
+        else:
+            stats["bytes"] = stats.pop("weight")
+            stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def clear(self):
+        """
+        Forget the structs, but not the counts.
+        """
+        self.data.clear()
+
+    def reset_stats(self):
+        """
+        Zero the counts.
+        """
+        self.data.reset_stats()
+        self.invalidations = 0
@@ -0,0 +1,175 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+A pool of threads to run database work, each with its own connection to
+the database.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from .cache import DbCache
+
+LOG = logging.getLogger(".db.executor")
+
+#-------------------------------------------------------------------------
+#
+# DatabaseExecutor
+#
+#-------------------------------------------------------------------------
+class ExecutorBusy(Exception):
+    """
+    Error raised when too many jobs are waiting for a thread.
+    """
+
+class DatabaseExecutor:
+    """
+    Runs functions in a bounded pool of threads. Each thread opens its
+    own database, with open_database, the first time it needs one, as
+    database connections can't be shared by threads. The databases of
+    the threads and the main database share one thread-safe cache.
+    """
+    def __init__(self, database, open_database, max_workers=4,
+                 max_pending=None):
+        """
+        database - the database of the main thread
+        open_database - function returning a new database on the same data
+        max_workers - number of threads
+        max_pending - number of jobs running or waiting before submit
+                      raises ExecutorBusy; default 8 per thread
+        """
+        self.database = database
+        self.open_database = open_database
+        self.max_workers = max_workers
+        self.max_pending = (max_pending if max_pending is not None
+                            else 8 * max_workers)
+        self.cache = DbCache(database.cache.size, database.cache.max_bytes,
+                             thread_safe=True)
+        database.set_cache(self.cache)
+        self.executor = ThreadPoolExecutor(max_workers,
+                                           thread_name_prefix="database",
+                                           initializer=self._start_worker)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.workers = 0
+        self.jobs = {} # future: job, until done
+        self.running = {} # job: database of the thread running it
+
+    def _start_worker(self):
+        self.local.worker = True
+        self.local.database = None
+        with self.lock:
+            self.workers += 1
+
+    def get_database(self):
+        """
+        Return the database of the calling thread: its own in a thread
+        of the executor, or else the main database.
+        """
+        if not getattr(self.local, "worker", False):
+            return self.database
+        if self.local.database is None:
+            database = self.open_database()
+            database.set_cache(self.cache)
+            self.local.database = database
+        return self.local.database
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) in a thread, and return the
+        concurrent.futures.Future of its result. Raises ExecutorBusy if
+        max_pending jobs are running or waiting.
+        """
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise ExecutorBusy("%d jobs waiting" % self.pending)
+            self.pending += 1
+        job = object()
+        future = self.executor.submit(self._run, job, func, args, kwargs)
+        with self.lock:
+            if not future.done():
+                self.jobs[future] = job
+        future.add_done_callback(self._done)
+        return future
+
+    def _run(self, job, func, args, kwargs):
+        database = self.get_database()
+        with self.lock:
+            self.running[job] = database
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self.lock:
+                del self.running[job]
+
+    def _done(self, future):
+        with self.lock:
+            self.pending -= 1
+            self.jobs.pop(future, None)
+
+    def interrupt(self, future):
+        """
+        Stop the job of future: cancel it if it has not started, or
+        else interrupt the query running on the database of its thread,
+        if the database can.
+        """
+        if future.cancel():
+            return
+        with self.lock:
+            database = self.running.get(self.jobs.get(future))
+            if database is not None and hasattr(database, "interrupt"):
+                LOG.warning("Interrupting the query of %s", future)
+                database.interrupt()
+
+    def shutdown(self):
+        """
+        Wait for the jobs to finish, and close the databases of the
+        threads, each in its own thread.
+        """
+        with self.lock:
+            (workers, self.workers) = (self.workers, 0)
+        if workers:
+            barrier = threading.Barrier(workers)
+            def close():
+                # Wait for the other threads, so that each closes its own:
+                barrier.wait(timeout=60)
+                if self.local.database is not None:
+                    self.local.database.close()
+                    self.local.database = None
+            futures = [self.executor.submit(close) for i in range(workers)]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    LOG.warning("Error closing a database", exc_info=True)
+        self.executor.shutdown()
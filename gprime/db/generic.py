@@ -54,6 +54,7 @@ from gprime.db import (DbReadBase, DbWriteBase, DbTxn, DbUndo,
                            TAG_KEY, eval_order_by)
 from gprime.errors import HandleError
 from gprime.db.base import QuerySet
+from gprime.db.cache import DbCache
 from gprime.utils.callback import Callback
 from gprime.updatecallback import UpdateCallback
 from gprime.db.dbconst import *
@@ -206,15 +207,21 @@ class DbGenericUndo(DbUndo):
         subitems = transaction.get_recnos(reverse=True)
 
         # Process all records in the transaction
-        for record_id in subitems:
-            (key, trans_type, handle, old_data, new_data) = \
-                    json.loads(self.undodb[record_id])
+        try:
+            self.db.transaction_backend_begin()
+            for record_id in subitems:
+                (key, trans_type, handle, old_data, new_data) = \
+                        json.loads(self.undodb[record_id])
 
-            if key == REFERENCE_KEY:
-                self.undo_reference(old_data, handle, self.mapbase[key])
-            else:
-                self.undo_data(old_data, handle, self.mapbase[key],
-                                db.emit, SIGBASE[key])
+                if key == REFERENCE_KEY:
+                    self.undo_reference(old_data, handle, self.mapbase[key])
+                else:
+                    self.undo_data(old_data, handle, self.mapbase[key],
+                                    db.emit, SIGBASE[key])
+            self.db.transaction_backend_commit()
+        except:
+            self.db.transaction_backend_abort()
+            raise
         # Notify listeners
         if db.undo_callback:
             if self.undo_count > 0:
@@ -456,11 +463,22 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     __callback_map = {}
 
     VERSION = (18, 0, 0)
+    # Number of primary object structs kept by the cache; 0 to disable:
+    CACHE_SIZE = 10000
+    # Limit on the bytes used by the cached structs, or None:
+    CACHE_BYTES = None
 
     def __init__(self, directory=None):
         DbReadBase.__init__(self)
         DbWriteBase.__init__(self)
         Callback.__init__(self)
+        # Structs read by handle, shared by get_*_from_handle and
+        # _get_raw_*_data, and the ones written in the open transaction,
+        # {(table, handle): struct, or None if removed}:
+        self.cache = DbCache(self.CACHE_SIZE, self.CACHE_BYTES)
+        self._cache_pending = {}
+        # Generation of the cache at the last miss, before reading:
+        self._cache_generation = 0
         self.struct = Struct(None, self)
         self.__tables =  {
             'Person':
@@ -789,6 +807,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                                             str(current_schema_version))
         # run backend-specific code:
         self.initialize_backend(directory)
+        self.cache.clear()
 
         # Load metadata
         self.name_formats = self.get_metadata('name_formats')
@@ -895,6 +914,97 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.transaction = transaction
         return transaction
 
+    def get_cache_stats(self):
+        """
+        Return a dictionary of the hits, misses, evictions, and
+        invalidations of the object cache.
+        """
+        return self.cache.get_stats()
+
+    def set_cache_size(self, size, max_bytes=None):
+        """
+        Set the number of structs kept by the object cache, 0 to
+        disable it, and the limit on the bytes they use, if any.
+        """
+        self.cache = DbCache(size, max_bytes)
+
+    def set_cache(self, cache):
+        """
+        Use cache, a DbCache, as the object cache. Databases on the same
+        data, used by different threads, may share a thread-safe one.
+        """
+        self.cache = cache
+
+    def sync_cache(self):
+        """
+        Forget the cached objects changed by other processes sharing the
+        database, and return the (class name, handle) of the changes.
+        Nothing to do here, as the database isn't shared.
+        """
+        return []
+
+    def get_last_change(self):
+        """
+        Return the stamp of the last committed change to the objects, in
+        seconds since the epoch, or 0 if not known, as here.
+        """
+        return 0
+
+    def _cache_get(self, table, handle):
+        """
+        Return the cached struct of handle in table, or None.
+
+        Rows written in the open transaction are not read from the
+        cache, as the transaction may yet be aborted.
+        """
+        if self._cache_pending and (table, handle) in self._cache_pending:
+            return None
+        struct = self.cache.get(table, handle)
+        if struct is None:
+            self._cache_generation = self.cache.generation
+        return struct
+
+    def _cache_put(self, table, handle, struct):
+        """
+        Cache the struct of handle in table, as read from the database
+        after a miss, unless a row was written since.
+        """
+        if not (self._cache_pending and
+                (table, handle) in self._cache_pending):
+            self.cache.put(table, handle, struct, self._cache_generation)
+
+    def _cache_write(self, table, handle, struct=None):
+        """
+        Invalidate handle in table, as it is written, or removed. In a
+        transaction, struct (the written struct, or None) is cached when
+        it is committed.
+        """
+        self.cache.invalidate(table, handle)
+        if self.transaction is not None:
+            self._cache_pending[(table, handle)] = struct
+
+    def _cache_commit(self):
+        """
+        Cache the structs written in the committed transaction. The
+        removed objects are invalidated again, moving the generation, as
+        other threads sharing the cache may have read their rows, still
+        there until the commit, since.
+        """
+        for ((table, handle), struct) in self._cache_pending.items():
+            if struct is not None:
+                self.cache.put(table, handle, struct)
+            else:
+                self.cache.invalidate(table, handle)
+        self._cache_pending.clear()
+
+    def _cache_abort(self):
+        """
+        Forget the structs written in the aborted transaction.
+        """
+        for (table, handle) in self._cache_pending:
+            self.cache.invalidate(table, handle)
+        self._cache_pending.clear()
+
     def _after_commit(self, transaction):
         """
         Post-transaction commit processing
@@ -1293,6 +1403,42 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         else:
             raise HandleError('Handle %s not found' % handle)
 
+    def get_objects_from_handles(self, table, handles, ignore_errors=False):
+        """
+        Return a list of the objects of table with the passed handles, in
+        the same order, made from get_raw_data_from_handles.
+
+        If any of them do not exist, a HandleError naming them is raised,
+        or, if ignore_errors is True, they are None in the list.
+        """
+        handles = list(handles)
+        class_func = self.get_table_func(table, "class_func")
+        objects = []
+        missing = []
+        for (handle, data) in zip(handles,
+                                  self.get_raw_data_from_handles(table,
+                                                                 handles)):
+            if data:
+                objects.append(class_func.create(data, self))
+            else:
+                objects.append(None)
+                missing.append(handle)
+        if missing and not ignore_errors:
+            raise HandleError("%s handles not found: %s" % (
+                table, ", ".join(str(handle, "utf-8")
+                                 if isinstance(handle, bytes) else str(handle)
+                                 for handle in missing)))
+        return objects
+
+    def get_raw_data_from_handles(self, table, handles):
+        """
+        Return a list of the raw data of the objects of table with the
+        passed handles, in the same order, with None for those that do
+        not exist.
+        """
+        raw_func = self.get_table_func(table, "raw_func")
+        return [raw_func(handle) if handle else None for handle in handles]
+
     def get_default_person(self):
         handle = self.get_default_handle()
         if handle:
@@ -1866,24 +2012,28 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                 self.set_metadata('place_bookmarks', self.place_bookmarks.get())
                 self.set_metadata('note_bookmarks', self.note_bookmarks.get())
 
-                # Custom type values, sets
-                self.set_metadata('event_names', list(self.event_names))
-                self.set_metadata('fattr_names', list(self.family_attributes))
-                self.set_metadata('pattr_names', list(self.individual_attributes))
-                self.set_metadata('sattr_names', list(self.source_attributes))
-                self.set_metadata('marker_names', list(self.marker_names))
-                self.set_metadata('child_refs', list(self.child_ref_types))
-                self.set_metadata('family_rels', list(self.family_rel_types))
-                self.set_metadata('event_roles', list(self.event_role_names))
-                self.set_metadata('name_types', list(self.name_types))
-                self.set_metadata('origin_types', list(self.origin_types))
-                self.set_metadata('repo_types', list(self.repository_types))
-                self.set_metadata('note_types', list(self.note_types))
-                self.set_metadata('sm_types', list(self.source_media_types))
-                self.set_metadata('url_types', list(self.url_types))
-                self.set_metadata('mattr_names', list(self.media_attributes))
-                self.set_metadata('eattr_names', list(self.event_attributes))
-                self.set_metadata('place_types', list(self.place_types))
+                # Custom type values, sets, with those saved by other
+                # connections to the database:
+                for (key, values) in [
+                        ('event_names', self.event_names),
+                        ('fattr_names', self.family_attributes),
+                        ('pattr_names', self.individual_attributes),
+                        ('sattr_names', self.source_attributes),
+                        ('marker_names', self.marker_names),
+                        ('child_refs', self.child_ref_types),
+                        ('family_rels', self.family_rel_types),
+                        ('event_roles', self.event_role_names),
+                        ('name_types', self.name_types),
+                        ('origin_types', self.origin_types),
+                        ('repo_types', self.repository_types),
+                        ('note_types', self.note_types),
+                        ('sm_types', self.source_media_types),
+                        ('url_types', self.url_types),
+                        ('mattr_names', self.media_attributes),
+                        ('eattr_names', self.event_attributes),
+                        ('place_types', self.place_types)]:
+                    self.set_metadata(key, list(
+                        set(self.get_metadata(key, list())) | values))
 
                 # Save misc items:
                 if self.has_changed:
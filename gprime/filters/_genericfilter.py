@@ -24,6 +24,13 @@
 Package providing filtering framework for GRAMPS.
 """
 
+#------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#------------------------------------------------------------------------
+from itertools import islice
+
 #------------------------------------------------------------------------
 #
 # Gramps imports
@@ -50,6 +57,8 @@ class GenericFilter:
     """Filter class that consists of several rules."""
 
     logical_functions = ['or', 'and', 'xor', 'one']
+    # Number of objects of an id_list that are got together:
+    FETCH_SIZE = 500
 
     def __init__(self, source=None):
         if source:
@@ -129,6 +138,25 @@ class GenericFilter:
     def find_from_handle(self, db, handle):
         return db.get_person_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_people_from_handles(handles)
+
+    def iter_from_handles(self, db, id_list, tupleind=None):
+        """
+        Yield (data, object) for each item of id_list, getting the
+        objects FETCH_SIZE at a time with find_from_handles.
+        """
+        id_iter = iter(id_list)
+        while True:
+            chunk = list(islice(id_iter, self.FETCH_SIZE))
+            if not chunk:
+                break
+            if tupleind is None:
+                handles = chunk
+            else:
+                handles = [data[tupleind] for data in chunk]
+            yield from zip(chunk, self.find_from_handles(db, handles))
+
     def check_func(self, db, id_list, task, cb_progress=None, tupleind=None):
         final_list = []
 
@@ -141,12 +169,7 @@ class GenericFilter:
                     if task(db, obj) != self.invert:
                         final_list.append(handle)
         else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                obj = self.find_from_handle(db, handle)
+            for data, obj in self.iter_from_handles(db, id_list, tupleind):
                 if cb_progress:
                     cb_progress()
                 if task(db, obj) != self.invert:
@@ -167,12 +190,7 @@ class GenericFilter:
                     if val != self.invert:
                         final_list.append(handle)
         else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                obj = self.find_from_handle(db, handle)
+            for data, obj in self.iter_from_handles(db, id_list, tupleind):
                 if cb_progress:
                     cb_progress()
                 val = all(rule.apply(db, obj) for rule in flist if obj)
@@ -261,6 +279,9 @@ class GenericFamilyFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_family_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_families_from_handles(handles)
+
 class GenericEventFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -275,6 +296,9 @@ class GenericEventFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_event_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_events_from_handles(handles)
+
 class GenericSourceFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -289,6 +313,9 @@ class GenericSourceFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_source_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_sources_from_handles(handles)
+
 class GenericCitationFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -303,6 +330,9 @@ class GenericCitationFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_citation_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_citations_from_handles(handles)
+
 class GenericPlaceFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -317,6 +347,9 @@ class GenericPlaceFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_place_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_places_from_handles(handles)
+
 class GenericMediaFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -331,6 +364,9 @@ class GenericMediaFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_media_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_media_from_handles(handles)
+
 class GenericRepoFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -345,6 +381,9 @@ class GenericRepoFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_repository_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_repositories_from_handles(handles)
+
 class GenericNoteFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -359,6 +398,9 @@ class GenericNoteFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_note_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_notes_from_handles(handles)
+
 
 def GenericFilterFactory(namespace):
     if namespace == 'Person':
@@ -46,6 +46,9 @@ from .const import IDENTICAL, EQUAL, DIFFERENT
 class Address(SecondaryObject, PrivacyBase, CitationBase, NoteBase, DateBase,
               LocationBase):
     """Provide address information."""
+    __slots__ = ('private', 'citation_list', 'note_list', 'date', 'street',
+                 'locality', 'city', 'county', 'state', 'country', 'postal',
+                 'phone')
 
     def __init__(self, source=None):
         """
@@ -28,6 +28,7 @@ AddressBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .address import Address
 from .const import IDENTICAL, EQUAL
 
@@ -36,10 +37,11 @@ from .const import IDENTICAL, EQUAL
 # AddressBase classes
 #
 #-------------------------------------------------------------------------
-class AddressBase:
+class AddressBase(BaseMixin):
     """
     Base class for address-aware objects.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
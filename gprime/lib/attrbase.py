@@ -28,6 +28,7 @@ AttributeRootBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .attribute import Attribute, AttributeRoot
 from .srcattribute import SrcAttribute
 from .const import IDENTICAL, EQUAL
@@ -37,10 +38,11 @@ from .const import IDENTICAL, EQUAL
 # AttributeRootBase class
 #
 #-------------------------------------------------------------------------
-class AttributeRootBase:
+class AttributeRootBase(BaseMixin):
     """
     Base class for attribute-aware objects.
     """
+    __slots__ = ()
     _CLASS = AttributeRoot
 
     def __init__(self, source=None):
@@ -163,7 +165,9 @@ class AttributeRootBase:
                 self.attribute_list.append(addendum)
 
 class AttributeBase(AttributeRootBase):
+    __slots__ = ()
     _CLASS = Attribute
 
 class SrcAttributeBase(AttributeRootBase):
+    __slots__ = ()
     _CLASS = SrcAttribute
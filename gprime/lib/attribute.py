@@ -56,6 +56,7 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
 
     Gramps at the moment does not support this GEDCOM Attribute structure.
     """
+    __slots__ = ('private', 'type', 'value')
 
     def __init__(self, source=None):
         """
@@ -228,6 +229,7 @@ class AttributeRoot(SecondaryObject, PrivacyBase):
 #
 #-------------------------------------------------------------------------
 class Attribute(AttributeRoot, CitationBase, NoteBase):
+    __slots__ = ('citation_list', 'note_list')
 
     def __init__(self, source=None):
         """
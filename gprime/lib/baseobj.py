@@ -42,7 +42,13 @@ class BaseObject(metaclass=ABCMeta):
 
     Its main goal is to provide common capabilites to all objects, such as
     searching through all available information.
+
+    Secondary objects have __slots__, and no __dict__, to keep them small.
     """
+    __slots__ = ()
+    # Objects are made by object.__new__, which is faster than the
+    # BaseMixin.__new__ of their mixins:
+    __new__ = object.__new__
 
     @abstractmethod
     def to_struct(self):
@@ -220,3 +226,26 @@ class BaseObject(metaclass=ABCMeta):
             obj = cls.from_struct(struct)
             obj.db = db
             return obj
+
+#-------------------------------------------------------------------------
+#
+# Base Mixin
+#
+#-------------------------------------------------------------------------
+class BaseMixin:
+    """
+    The BaseMixin is the base class of the mixins of the data objects
+    (PrivacyBase, NoteBase, ...). A mixin has empty __slots__, as the
+    object using it has the slots of its attributes; a mixin made on its
+    own is a subclass of it with a __dict__.
+    """
+    __slots__ = ()
+    _WITH_DICT = {}
+
+    def __new__(cls, *args, **kwargs):
+        if not cls.__dictoffset__ and \
+                cls.__basicsize__ == object.__basicsize__:
+            if cls not in BaseMixin._WITH_DICT:
+                BaseMixin._WITH_DICT[cls] = type(cls.__name__, (cls,), {})
+            cls = BaseMixin._WITH_DICT[cls]
+        return object.__new__(cls)
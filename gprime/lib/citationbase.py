@@ -36,6 +36,7 @@ import logging
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .handle import Handle
 
 LOG = logging.getLogger(".citation")
@@ -45,7 +46,7 @@ LOG = logging.getLogger(".citation")
 # CitationBase class
 #
 #-------------------------------------------------------------------------
-class CitationBase:
+class CitationBase(BaseMixin):
     """
     Base class for storing citations.
 
@@ -60,6 +61,7 @@ class CitationBase:
     This class, together with the Citation class, replaces the old SourceRef
     class. I.e. SourceRef = CitationBase + Citation
     """
+    __slots__ = ()
     def __init__(self, source=None):
         """
         Create a new CitationBase, copying from source if not None.
@@ -258,7 +260,7 @@ class CitationBase:
         for item in self.get_citation_child_list():
             item.replace_citation_references(old_handle, new_handle)
 
-class IndirectCitationBase:
+class IndirectCitationBase(BaseMixin):
     """
     Citation management logic for objects that don't have citations
     for the primary objects, but only for the child (secondary) ones.
@@ -271,6 +273,7 @@ class IndirectCitationBase:
               :class:`CitationBase`, which checks both the object and the child
               objects.
     """
+    __slots__ = ()
     def has_citation_reference(self, citation_handle):
         """
         Return True if any of the child objects has reference to this citation
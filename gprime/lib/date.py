@@ -538,6 +538,8 @@ class Date:
 
     Supports partial dates, compound dates and alternate calendars.
     """
+    __slots__ = ('calendar', 'modifier', 'quality', 'dateval', 'text',
+                 'sortval', 'newyear', 'format')
     MOD_NONE = 0  # CODE
     MOD_BEFORE = 1
     MOD_AFTER = 2
@@ -27,6 +27,7 @@ DateBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .date import Date
 
 #-------------------------------------------------------------------------
@@ -34,10 +35,11 @@ from .date import Date
 # DateBase classes
 #
 #-------------------------------------------------------------------------
-class DateBase:
+class DateBase(BaseMixin):
     """
     Base class for storing date information.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
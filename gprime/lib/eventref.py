@@ -53,6 +53,7 @@ class EventRef(PrivacyBase, NoteBase, AttributeBase, RefBase,
     This class is for keeping information about how the person relates
     to the referenced event.
     """
+    __slots__ = ('private', 'note_list', 'attribute_list', 'ref', '__role')
 
     def __init__(self, source=None):
         """
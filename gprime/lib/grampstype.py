@@ -41,8 +41,14 @@ class GrampsTypeMeta(type):
     """
     Metaclass for :class:`~.grampstype.GrampsType`.
 
-    Create the class-specific integer/string maps.
+    Create the class-specific integer/string maps, and give each class
+    empty __slots__, unless it has its own, so that no type has a
+    __dict__.
     """
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault('__slots__', ())
+        return type.__new__(mcs, name, bases, namespace)
+
     def __init__(cls, name, bases, namespace):
 
         # Helper function to create the maps
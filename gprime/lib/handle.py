@@ -26,7 +26,10 @@ class HandleClass(str):
         return database.get_table_func(self.classname,"handle_func")(handle)
 
     @classmethod
-    def get_schema(cls):
+    def get_class(cls):
+        """
+        Return the class of the objects of the handles.
+        """
         from gprime.lib import (Person, Family, Event, Place, Source,
                                     Media, Repository, Note, Citation, Tag)
         tables = {
@@ -41,20 +44,28 @@ class HandleClass(str):
             "Citation": Citation,
             "Tag": Tag,
         }
-        return tables[cls.classname].get_schema()
+        return tables[cls.classname]
+
+    @classmethod
+    def get_schema(cls):
+        return cls.get_class().get_schema()
+
+# {classname: HandleClass subclass}, made on first use by Handle:
+_HANDLE_CLASSES = {}
 
 def Handle(_classname, handle):
     if handle is None:
         return None
-    class MyHandleClass(HandleClass):
-        """
-        Class created to have classname attribute.
-        """
-        classname = _classname
-        def get_labels(self, _):
-            return self.classname
-    h = MyHandleClass(handle)
-    return h
+    if _classname not in _HANDLE_CLASSES:
+        class MyHandleClass(HandleClass):
+            """
+            Class created to have classname attribute.
+            """
+            classname = _classname
+            def get_labels(self, _):
+                return self.classname
+        _HANDLE_CLASSES[_classname] = MyHandleClass
+    return _HANDLE_CLASSES[_classname](handle)
 
 def __from_struct(struct):
     return struct
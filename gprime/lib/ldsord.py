@@ -62,6 +62,8 @@ class LdsOrd(SecondaryObject, CitationBase, NoteBase,
     of Latter Day Saints (Mormon church). The LDS church is the largest
     source of genealogical information in the United States.
     """
+    __slots__ = ('citation_list', 'note_list', 'date', 'place', 'private',
+                 'type', 'famc', 'temple', 'status')
 
     BAPTISM = 0
     ENDOWMENT = 1
@@ -28,6 +28,7 @@ LdsOrdBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .ldsord import LdsOrd
 from .const import IDENTICAL, EQUAL
 
@@ -36,10 +37,11 @@ from .const import IDENTICAL, EQUAL
 # LdsOrdBase classes
 #
 #-------------------------------------------------------------------------
-class LdsOrdBase:
+class LdsOrdBase(BaseMixin):
     """
     Base class for lds_ord-aware objects.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
@@ -46,6 +46,8 @@ class Location(SecondaryObject, LocationBase):
     Multiple Location objects can represent the same place, since names
     of cities, counties, states, and even countries can change with time.
     """
+    __slots__ = ('street', 'locality', 'city', 'county', 'state', 'country',
+                 'postal', 'phone', 'parish')
 
     def __init__(self, source=None):
         """
@@ -23,15 +23,23 @@
 LocationBase class for Gramps.
 """
 
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from .baseobj import BaseMixin
+
 #-------------------------------------------------------------------------
 #
 # LocationBase class
 #
 #-------------------------------------------------------------------------
-class LocationBase:
+class LocationBase(BaseMixin):
     """
     Base class for all things Address.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
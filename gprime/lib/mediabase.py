@@ -28,6 +28,7 @@ MediaBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .mediaref import MediaRef
 from .const import IDENTICAL, EQUAL, DIFFERENT
 
@@ -36,10 +37,11 @@ from .const import IDENTICAL, EQUAL, DIFFERENT
 # MediaBase class
 #
 #-------------------------------------------------------------------------
-class MediaBase:
+class MediaBase(BaseMixin):
     """
     Base class for storing media references.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
@@ -47,6 +47,8 @@ from .handle import Handle
 class MediaRef(SecondaryObject, PrivacyBase, CitationBase, NoteBase, RefBase,
                AttributeBase):
     """Media reference class."""
+    __slots__ = ('private', 'citation_list', 'note_list', 'ref',
+                 'attribute_list', 'rect')
     def __init__(self, source=None):
         PrivacyBase.__init__(self, source)
         CitationBase.__init__(self, source)
@@ -85,7 +87,8 @@ class MediaRef(SecondaryObject, PrivacyBase, CitationBase, NoteBase, RefBase,
                 "note_list": NoteBase.to_struct(self),
                 "attribute_list": AttributeBase.to_struct(self),
                 "ref": Handle("Media", self.ref),
-                "rect": self.rect if self.rect != (0, 0, 0, 0) else None}
+                "rect": (self.rect[:] if self.rect not in (None, (0, 0, 0, 0))
+                         else None)}
 
     @classmethod
     def get_schema(cls):
@@ -113,7 +116,8 @@ class MediaRef(SecondaryObject, PrivacyBase, CitationBase, NoteBase, RefBase,
         :returns: Returns a serialized object
         """
         self = default = MediaRef()
-        self.rect = struct.get("rect", default.rect)
+        rect = struct.get("rect", default.rect)
+        self.rect = rect[:] if rect is not None else None
         PrivacyBase.set_from_struct(self, struct)
         CitationBase.set_from_struct(self, struct)
         NoteBase.set_from_struct(self, struct)
@@ -56,6 +56,9 @@ class Name(SecondaryObject, PrivacyBase, SurnameBase, CitationBase, NoteBase,
     A person may have more that one name throughout his or her life. The Name
     object stores one of them
     """
+    __slots__ = ('private', 'surname_list', 'citation_list', 'note_list',
+                 'date', 'first_name', 'suffix', 'title', 'type', 'group_as',
+                 'sort_as', 'display_as', 'call', 'nick', 'famnick')
 
     DEF = 0    # Default format (determined by gramps-wide prefs)
     LNFN = 1   # last name first name
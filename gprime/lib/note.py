@@ -143,6 +143,13 @@ class Note(BasicPrimaryObject):
              Column("gid", "TEXT", index=True),
              Column("json_data", "TEXT")])
 
+    @classmethod
+    def get_search_fields(cls):
+        return [
+            "gid",
+            "text.string",
+        ]
+
     @classmethod
     def get_labels(cls, _):
         return {
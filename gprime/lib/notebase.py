@@ -23,6 +23,7 @@
 NoteBase class for Gramps.
 """
 
+from .baseobj import BaseMixin
 from .handle import Handle
 
 #-------------------------------------------------------------------------
@@ -30,7 +31,7 @@ from .handle import Handle
 # NoteBase class
 #
 #-------------------------------------------------------------------------
-class NoteBase:
+class NoteBase(BaseMixin):
     """
     Base class for storing notes.
 
@@ -38,6 +39,7 @@ class NoteBase:
     Internally, this class maintains a list of Note handles,
     as a note_list attribute of the NoteBase object.
     """
+    __slots__ = ()
     def __init__(self, source=None):
         """
         Create a new NoteBase, copying from source if not None.
@@ -192,6 +192,20 @@ class Person(CitationBase, NoteBase, AttributeBase, MediaBase,
             "primary_name.surname_list.0.surname",
         ]
 
+    @classmethod
+    def get_search_fields(cls):
+        return [
+            "gid",
+            "primary_name.first_name",
+            "primary_name.call",
+            "primary_name.nick",
+            "primary_name.surname_list.surname",
+            "alternate_names.first_name",
+            "alternate_names.call",
+            "alternate_names.nick",
+            "alternate_names.surname_list.surname",
+        ]
+
     @classmethod
     def get_labels(cls, _):
         return {
@@ -51,6 +51,7 @@ class PersonRef(SecondaryObject, PrivacyBase, CitationBase, NoteBase, RefBase):
     to another person from the database, if not through family.
     Examples would be: godparent, friend, etc.
     """
+    __slots__ = ('private', 'citation_list', 'note_list', 'ref', 'rel')
 
     def __init__(self, source=None):
         PrivacyBase.__init__(self, source)
@@ -116,6 +116,16 @@ class Place(CitationBase, NoteBase, MediaBase, UrlBase, PrimaryObject):
              Column("gid", "TEXT", index=True),
              Column("json_data", "TEXT")])
 
+    @classmethod
+    def get_search_fields(cls):
+        return [
+            "gid",
+            "title",
+            "name.value",
+            "alt_names.value",
+            "code",
+        ]
+
     @classmethod
     def get_schema(cls):
         """
@@ -22,15 +22,23 @@
 PlaceBase class for Gramps.
 """
 
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from .baseobj import BaseMixin
+
 #-------------------------------------------------------------------------
 #
 # PlaceBase class
 #
 #-------------------------------------------------------------------------
-class PlaceBase:
+class PlaceBase(BaseMixin):
     """
     Base class for place-aware objects.
     """
+    __slots__ = ()
     def __init__(self, source=None):
         """
         Initialize a PlaceBase.
@@ -43,6 +43,7 @@ class PlaceName(SecondaryObject, DateBase):
 
     This class is for keeping information about place names.
     """
+    __slots__ = ('date', 'value', 'lang')
 
     def __init__(self, source=None, **kwargs):
         """
@@ -46,6 +46,7 @@ class PlaceRef(RefBase, DateBase, SecondaryObject):
     This class is for keeping information about how places link to other places
     in the place hierarchy.
     """
+    __slots__ = ('ref', 'date')
 
     def __init__(self, source=None):
         """
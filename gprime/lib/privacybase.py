@@ -23,15 +23,23 @@
 PrivacyBase Object class for Gramps.
 """
 
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from .baseobj import BaseMixin
+
 #-------------------------------------------------------------------------
 #
 # PrivacyBase Object
 #
 #-------------------------------------------------------------------------
-class PrivacyBase:
+class PrivacyBase(BaseMixin):
     """
     Base class for privacy-aware objects.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
@@ -29,17 +29,25 @@ Base Reference class for Gramps.
 #-------------------------------------------------------------------------
 from abc import ABCMeta, abstractmethod
 
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from .baseobj import BaseMixin
+
 #-------------------------------------------------------------------------
 #
 # RefBase class
 #
 #-------------------------------------------------------------------------
-class RefBase(metaclass=ABCMeta):
+class RefBase(BaseMixin, metaclass=ABCMeta):
     """
     Base reference class to manage references to other objects.
 
     Any *Ref* classes should derive from this class.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         if source:
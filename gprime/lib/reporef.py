@@ -46,6 +46,7 @@ class RepoRef(SecondaryObject, PrivacyBase, NoteBase, RefBase):
     """
     Repository reference class.
     """
+    __slots__ = ('private', 'note_list', 'ref', 'call_number', 'media_type')
 
     def __init__(self, source=None):
         PrivacyBase.__init__(self, source)
@@ -46,6 +46,7 @@ class SecondaryObject(BaseObject):
     The SecondaryObject is the base class for all secondary objects in the
     database.
     """
+    __slots__ = ()
 
     @abstractmethod
     def to_struct(self):
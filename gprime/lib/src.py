@@ -94,6 +94,16 @@ class Source(MediaBase, NoteBase, SrcAttributeBase, IndirectCitationBase,
              Column("gid", "TEXT", index=True),
              Column("json_data", "TEXT")])
 
+    @classmethod
+    def get_search_fields(cls):
+        return [
+            "gid",
+            "title",
+            "author",
+            "pubinfo",
+            "abbrev",
+        ]
+
     @classmethod
     def get_schema(cls):
         """
@@ -40,6 +40,7 @@ class SrcAttribute(AttributeRoot):
     Provide a simple key/value pair for describing properties.
     Used to store descriptive information.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
@@ -75,6 +75,7 @@ class StyledText:
         however :py:class:`StyledTextBuffer` will merge them automatically if
         the text is displayed.
     """
+    __slots__ = ('_string', '_tags')
     (POS_TEXT, POS_TAGS) = list(range(2))
 
     def __init__(self, text="", tags=None):
@@ -47,6 +47,7 @@ class StyledTextTag:
     :type ranges: list of (int(start), int(end)) tuples.
 
     """
+    __slots__ = ('name', 'value', 'ranges')
     def __init__(self, name=None, value=None, ranges=None):
         """Setup initial instance variable values.
 
@@ -86,7 +87,7 @@ class StyledTextTag:
         return {"_class": "StyledTextTag",
                 "name": self.name.to_struct(),
                 "value": self.value,
-                "ranges": self.ranges}
+                "ranges": [rng[:] for rng in self.ranges]}
 
     @classmethod
     def get_schema(cls):
@@ -107,6 +108,6 @@ class StyledTextTag:
         self = default = StyledTextTag()
         data = (StyledTextTagType.from_struct(struct.get("name", {})),
                 struct.get("value", default.value),
-                struct.get("ranges", default.ranges))
+                [rng[:] for rng in struct.get("ranges", default.ranges)])
         (self.name, self.value, self.ranges) = data
         return self
@@ -43,6 +43,7 @@ class Surname(SecondaryObject):
 
     A person may have more that one surname in his name
     """
+    __slots__ = ('surname', 'prefix', 'primary', 'origintype', 'connector')
 
     def __init__(self, source=None):
         """
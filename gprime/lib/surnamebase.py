@@ -27,6 +27,7 @@ SurnameBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .surname import Surname
 from .const import IDENTICAL, EQUAL
 from ..const import LOCALE as glocale
@@ -37,10 +38,11 @@ _ = glocale.translation.gettext
 # SurnameBase classes
 #
 #-------------------------------------------------------------------------
-class SurnameBase:
+class SurnameBase(BaseMixin):
     """
     Base class for surname-aware objects.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
@@ -46,6 +46,151 @@ from gprime.errors import HandleError
 #-------------------------------------------------------------------------
 from ..const import LOCALE as glocale
 CODESET = glocale.encoding
+
+# {class: (defaults, eager, lazy)}, built on first use by
+# TableObject._get_lazy_plan:
+_LAZY_PLANS = {}
+
+def _get_decoder(ptype):
+    """
+    Return the function that turns the struct of a value of a schema
+    type into the value, or None if the struct is the value (plain
+    values and handles).
+    """
+    if isinstance(ptype, list):
+        decode = _get_decoder(ptype[0])
+        if decode is None:
+            return list
+        return lambda value: [decode(item) for item in value]
+    elif isinstance(ptype, type) and hasattr(ptype, "from_struct"):
+        return ptype.from_struct
+    return None
+
+# {(class, field): accessor}, built on first use by
+# TableObject.get_field_accessor:
+_FIELD_ACCESSORS = {}
+
+class _Fallback(Exception):
+    """
+    Raised by an accessor step for a value that doesn't follow the
+    schema, or an error; the field is then got with _follow_field_path.
+    """
+
+# A value that later steps skip, and that ends as None: a join on no
+# handle with "self", or a missing position of a list:
+_NONE = object()
+_MISSING = object()
+_PLAIN = (str, bool, int)
+
+def _get_attribute_step(part):
+    """
+    Return the accessor step that gets attribute part of the values.
+    """
+    def step(values, db, ignore_errors):
+        results = []
+        for value in values:
+            if value is _NONE:
+                continue
+            elif value is None or isinstance(value, _PLAIN):
+                if value is None and ignore_errors:
+                    continue
+                raise _Fallback
+            value = getattr(value, part, _MISSING)
+            if value is _MISSING:
+                raise _Fallback
+            results.append(value)
+        return results
+    return step
+
+def _get_index_step(position):
+    """
+    Return the accessor step that gets the item at position of the
+    list values.
+    """
+    def step(values, db, ignore_errors):
+        results = []
+        for value in values:
+            if value is _NONE:
+                continue
+            elif not isinstance(value, (list, tuple)):
+                if value is None and ignore_errors:
+                    continue
+                raise _Fallback
+            elif position < len(value):
+                results.append(value[position])
+            elif ignore_errors:
+                results.append(_NONE)
+            else:
+                raise _Fallback
+        return results
+    return step
+
+def _fan_out_step(values, db, ignore_errors):
+    """
+    The accessor step that replaces the list values by their items.
+    """
+    results = []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            results.extend(value)
+        elif value is _NONE or (value is None and ignore_errors):
+            continue
+        else:
+            raise _Fallback
+    return results
+
+def _join_handles(db, classname, handles, ignore_errors):
+    """
+    Return {handle: object} of the objects of table classname with the
+    handles, looked up together for all values of a join.
+    """
+    handles = list(handles)
+    try:
+        objects = db.get_objects_from_handles(classname, handles,
+                                              ignore_errors)
+    except HandleError:
+        raise _Fallback
+    return dict(zip(handles, objects))
+
+def _get_join_handles(values):
+    """
+    Return the set of the handles of the values of a join.
+    """
+    return set(value for value in values
+               if value and isinstance(value, str))
+
+def _get_join_step(classname, part):
+    """
+    Return the accessor step that joins the handle values to their
+    objects of table classname, and gets their attribute part (or the
+    objects, for "self"). The objects can be given, as {handle:
+    object}, when they were got together for many values.
+    """
+    def step(values, db, ignore_errors, objects=None):
+        if db is None:
+            raise _Fallback
+        if objects is None:
+            objects = _join_handles(db, classname,
+                                    _get_join_handles(values),
+                                    ignore_errors)
+        results = []
+        for value in values:
+            if value is _NONE:
+                continue
+            elif not value:
+                obj = None
+            elif isinstance(value, str):
+                obj = objects.get(value)
+            else:
+                raise _Fallback
+            if part == "self":
+                results.append(_NONE if obj is None else obj)
+            elif obj is not None:
+                results.append(getattr(obj, part))
+        return results
+    step.classname = classname
+    return step
+
 #-------------------------------------------------------------------------
 #
 # Table Object class
@@ -131,6 +276,88 @@ class TableObject(BaseObject):
         :returns: Returns an object of this type.
         """
 
+    @classmethod
+    def create(cls, struct, db=None):
+        """
+        Create a new instance from serialized data. Objects of a
+        database are lazy (see from_lazy_struct), unless it has the
+        "skip-lazy-objects" feature.
+        """
+        if struct:
+            if db is not None and not db.get_feature("skip-lazy-objects"):
+                obj = cls.from_lazy_struct(struct)
+            else:
+                obj = cls.from_struct(struct)
+            obj.db = db
+            return obj
+
+    @classmethod
+    def _get_lazy_plan(cls):
+        """
+        Return how from_lazy_struct makes objects of this class, as
+        ({attribute: value} of attributes not in the struct,
+         [(attribute, key, default), ...] of the plain values,
+         {attribute: (key, decode)} of the values made when used).
+        """
+        plan = _LAZY_PLANS.get(cls)
+        if plan is None:
+            values = vars(cls())
+            eager = []
+            lazy = {}
+            for (key, ptype) in cls.get_schema().items():
+                # Private attributes, behind a property:
+                attribute = "_%s__%s" % (cls.__name__, key)
+                if attribute not in values:
+                    attribute = key
+                decode = _get_decoder(ptype)
+                if decode is None:
+                    eager.append((attribute, key, values[attribute]))
+                else:
+                    lazy[attribute] = (key, decode)
+            attributes = set(attribute for (attribute, key, default)
+                             in eager) | set(lazy) | set(["db"])
+            defaults = {attribute: value
+                        for (attribute, value) in values.items()
+                        if attribute not in attributes}
+            plan = _LAZY_PLANS[cls] = (defaults, eager, lazy)
+        return plan
+
+    @classmethod
+    def from_lazy_struct(cls, struct):
+        """
+        Given a struct data representation, return an object of this
+        type that only has its plain values (handles, strings, numbers).
+        Its lists, and secondary objects, are made from the struct when
+        first used, so the object can be used like any other.
+        """
+        (defaults, eager, lazy) = cls._get_lazy_plan()
+        obj = cls.__new__(cls)
+        values = obj.__dict__
+        values.update(defaults)
+        for (attribute, key, default) in eager:
+            values[attribute] = struct.get(key, default)
+        values["_lazy_struct"] = struct
+        return obj
+
+    def __getattr__(self, name):
+        """
+        Make a value that from_lazy_struct left in the struct. Only
+        called for attributes the object doesn't have.
+        """
+        struct = self.__dict__.get("_lazy_struct")
+        if struct is not None:
+            lazy = _LAZY_PLANS[self.__class__][2]
+            if name in lazy:
+                (key, decode) = lazy[name]
+                if key in struct:
+                    value = decode(struct[key])
+                else:
+                    value = getattr(self.__class__(), name)
+                self.__dict__[name] = value
+                return value
+        raise AttributeError("'%s' object has no attribute '%s'" %
+                             (self.__class__.__name__, name))
+
     def get_change_time(self):
         """
         Return the time that the data was last changed.
@@ -231,6 +458,14 @@ class TableObject(BaseObject):
         """
         return []
 
+    @classmethod
+    def get_search_fields(cls):
+        """
+        Return a list of full field names of the text in the
+        full-text search index.
+        """
+        return []
+
     @classmethod
     def get_secondary_fields(cls):
         """
@@ -296,8 +531,149 @@ class TableObject(BaseObject):
         """
         Get the value of a field.
         """
+        return self.get_field_accessor(field)(self, db, ignore_errors)
+
+    @classmethod
+    def get_field_values(cls, objects, field, db=None, ignore_errors=False):
+        """
+        Get the value of a field of each of the objects of this class,
+        as get_field does, getting the objects of each join of all of
+        them together.
+        """
+        return cls.get_field_accessor(field).many(objects, db, ignore_errors)
+
+    @classmethod
+    def get_field_accessor(cls, field):
+        """
+        Return the function accessor(obj, db=None, ignore_errors=False)
+        that gets the value of a field of an object of this class, as
+        get_field does. It is made from the schema once per class and
+        field, and gets the values of lists, and joins, in steps over
+        all values together; accessor.many(objs, db=None,
+        ignore_errors=False) does so over the values of all objs.
+        """
+        key = (cls, field)
+        accessor = _FIELD_ACCESSORS.get(key)
+        if accessor is None:
+            accessor = _FIELD_ACCESSORS[key] = cls._compile_field(field)
+        return accessor
+
+    @classmethod
+    def _compile_field(cls, field):
+        """
+        Return the accessor of a field (see get_field_accessor). Fields
+        that don't follow the schema, and errors, use _get_field_by_path.
+        """
+        from .handle import HandleClass
+        field = cls.get_field_alias(field)
+        chain = field.split(".")
+
+        def get_by_path(obj, db=None, ignore_errors=False):
+            return obj._get_field_by_path(field, db, ignore_errors)
+
+        def get_many_by_path(objs, db=None, ignore_errors=False):
+            return [get_by_path(obj, db, ignore_errors) for obj in objs]
+        get_by_path.many = get_many_by_path
+
+        try:
+            ftype = cls._follow_schema_path(chain)
+        except Exception:
+            return get_by_path
+        steps = []
+        ptype = cls
+        position = 0
+        while position < len(chain):
+            part = chain[position]
+            if isinstance(ptype, HandleClass):
+                steps.append(_get_join_step(ptype.classname, part))
+                if part == "self":
+                    ptype = ptype.get_class()
+                elif part in ptype.get_schema():
+                    ptype = ptype.get_schema()[part]
+                else:
+                    return get_by_path
+            elif isinstance(ptype, (list, tuple)):
+                if part.isdigit():
+                    steps.append(_get_index_step(int(part)))
+                elif hasattr(ptype, part):
+                    return get_by_path
+                else:
+                    # Same part, on each item:
+                    steps.append(_fan_out_step)
+                    position -= 1
+                ptype = ptype[0]
+            elif hasattr(ptype, "get_schema") and part in ptype.get_schema():
+                steps.append(_get_attribute_step(part))
+                ptype = ptype.get_schema()[part]
+            else:
+                return get_by_path
+            position += 1
+        # If this is a handle, let's mark it:
+        handle_type = type(ftype) if isinstance(ftype, HandleClass) else None
+
+        def get_value(values):
+            """
+            Return the value of the field from the values of the last
+            step.
+            """
+            if len(values) == 1:
+                value = values[0]
+                if value is _NONE:
+                    return None
+                elif handle_type is not None and isinstance(value, str):
+                    return handle_type(value)
+                return value
+            # In the order of _follow_field_path:
+            return [None if value is _NONE else value
+                    for value in reversed(values)] or None
+
+        def accessor(obj, db=None, ignore_errors=False):
+            values = [obj]
+            try:
+                for step in steps:
+                    values = step(values, db, ignore_errors)
+            except Exception:
+                return get_by_path(obj, db, ignore_errors)
+            return get_value(values)
+
+        def accessor_many(objs, db=None, ignore_errors=False):
+            # The values of each object, or None once it has failed:
+            all_values = [[obj] for obj in objs]
+            for step in steps:
+                objects = None
+                if hasattr(step, "classname") and db is not None:
+                    handles = set()
+                    for values in all_values:
+                        if values is not None:
+                            handles.update(_get_join_handles(values))
+                    try:
+                        objects = _join_handles(db, step.classname, handles,
+                                                ignore_errors)
+                    except _Fallback:
+                        pass # each joins its own, and fails alone
+                for (i, values) in enumerate(all_values):
+                    if values is None:
+                        continue
+                    try:
+                        if objects is None:
+                            all_values[i] = step(values, db, ignore_errors)
+                        else:
+                            all_values[i] = step(values, db, ignore_errors,
+                                                 objects)
+                    except Exception:
+                        all_values[i] = None
+            return [get_by_path(obj, db, ignore_errors) if values is None
+                    else get_value(values)
+                    for (obj, values) in zip(objs, all_values)]
+
+        accessor.many = accessor_many
+        return accessor
+
+    def _get_field_by_path(self, field, db=None, ignore_errors=False):
+        """
+        Get the value of a field, following its path item by item.
+        """
         from .handle import HandleClass
-        field = self.__class__.get_field_alias(field)
         chain = field.split(".")
         try:
             path = self._follow_field_path(chain, db, ignore_errors)
@@ -357,7 +733,7 @@ class TableObject(BaseObject):
                             #      current.__class__.__name__,
                             #      path_to[:],
                             #      [str(i)] + chain[p:])
-                            todo.append([self, current, path_to[:], [str(i)] + chain[p:]])
+                            todo.append([parent, current, path_to[:], [str(i)] + chain[p:]])
                         current = None
                         keep_going = False
                 else: # part not found on this self
@@ -22,6 +22,7 @@
 TagBase class for Gramps.
 """
 
+from .baseobj import BaseMixin
 from .handle import Handle
 
 #-------------------------------------------------------------------------
@@ -29,10 +30,11 @@ from .handle import Handle
 # TagBase class
 #
 #-------------------------------------------------------------------------
-class TagBase:
+class TagBase(BaseMixin):
     """
     Base class for tag-aware objects.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
@@ -54,8 +56,7 @@ class TagBase:
 
     def set_from_struct(self, struct):
         from .tag import Tag
-        tag_list = struct.get("tag_list", [])
-        self.tag_list = tag_list
+        self.tag_list = list(struct.get("tag_list", []))
 
     def add_tag(self, tag):
         """
@@ -0,0 +1,69 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" unittest for the __slots__ of the secondary objects """
+
+import copy
+import pickle
+import unittest
+
+from .. import (Address, Attribute, ChildRef, Date, EventRef, EventType,
+                LdsOrd, Location, MediaRef, Name, NameType, PersonRef,
+                PlaceName, PlaceRef, RepoRef, SrcAttribute, Surname, Url,
+                Person)
+from ..locationbase import LocationBase
+from ..privacybase import PrivacyBase
+
+SLOTTED = [Address, Attribute, ChildRef, Date, EventRef, EventType, LdsOrd,
+           Location, MediaRef, Name, NameType, PersonRef, PlaceName,
+           PlaceRef, RepoRef, SrcAttribute, Surname, Url]
+
+class SlotsTest(unittest.TestCase):
+
+    def test_no_dict(self):
+        for cls in SLOTTED:
+            obj = cls()
+            self.assertFalse(hasattr(obj, "__dict__"), cls.__name__)
+            self.assertRaises(AttributeError, setattr, obj, "no_such_field",
+                              1)
+        # Primary objects still have one:
+        self.assertTrue(hasattr(Person(), "__dict__"))
+
+    def test_copy(self):
+        for cls in SLOTTED:
+            obj = cls()
+            if hasattr(obj, "to_struct"):
+                struct = obj.to_struct()
+                self.assertEqual(copy.deepcopy(obj).to_struct(), struct)
+                self.assertEqual(pickle.loads(pickle.dumps(obj)).to_struct(),
+                                 struct)
+        event_ref = EventRef()
+        event_ref.set_role(EventType.BIRTH)
+        self.assertEqual(copy.copy(event_ref).get_role(), EventType.BIRTH)
+
+    def test_mixin(self):
+        privacy = PrivacyBase()
+        privacy.set_privacy(True)
+        self.assertTrue(PrivacyBase(privacy).get_privacy())
+        self.assertIsInstance(privacy, PrivacyBase)
+        self.assertEqual(LocationBase().city, "")
+
+if __name__ == "__main__":
+    unittest.main()
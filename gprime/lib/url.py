@@ -51,6 +51,7 @@ class Url(SecondaryObject, PrivacyBase):
     Contains information related to internet Uniform Resource Locators,
     allowing gramps to store information about internet resources.
     """
+    __slots__ = ('private', 'path', 'desc', 'type')
 
     def __init__(self, source=None):
         """Create a new URL instance, copying from the source if present."""
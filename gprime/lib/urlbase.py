@@ -27,6 +27,7 @@ UrlBase class for Gramps.
 # Gprime modules
 #
 #-------------------------------------------------------------------------
+from .baseobj import BaseMixin
 from .url import Url
 from .const import IDENTICAL, EQUAL
 
@@ -35,10 +36,11 @@ from .const import IDENTICAL, EQUAL
 # UrlBase classes
 #
 #-------------------------------------------------------------------------
-class UrlBase:
+class UrlBase(BaseMixin):
     """
     Base class for url-aware objects.
     """
+    __slots__ = ()
 
     def __init__(self, source=None):
         """
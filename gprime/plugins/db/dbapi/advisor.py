@@ -0,0 +1,256 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Statistics of the fields used by selects, and suggestions of the
+secondary columns and indexes that would make them faster, for the
+DB-API backends.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.lib.grampstype import GrampsType
+from gprime.lib.handle import HandleClass
+
+# Names of the types of secondary columns, as kept in the metadata:
+COLUMN_TYPES = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+}
+
+def get_where_fields(where):
+    """
+    Return the list of field names in where, a
+    (field, op, value) | ["AND", [where, ...]] | ["OR", [where, ...]]
+    | ["NOT", where].
+    """
+    if where is None:
+        return []
+    elif len(where) == 3:
+        return [where[0]]
+    elif where[0] in ["AND", "OR"]:
+        return [field for part in where[1]
+                for field in get_where_fields(part)]
+    else: # "NOT"
+        return get_where_fields(where[1])
+
+#-------------------------------------------------------------------------
+#
+# QueryStats class
+#
+#-------------------------------------------------------------------------
+class QueryStats:
+    """
+    For each table and field, the number of selects with the field in
+    their where or order by, the time they took, and the number of
+    rows they returned (or counted).
+
+    The time of a select is shared by its fields.
+    """
+    def __init__(self):
+        # {table: {field: {"queries": n, "where": n, "order": n,
+        #                  "seconds": s, "rows": n}}}
+        self.tables = {}
+
+    def record(self, table, where, order_by, seconds, rows):
+        """
+        Add a select on table to the statistics.
+        """
+        where_fields = set(get_where_fields(where))
+        order_fields = set(field for (field, direction) in order_by or [])
+        fields = (where_fields | order_fields) - set(["handle"])
+        if not fields:
+            return
+        for field in fields:
+            self._add(table, field, {
+                "queries": 1,
+                "where": 1 if field in where_fields else 0,
+                "order": 1 if field in order_fields else 0,
+                "seconds": seconds / len(fields),
+                "rows": rows,
+            })
+
+    def _add(self, table, field, stats):
+        """
+        Add the counts of stats to those of the field.
+        """
+        totals = self.tables.setdefault(table, {}).setdefault(
+            field, {"queries": 0, "where": 0, "order": 0,
+                    "seconds": 0.0, "rows": 0})
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+
+    def update(self, tables):
+        """
+        Add the statistics of tables, as returned by get_stats.
+        """
+        for table in tables:
+            for field in tables[table]:
+                self._add(table, field, tables[table][field])
+
+    def get_stats(self):
+        """
+        Return the statistics, as a dictionary that can be saved as JSON.
+        """
+        return self.tables
+
+    def clear(self):
+        """
+        Forget all the selects.
+        """
+        self.tables = {}
+
+#-------------------------------------------------------------------------
+#
+# IndexAdvisor class
+#
+#-------------------------------------------------------------------------
+class IndexAdvisor:
+    """
+    Suggests the indexes that would have made the recorded selects of
+    a DBAPI database faster, and creates them.
+
+    Each suggestion is a dictionary with the table, field, and kind:
+
+    "index" - index a secondary column
+    "column" - add a secondary column for a field in the json_data,
+               and index it
+    "expression" - index the value of a type in the json_data
+    None - the field can't be indexed; reason says why
+
+    and the statistics of the field, with the estimated seconds that
+    an index would have saved: the time of the selects, less that
+    needed to read the rows they returned.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def get_suggestions(self, stats=None):
+        """
+        Return the suggestions for the statistics (by default, those of
+        the database) of the fields that are not indexed yet, the ones
+        with the most savings first.
+        """
+        if stats is None:
+            stats = self.db.get_query_stats()
+        suggestions = []
+        for table in stats:
+            class_ = self.db.get_table_func(table, "class_func")
+            merged = QueryStats()
+            for field in stats[table]:
+                merged._add(table, class_.get_field_alias(field),
+                            stats[table][field])
+            total = self.db.get_table_func(table, "count_func")()
+            for (field, counts) in merged.get_stats().get(table, {}).items():
+                (kind, detail) = self.get_kind(table, field)
+                if kind == "indexed":
+                    continue
+                if total and counts["queries"]:
+                    selectivity = min(1.0, counts["rows"] /
+                                      (counts["queries"] * total))
+                else:
+                    selectivity = 1.0
+                suggestion = dict(counts)
+                suggestion.update({
+                    "table": table,
+                    "field": field,
+                    "kind": kind,
+                    "savings": (counts["seconds"] * (1.0 - selectivity)
+                                if kind else 0.0),
+                })
+                if kind == "column":
+                    suggestion["type"] = detail
+                elif kind is None:
+                    suggestion["reason"] = detail
+                suggestions.append(suggestion)
+        suggestions.sort(key=lambda suggestion: (-suggestion["savings"],
+                                                 suggestion["table"],
+                                                 suggestion["field"]))
+        return suggestions
+
+    def get_kind(self, table, field):
+        """
+        Return the kind of index that field (a full field name) of table
+        needs, and the type of the column, or the reason it can't have
+        one. The kind is "indexed" if it is indexed already.
+        """
+        from gprime.plugins.db.dbapi.dbapi import _get_json_path
+        class_ = self.db.get_table_func(table, "class_func")
+        column = self.db._hash_name(table, field)
+        secondary_fields = [self.db._hash_name(table, name)
+                            for (name, ptype)
+                            in self.db.get_secondary_fields(table)]
+        if column in secondary_fields:
+            if self.db.is_indexed(table, column):
+                return ("indexed", None)
+            return ("index", None)
+        json_path = _get_json_path(class_, field)
+        if json_path is None:
+            return (None, "joins another table, or is not a field")
+        (segments, ptype) = json_path
+        if len(segments) > 1:
+            return (None, "is in a list")
+        if isinstance(ptype, type) and issubclass(ptype, GrampsType):
+            if not self.db.has_json_sql():
+                return (None, "is a type, and the json_data isn't JSON "
+                        "the backend can read")
+            if self.db.is_indexed(table, column):
+                return ("indexed", None)
+            return ("expression", None)
+        if isinstance(ptype, HandleClass):
+            return ("column", "str")
+        return ("column", ptype.__name__)
+
+    def create(self, suggestion):
+        """
+        Create the index (and column) of a suggestion.
+        """
+        if suggestion["kind"] is None:
+            raise Exception("%s.%s can't be indexed: it %s" %
+                            (suggestion["table"], suggestion["field"],
+                             suggestion["reason"]))
+        self.db.add_secondary_index(suggestion["table"], suggestion["field"],
+                                    suggestion.get("type"))
+
+    def get_report(self, stats=None):
+        """
+        Return the suggestions as lines of text.
+        """
+        suggestions = self.get_suggestions(stats)
+        if not suggestions:
+            return ["No suggestions: the selects only used indexed fields."]
+        lines = ["%-10s %-45s %-10s %7s %7s %10s %10s" %
+                 ("Table", "Field", "Suggest", "Where", "Order",
+                  "Seconds", "Savings")]
+        for suggestion in suggestions:
+            lines.append("%-10s %-45s %-10s %7d %7d %10.3f %10.3f" % (
+                suggestion["table"], suggestion["field"],
+                suggestion["kind"] or "-", suggestion["where"],
+                suggestion["order"], suggestion["seconds"],
+                suggestion["savings"]))
+            if suggestion["kind"] is None:
+                lines.append("    can't be indexed: it %s" %
+                             suggestion["reason"])
+        return lines
@@ -0,0 +1,152 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Codecs of the object data (the json_data column) of the DB-API backends.
+
+The codec of a database is kept in its metadata, as "codec", and is
+changed with DBAPI.set_codec.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import json
+import marshal
+import zlib
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+def _get_plain(value):
+    """
+    Return a copy of a struct with only the plain types that marshal
+    accepts: handles, and other subclasses, become their base type, and
+    tuples lists, as they would be after JSON.
+    """
+    if type(value) in _PLAIN_TYPES:
+        return value
+    elif isinstance(value, dict):
+        return {key: _get_plain(item) for (key, item) in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_get_plain(item) for item in value]
+    for plain_type in _PLAIN_TYPES:
+        if isinstance(value, plain_type):
+            return plain_type(value)
+    raise TypeError("Can't encode %r" % (value,))
+
+#-------------------------------------------------------------------------
+#
+# Codec classes
+#
+#-------------------------------------------------------------------------
+class Codec:
+    """
+    Turns the struct of an object into the value stored in the
+    json_data column, and back.
+    """
+    # Name of the codec, as kept in the metadata:
+    name = None
+    # True if the encoded values are bytes, rather than text:
+    binary = False
+    # True if the backend's JSON functions can read the encoded values:
+    sql_json = False
+
+    def encode(self, struct):
+        """
+        Return the stored value of struct.
+        """
+        raise NotImplementedError
+
+    def decode(self, data):
+        """
+        Return the struct of a stored value.
+        """
+        raise NotImplementedError
+
+    def to_json(self, data):
+        """
+        Return the JSON text, with sorted keys, of a stored value.
+        """
+        return json.dumps(self.decode(data), sort_keys=True)
+
+class JSONCodec(Codec):
+    """
+    JSON text, with sorted keys. The default.
+    """
+    name = "json"
+    sql_json = True
+
+    def encode(self, struct):
+        return json.dumps(struct, sort_keys=True)
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def to_json(self, data):
+        # Already JSON with sorted keys; no need to decode it:
+        if isinstance(data, (bytes, memoryview)):
+            return bytes(data).decode("utf-8")
+        return data
+
+class BinaryCodec(Codec):
+    """
+    Python's marshal format: compact, and the fastest to decode.
+    """
+    name = "binary"
+    binary = True
+    # Version 4 shares repeated strings, like the keys of the structs:
+    VERSION = 4
+
+    def encode(self, struct):
+        return marshal.dumps(_get_plain(struct), self.VERSION)
+
+    def decode(self, data):
+        return marshal.loads(data)
+
+class CompressedCodec(Codec):
+    """
+    JSON, without spaces, compressed with zlib: the smallest.
+    """
+    name = "compressed"
+    binary = True
+    LEVEL = 6
+
+    def encode(self, struct):
+        return zlib.compress(json.dumps(struct, separators=(",", ":"))
+                             .encode("utf-8"), self.LEVEL)
+
+    def decode(self, data):
+        return json.loads(zlib.decompress(data))
+
+CODECS = {codec.name: codec for codec in [JSONCodec, BinaryCodec,
+                                          CompressedCodec]}
+
+def get_codec(name):
+    """
+    Return a codec by name.
+    """
+    if name not in CODECS:
+        raise Exception("Unknown codec '%s'; use one of: %s" %
+                        (name, ", ".join(sorted(CODECS))))
+    return CODECS[name]()
@@ -28,7 +28,9 @@ import shutil
 import time
 import sys
 import json
-from operator import itemgetter
+from collections import deque
+import itertools
+import multiprocessing
 import logging
 
 #------------------------------------------------------------------------
@@ -36,7 +38,8 @@ import logging
 # Gramps Modules
 #
 #------------------------------------------------------------------------
-from gprime.db.base import eval_order_by
+from gprime.db.base import (eval_order_by, get_search_words,
+                             get_search_text)
 from gprime.db.dbconst import (DBLOGNAME, DBBACKEND, KEY_TO_NAME_MAP,
                                    TXNADD, TXNUPD, TXNDEL,
                                    PERSON_KEY, FAMILY_KEY, SOURCE_KEY,
@@ -44,17 +47,171 @@ from gprime.db.dbconst import (DBLOGNAME, DBBACKEND, KEY_TO_NAME_MAP,
                                    TAG_KEY, CITATION_KEY, REPOSITORY_KEY)
 from gprime.db.generic import DbGeneric
 from gprime.lib import (Tag, Media, Person, Family, Source,
-                            Citation, Event, Place, Repository, Note)
+                            Citation, Event, Place, Repository, Note,
+                            Name, Date)
+from gprime.plugins.db.dbapi.advisor import (QueryStats, IndexAdvisor,
+                                             COLUMN_TYPES)
+from gprime.plugins.db.dbapi.codec import JSONCodec, get_codec
 from gprime.const import LOCALE as glocale
 _ = glocale.translation.gettext
 
 LOG = logging.getLogger(".dbapi")
 _LOG = logging.getLogger(DBLOGNAME)
 
+# Columns of the person_summary table, and keys of the summaries of
+# get_person_summaries:
+PERSON_SUMMARY_COLUMNS = ["handle", "gid", "gender", "primary_name",
+                          "surname", "first_name", "birth_date",
+                          "birth_sortval", "death_date", "death_sortval",
+                          "parent_family_handle", "father_handle",
+                          "mother_handle"]
+
+# {struct _class: {key: (referenced class name, is_list)}}, built on
+# first use by _get_reference_keys:
+_REFERENCE_KEYS = {}
+
+def _get_reference_keys():
+    """
+    Return, for each struct _class, the keys that hold handles of other
+    primary objects, as given by the schemas in gprime.lib.
+    """
+    if not _REFERENCE_KEYS:
+        import gprime.lib
+        from gprime.lib.handle import HandleClass
+        for name, cls in vars(gprime.lib).items():
+            if (not isinstance(cls, type) or issubclass(cls, HandleClass) or
+                    not hasattr(cls, "get_schema")):
+                continue
+            schema = cls.get_schema()
+            # Citation and note lists come from the CitationBase and
+            # NoteBase mixins, which not every schema lists:
+            keys = {"citation_list": ("Citation", True),
+                    "note_list": ("Note", True)}
+            for key, ptype in schema.items():
+                is_list = isinstance(ptype, (list, tuple))
+                if is_list:
+                    ptype = ptype[0]
+                if isinstance(ptype, HandleClass) and key != "handle":
+                    keys[key] = (ptype.classname, is_list)
+            _REFERENCE_KEYS[name] = keys
+            if isinstance(schema.get("_class"), str):
+                _REFERENCE_KEYS[schema["_class"]] = keys
+    return _REFERENCE_KEYS
+
+def _get_struct_references(struct):
+    """
+    Return the set of (class name, handle) referenced by a primary
+    object struct, without creating the object. This is the same as
+    the object's get_referenced_handles_recursively().
+    """
+    reference_keys = _get_reference_keys()
+    references = set()
+    todo = [struct]
+    while todo:
+        item = todo.pop()
+        if isinstance(item, dict):
+            keys = reference_keys.get(item.get("_class"), {})
+            for key, value in item.items():
+                if key in keys:
+                    classname, is_list = keys[key]
+                    if is_list:
+                        references.update((classname, handle)
+                                          for handle in value if handle)
+                    elif value:
+                        references.add((classname, value))
+                elif isinstance(value, (dict, list)):
+                    todo.append(value)
+        else:
+            todo.extend(value for value in item
+                        if isinstance(value, (dict, list)))
+    return references
+
+def _get_rows_references(class_name, rows, codec_name="json"):
+    """
+    Given (handle, json_data) rows of a primary table, stored with the
+    named codec, return the rows of the reference table for them.
+    """
+    codec = get_codec(codec_name)
+    references = []
+    for (handle, json_data) in rows:
+        references.extend(
+            (handle, class_name, ref_handle, ref_class_name)
+            for (ref_class_name, ref_handle)
+            in _get_struct_references(codec.decode(json_data)))
+    return references
+
+# {(class name, field): (segments, type) or None}, built on use by
+# _get_json_path:
+_JSON_PATHS = {}
+
+def _get_json_path(cls, field):
+    """
+    Return the path of the (full) field name in the json_data of class
+    cls, as (segments, type), or None if it can't be selected in SQL
+    (joins to other tables, or values that aren't simple types).
+
+    Each segment is a list of keys and list positions; all but the
+    last end at a list, and the next segment is a path into each of
+    its items. The type is that of the value at the end of the path.
+    """
+    key = (cls.__name__, field)
+    if key not in _JSON_PATHS:
+        from gprime.lib.handle import HandleClass
+        from gprime.lib.grampstype import GrampsType
+        segments = [[]]
+        ptype = cls
+        in_list = False
+        for part in field.split("."):
+            if in_list:
+                in_list = False
+                if part.isdigit():
+                    segments[-1].append(int(part))
+                    continue
+                segments.append([])
+            if (not isinstance(ptype, type) or
+                    not hasattr(ptype, "get_schema") or
+                    part not in ptype.get_schema() or part == "_class"):
+                # a join (the type is a handle), or not a field
+                segments = None
+                break
+            ptype = ptype.get_schema()[part]
+            segments[-1].append(part)
+            if isinstance(ptype, (list, tuple)):
+                ptype = ptype[0]
+                in_list = True
+        if segments is None:
+            _JSON_PATHS[key] = None
+        else:
+            if in_list:
+                segments.append([])
+            if (isinstance(ptype, HandleClass) or
+                    ptype in [str, int, float, bool] or
+                    (isinstance(ptype, type) and
+                     issubclass(ptype, GrampsType))):
+                _JSON_PATHS[key] = (segments, ptype)
+            else:
+                _JSON_PATHS[key] = None
+    return _JSON_PATHS[key]
+
 class DBAPI(DbGeneric):
     """
     Database backends class for DB-API 2.0 databases
     """
+    # Number of queued rows in a table before a batch transaction
+    # writes them out with executemany:
+    BULK_SIZE = 5000
+    # Number of rows read at a time by reindex_reference_map:
+    REINDEX_CHUNK = 1000
+    # Number of handles in each query of get_raw_data_from_handles:
+    FETCH_SIZE = 512
+    # Tables with more rows than this get an estimated total for the
+    # pages of selects with a where, from about this many of their rows,
+    # sampled over the whole table:
+    ESTIMATE_ROWS = 100000
+    # Seconds that the changes are kept in the change_log table, for the
+    # caches of other processes:
+    CHANGE_LOG_SECONDS = 60 * 60
+
     @classmethod
     def get_class_summary(cls):
         """
@@ -66,6 +223,47 @@ class DBAPI(DbGeneric):
         }
         return summary
 
+    def __init__(self, *args, **kwargs):
+        # Rows queued by batch transactions, {"Person": {handle: (row,
+        # struct)}, ...}, and a {"Person": {gid: handle}, ...} index:
+        self._bulk_rows = {}
+        self._bulk_gids = {}
+        self._bulk_fields = {}
+        # Search text of the queued rows, {handle: (table, text)}:
+        self._bulk_search = {}
+        # Fields used by selects, for the IndexAdvisor:
+        self.query_stats = QueryStats()
+        # Secondary fields and indexes added by add_secondary_index,
+        # {"fields": {"Person": [[field, type name], ...]},
+        #  "indexes": {"Person": [field, ...]}}, read on first use:
+        self._secondary_extras = None
+        # Codec of the json_data, read from the metadata by update_schema:
+        self.codec = JSONCodec()
+        # Changes to the row counters in the open transaction,
+        # {"person": delta, ...}, written when it is committed:
+        self._counter_deltas = {}
+        # Changes to the numbers of people by surname, written to the
+        # surname table when the transaction is committed, or before it
+        # is read:
+        self._surname_deltas = {}
+        # True if people, events or families were changed in the open
+        # batch transaction, so that the person_summary table is rebuilt
+        # when it is committed:
+        self._summaries_stale = False
+        # When shared with other processes, the id of this one, the
+        # (class name, handle) of the objects changed since the last
+        # commit, for the change_log table, the last change read from
+        # it, and when:
+        self._log_changes = False
+        self._process = None
+        self._changes = set()
+        self._change_seq = 0
+        self._change_sync = 0
+        # True if objects were written since the last commit, which then
+        # moves the last change stamp, for get_last_change:
+        self._changed = False
+        super().__init__(*args, **kwargs)
+
     def restore(self):
         """
         If you wish to support an optional restore routine, put it here.
@@ -202,6 +400,55 @@ class DBAPI(DbGeneric):
                                       null=False),
                               Column("value", "TEXT")])
 
+        CounterTable = Table("counter",
+                             [Column("name", "VARCHAR(50)", primary=True,
+                                     null=False),
+                              Column("value", "INTEGER")])
+
+        SurnameTable = Table("surname",
+                             [Column("surname", "VARCHAR(255)", primary=True,
+                                     null=False),
+                              Column("count", "INTEGER")])
+
+        ChangeLogTable = Table("change_log",
+                               [Column("seq", "INTEGER", index=True),
+                                Column("obj_class", "VARCHAR(50)"),
+                                Column("handle", "VARCHAR(255)"),
+                                Column("process", "INTEGER"),
+                                Column("changed", "BIGINT")])
+
+        PersonSummaryTable = Table(
+            "person_summary",
+            [Column("handle", "VARCHAR(50)", primary=True, null=False),
+             Column("gid", "TEXT"),
+             Column("gender", "INTEGER"),
+             Column("primary_name", "TEXT"),
+             Column("surname", "TEXT"),
+             Column("first_name", "TEXT"),
+             Column("birth_date", "TEXT"),
+             Column("birth_sortval", "INTEGER"),
+             Column("death_date", "TEXT"),
+             Column("death_sortval", "INTEGER"),
+             Column("parent_family_handle", "VARCHAR(50)", index=True),
+             Column("father_handle", "VARCHAR(50)"),
+             Column("mother_handle", "VARCHAR(50)")])
+
+        JobTable = Table("job",
+                         [Column("handle", "VARCHAR(50)", primary=True,
+                                 null=False),
+                          Column("username", "VARCHAR(50)", index=True),
+                          Column("kind", "VARCHAR(20)"),
+                          Column("plugin", "VARCHAR(50)"),
+                          Column("name", "TEXT"),
+                          Column("options", "TEXT"),
+                          Column("status", "VARCHAR(20)", index=True),
+                          Column("message", "TEXT"),
+                          Column("filename", "TEXT"),
+                          Column("worker", "VARCHAR(50)"),
+                          Column("created", "BIGINT"),
+                          Column("started", "BIGINT"),
+                          Column("finished", "BIGINT")])
+
         UserTable = Table("user",
                           [Column("username", "VARCHAR(50)", primary=True),
                            Column("password", "TEXT"),
@@ -213,8 +460,12 @@ class DBAPI(DbGeneric):
                            Column("permissions", "VARCHAR(20)"),
                           ])
 
+        rebuild_counters = not self.dbapi.table_exists("counter")
+        rebuild_surnames = not self.dbapi.table_exists("surname")
+        rebuild_summaries = not self.dbapi.table_exists("person_summary")
         for table in [ReferenceTable, NamegroupTable, MetadataTable,
-                      UserTable]:
+                      CounterTable, SurnameTable, PersonSummaryTable,
+                      ChangeLogTable, JobTable, UserTable]:
             if not self.dbapi.table_exists(table.name):
                 self.create_table(table)
             else:
@@ -226,11 +477,165 @@ class DBAPI(DbGeneric):
                         self.dbapi.execute("""CREATE INDEX %s ON %s(%s);"""
                                            % (index_name, table.name, column.name))
 
+        self.codec = get_codec(self.get_metadata("codec", "json"))
+        if rebuild_counters:
+            self.rebuild_counters()
+            self.dbapi.commit()
+        if rebuild_surnames:
+            self.build_surname_list()
+            self.dbapi.commit()
+        if rebuild_summaries:
+            self.rebuild_person_summaries()
+            self.dbapi.commit()
+
+        if (hasattr(self.dbapi, "create_search_table") and
+                not self.dbapi.table_exists("search")):
+            self.dbapi.create_search_table()
+            self.rebuild_search()
+            self.dbapi.commit()
+
         self.rebuild_secondary_fields()
 
     def close_backend(self):
+        self.save_query_stats()
         self.dbapi.close()
 
+    def interrupt(self):
+        """
+        Stop the query running on the database, from another thread, if
+        the backend can.
+        """
+        if hasattr(self.dbapi, "interrupt"):
+            self.dbapi.interrupt()
+
+    def enable_multiprocess(self):
+        """
+        Prepare the database to be shared with other processes, each with
+        its own connections and caches: use write-ahead logging, if
+        SQLite, so that reads don't wait for writes, and log the changed
+        objects in the change_log table, for sync_cache.
+        """
+        if hasattr(self.dbapi, "set_wal"):
+            self.dbapi.set_wal()
+        self._log_changes = True
+        self._process = os.getpid()
+        self._change_seq = self._get_change_seq()
+        self._change_sync = time.time()
+
+    def _get_change_seq(self):
+        self.dbapi.execute("SELECT MAX(seq) FROM change_log;")
+        row = self.dbapi.fetchone()
+        return (row and row[0]) or 0
+
+    def _cache_write(self, table, handle, struct=None):
+        super()._cache_write(table, handle, struct)
+        self._changed = True
+        if self._log_changes:
+            self._log_change(table, handle)
+
+    def _log_change(self, obj_class, handle):
+        """
+        Log the change of the object for the other processes, when
+        committed. A batch transaction logs ("*", ""), for all objects.
+        """
+        if self.transaction is not None and self.transaction.batch:
+            self._changes.add(("*", ""))
+        else:
+            self._changes.add((obj_class, handle))
+
+    def _write_change_log(self):
+        """
+        Write the changes logged since the last commit to the change_log
+        table, with the next sequence number, and forget the changes
+        older than CHANGE_LOG_SECONDS. Does not commit.
+        """
+        if not self._changes:
+            return
+        # The counter row is locked until committed, so the changes are
+        # committed in the order of their sequence numbers:
+        self.dbapi.execute("UPDATE counter SET value = value + 1 "
+                           "WHERE name = 'change_log';")
+        self.dbapi.execute("SELECT value FROM counter "
+                           "WHERE name = 'change_log';")
+        row = self.dbapi.fetchone()
+        if row is None:
+            seq = self._get_change_seq() + 1
+            self.dbapi.execute("INSERT INTO counter (name, value) "
+                               "VALUES ('change_log', ?);", [seq])
+        else:
+            seq = row[0]
+        now = int(time.time())
+        self.dbapi.executemany(
+            "INSERT INTO change_log (seq, obj_class, handle, process, "
+            "changed) VALUES (?, ?, ?, ?, ?);",
+            [[seq, obj_class, handle, self._process, now]
+             for (obj_class, handle) in sorted(self._changes)])
+        self.dbapi.execute("DELETE FROM change_log WHERE changed < ?;",
+                           [now - self.CHANGE_LOG_SECONDS])
+        self._changes.clear()
+
+    def _write_last_change(self):
+        """
+        Move the last change stamp, if objects were written since the
+        last commit: to the current time, or one second past the last
+        stamp, if that is later, so that every commit has its own stamp.
+        Does not commit.
+        """
+        if not self._changed:
+            return
+        now = int(time.time())
+        self.dbapi.execute("UPDATE counter SET value = CASE "
+                           "WHEN value < ? THEN ? ELSE value + 1 END "
+                           "WHERE name = 'last_change';", [now, now])
+        if not self.get_last_change():
+            self.dbapi.execute("INSERT INTO counter (name, value) "
+                               "VALUES ('last_change', ?);", [now])
+        self._changed = False
+
+    def get_last_change(self):
+        """
+        Return the stamp of the last committed change to the objects, by
+        any process: the time in seconds since the epoch, or a little
+        later, if there were several changes in the same second. Meant
+        for validating the pages that show the objects. 0 if not known.
+        """
+        self.dbapi.execute("SELECT value FROM counter "
+                           "WHERE name = 'last_change';")
+        row = self.dbapi.fetchone()
+        return (row and row[0]) or 0
+
+    def sync_cache(self):
+        """
+        Forget the cached objects that other processes have changed since
+        the last sync. Returns the (class name, handle) of the changes,
+        where ("*", "") means that the whole cache was cleared.
+        """
+        if not self._log_changes:
+            return []
+        now = time.time()
+        if now - self._change_sync > self.CHANGE_LOG_SECONDS / 2:
+            # Changes may have been forgotten since the last sync:
+            self._change_seq = self._get_change_seq()
+            self._change_sync = now
+            self.cache.clear()
+            return [("*", "")]
+        self._change_sync = now
+        self.dbapi.execute("SELECT seq, obj_class, handle, process "
+                           "FROM change_log WHERE seq > ?;",
+                           [self._change_seq])
+        changes = []
+        for (seq, obj_class, handle, process) in self.dbapi.fetchall():
+            self._change_seq = max(self._change_seq, seq)
+            if process == self._process:
+                # Written to the cache of this process when committed
+                continue
+            if obj_class == "*":
+                self.cache.clear()
+            else:
+                self.cache.invalidate(obj_class, handle)
+            changes.append((obj_class, handle))
+        return changes
+
     def transaction_backend_begin(self):
         """
         Lowlevel interface to the backend transaction.
@@ -245,6 +650,8 @@ class DBAPI(DbGeneric):
         Executes a db END;
         """
         _LOG.debug("    DBAPI %s transaction commit", hex(id(self)))
+        self._write_change_log()
+        self._write_last_change()
         self.dbapi.commit()
 
     def transaction_backend_abort(self):
@@ -252,7 +659,11 @@ class DBAPI(DbGeneric):
         Lowlevel interface to the backend transaction.
         Executes a db ROLLBACK;
         """
+        self._changes.clear()
+        self._changed = False
         self.dbapi.rollback()
+        # Rows read from the rolled back changes may be cached:
+        self.cache.clear()
 
     def transaction_begin(self, transaction):
         """
@@ -278,10 +689,17 @@ class DBAPI(DbGeneric):
                   TXNDEL: "-delete",
                   None: "-delete"}
         if txn.batch:
-            self.build_surname_list()
+            self._bulk_flush()
             # FIXME: need a User GUI update callback here:
             self.reindex_reference_map(lambda percent: percent)
+            if self._summaries_stale:
+                self.rebuild_person_summaries()
+        self._write_counters()
+        self._write_surnames()
+        self._write_change_log()
+        self._write_last_change()
         self.dbapi.commit()
+        self._cache_commit()
         if not txn.batch:
             # Now, emit signals:
             for (obj_type_val, txn_type_val) in list(txn):
@@ -308,7 +726,16 @@ class DBAPI(DbGeneric):
         """
         Executed after a batch operation abort.
         """
+        self._bulk_rows.clear()
+        self._bulk_gids.clear()
+        self._bulk_search.clear()
+        self._counter_deltas.clear()
+        self._surname_deltas.clear()
+        self._summaries_stale = False
+        self._changes.clear()
+        self._changed = False
         self.dbapi.rollback()
+        self._cache_abort()
         self.transaction = None
         txn.clear()
         txn.first = None
@@ -354,6 +781,65 @@ class DBAPI(DbGeneric):
                 "INSERT INTO metadata (setting, value) VALUES (?, ?);",
                 [key, json.dumps(value, sort_keys=True)])
 
+    def set_mediapath(self, mediapath):
+        """
+        Set the media path, committed at once: it is set when the
+        database is opened, outside of any transaction, and the other
+        connections couldn't write until it was committed.
+        """
+        super().set_mediapath(mediapath)
+        if self.transaction is None:
+            self.dbapi.commit()
+
+    def _update_counter(self, table_name, delta):
+        """
+        Add delta to the number of rows of a primary table: when the
+        open transaction is committed, or now if there is none.
+        """
+        if self.transaction is None:
+            self.dbapi.execute(
+                "UPDATE counter SET value = value + ? WHERE name = ?;",
+                [delta, table_name])
+        else:
+            self._counter_deltas[table_name] = (
+                self._counter_deltas.get(table_name, 0) + delta)
+
+    def _write_counters(self):
+        """
+        Write the changes to the row counters of the open transaction.
+        """
+        for (table_name, delta) in self._counter_deltas.items():
+            if delta:
+                self.dbapi.execute(
+                    "UPDATE counter SET value = value + ? WHERE name = ?;",
+                    [delta, table_name])
+        self._counter_deltas.clear()
+
+    def _get_counter(self, table_name):
+        """
+        Return the number of rows of a primary table, as kept in the
+        counter table, with the changes of the open transaction.
+        """
+        self.dbapi.execute("SELECT value FROM counter WHERE name = ?;",
+                           [table_name])
+        row = self.dbapi.fetchone()
+        return row[0] + self._counter_deltas.get(table_name, 0)
+
+    def rebuild_counters(self):
+        """
+        Count the rows of each primary table into the counter table.
+        """
+        self.dbapi.execute("DELETE FROM counter;")
+        for class_ in [Person, Family, Event, Place, Source, Citation,
+                       Media, Repository, Note, Tag]:
+            table_name = class_.__name__.lower()
+            self.dbapi.execute("SELECT count(1) FROM %s;" % table_name)
+            count = self.dbapi.fetchone()[0]
+            self.dbapi.execute(
+                "INSERT INTO counter (name, value) VALUES (?, ?);",
+                [table_name, count])
+        self._counter_deltas.clear()
+
     def get_name_group_keys(self):
         """
         Return the defined names that have been assigned to a default grouping.
@@ -381,6 +867,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by surnames.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("SELECT handle FROM person ORDER BY order_by;")
         else:
@@ -395,6 +882,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by surnames.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("""SELECT f.handle FROM
                                    (SELECT family.*
@@ -421,6 +909,7 @@ class DBAPI(DbGeneric):
         Return a list of database handles, one handle for each Event in the
         database.
         """
+        self._bulk_flush()
         self.dbapi.execute("SELECT handle FROM event;")
         rows = self.dbapi.fetchall()
         return [bytes(row[0], "utf-8") for row in rows]
@@ -432,6 +921,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by Citation title.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("SELECT handle FROM citation ORDER BY order_by;")
         else:
@@ -446,6 +936,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by Source title.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("SELECT handle FROM source ORDER BY order_by;")
         else:
@@ -460,6 +951,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by Place title.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("SELECT handle FROM place ORDER BY order_by;")
         else:
@@ -472,6 +964,7 @@ class DBAPI(DbGeneric):
         Return a list of database handles, one handle for each Repository in
         the database.
         """
+        self._bulk_flush()
         self.dbapi.execute("SELECT handle FROM repository;")
         rows = self.dbapi.fetchall()
         return [bytes(row[0], "utf-8") for row in rows]
@@ -483,6 +976,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by title.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("SELECT handle FROM media ORDER BY order_by;")
         else:
@@ -495,6 +989,7 @@ class DBAPI(DbGeneric):
         Return a list of database handles, one handle for each Note in the
         database.
         """
+        self._bulk_flush()
         self.dbapi.execute("SELECT handle FROM note;")
         rows = self.dbapi.fetchall()
         return [bytes(row[0], "utf-8") for row in rows]
@@ -506,6 +1001,7 @@ class DBAPI(DbGeneric):
 
         If sort_handles is True, the list is sorted by Tag name.
         """
+        self._bulk_flush()
         if sort_handles:
             self.dbapi.execute("SELECT handle FROM tag ORDER BY order_by;")
         else:
@@ -519,6 +1015,7 @@ class DBAPI(DbGeneric):
 
         If no such Tag exists, None is returned.
         """
+        self._bulk_flush()
         self.dbapi.execute("""select handle from tag where order_by = ?;""",
                            [self._order_by_tag_key(name)])
         row = self.dbapi.fetchone()
@@ -530,81 +1027,71 @@ class DBAPI(DbGeneric):
         """
         Return the number of people currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM person;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("person")
 
     def get_number_of_events(self):
         """
         Return the number of events currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM event;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("event")
 
     def get_number_of_places(self):
         """
         Return the number of places currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM place;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("place")
 
     def get_number_of_tags(self):
         """
         Return the number of tags currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM tag;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("tag")
 
     def get_number_of_families(self):
         """
         Return the number of families currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM family;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("family")
 
     def get_number_of_notes(self):
         """
         Return the number of notes currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM note;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("note")
 
     def get_number_of_citations(self):
         """
         Return the number of citations currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM citation;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("citation")
 
     def get_number_of_sources(self):
         """
         Return the number of sources currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM source;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("source")
 
     def get_number_of_media(self):
         """
         Return the number of media objects currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM media;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("media")
 
     def get_number_of_repositories(self):
         """
         Return the number of source repositories currently in the database.
         """
-        self.dbapi.execute("SELECT count(1) FROM repository;")
-        row = self.dbapi.fetchone()
-        return row[0]
+        self._bulk_flush()
+        return self._get_counter("repository")
 
     def has_name_group_key(self, key):
         """
@@ -629,6 +1116,109 @@ class DBAPI(DbGeneric):
             "INSERT INTO name_group (name, grouping) VALUES(?, ?);",
             [name, grouping])
 
+    def _bulk_queue(self, obj, trans, columns):
+        """
+        In a batch transaction, queue the row for obj rather than writing
+        it now. Queued rows, including their secondary field values, are
+        written with a single executemany per table by _bulk_flush.
+
+        columns - dict of the table's primary column values, other than
+                  handle and json_data
+
+        Returns True if the row was queued, and False if the caller
+        should write it directly (not an open batch transaction, or the
+        row is already in the database).
+        """
+        if (not trans.batch or trans is not self.transaction or
+                self.get_feature("skip-bulk-load")):
+            return False
+        table = obj.__class__.__name__
+        pending = self._bulk_rows.setdefault(table, {})
+        if (obj.handle not in pending and
+                self.get_table_func(table, "has_handle_func")(obj.handle)):
+            return False
+        row = dict(columns)
+        row["handle"] = obj.handle
+        for (field, column) in self._get_bulk_fields(table):
+            if "." in field:
+                row[column] = obj.get_field(field, self, ignore_errors=True)
+            else:
+                row[column] = getattr(obj, field)
+        pending[obj.handle] = (row, obj.to_struct())
+        if self._has_search(table):
+            self._bulk_search[obj.handle] = (table, get_search_text(obj))
+        gid = row.get("gid")
+        if gid:
+            self._bulk_gids.setdefault(table, {})[gid] = obj.handle
+        if len(pending) >= self.BULK_SIZE:
+            self._bulk_flush()
+        return True
+
+    def _get_bulk_fields(self, table):
+        """
+        Return a list of (field, column) pairs of the secondary fields
+        of a table.
+        """
+        if table not in self._bulk_fields:
+            class_ = self.get_table_func(table, "class_func")
+            self._bulk_fields[table] = [
+                (class_.get_field_alias(field), self._hash_name(table, field))
+                for (field, ptype) in self.get_secondary_fields(table)]
+        return self._bulk_fields[table]
+
+    def _bulk_flush(self):
+        """
+        Write all queued rows to the database.
+        Does not commit.
+        """
+        for table, pending in self._bulk_rows.items():
+            if not pending:
+                continue
+            columns = None
+            rows = []
+            for (row, struct) in pending.values():
+                if columns is None:
+                    columns = list(row.keys())
+                rows.append(self._sql_cast_list(
+                    table, columns, [row[column] for column in columns]) +
+                            [self.codec.encode(struct)])
+            self.dbapi.executemany(
+                "INSERT INTO %s (%s, json_data) VALUES(%s);" %
+                (table.lower(), ", ".join(columns),
+                 ", ".join(["?"] * (len(columns) + 1))),
+                rows)
+            self._update_counter(table.lower(), len(rows))
+            if table == "Person":
+                for (row, struct) in pending.values():
+                    self._update_surname(row["surname"] or "", 1)
+        if self._bulk_search:
+            self.dbapi.executemany(
+                "INSERT INTO search (handle, obj_class, text) "
+                "VALUES (?, ?, ?);",
+                [[handle, table, text] for (handle, (table, text))
+                 in self._bulk_search.items()])
+        self._bulk_rows.clear()
+        self._bulk_gids.clear()
+        self._bulk_search.clear()
+
+    def _get_bulk_data(self, table, handle):
+        """
+        Return the struct of a queued row, or None.
+        """
+        pending = self._bulk_rows.get(table)
+        if pending and handle in pending:
+            return pending[handle][1]
+
+    def _get_bulk_from_id_data(self, table, gid):
+        """
+        Return the struct of a queued row by gid, or None.
+        """
+        handle = self._bulk_gids.get(table, {}).get(gid)
+        if handle is not None:
+            row, struct = self._bulk_rows[table][handle]
+            if row["gid"] == gid:
+                return struct
+
     def commit_person(self, person, trans, change_time=None):
         """
         Commit the specified Person to the database, storing the changes as
@@ -636,14 +1226,21 @@ class DBAPI(DbGeneric):
         """
         old_person = None
         person.change = int(change_time or time.time())
-        if person.handle in self.person_map:
+        given_name, surname, gender_type = self.get_person_data(person)
+        if self._bulk_queue(person, trans,
+                            {"order_by": self._order_by_person_key(person),
+                             "gid": person.gid,
+                             "given_name": given_name,
+                             "surname": surname,
+                             "gender_type": gender_type}):
+            pass # written later, by _bulk_flush
+        elif person.handle in self.person_map:
             old_person = self.get_person_from_handle(person.handle)
             # Update surname list if necessary
             if (self._order_by_person_key(person) !=
                     self._order_by_person_key(old_person)):
                 self.remove_from_surname_list(old_person)
                 self.add_to_surname_list(person, trans.batch)
-            given_name, surname, gender_type = self.get_person_data(person)
             # update the person:
             self.dbapi.execute("""UPDATE person SET gid = ?,
                                                     order_by = ?,
@@ -654,14 +1251,13 @@ class DBAPI(DbGeneric):
                                                 WHERE handle = ?;""",
                                [person.gid,
                                 self._order_by_person_key(person),
-                                json.dumps(person.to_struct(), sort_keys=True),
+                                self.codec.encode(person.to_struct()),
                                 given_name,
                                 surname,
                                 gender_type,
                                 person.handle])
         else:
             self.add_to_surname_list(person, trans.batch)
-            given_name, surname, gender_type = self.get_person_data(person)
             # Insert the person:
             self.dbapi.execute(
                 """INSERT INTO person (handle, order_by, gid, json_data,
@@ -670,9 +1266,14 @@ class DBAPI(DbGeneric):
                 [person.handle,
                  self._order_by_person_key(person),
                  person.gid,
-                 json.dumps(person.to_struct(), sort_keys=True),
+                 self.codec.encode(person.to_struct()),
                  given_name, surname, gender_type])
+            self._update_counter("person", 1)
+        self._cache_write("Person", person.handle,
+                          None if trans.batch else person.to_struct())
         self.update_secondary_values(person)
+        self.update_search(person)
+        self._update_summaries_of("Person", person.handle, trans)
         if not trans.batch:
             self.update_backlinks(person)
             if old_person:
@@ -718,7 +1319,12 @@ class DBAPI(DbGeneric):
         """
         old_family = None
         family.change = int(change_time or time.time())
-        if family.handle in self.family_map:
+        if self._bulk_queue(family, trans,
+                            {"gid": family.gid,
+                             "father_handle": family.father_handle,
+                             "mother_handle": family.mother_handle}):
+            pass # written later, by _bulk_flush
+        elif family.handle in self.family_map:
             old_family = self.get_family_from_handle(family.handle).to_struct()
             self.dbapi.execute("""UPDATE family SET gid = ?,
                                                     father_handle = ?,
@@ -728,7 +1334,7 @@ class DBAPI(DbGeneric):
                                [family.gid,
                                 family.father_handle,
                                 family.mother_handle,
-                                json.dumps(family.to_struct(), sort_keys=True),
+                                self.codec.encode(family.to_struct()),
                                 family.handle])
         else:
             self.dbapi.execute(
@@ -739,10 +1345,15 @@ class DBAPI(DbGeneric):
                  family.gid,
                  family.father_handle,
                  family.mother_handle,
-                 json.dumps(family.to_struct(), sort_keys=True)])
+                 self.codec.encode(family.to_struct())])
+            self._update_counter("family", 1)
+        self._cache_write("Family", family.handle,
+                          None if trans.batch else family.to_struct())
         self.update_secondary_values(family)
         if not trans.batch:
             self.update_backlinks(family)
+        self._update_summaries_of("Family", family.handle, trans)
+        if not trans.batch:
             db_op = TXNUPD if old_family else TXNADD
             trans.add(FAMILY_KEY, db_op, family.handle,
                       old_family,
@@ -781,7 +1392,11 @@ class DBAPI(DbGeneric):
         """
         old_citation = None
         citation.change = int(change_time or time.time())
-        if citation.handle in self.citation_map:
+        if self._bulk_queue(citation, trans,
+                            {"order_by": self._order_by_citation_key(citation),
+                             "gid": citation.gid}):
+            pass # written later, by _bulk_flush
+        elif citation.handle in self.citation_map:
             old_citation = self.get_citation_from_handle(
                 citation.handle).to_struct()
             self.dbapi.execute("""UPDATE citation SET gid = ?,
@@ -790,7 +1405,7 @@ class DBAPI(DbGeneric):
                                                 WHERE handle = ?;""",
                                [citation.gid,
                                 self._order_by_citation_key(citation),
-                                json.dumps(citation.to_struct(), sort_keys=True),
+                                self.codec.encode(citation.to_struct()),
                                 citation.handle])
         else:
             self.dbapi.execute(
@@ -799,7 +1414,10 @@ class DBAPI(DbGeneric):
                 [citation.handle,
                  self._order_by_citation_key(citation),
                  citation.gid,
-                 json.dumps(citation.to_struct(), sort_keys=True)])
+                 self.codec.encode(citation.to_struct())])
+            self._update_counter("citation", 1)
+        self._cache_write("Citation", citation.handle,
+                          None if trans.batch else citation.to_struct())
         self.update_secondary_values(citation)
         if not trans.batch:
             self.update_backlinks(citation)
@@ -825,7 +1443,11 @@ class DBAPI(DbGeneric):
         """
         old_source = None
         source.change = int(change_time or time.time())
-        if source.handle in self.source_map:
+        if self._bulk_queue(source, trans,
+                            {"order_by": self._order_by_source_key(source),
+                             "gid": source.gid}):
+            pass # written later, by _bulk_flush
+        elif source.handle in self.source_map:
             old_source = self.get_source_from_handle(source.handle).to_struct()
             self.dbapi.execute("""UPDATE source SET gid = ?,
                                                     order_by = ?,
@@ -833,7 +1455,7 @@ class DBAPI(DbGeneric):
                                                 WHERE handle = ?;""",
                                [source.gid,
                                 self._order_by_source_key(source),
-                                json.dumps(source.to_struct(), sort_keys=True),
+                                self.codec.encode(source.to_struct()),
                                 source.handle])
         else:
             self.dbapi.execute(
@@ -842,8 +1464,12 @@ class DBAPI(DbGeneric):
                 [source.handle,
                  self._order_by_source_key(source),
                  source.gid,
-                 json.dumps(source.to_struct(), sort_keys=True)])
+                 self.codec.encode(source.to_struct())])
+            self._update_counter("source", 1)
+        self._cache_write("Source", source.handle,
+                          None if trans.batch else source.to_struct())
         self.update_secondary_values(source)
+        self.update_search(source)
         if not trans.batch:
             self.update_backlinks(source)
             db_op = TXNUPD if old_source else TXNADD
@@ -871,21 +1497,27 @@ class DBAPI(DbGeneric):
         """
         old_repository = None
         repository.change = int(change_time or time.time())
-        if repository.handle in self.repository_map:
+        if self._bulk_queue(repository, trans,
+                            {"gid": repository.gid}):
+            pass # written later, by _bulk_flush
+        elif repository.handle in self.repository_map:
             old_repository = self.get_repository_from_handle(
                 repository.handle).to_struct()
             self.dbapi.execute("""UPDATE repository SET gid = ?,
                                                     json_data = ?
                                                 WHERE handle = ?;""",
                                [repository.gid,
-                                json.dumps(repository.to_struct(), sort_keys=True),
+                                self.codec.encode(repository.to_struct()),
                                 repository.handle])
         else:
             self.dbapi.execute(
                 """INSERT INTO repository (handle, gid, json_data)
                                           VALUES(?, ?, ?);""",
                 [repository.handle, repository.gid,
-                 json.dumps(repository.to_struct(), sort_keys=True)])
+                 self.codec.encode(repository.to_struct())])
+            self._update_counter("repository", 1)
+        self._cache_write("Repository", repository.handle,
+                          None if trans.batch else repository.to_struct())
         self.update_secondary_values(repository)
         if not trans.batch:
             self.update_backlinks(repository)
@@ -907,20 +1539,27 @@ class DBAPI(DbGeneric):
         """
         old_note = None
         note.change = int(change_time or time.time())
-        if note.handle in self.note_map:
+        if self._bulk_queue(note, trans,
+                            {"gid": note.gid}):
+            pass # written later, by _bulk_flush
+        elif note.handle in self.note_map:
             old_note = self.get_note_from_handle(note.handle).to_struct()
             self.dbapi.execute("""UPDATE note SET gid = ?,
                                                     json_data = ?
                                                 WHERE handle = ?;""",
                                [note.gid,
-                                json.dumps(note.to_struct(), sort_keys=True),
+                                self.codec.encode(note.to_struct()),
                                 note.handle])
         else:
             self.dbapi.execute(
                 """INSERT INTO note (handle, gid, json_data)
                                     VALUES(?, ?, ?);""",
-                [note.handle, note.gid, json.dumps(note.to_struct(), sort_keys=True)])
+                [note.handle, note.gid, self.codec.encode(note.to_struct())])
+            self._update_counter("note", 1)
+        self._cache_write("Note", note.handle,
+                          None if trans.batch else note.to_struct())
         self.update_secondary_values(note)
+        self.update_search(note)
         if not trans.batch:
             self.update_backlinks(note)
             db_op = TXNUPD if old_note else TXNADD
@@ -938,7 +1577,11 @@ class DBAPI(DbGeneric):
         """
         old_place = None
         place.change = int(change_time or time.time())
-        if place.handle in self.place_map:
+        if self._bulk_queue(place, trans,
+                            {"order_by": self._order_by_place_key(place),
+                             "gid": place.gid}):
+            pass # written later, by _bulk_flush
+        elif place.handle in self.place_map:
             old_place = self.get_place_from_handle(place.handle).to_struct()
             self.dbapi.execute("""UPDATE place SET gid = ?,
                                                    order_by = ?,
@@ -946,7 +1589,7 @@ class DBAPI(DbGeneric):
                                                 WHERE handle = ?;""",
                                [place.gid,
                                 self._order_by_place_key(place),
-                                json.dumps(place.to_struct(), sort_keys=True),
+                                self.codec.encode(place.to_struct()),
                                 place.handle])
         else:
             self.dbapi.execute(
@@ -955,8 +1598,12 @@ class DBAPI(DbGeneric):
                 [place.handle,
                  self._order_by_place_key(place),
                  place.gid,
-                 json.dumps(place.to_struct(), sort_keys=True)])
+                 self.codec.encode(place.to_struct())])
+            self._update_counter("place", 1)
+        self._cache_write("Place", place.handle,
+                          None if trans.batch else place.to_struct())
         self.update_secondary_values(place)
+        self.update_search(place)
         if not trans.batch:
             self.update_backlinks(place)
             db_op = TXNUPD if old_place else TXNADD
@@ -983,13 +1630,16 @@ class DBAPI(DbGeneric):
         """
         old_event = None
         event.change = int(change_time or time.time())
-        if event.handle in self.event_map:
+        if self._bulk_queue(event, trans,
+                            {"gid": event.gid}):
+            pass # written later, by _bulk_flush
+        elif event.handle in self.event_map:
             old_event = self.get_event_from_handle(event.handle).to_struct()
             self.dbapi.execute("""UPDATE event SET gid = ?,
                                                     json_data = ?
                                                 WHERE handle = ?;""",
                                [event.gid,
-                                json.dumps(event.to_struct(), sort_keys=True),
+                                self.codec.encode(event.to_struct()),
                                 event.handle])
         else:
             self.dbapi.execute(
@@ -997,10 +1647,15 @@ class DBAPI(DbGeneric):
                                      VALUES(?, ?, ?);""",
                 [event.handle,
                  event.gid,
-                 json.dumps(event.to_struct(), sort_keys=True)])
+                 self.codec.encode(event.to_struct())])
+            self._update_counter("event", 1)
+        self._cache_write("Event", event.handle,
+                          None if trans.batch else event.to_struct())
         self.update_secondary_values(event)
         if not trans.batch:
             self.update_backlinks(event)
+        self._update_summaries_of("Event", event.handle, trans)
+        if not trans.batch:
             db_op = TXNUPD if old_event else TXNADD
             trans.add(EVENT_KEY, db_op, event.handle,
                       old_event,
@@ -1024,12 +1679,15 @@ class DBAPI(DbGeneric):
         """
         old_tag = None
         tag.change = int(change_time or time.time())
-        if tag.handle in self.tag_map:
+        if self._bulk_queue(tag, trans,
+                            {"order_by": self._order_by_tag_key(tag.name)}):
+            pass # written later, by _bulk_flush
+        elif tag.handle in self.tag_map:
             old_tag = self.get_tag_from_handle(tag.handle).to_struct()
             self.dbapi.execute("""UPDATE tag SET json_data = ?,
                                                  order_by = ?
                                          WHERE handle = ?;""",
-                               [json.dumps(tag.to_struct(), sort_keys=True),
+                               [self.codec.encode(tag.to_struct()),
                                 self._order_by_tag_key(tag.name),
                                 tag.handle])
         else:
@@ -1037,7 +1695,10 @@ class DBAPI(DbGeneric):
                                                   VALUES(?, ?, ?);""",
                                [tag.handle,
                                 self._order_by_tag_key(tag.name),
-                                json.dumps(tag.to_struct(), sort_keys=True)])
+                                self.codec.encode(tag.to_struct())])
+            self._update_counter("tag", 1)
+        self._cache_write("Tag", tag.handle,
+                          None if trans.batch else tag.to_struct())
         self.update_secondary_values(tag)
         if not trans.batch:
             self.update_backlinks(tag)
@@ -1053,7 +1714,11 @@ class DBAPI(DbGeneric):
         """
         old_media = None
         media.change = int(change_time or time.time())
-        if media.handle in self.media_map:
+        if self._bulk_queue(media, trans,
+                            {"order_by": self._order_by_media_key(media),
+                             "gid": media.gid}):
+            pass # written later, by _bulk_flush
+        elif media.handle in self.media_map:
             old_media = self.get_media_from_handle(media.handle).to_struct()
             self.dbapi.execute("""UPDATE media SET gid = ?,
                                                    order_by = ?,
@@ -1061,7 +1726,7 @@ class DBAPI(DbGeneric):
                                                 WHERE handle = ?;""",
                                [media.gid,
                                 self._order_by_media_key(media),
-                                json.dumps(media.to_struct(), sort_keys=True),
+                                self.codec.encode(media.to_struct()),
                                 media.handle])
         else:
             self.dbapi.execute(
@@ -1070,7 +1735,10 @@ class DBAPI(DbGeneric):
                 [media.handle,
                  self._order_by_media_key(media),
                  media.gid,
-                 json.dumps(media.to_struct(), sort_keys=True)])
+                 self.codec.encode(media.to_struct())])
+            self._update_counter("media", 1)
+        self._cache_write("Media", media.handle,
+                          None if trans.batch else media.to_struct())
         self.update_secondary_values(media)
         if not trans.batch:
             self.update_backlinks(media)
@@ -1087,6 +1755,7 @@ class DBAPI(DbGeneric):
         """
         Removes all references to this object, and updates backlinks.
         """
+        self._bulk_flush()
         # First remove backlinks to this obj:
         self.dbapi.execute("SELECT obj_class, obj_handle FROM " +
                            "reference WHERE ref_handle = ?;", [obj_handle])
@@ -1120,6 +1789,7 @@ class DBAPI(DbGeneric):
         # This function is followed by a commit.
 
     def _do_remove(self, handle, transaction, data_map, data_id_map, key):
+        self._bulk_flush()
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
         key2table = {
@@ -1142,6 +1812,16 @@ class DBAPI(DbGeneric):
             self.dbapi.execute(
                 "DELETE FROM %s WHERE handle = ?;" % key2table[key],
                 [handle])
+            self._update_counter(key2table[key], -1)
+            if self._has_search(data["_class"]):
+                self.dbapi.execute("DELETE FROM search WHERE handle = ?;",
+                                   [handle])
+            self._cache_write(data["_class"], handle)
+            if data["_class"] == "Person":
+                self.remove_from_surname_list(Person.from_struct(data))
+            if data["_class"] in ["Person", "Event", "Family"]:
+                self._update_summaries_of(data["_class"], handle,
+                                          transaction)
             if not transaction.batch:
                 transaction.add(key, TXNDEL, handle, data, None)
 
@@ -1162,6 +1842,7 @@ class DBAPI(DbGeneric):
 
             result_list = list(find_backlink_handles(handle))
         """
+        self._bulk_flush()
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
         self.dbapi.execute(
@@ -1176,6 +1857,7 @@ class DBAPI(DbGeneric):
         """
         Returns first person in the database
         """
+        self._bulk_flush()
         handle = self.get_default_handle()
         person = None
         if handle:
@@ -1192,14 +1874,13 @@ class DBAPI(DbGeneric):
         This method is for those iter_items with a order_by, but
         can't be done with secondary fields.
         """
+        self._bulk_flush()
         # first build sort order:
         sorted_items = []
         query = "SELECT json_data FROM %s;" % class_.__name__.lower()
-        self.dbapi.execute(query)
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        for row in self.dbapi.iter_rows(query):
             obj = self.get_table_func(class_.__name__,
-                                      "class_func").create(json.loads(row[0])) # no need for db
+                                      "class_func").create(self.codec.decode(row[0])) # no need for db
             # just use values and handle to keep small:
             sorted_items.append((eval_order_by(order_by, obj, self),
                                  obj.handle))
@@ -1207,7 +1888,8 @@ class DBAPI(DbGeneric):
         pos = len(order_by) - 1
         for (field, order) in reversed(order_by): # sort the lasts parts first
             try:
-                sorted_items.sort(key=itemgetter(pos), reverse=(order == "DESC"))
+                sorted_items.sort(key=lambda item: item[0][pos],
+                                  reverse=(order == "DESC"))
             except:
                 pass # might not be able to sort if a None in set
             pos -= 1
@@ -1215,53 +1897,68 @@ class DBAPI(DbGeneric):
         for (order_by_values, handle) in sorted_items:
             yield self.get_table_func(class_.__name__, "handle_func")(handle)
 
+    def _get_json_data_query(self, table, order_by):
+        """
+        Return the query of the json_data of table, ordered by
+        order_by, or None if the order_by fields aren't secondary
+        fields, and need Python sorts.
+        """
+        if not order_by:
+            return "SELECT json_data FROM %s;" % table.lower()
+        secondary_fields = ([self._hash_name(table, field)
+                             for (field, ptype)
+                             in self.get_secondary_fields(table)]
+                            + ["handle"])
+        if not self._check_order_by_fields(table, order_by,
+                                           secondary_fields):
+            return None
+        return "SELECT json_data FROM %s %s;" % (
+            table.lower(),
+            self._build_order_clause(table, order_by, secondary_fields))
+
     def iter_items(self, order_by, class_):
         """
         Iterate over items in a class, possibly ordered by
         a list of field names and direction ("ASC" or "DESC").
         """
-        # check if order_by fields are secondary
-        # if so, fine
-        # else, use Python sorts
-        if order_by:
-            secondary_fields = class_.get_secondary_fields()
-            if not self._check_order_by_fields(class_.__name__,
-                                               order_by, secondary_fields):
-                for item in self.iter_items_order_by_python(order_by, class_):
-                    yield item
-                return
-        ## Continue with dbapi select
-        if order_by is None:
-            query = "SELECT json_data FROM %s;" % class_.__name__.lower()
-        else:
-            order_phrases = [
-                "%s %s" % (self._hash_name(class_.__name__,
-                                           class_.get_field_alias(field)),
-                           direction)
-                for (field, direction) in order_by]
-            query = "SELECT json_data FROM %s ORDER BY %s;" % (
-                class_.__name__.lower(), ", ".join(order_phrases))
-        self.dbapi.execute(query)
-        rows = self.dbapi.fetchall()
-        for row in rows:
-            yield class_.create(json.loads(row[0]), self)
+        self._bulk_flush()
+        query = self._get_json_data_query(class_.__name__, order_by)
+        if query is None:
+            for item in self.iter_items_order_by_python(order_by, class_):
+                yield item
+            return
+        for row in self.dbapi.iter_rows(query):
+            yield class_.create(self.codec.decode(row[0]), self)
+
+    def iter_raw_json(self, table, order_by=None):
+        """
+        Return an iterator over the objects of table as JSON text with
+        sorted keys (see DbReadBase.iter_raw_json). With the json codec,
+        that is the json_data column itself.
+        """
+        self._bulk_flush()
+        query = self._get_json_data_query(table, order_by)
+        if query is None:
+            yield from super().iter_raw_json(table, order_by)
+            return
+        to_json = self.codec.to_json
+        for row in self.dbapi.iter_rows(query):
+            yield to_json(row[0])
 
     def iter_person_handles(self):
         """
         Return an iterator over handles for Persons in the database
         """
-        self.dbapi.execute("SELECT handle FROM person;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM person;"):
             yield row[0]
 
     def iter_family_handles(self):
         """
         Return an iterator over handles for Families in the database
         """
-        self.dbapi.execute("SELECT handle FROM family;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM family;"):
             yield row[0]
 
     def iter_citation_handles(self):
@@ -1269,124 +1966,167 @@ class DBAPI(DbGeneric):
         Return an iterator over database handles, one handle for each Citation
         in the database.
         """
-        self.dbapi.execute("SELECT handle FROM citation;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM citation;"):
             yield row[0]
 
     def iter_event_handles(self):
         """
         Return an iterator over handles for Events in the database
         """
-        self.dbapi.execute("SELECT handle FROM event;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM event;"):
             yield row[0]
 
     def iter_media_handles(self):
         """
         Return an iterator over handles for Media in the database
         """
-        self.dbapi.execute("SELECT handle FROM media;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM media;"):
             yield row[0]
 
     def iter_note_handles(self):
         """
         Return an iterator over handles for Notes in the database
         """
-        self.dbapi.execute("SELECT handle FROM note;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM note;"):
             yield row[0]
 
     def iter_place_handles(self):
         """
         Return an iterator over handles for Places in the database
         """
-        self.dbapi.execute("SELECT handle FROM place;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM place;"):
             yield row[0]
 
     def iter_repository_handles(self):
         """
         Return an iterator over handles for Repositories in the database
         """
-        self.dbapi.execute("SELECT handle FROM repository;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM repository;"):
             yield row[0]
 
     def iter_source_handles(self):
         """
         Return an iterator over handles for Sources in the database
         """
-        self.dbapi.execute("SELECT handle FROM source;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM source;"):
             yield row[0]
 
     def iter_tag_handles(self):
         """
         Return an iterator over handles for Tags in the database
         """
-        self.dbapi.execute("SELECT handle FROM tag;")
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        self._bulk_flush()
+        for row in self.dbapi.iter_rows("SELECT handle FROM tag;"):
             yield row[0]
 
-    def reindex_reference_map(self, callback):
+    def reindex_reference_map(self, callback, processes=None):
         """
         Reindex all primary records in the database.
+
+        The primary tables are read in chunks of REINDEX_CHUNK rows, the
+        references are taken from the stored JSON without creating
+        objects, and each chunk is written with one executemany.
+
+        callback - called with the percentage done
+        processes - number of worker processes to decode the JSON; the
+                    default is the "reindex-processes" feature, or none
         """
-        callback(4)
+        self._bulk_flush()
+        if processes is None:
+            processes = self.get_feature("reindex-processes") or 0
+        callback(0)
         self.dbapi.execute("DELETE FROM reference;")
-        primary_table = (
-            (self.get_person_cursor, Person),
-            (self.get_family_cursor, Family),
-            (self.get_event_cursor, Event),
-            (self.get_place_cursor, Place),
-            (self.get_source_cursor, Source),
-            (self.get_citation_cursor, Citation),
-            (self.get_media_cursor, Media),
-            (self.get_repository_cursor, Repository),
-            (self.get_note_cursor, Note),
-            (self.get_tag_cursor, Tag),
-        )
-        # Now we use the functions and classes defined above
-        # to loop through each of the primary object tables.
-        for cursor_func, class_func in primary_table:
-            logging.info("Rebuilding %s reference map", class_func.__name__)
-            with cursor_func() as cursor:
-                for found_handle, val in cursor:
-                    obj = class_func.create(val) # no need for db
-                    references = set(obj.get_referenced_handles_recursively())
-                    # handle addition of new references
-                    for (ref_class_name, ref_handle) in references:
-                        self.dbapi.execute(
-                            """INSERT INTO reference (obj_handle, obj_class,
-                                                      ref_handle, ref_class)
-                                                     VALUES(?, ?, ?, ?);""",
-                            [obj.handle,
-                             obj.__class__.__name__,
-                             ref_handle,
-                             ref_class_name])
-        callback(5)
+        primary_tables = [Person, Family, Event, Place, Source, Citation,
+                          Media, Repository, Note, Tag]
+        total = sum(self.get_table_func(class_.__name__, "count_func")()
+                    for class_ in primary_tables)
+        done = 0
+        pool = multiprocessing.Pool(processes) if processes > 1 else None
+        pending = deque()
+        try:
+            for class_ in primary_tables:
+                LOG.info("Rebuilding %s reference map", class_.__name__)
+                for rows in self._iter_table_chunks(class_.__name__.lower()):
+                    if pool:
+                        pending.append(
+                            (len(rows),
+                             pool.apply_async(_get_rows_references,
+                                              (class_.__name__, rows,
+                                               self.codec.name))))
+                        if len(pending) < processes * 2:
+                            continue
+                        count, result = pending.popleft()
+                        references = result.get()
+                    else:
+                        count = len(rows)
+                        references = _get_rows_references(
+                            class_.__name__, rows, self.codec.name)
+                    self._insert_references(references)
+                    done += count
+                    callback(100 * done // total)
+            while pending:
+                count, result = pending.popleft()
+                self._insert_references(result.get())
+                done += count
+                callback(100 * done // total)
+        finally:
+            if pool:
+                pool.terminate()
+        callback(100)
+
+    def _iter_table_chunks(self, table_name):
+        """
+        Iterate over a primary table in chunks of (handle, json_data) rows,
+        ordered by handle. Each chunk is a separate query, so the
+        connection may be used between chunks.
+        """
+        last_handle = ""
+        while True:
+            self.dbapi.execute(
+                "SELECT handle, json_data FROM %s WHERE handle > ? "
+                "ORDER BY handle LIMIT ?;" % table_name,
+                [last_handle, self.REINDEX_CHUNK])
+            rows = self.dbapi.fetchall()
+            if not rows:
+                return
+            last_handle = rows[-1][0]
+            yield rows
+
+    def _insert_references(self, references):
+        """
+        Write (obj_handle, obj_class, ref_handle, ref_class) rows to the
+        reference table.
+        """
+        if references:
+            self.dbapi.executemany(
+                """INSERT INTO reference (obj_handle, obj_class,
+                                          ref_handle, ref_class)
+                                         VALUES(?, ?, ?, ?);""",
+                references)
 
     def rebuild_secondary(self, update):
         """
         Rebuild secondary indices
         """
+        self._bulk_flush()
         # First, expand json to individual fields:
         self.rebuild_secondary_fields()
+        self.rebuild_search()
+        self.build_surname_list()
+        self.rebuild_person_summaries()
         # Rebuild all order_by fields:
         ## Rebuild place order_by:
         self.dbapi.execute("""select json_data from place;""")
         row = self.dbapi.fetchone()
         while row:
-            place = Place.create(json.loads(row[0])) # no need for db
+            place = Place.create(self.codec.decode(row[0])) # no need for db
             order_by = self._order_by_place_key(place)
             cur2 = self.dbapi.execute(
                 """UPDATE place SET order_by = ? WHERE handle = ?;""",
@@ -1396,7 +2136,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("""select json_data from person;""")
         row = self.dbapi.fetchone()
         while row:
-            person = Person.create(json.loads(row[0])) # no need for db
+            person = Person.create(self.codec.decode(row[0])) # no need for db
             order_by = self._order_by_person_key(person)
             cur2 = self.dbapi.execute(
                 """UPDATE person SET order_by = ? WHERE handle = ?;""",
@@ -1406,7 +2146,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("""select json_data from citation;""")
         row = self.dbapi.fetchone()
         while row:
-            citation = Citation.create(json.loads(row[0])) # no need for db
+            citation = Citation.create(self.codec.decode(row[0])) # no need for db
             order_by = self._order_by_citation_key(citation)
             cur2 = self.dbapi.execute(
                 """UPDATE citation SET order_by = ? WHERE handle = ?;""",
@@ -1416,7 +2156,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("""select json_data from source;""")
         row = self.dbapi.fetchone()
         while row:
-            source = Source.create(json.loads(row[0])) # no need for db
+            source = Source.create(self.codec.decode(row[0])) # no need for db
             order_by = self._order_by_source_key(source)
             cur2 = self.dbapi.execute(
                 """UPDATE source SET order_by = ? WHERE handle = ?;""",
@@ -1426,7 +2166,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("""select json_data from tag;""")
         row = self.dbapi.fetchone()
         while row:
-            tag = Tag.create(json.loads(row[0])) # no need for db
+            tag = Tag.create(self.codec.decode(row[0])) # no need for db
             order_by = self._order_by_tag_key(tag.name)
             cur2 = self.dbapi.execute(
                 """UPDATE tag SET order_by = ? WHERE handle = ?;""",
@@ -1436,7 +2176,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("""select json_data from media;""")
         row = self.dbapi.fetchone()
         while row:
-            media = Media.create(json.loads(row[0])) # no need for db
+            media = Media.create(self.codec.decode(row[0])) # no need for db
             order_by = self._order_by_media_key(media)
             cur2 = self.dbapi.execute(
                 """UPDATE media SET order_by = ? WHERE handle = ?;""",
@@ -1446,323 +2186,484 @@ class DBAPI(DbGeneric):
     def has_handle_for_person(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Person", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM person WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_family(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Family", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM family WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_source(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Source", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM source WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_citation(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Citation", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM citation WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_event(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Event", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM event WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_media(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Media", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM media WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_place(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Place", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM place WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_repository(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Repository", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM repository WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_note(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Note", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM note WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_handle_for_tag(self, key):
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        if self._get_bulk_data("Tag", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM tag WHERE handle = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_person(self, key):
+        if self._get_bulk_from_id_data("Person", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM person WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_family(self, key):
+        if self._get_bulk_from_id_data("Family", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM family WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_source(self, key):
+        if self._get_bulk_from_id_data("Source", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM source WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_citation(self, key):
+        if self._get_bulk_from_id_data("Citation", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM citation WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_event(self, key):
+        if self._get_bulk_from_id_data("Event", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM event WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_media(self, key):
+        if self._get_bulk_from_id_data("Media", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM media WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_place(self, key):
+        if self._get_bulk_from_id_data("Place", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM place WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_repository(self, key):
+        if self._get_bulk_from_id_data("Repository", key) is not None:
+            return True
         self.dbapi.execute(
             "SELECT 1 FROM repository WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def has_gid_for_note(self, key):
+        if self._get_bulk_from_id_data("Note", key) is not None:
+            return True
         self.dbapi.execute("SELECT 1 FROM note WHERE gid = ?", [key])
         return self.dbapi.fetchone() != None
 
     def get_person_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM person;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_family_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM family;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_source_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM source;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_citation_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM citation;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_event_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM event;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_media_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM media;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_place_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gramps FROM place;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_repository_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM repository;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
     def get_note_gids(self):
+        self._bulk_flush()
         self.dbapi.execute("SELECT gid FROM note;")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
-    def _get_raw_person_data(self, key):
+    def _get_raw_data(self, table, key):
+        """
+        Return the struct of the row of table with handle key, or None,
+        from the queued rows, the cache, or the database.
+        """
         if isinstance(key, bytes):
             key = str(key, "utf-8")
+        data = self._get_bulk_data(table, key)
+        if data is not None:
+            return data
+        data = self._cache_get(table, key)
+        if data is not None:
+            return data
         self.dbapi.execute(
-            "SELECT json_data FROM person WHERE handle = ?", [key])
+            "SELECT json_data FROM %s WHERE handle = ?" % table.lower(),
+            [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            data = self.codec.decode(row[0])
+            self._cache_put(table, key, data)
+            return data
+
+    def get_raw_data_from_handles(self, table, handles):
+        """
+        Return a list of the raw data of the objects of table with the
+        passed handles, in the same order, with None for those that do
+        not exist. Those not queued or cached are read with one query
+        per FETCH_SIZE handles.
+        """
+        handles = [str(handle, "utf-8") if isinstance(handle, bytes)
+                   else handle for handle in handles]
+        found = {}
+        fetch = []
+        pending = self._bulk_rows.get(table)
+        for handle in handles:
+            if not handle or handle in found:
+                continue
+            if pending and handle in pending:
+                found[handle] = pending[handle][1]
+                continue
+            found[handle] = self._cache_get(table, handle)
+            if found[handle] is None:
+                fetch.append(handle)
+        query = "SELECT handle, json_data FROM %s WHERE handle IN (%%s)" % (
+            table.lower())
+        for (handle, json_data) in self._iter_handle_rows(query, fetch):
+            data = self.codec.decode(json_data)
+            self._cache_put(table, handle, data)
+            found[handle] = data
+        return [found.get(handle) for handle in handles]
+
+    def _iter_handle_rows(self, query, handles):
+        """
+        Iterate over the rows of query, whose "IN (%s)" is filled in with
+        the handles, FETCH_SIZE at a time.
+        """
+        for start in range(0, len(handles), self.FETCH_SIZE):
+            chunk = handles[start:start + self.FETCH_SIZE]
+            # Padded to a power of two, so there are few statements:
+            size = 1
+            while size < len(chunk):
+                size *= 2
+            chunk += chunk[-1:] * (size - len(chunk))
+            self.dbapi.execute(query % ", ".join(["?"] * size), chunk)
+            yield from self.dbapi.fetchall()
+
+    def _get_raw_person_data(self, key):
+        return self._get_raw_data("Person", key)
 
     def _get_raw_person_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Person", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM person WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_family_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM family WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Family", key)
 
     def _get_raw_family_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Family", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM family WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_source_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM source WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Source", key)
 
     def _get_raw_source_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Source", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM source WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_citation_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM citation WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Citation", key)
 
     def _get_raw_citation_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Citation", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM citation WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_event_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM event WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Event", key)
 
     def _get_raw_event_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Event", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM event WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_media_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM media WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Media", key)
 
     def _get_raw_media_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Media", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM media WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_place_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM place WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Place", key)
 
     def _get_raw_place_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Place", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM place WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_repository_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM repository WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Repository", key)
 
     def _get_raw_repository_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Repository", key)
+        if data is not None:
+            return data
         if isinstance(key, bytes):
             key = str(key, "utf-8")
         self.dbapi.execute(
             "SELECT json_data FROM repository WHERE handle = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_note_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute(
-            "SELECT json_data FROM note WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Note", key)
 
     def _get_raw_note_from_id_data(self, key):
+        data = self._get_bulk_from_id_data("Note", key)
+        if data is not None:
+            return data
         self.dbapi.execute(
             "SELECT json_data FROM note WHERE gid = ?", [key])
         row = self.dbapi.fetchone()
         if row:
-            return json.loads(row[0])
+            return self.codec.decode(row[0])
 
     def _get_raw_tag_data(self, key):
-        if isinstance(key, bytes):
-            key = str(key, "utf-8")
-        self.dbapi.execute("SELECT json_data FROM tag WHERE handle = ?", [key])
-        row = self.dbapi.fetchone()
-        if row:
-            return json.loads(row[0])
+        return self._get_raw_data("Tag", key)
 
     def get_surname_list(self):
         """
         Return the list of locale-sorted surnames contained in the database.
         """
-        self.dbapi.execute(
-            """SELECT DISTINCT surname FROM person ORDER BY surname;""")
-        surname_list = []
-        for row in self.dbapi.fetchall():
-            surname_list.append(row[0])
-        return surname_list
+        return [surname for (surname, count) in self.get_surname_counts()]
+
+    def get_surname_counts(self, prefix="", after=None, count=None):
+        """
+        Return a sorted list of (surname, number of people) of the
+        primary surnames of the people: those that start with prefix,
+        whatever the case, and sort after after, if given, at most count
+        of them.
+
+        Read from the surname table, in the order of its index.
+        """
+        self._bulk_flush()
+        self._write_surnames()
+        query = "SELECT surname, count FROM surname"
+        conditions = []
+        args = []
+        if prefix:
+            # Whatever the case, like the other completions; a range
+            # would depend on the case, and on the collation:
+            conditions.append("LOWER(surname) LIKE LOWER(?) ESCAPE '\\'")
+            args.append(prefix.replace("\\", "\\\\").replace(
+                "%", "\\%").replace("_", "\\_") + "%")
+        if after is not None:
+            conditions.append("surname > ?")
+            args.append(after)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY surname"
+        if count is not None:
+            query += " LIMIT %d" % count
+        self.dbapi.execute(query + ";", args)
+        return [tuple(row) for row in self.dbapi.fetchall()]
+
+    def add_to_surname_list(self, person, batch_transaction):
+        """
+        Count the person in the surname table.
+        """
+        self._update_surname(self.get_person_data(person)[1], 1)
+
+    def remove_from_surname_list(self, person):
+        """
+        No longer count the person in the surname table; the surname is
+        removed when no one has it.
+        """
+        self._update_surname(self.get_person_data(person)[1], -1)
+
+    def _update_surname(self, surname, delta):
+        """
+        Add delta to the number of people with the surname: when the
+        open transaction is committed, or the table is read.
+        """
+        self._surname_deltas[surname] = (
+            self._surname_deltas.get(surname, 0) + delta)
+        if self.transaction is None:
+            self._write_surnames()
+
+    def _write_surnames(self):
+        """
+        Write the changes to the numbers of people by surname.
+        Does not commit.
+
+        The counts are changed in place, rather than read and written,
+        so that other connections writing the same surnames don't lose
+        each other's changes.
+        """
+        for (surname, delta) in self._surname_deltas.items():
+            if not delta:
+                continue
+            self.dbapi.execute(
+                "UPDATE surname SET count = count + ? WHERE surname = ?;",
+                [delta, surname])
+            self.dbapi.execute(
+                "INSERT INTO surname (surname, count) SELECT ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM surname WHERE surname = ?);",
+                [surname, delta, surname])
+            if delta < 0:
+                self.dbapi.execute(
+                    "DELETE FROM surname WHERE surname = ? AND count <= 0;",
+                    [surname])
+        self._surname_deltas.clear()
 
     def save_surname_list(self):
         """
         Save the surname_list into persistant storage.
         """
-        # Nothing for DB-API to do; saves in person table
+        # Nothing for DB-API to do; kept in the surname table
         pass
 
     def build_surname_list(self):
         """
-        Rebuild the surname_list.
+        Rebuild the surname table from the people. Does not commit.
         """
-        # Nothing for DB-API to do; saves in person table
-        pass
+        LOG.info("Rebuilding surnames...")
+        self._bulk_flush()
+        self._surname_deltas.clear()
+        self.dbapi.execute("DELETE FROM surname;")
+        self.dbapi.execute(
+            "INSERT INTO surname (surname, count) "
+            "SELECT COALESCE(surname, ''), count(1) FROM person "
+            "GROUP BY COALESCE(surname, '');")
 
     def drop_tables(self):
         """
@@ -1784,6 +2685,12 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("""DROP TABLE  reference;""")
         self.dbapi.execute("""DROP TABLE  name_group;""")
         self.dbapi.execute("""DROP TABLE  metadata;""")
+        self.dbapi.execute("""DROP TABLE  counter;""")
+        self.dbapi.execute("""DROP TABLE  surname;""")
+        self.dbapi.execute("""DROP TABLE  person_summary;""")
+        self.dbapi.execute("""DROP TABLE  change_log;""")
+        self.dbapi.execute("""DROP TABLE  job;""")
+        self.cache.clear()
 
     def _sql_type(self, python_type):
         """
@@ -1817,8 +2724,7 @@ class DBAPI(DbGeneric):
             try:
                 fields = [self._hash_name(table, field)
                           for (field, ptype)
-                          in self.get_table_func(
-                              table, "class_func").get_secondary_fields()]
+                          in self.get_secondary_fields(table)]
                 if fields:
                     self.dbapi.execute("select %s from %s limit 1;"
                                        % (", ".join(fields), table_name))
@@ -1829,8 +2735,7 @@ class DBAPI(DbGeneric):
                 pass # got to add missing ones, so continue
             LOG.info("Table %s needs rebuilding...", table)
             altered = False
-            for field_pair in self.get_table_func(
-                    table, "class_func").get_secondary_fields():
+            for field_pair in self.get_secondary_fields(table):
                 field, python_type = field_pair
                 field = self._hash_name(table, field)
                 sql_type = self._sql_type(python_type)
@@ -1865,14 +2770,220 @@ class DBAPI(DbGeneric):
 
     def create_secondary_indexes_table(self, table):
         """
-        Create secondary indexes for just this table.
+        Create secondary indexes for just this table, if they don't
+        exist yet.
         """
         table_name = table.lower()
-        for field in self.get_table_func(
-                table, "class_func").get_index_fields():
-            field = self._hash_name(table, field)
+        secondary_fields = [self._hash_name(table, field)
+                            for (field, ptype)
+                            in self.get_secondary_fields(table)]
+        for field in self.get_index_fields(table):
+            column = self._hash_name(table, field)
+            if self.dbapi.index_exists("%s_%s" % (table, column)):
+                continue
+            if column in secondary_fields:
+                expr = column
+            elif self.has_json_sql():
+                expr = self._get_index_expr(table, field)
+            else:
+                continue
             self.dbapi.execute("CREATE INDEX %s_%s ON %s(%s);"
-                                   % (table, field, table_name, field))
+                                   % (table, column, table_name, expr))
+
+    def _get_index_expr(self, table, field):
+        """
+        Return the SQL expression to index a type field that is in the
+        json_data (not in a list), as compared in where clauses.
+        """
+        cls = self.get_table_func(table, "class_func")
+        (segments, ptype) = _get_json_path(cls, cls.get_field_alias(field))
+        return self.dbapi.json_extract("json_data", segments[0] + ["value"],
+                                       int)
+
+    def _get_secondary_extras(self):
+        """
+        Return the secondary fields and indexes added to this database.
+        """
+        if self._secondary_extras is None:
+            self._secondary_extras = {
+                "fields": self.get_metadata("secondary-fields", {}),
+                "indexes": self.get_metadata("secondary-indexes", {}),
+            }
+        return self._secondary_extras
+
+    def get_secondary_fields(self, table):
+        """
+        Return all secondary fields of table, and their types: those of
+        its class, and those added with add_secondary_index.
+        """
+        class_ = self.get_table_func(table, "class_func")
+        return class_.get_secondary_fields() + [
+            (field, COLUMN_TYPES[type_name])
+            for (field, type_name)
+            in self._get_secondary_extras()["fields"].get(table, [])]
+
+    def get_index_fields(self, table):
+        """
+        Return the full field names of the secondary indexes of table:
+        those of its class, and those added with add_secondary_index.
+        """
+        class_ = self.get_table_func(table, "class_func")
+        return (class_.get_index_fields() +
+                self._get_secondary_extras()["indexes"].get(table, []))
+
+    def is_indexed(self, table, column):
+        """
+        Return True if the column (hashed name) of table has an index.
+        """
+        return (column == "handle" or
+                self.dbapi.index_exists("%s_%s" % (table, column)) or
+                self.dbapi.index_exists("%s_%s" % (table.lower(), column)))
+
+    def add_secondary_index(self, table, field, column_type=None):
+        """
+        Index field of table. If column_type ("str", "int", "float", or
+        "bool") is given, the field is in the json_data, and is first
+        added as a secondary column of that type; otherwise, it is a
+        secondary column, or a type in the json_data.
+        """
+        field = self.get_table_func(table, "class_func").get_field_alias(field)
+        extras = self._get_secondary_extras()
+        if column_type is not None:
+            extras["fields"].setdefault(table, []).append([field,
+                                                           column_type])
+            self.set_metadata("secondary-fields", extras["fields"])
+            self._bulk_fields.pop(table, None)
+        if field not in self.get_index_fields(table):
+            extras["indexes"].setdefault(table, []).append(field)
+            self.set_metadata("secondary-indexes", extras["indexes"])
+        # Adds, and fills in, the new column:
+        self.rebuild_secondary_fields()
+        self.create_secondary_indexes_table(table)
+        self.dbapi.commit()
+
+    def get_query_stats(self):
+        """
+        Return the statistics of the fields used by selects, saved by
+        this and earlier sessions.
+        """
+        stats = QueryStats()
+        stats.update(self.get_metadata("query-stats", {}))
+        stats.update(self.query_stats.get_stats())
+        return stats.get_stats()
+
+    def save_query_stats(self):
+        """
+        Add the statistics of the selects of this session to those saved
+        in the database. If the "auto-index" feature is set to a number
+        of seconds, then first create the suggested indexes that would
+        have saved at least that much time.
+        """
+        if not self.query_stats.get_stats():
+            return
+        threshold = self.get_feature("auto-index")
+        if threshold is not None:
+            advisor = self.get_index_advisor()
+            for suggestion in advisor.get_suggestions():
+                if suggestion["kind"] and suggestion["savings"] >= threshold:
+                    LOG.info("Adding index on %s.%s",
+                             suggestion["table"], suggestion["field"])
+                    advisor.create(suggestion)
+        self.set_metadata("query-stats", self.get_query_stats())
+        self.dbapi.commit()
+        self.query_stats.clear()
+
+    def get_index_advisor(self):
+        """
+        Return an IndexAdvisor for this database.
+        """
+        return IndexAdvisor(self)
+
+    def has_json_sql(self):
+        """
+        Return True if selects and indexes can use the backend's JSON
+        functions on the json_data: the backend has them, and the codec
+        stores JSON text.
+        """
+        return hasattr(self.dbapi, "json_extract") and self.codec.sql_json
+
+    def set_codec(self, name, callback=None):
+        """
+        Store the json_data of all primary tables with the named codec
+        ("json", "binary", or "compressed"), and keep it as the codec of
+        the database, in one transaction.
+
+        The indexes on types in the json_data are dropped if the new
+        codec isn't JSON, and created again if it is.
+
+        callback - called with the percentage done
+        """
+        codec = get_codec(name)
+        if codec.name == self.codec.name:
+            return
+        old_codec = self.codec
+        # Backends that need a binary column type for bytes:
+        binary_column = (hasattr(self.dbapi, "set_binary_column") and
+                         (old_codec.binary or codec.binary))
+        primary_tables = [Person, Family, Event, Place, Source, Citation,
+                          Media, Repository, Note, Tag]
+        total = sum(self.get_table_func(class_.__name__, "count_func")()
+                    for class_ in primary_tables)
+        done = 0
+        if callback:
+            callback(0)
+        self.dbapi.begin()
+        try:
+            if not codec.sql_json:
+                self._drop_json_indexes()
+            for class_ in primary_tables:
+                table_name = class_.__name__.lower()
+                LOG.info("Encoding %s with the %s codec", class_.__name__,
+                         codec.name)
+                if binary_column and not old_codec.binary:
+                    self.dbapi.set_binary_column(table_name, "json_data",
+                                                 True)
+                for rows in self._iter_table_chunks(table_name):
+                    values = []
+                    for (handle, json_data) in rows:
+                        value = codec.encode(old_codec.decode(json_data))
+                        if binary_column and not codec.binary:
+                            value = value.encode("utf-8")
+                        values.append([value, handle])
+                    self.dbapi.executemany(
+                        "UPDATE %s SET json_data = ? WHERE handle = ?;" %
+                        table_name, values)
+                    done += len(rows)
+                    if callback:
+                        callback(100 * done // total)
+                if binary_column and not codec.binary:
+                    self.dbapi.set_binary_column(table_name, "json_data",
+                                                 False)
+            self.codec = codec
+            self.set_metadata("codec", codec.name)
+            self.create_secondary_indexes()
+        except:
+            self.dbapi.rollback()
+            self.codec = old_codec
+            raise
+        self.dbapi.commit()
+        if callback:
+            callback(100)
+
+    def _drop_json_indexes(self):
+        """
+        Drop the indexes on types in the json_data, which only a JSON
+        codec can have.
+        """
+        for table in self.get_table_func():
+            secondary_fields = [self._hash_name(table, field)
+                                for (field, ptype)
+                                in self.get_secondary_fields(table)]
+            for field in self.get_index_fields(table):
+                column = self._hash_name(table, field)
+                index_name = "%s_%s" % (table, column)
+                if (column not in secondary_fields and
+                        self.dbapi.index_exists(index_name)):
+                    self.dbapi.execute("DROP INDEX %s;" % index_name)
 
     def update_secondary_values_all(self):
         """
@@ -1894,6 +3005,165 @@ class DBAPI(DbGeneric):
         for item in self.get_table_func(table, "iter_func")():
             self.update_secondary_values(item)
 
+    def _has_search(self, table):
+        """
+        Return True if the objects of table are in the search table.
+        """
+        return (hasattr(self.dbapi, "search_query") and
+                bool(self.get_table_func(table,
+                                         "class_func").get_search_fields()))
+
+    def update_search(self, item):
+        """
+        Given a primary object update its row in the search table.
+        Does not commit.
+        """
+        table = item.__class__.__name__
+        if (not self._has_search(table) or
+                self._get_bulk_data(table, item.handle) is not None):
+            return
+        self.dbapi.execute("DELETE FROM search WHERE handle = ?;",
+                           [item.handle])
+        self.dbapi.execute(
+            "INSERT INTO search (handle, obj_class, text) VALUES (?, ?, ?);",
+            [item.handle, table, get_search_text(item)])
+
+    def rebuild_search(self):
+        """
+        Rebuild the search table from the objects.
+        """
+        if not hasattr(self.dbapi, "search_query"):
+            return
+        LOG.info("Rebuilding search table...")
+        self._bulk_flush()
+        self.dbapi.execute("DELETE FROM search;")
+        for table in self.get_table_func():
+            if not self._has_search(table):
+                continue
+            rows = []
+            for item in self.get_table_func(table, "iter_func")():
+                rows.append([item.handle, table, get_search_text(item)])
+                if len(rows) >= self.REINDEX_CHUNK:
+                    self.dbapi.executemany(
+                        "INSERT INTO search (handle, obj_class, text) "
+                        "VALUES (?, ?, ?);", rows)
+                    rows = []
+            if rows:
+                self.dbapi.executemany(
+                    "INSERT INTO search (handle, obj_class, text) "
+                    "VALUES (?, ?, ?);", rows)
+
+    def _search(self, table, text):
+        """
+        Return {handle: rank} of the objects of table with text in their
+        search fields, from the search table, if there is one.
+        """
+        if not self._has_search(table):
+            return super()._search(table, text)
+        words = get_search_words(text)
+        if not words:
+            return {}
+        self._bulk_flush()
+        (query, args) = self.dbapi.search_query(table, words)
+        self.dbapi.execute(query + ";", args)
+        return {handle: rank for (handle, rank) in self.dbapi.fetchall()}
+
+    def get_person_summaries(self, handles):
+        """
+        Return a list of the summaries of the people with the passed
+        handles (see DbReadBase.get_person_summaries), from the
+        person_summary table.
+        """
+        handles = [str(handle, "utf-8") if isinstance(handle, bytes)
+                   else handle for handle in handles]
+        if self._summaries_stale or self._bulk_rows.get("Person"):
+            # Not yet in the table:
+            return super().get_person_summaries(handles)
+        query = ("SELECT %s FROM person_summary WHERE handle IN (%%s)" %
+                 ", ".join(PERSON_SUMMARY_COLUMNS))
+        found = {}
+        for row in self._iter_handle_rows(query, list(set(filter(None,
+                                                                 handles)))):
+            summary = dict(zip(PERSON_SUMMARY_COLUMNS, row))
+            summary["primary_name"] = Name.from_struct(
+                json.loads(summary["primary_name"]))
+            for key in ["birth_date", "death_date"]:
+                if summary[key] is not None:
+                    summary[key] = Date.from_struct(json.loads(summary[key]))
+            found[summary["handle"]] = summary
+        return [found.get(handle) for handle in handles]
+
+    def _update_summaries_of(self, class_name, handle, trans):
+        """
+        Update the rows of the person_summary table that the committed
+        or removed Person, Event or Family with the handle is in: that
+        of the person, or those of the people that refer to the event or
+        family. In a batch transaction, the table is rebuilt when it is
+        committed. Does not commit.
+        """
+        if trans.batch and trans is self.transaction:
+            self._summaries_stale = True
+        elif class_name == "Person":
+            self.update_person_summaries([handle])
+        else:
+            self.dbapi.execute(
+                "SELECT obj_handle FROM reference "
+                "WHERE ref_handle = ? AND obj_class = 'Person';",
+                [handle])
+            self.update_person_summaries([row[0] for row
+                                          in self.dbapi.fetchall()])
+
+    def update_person_summaries(self, handles):
+        """
+        Update the rows of the people with the handles in the
+        person_summary table. Does not commit.
+        """
+        handles = list(set(handles))
+        if not handles:
+            return
+        self.dbapi.executemany(
+            "DELETE FROM person_summary WHERE handle = ?;",
+            [[handle] for handle in handles])
+        self._insert_person_summaries(self._make_person_summaries(handles))
+
+    def rebuild_person_summaries(self):
+        """
+        Rebuild the person_summary table from the people, and their
+        events and families. Does not commit.
+        """
+        LOG.info("Rebuilding person summaries...")
+        self._bulk_flush()
+        self._summaries_stale = False
+        self.dbapi.execute("DELETE FROM person_summary;")
+        handles = list(self.iter_person_handles())
+        for start in range(0, len(handles), self.REINDEX_CHUNK):
+            self._insert_person_summaries(self._make_person_summaries(
+                handles[start:start + self.REINDEX_CHUNK]))
+
+    def _insert_person_summaries(self, summaries):
+        """
+        Write the summaries (see DbReadBase.get_person_summaries) to
+        the person_summary table; those that are None are skipped.
+        """
+        rows = []
+        for summary in summaries:
+            if summary is None:
+                continue
+            row = dict(summary)
+            row["primary_name"] = json.dumps(
+                summary["primary_name"].to_struct(), sort_keys=True)
+            for key in ["birth_date", "death_date"]:
+                if summary[key] is not None:
+                    row[key] = json.dumps(summary[key].to_struct(),
+                                          sort_keys=True)
+            rows.append([row[column] for column in PERSON_SUMMARY_COLUMNS])
+        if rows:
+            self.dbapi.executemany(
+                "INSERT INTO person_summary (%s) VALUES (%s);" % (
+                    ", ".join(PERSON_SUMMARY_COLUMNS),
+                    ", ".join(["?"] * len(PERSON_SUMMARY_COLUMNS))),
+                rows)
+
     def update_secondary_values(self, item):
         """
         Given a primary object update its secondary field values
@@ -1901,7 +3171,10 @@ class DBAPI(DbGeneric):
         Does not commit.
         """
         table = item.__class__.__name__
-        fields = self.get_table_func(table, "class_func").get_secondary_fields()
+        if self._get_bulk_data(table, item.handle) is not None:
+            # Queued rows already hold their secondary values
+            return
+        fields = self.get_secondary_fields(table)
         fields = [field for (field, direction) in fields]
         sets = []
         values = []
@@ -1924,65 +3197,205 @@ class DBAPI(DbGeneric):
         """
         return [v if not isinstance(v, bool) else int(v) for v in values]
 
-    def _sql_repr(self, value):
+    def _sql_value(self, value):
         """
-        Given a Python value, turn it into a SQL value.
+        Given a Python value, turn it into a SQL parameter value.
         """
         if value is True:
-            return "1"
+            return 1
         elif value is False:
-            return "0"
+            return 0
         elif value is None:
-            return '""'
-        elif isinstance(value, list):
-            return repr(tuple(value))
+            return ""
         else:
-            return repr(value)
+            return value
+
+    def _build_condition(self, expr, db_op, value, args):
+        """
+        expr - SQL expression
+        return - "(expr db_op ?)"
+        """
+        if db_op in ["IS NULL", "IS NOT NULL"]:
+            return "(%s %s)" % (expr, db_op)
+        elif db_op == "BETWEEN":
+            args.extend([self._sql_value(v) for v in value])
+            return "(%s BETWEEN ? AND ?)" % expr
+        elif isinstance(value, (list, tuple)):
+            args.extend([self._sql_value(v) for v in value])
+            return "(%s %s (%s))" % (expr, db_op,
+                                     ", ".join(["?"] * len(value)))
+        else:
+            args.append(self._sql_value(value))
+            return "(%s %s ?)" % (expr, db_op)
 
-    def _build_where_clause_recursive(self, table, where):
+    def _get_where_json_path(self, table, where):
+        """
+        Return the path in the json_data of the field of where, a
+        (field, op, value), if the backend can select on it; else None.
+        """
+        from gprime.lib.grampstype import GrampsType
+        if not self.has_json_sql():
+            return None
+        (field, db_op, value) = where
+        cls = self.get_table_func(table, "class_func")
+        json_path = _get_json_path(cls, cls.get_field_alias(field))
+        if json_path is None:
+            return None
+        (segments, ptype) = json_path
+        if isinstance(ptype, type) and issubclass(ptype, GrampsType):
+            # compared like GrampsType.__eq__:
+            if (db_op not in ["=", "==", "!=", "<>"] or
+                    isinstance(value, bool) or
+                    not isinstance(value, (int, str))):
+                return None
+        return json_path
+
+    def _build_json_condition(self, table, where, args):
+        """
+        where - (field, op, value), on a field in the json_data
+        return - the condition on the json_data
+
+        A field in a list (of items) matches if it matches in any item.
+        """
+        from gprime.lib.grampstype import GrampsType
+        (field, db_op, value) = where
+        (segments, ptype) = self._get_where_json_path(table, where)
+        expr = "json_data"
+        items = []
+        for segment in segments[:-1]:
+            alias = "item%s" % len(items)
+            items.append(self.dbapi.json_each(expr, segment, alias))
+            expr = "%s.value" % alias
+        path = segments[-1]
+        if isinstance(ptype, type) and issubclass(ptype, GrampsType):
+            leaf = self.dbapi.json_extract(expr, path + ["value"], int)
+            if isinstance(value, int):
+                args.append(value)
+                condition = "(%s = ?)" % leaf
+            else:
+                codes = [code for (code, string) in ptype._I2SMAP.items()
+                         if string == value and code != ptype._CUSTOM]
+                args.extend(codes + [ptype._CUSTOM, value])
+                condition = "((%s = ?) AND (%s = ?))" % (
+                    leaf, self.dbapi.json_extract(expr, path + ["string"], str))
+                if codes:
+                    condition = "((%s IN (%s)) OR %s)" % (
+                        leaf, ", ".join(["?"] * len(codes)), condition)
+            if db_op in ["!=", "<>"]:
+                condition = "(NOT %s)" % condition
+        else:
+            leaf = self.dbapi.json_extract(expr, path, ptype)
+            condition = self._build_condition(leaf, db_op, value, args)
+        # As in Python, a missing value is not equal to anything:
+        none_matches = db_op in ["!=", "<>"] and value is not None
+        if none_matches:
+            condition = "(%s OR %s IS NULL)" % (condition, leaf)
+        if items:
+            condition = "(EXISTS (SELECT 1 FROM %s WHERE %s))" % (
+                ", ".join(items), condition)
+            if none_matches:
+                condition = "(%s OR NOT EXISTS (SELECT 1 FROM %s))" % (
+                    condition, ", ".join(items))
+        return condition
+
+    def _build_where_clause_recursive(self, table, where, args,
+                                      secondary_fields):
         """
         where - (field, op, value)
                - ["NOT", where]
                - ["AND", (where, ...)]
                - ["OR", (where, ...)]
+        args - list, to which the values of the placeholders are added
+        secondary_fields - hashed; other fields are in the json_data
         """
         if where is None:
             return ""
         elif len(where) == 3:
             field, db_op, value = where
-            return "(%s %s %s)" % (self._hash_name(table, field),
-                                   db_op, self._sql_repr(value))
+            if self._hash_name(table, field) in secondary_fields:
+                return self._build_condition(self._hash_name(table, field),
+                                             db_op, value, args)
+            else:
+                return self._build_json_condition(table, where, args)
         elif where[0] in ["AND", "OR"]:
-            parts = [self._build_where_clause_recursive(table, part)
+            parts = [self._build_where_clause_recursive(table, part, args,
+                                                        secondary_fields)
                      for part in where[1]]
             return "(%s)" % ((" %s " % where[0]).join(parts))
         else:
-            return "(NOT %s)" % self._build_where_clause_recursive(table,
-                                                                   where[1])
+            return "(NOT %s)" % self._build_where_clause_recursive(
+                table, where[1], args, secondary_fields)
 
-    def _build_where_clause(self, table, where):
+    def _build_where_clause(self, table, where, args, secondary_fields):
         """
         where - a list in where format
+        args - list, to which the values of the placeholders are added
+        secondary_fields - hashed; other fields are in the json_data
         return - "WHERE conditions..."
         """
-        parts = self._build_where_clause_recursive(table, where)
+        parts = self._build_where_clause_recursive(table, where, args,
+                                                   secondary_fields)
         if parts:
             return "WHERE " + parts
         else:
             return ""
 
-    def _build_order_clause(self, table, order_by):
+    def _build_limit_clause(self, start, limit, args):
+        """
+        start - position to start
+        limit - count to get; -1 for all
+        args - list, to which the values of the placeholders are added
+        return - "LIMIT ? OFFSET ?"
+        """
+        if limit == -1:
+            if start:
+                args.append(start)
+                return "LIMIT -1 OFFSET ?"
+            return ""
+        elif start:
+            args.extend([limit, start])
+            return "LIMIT ? OFFSET ?"
+        else:
+            args.append(limit)
+            return "LIMIT ?"
+
+    def _build_order_clause(self, table, order_by, secondary_fields):
         """
         order_by - [(field, "ASC" | "DESC"), ...]
+        secondary_fields - hashed; other fields are in the json_data
         """
         if order_by:
-            order_clause = ", ".join(["%s %s" % (self._hash_name(table, field),
+            order_clause = ", ".join(["%s %s" % (self._get_order_expr(table,
+                                                                      field,
+                                                                      secondary_fields),
                                                  dir)
                                       for (field, dir) in order_by])
             return "ORDER BY " + order_clause
         else:
             return ""
 
+    def _get_order_expr(self, table, field, secondary_fields):
+        """
+        Return the SQL expression to order by field, or None if it
+        can't be ordered by in SQL.
+        """
+        from gprime.lib.grampstype import GrampsType
+        if self._hash_name(table, field) in secondary_fields:
+            return self._hash_name(table, field)
+        elif self.has_json_sql():
+            cls = self.get_table_func(table, "class_func")
+            json_path = _get_json_path(cls, cls.get_field_alias(field))
+            if json_path is None:
+                return None
+            (segments, ptype) = json_path
+            # Not a list of values, or types (that sort as objects):
+            if (len(segments) == 1 and
+                    not (isinstance(ptype, type) and
+                         issubclass(ptype, GrampsType))):
+                return self.dbapi.json_extract("json_data", segments[0],
+                                               ptype)
+        return None
+
     def _build_select_fields(self, table, select_fields, secondary_fields):
         """
         fields - [field, ...]
@@ -2005,7 +3418,8 @@ class DBAPI(DbGeneric):
         """
         if order_by:
             for (field, directory) in order_by:
-                if self._hash_name(table, field) not in secondary_fields:
+                if self._get_order_expr(table, field,
+                                        secondary_fields) is None:
                     return False
         return True
 
@@ -2032,10 +3446,11 @@ class DBAPI(DbGeneric):
         elif len(where) == 3: # (name, db_op, value)
             (name, db_op, value) = where
             # just the ones we need for where
-            return self._hash_name(table, name) in secondary_fields
+            return (self._hash_name(table, name) in secondary_fields or
+                    self._get_where_json_path(table, where) is not None)
 
     def _select(self, table, fields=None, start=0, limit=-1,
-                where=None, order_by=None):
+                where=None, order_by=None, search=None, with_total=False):
         """
         Default implementation of a select for those databases
         that don't support SQL. Returns a list of dicts, total,
@@ -2050,22 +3465,75 @@ class DBAPI(DbGeneric):
                  ["OR",  [where, where, ...]]      |
                  ["NOT",  where]
         order_by - [[fieldname, "ASC" | "DESC"], ...]
+        search - text to match in the search table; without an
+                 order_by, the best matches come first
+        with_total - if True, the first item is the number of rows
+                     without start and limit
+
+        The fields of the where and order_by, and the time taken to get
+        the rows, are added to the query_stats.
+        """
+        count_only = fields is not None and fields[0] == "count(1)"
+        generator = self._select_items(table, fields, start, limit,
+                                       where, order_by, search, with_total)
+        seconds = 0.0
+        rows = -1 if with_total else 0 # the total isn't a row
+        try:
+            while True:
+                begin = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    break
+                finally:
+                    seconds += time.perf_counter() - begin
+                if count_only and isinstance(item, int):
+                    rows = item
+                else:
+                    rows += 1
+                yield item
+        finally:
+            generator.close()
+            self.query_stats.record(table, where, order_by, seconds, rows)
+
+    def _get_sql_fields(self, table, where, order_by, search):
+        """
+        Return the secondary fields (hashed, with handle) of table if a
+        select with the where, order_by and search can be done in SQL,
+        else None.
         """
         secondary_fields = ([self._hash_name(table, field)
                              for (field, ptype)
-                             in self.get_table_func(
-                                 table, "class_func").get_secondary_fields()]
+                             in self.get_secondary_fields(table)]
                             + ["handle"])
                         # handle is a sql field, but not listed in secondaries
-        # If no fields, then we need objects:
-        # Check to see if where matches SQL fields:
-        table_name = table.lower()
         if ((not self._check_where_fields(table, where, secondary_fields))
                 or (not self._check_order_by_fields(table, order_by,
-                                                    secondary_fields))):
+                                                    secondary_fields))
+                or (search is not None and
+                    not (self._has_search(table) and
+                         get_search_words(search)))):
+            return None
+        return secondary_fields
+
+    def _select_items(self, table, fields, start, limit, where, order_by,
+                      search, with_total=False):
+        """
+        The select of _select, in SQL if the where and order_by fields
+        (and the search) allow it, else in Python.
+        """
+        self._bulk_flush()
+        # Check to see if where matches SQL fields:
+        secondary_fields = self._get_sql_fields(table, where, order_by,
+                                                search)
+        table_name = table.lower()
+        if secondary_fields is None:
             # If not, then need to do select via Python:
+            if with_total:
+                yield next(super()._select(table, ["count(1)"],
+                                           where=where, search=search))
             generator = super()._select(table, fields, start,
-                                        limit, where, order_by)
+                                        limit, where, order_by, search)
             for item in generator:
                 yield item
             return
@@ -2083,53 +3551,141 @@ class DBAPI(DbGeneric):
             fields = hashed_fields
             select_fields = self._build_select_fields(table, fields,
                                                       secondary_fields)
-        where_clause = self._build_where_clause(table, where)
-        order_clause = self._build_order_clause(table, order_by)
+        args = []
+        from_clause = table_name
+        if search is not None:
+            # The search_handle and search_rank of the matches:
+            (search_query, args) = self.dbapi.search_query(
+                table, get_search_words(search))
+            from_clause = "%s JOIN (%s) AS matches ON handle = search_handle" % (
+                table_name, search_query)
+        where_clause = self._build_where_clause(table, where, args,
+                                                secondary_fields)
+        if search is not None and not order_by:
+            order_clause = "ORDER BY search_rank, handle"
+        else:
+            order_clause = self._build_order_clause(table, order_by,
+                                                    secondary_fields)
+        limit_clause = self._build_limit_clause(start, limit, args)
         if get_count_only:
             select_fields = ["1"]
-        if start:
-            query = "SELECT %s FROM %s %s %s LIMIT %s, %s " % (
-                ", ".join(select_fields),
-                table_name, where_clause, order_clause, start, limit
-            )
-        else:
-            query = "SELECT %s FROM %s %s %s LIMIT %s" % (
-                ", ".join(select_fields),
-                table_name, where_clause, order_clause, limit
-            )
+        elif with_total:
+            select_fields = select_fields + ["COUNT(*) OVER ()"]
+        query = "SELECT %s FROM %s %s %s %s" % (
+            ", ".join(select_fields),
+            from_clause, where_clause, order_clause, limit_clause
+        )
         if get_count_only:
             self.dbapi.execute("SELECT count(1) from (%s) AS temp_select;"
-                               % query)
+                               % query, args)
             rows = self.dbapi.fetchall()
             yield rows[0][0]
             return
-        self.dbapi.execute(query)
-        rows = self.dbapi.fetchall()
-        for row in rows:
-            if fields[0] != "json_data":
-                obj = None # don't build it if you don't need it
-                data = {}
-                for field in fields:
-                    if field in select_fields:
-                        data[field.replace("__", ".")
-                            ] = row[select_fields.index(field)]
-                    else:
-                        if obj is None:  # we need it! create it and cache it:
-                            obj = self.get_table_func(table,
-                                                      "class_func").create( # no need for db
-                                                          json.loads(row[0]))
-                        # get the field, even if we need to do a join:
-                        # FIXME: possible optimize:
-                        #     do a join in select for this if needed:
-                        field = field.replace("__", ".")
-                        data[field] = obj.get_field(field, self,
-                                                    ignore_errors=True)
-                yield data
+        rows = self.dbapi.iter_rows(query, args)
+        if with_total:
+            # The last column of each row is the window count:
+            first = next(rows, None)
+            if first is not None:
+                yield first[-1]
+                rows = itertools.chain([first], rows)
+            elif start:
+                yield next(self._select_items(table, ["count(1)"], 0, -1,
+                                              where, None, search))
+            else:
+                yield 0
+        class_func = self.get_table_func(table, "class_func")
+        if fields[0] == "json_data":
+            for row in rows:
+                yield class_func.create(self.codec.decode(row[0]), self)
+            return
+        # [(name, position in the row), ...], and the names of the
+        # fields got from the objects:
+        columns = []
+        names = []
+        all_names = [field.replace("__", ".") for field in fields]
+        for (field, name) in zip(fields, all_names):
+            if field in select_fields:
+                columns.append((name, select_fields.index(field)))
             else:
-                obj = self.get_table_func(table,
-                                          "class_func").create(
-                                              json.loads(row[0]), self)
-                yield obj
+                names.append(name)
+        # PREFETCH_ROWS rows at a time, so that the objects of the joins
+        # of their fields are got together:
+        while True:
+            page = list(itertools.islice(rows, self.PREFETCH_ROWS))
+            if not page:
+                break
+            data = []
+            for row in page:
+                item = dict.fromkeys(all_names) # in the order of the fields
+                for (name, position) in columns:
+                    item[name] = row[position]
+                data.append(item)
+            if names:
+                # Lazy, as only a few fields are needed:
+                objs = [class_func.create(self.codec.decode(row[0]), self)
+                        for row in page]
+                for name in names:
+                    values = class_func.get_field_values(objs, name, self,
+                                                         True)
+                    for (item, value) in zip(data, values):
+                        item[name] = value
+            yield from data
+
+    def _count(self, table, where=None, search=None):
+        """
+        Return the number of rows of table that match where and search
+        (see _select), and whether it is an estimate, as (count,
+        estimated).
+
+        The number of all rows is kept in the counter table. The matches
+        in a table of more than ESTIMATE_ROWS rows are estimated from
+        about that many of its rows, if the backend can sample them
+        over the whole table; the first rows could all be older, or
+        newer, than the rest.
+        """
+        total = self.get_table_func(table, "count_func")()
+        if not where and search is None:
+            return (total, False)
+        secondary_fields = self._get_sql_fields(table, where, None, None)
+        if (total <= self.ESTIMATE_ROWS or search is not None or
+                secondary_fields is None or
+                not hasattr(self.dbapi, "sample_table")):
+            return super()._count(table, where, search)
+        args = []
+        condition = self._build_where_clause_recursive(table, where, args,
+                                                       secondary_fields)
+        (sample, sample_args) = self.dbapi.sample_table(
+            table.lower(), self.ESTIMATE_ROWS / total)
+        self.dbapi.execute("SELECT count(1), count(CASE WHEN %s THEN 1 END) "
+                           "FROM %s;" % (condition, sample),
+                           args + sample_args)
+        (sampled, matched) = self.dbapi.fetchone()
+        if not sampled:
+            return super()._count(table, where, search)
+        return (round(matched * total / sampled), True)
+
+    def _select_page(self, table, fields=None, start=0, limit=-1,
+                     where=None, order_by=None, search=None):
+        """
+        Return a page of a select (see _select) as a list, with the
+        number of rows the select has without start and limit, as
+        (rows, total, estimated).
+
+        Without a where or search, the total is the table's counter.
+        Otherwise, if the backend has window functions, the total is
+        counted by the query of the page, unless it is estimated (see
+        _count).
+        """
+        if (not where and search is None or
+                not getattr(self.dbapi, "window_functions", False) or
+                (self.get_table_func(table, "count_func")() >
+                 self.ESTIMATE_ROWS)):
+            return super()._select_page(table, fields, start, limit, where,
+                                        order_by, search)
+        generator = self._select(table, fields, start, limit, where,
+                                 order_by, search, with_total=True)
+        total = next(generator)
+        return (list(generator), total, False)
 
     def get_summary(self):
         """
@@ -2142,6 +3698,10 @@ class DBAPI(DbGeneric):
         """
         summary = super().get_summary()
         summary.update(self.dbapi.__class__.get_summary())
+        stats = self.dbapi.get_statement_stats()
+        summary["Statement cache hit rate"] = "%.1f%% (of %s)" % (
+            stats["hit_rate"] * 100, stats["hits"] + stats["misses"])
+        summary["Codec"] = self.codec.name
         return summary
 
     def update_user_data(self, username, data):
@@ -2165,7 +3725,7 @@ class DBAPI(DbGeneric):
                             data.get("language", old_data["language"]),
                             data.get("email", old_data["email"]),
                             username])
-        self.dbapi.commit()
+        self._commit_user(username)
 
     def add_user(self, username, password, permissions, data):
         """
@@ -2183,7 +3743,7 @@ class DBAPI(DbGeneric):
                             data.get("language", "en"),
                             data.get("email", ""),
                            ])
-        self.dbapi.commit()
+        self._commit_user(username)
 
     def decode_permissions(self, permissions):
         retval = set()
@@ -2250,4 +3810,148 @@ class DBAPI(DbGeneric):
         Remove user from table
         """
         self.dbapi.execute("DELETE FROM user WHERE username = ?;", [username])
+        self._commit_user(username)
+
+    def _commit_user(self, username):
+        """
+        Commit the change of the user's data, and log it for the other
+        processes.
+        """
+        if self._log_changes:
+            self._changes.add(("User", username))
+            self._write_change_log()
+        self.dbapi.commit()
+
+    # Columns of the job table, the keys of the dicts of get_job:
+    JOB_COLUMNS = ["handle", "username", "kind", "plugin", "name", "options",
+                   "status", "message", "filename", "worker", "created",
+                   "started", "finished"]
+
+    def add_job(self, handle, username, kind, plugin, name, options):
+        """
+        Add a queued job to the job table: a "Report", "Export" or
+        "Import" (kind) of the user, with the plugin id, a name for the
+        job, and the options dict of the plugin. The job is "running"
+        once claimed by a worker, "cancelling" if cancelled while
+        running, and finally "done", "failed" or "cancelled".
+        """
+        self.dbapi.execute("""INSERT INTO job
+                                (handle, username, kind, plugin, name, options,
+                                 status, message, filename, worker, created,
+                                 started, finished)
+                                VALUES (?, ?, ?, ?, ?, ?, 'queued', '', '', '',
+                                        ?, 0, 0);""",
+                           [handle, username, kind, plugin, name,
+                            json.dumps(options), int(time.time())])
+        self.dbapi.commit()
+
+    def _make_job(self, row):
+        job = dict(zip(self.JOB_COLUMNS, row))
+        job["options"] = json.loads(job["options"] or "{}")
+        return job
+
+    def get_job(self, handle):
+        """
+        Return the job as a dict of its columns, or None.
+        """
+        self.dbapi.execute("SELECT %s FROM job WHERE handle = ?;" %
+                           ", ".join(self.JOB_COLUMNS), [handle])
+        row = self.dbapi.fetchone()
+        if row:
+            return self._make_job(row)
+        return None
+
+    def get_jobs(self, username=None, status=None):
+        """
+        Return the jobs of the user, or of all users, with the status,
+        or any, newest first.
+        """
+        where = []
+        args = []
+        if username is not None:
+            where.append("username = ?")
+            args.append(username)
+        if status is not None:
+            where.append("status = ?")
+            args.append(status)
+        self.dbapi.execute("SELECT %s FROM job %s ORDER BY created DESC;" % (
+            ", ".join(self.JOB_COLUMNS),
+            ("WHERE " + " AND ".join(where)) if where else ""), args)
+        return [self._make_job(row) for row in self.dbapi.fetchall()]
+
+    def claim_job(self, worker):
+        """
+        Mark the oldest queued job as running by the worker, a name
+        unique to the worker, and return it, or None if none is queued.
+        Of the workers claiming a job at the same time, in any process,
+        only one gets it.
+        """
+        while True:
+            self.dbapi.execute("SELECT handle FROM job WHERE status = 'queued' "
+                               "ORDER BY created LIMIT 1;")
+            row = self.dbapi.fetchone()
+            if row is None:
+                self.dbapi.commit()
+                return None
+            self.dbapi.execute("UPDATE job SET status = 'running', worker = ?, "
+                               "started = ? WHERE handle = ? AND "
+                               "status = 'queued';",
+                               [worker, int(time.time()), row[0]])
+            self.dbapi.commit()
+            job = self.get_job(row[0])
+            if job["status"] == "running" and job["worker"] == worker:
+                return job
+            # Claimed by another worker in the meantime
+
+    def finish_job(self, handle, status, message="", filename=""):
+        """
+        Set the final status of the job, "done", "failed" or
+        "cancelled", its message and the name of its output file.
+        """
+        self.dbapi.execute("UPDATE job SET status = ?, message = ?, "
+                           "filename = ?, finished = ? WHERE handle = ?;",
+                           [status, message, filename, int(time.time()),
+                            handle])
+        self.dbapi.commit()
+
+    def cancel_job(self, handle):
+        """
+        Cancel the job: a queued job is cancelled at once, a running job
+        is marked "cancelling", for its worker to stop it. Returns the
+        new status of the job.
+        """
+        self.dbapi.execute("UPDATE job SET status = 'cancelled', finished = ? "
+                           "WHERE handle = ? AND status = 'queued';",
+                           [int(time.time()), handle])
+        self.dbapi.execute("UPDATE job SET status = 'cancelling' "
+                           "WHERE handle = ? AND status = 'running';",
+                           [handle])
+        self.dbapi.commit()
+        job = self.get_job(handle)
+        return job["status"] if job else None
+
+    def requeue_jobs(self, worker):
+        """
+        Queue the running jobs of the worker again, to be run from the
+        start by another worker, and cancel those being cancelled.
+        """
+        self.dbapi.execute("UPDATE job SET status = 'queued', worker = '', "
+                           "started = 0 WHERE worker = ? AND "
+                           "status = 'running';", [worker])
+        self.dbapi.execute("UPDATE job SET status = 'cancelled', finished = ? "
+                           "WHERE worker = ? AND status = 'cancelling';",
+                           [int(time.time()), worker])
+        self.dbapi.commit()
+
+    def remove_jobs(self, before):
+        """
+        Remove the jobs that finished before the time before, and return
+        their handles.
+        """
+        self.dbapi.execute("SELECT handle FROM job WHERE finished > 0 AND "
+                           "finished < ?;", [before])
+        handles = [row[0] for row in self.dbapi.fetchall()]
+        self.dbapi.execute("DELETE FROM job WHERE finished > 0 AND "
+                           "finished < ?;", [before])
         self.dbapi.commit()
+        return handles
@@ -19,7 +19,8 @@
 #
 
 import MySQLdb
-import re
+
+from gprime.plugins.db.dbapi.statements import StatementCache
 
 MySQLdb.paramstyle = 'qmark' ## Doesn't work
 
@@ -43,6 +44,10 @@ class MySQL:
         self.connection = MySQLdb.connect(*args, **kwargs)
         self.connection.autocommit(True)
         self.cursor = self.connection.cursor()
+        # Number of rows fetched at a time by iter_rows:
+        self.chunk_size = 1000
+        # The queries, translated by _hack_query, by SQL text:
+        self.statements = StatementCache(1000, self._hack_query)
 
     def _hack_query(self, query):
         ## Workaround: no qmark support:
@@ -52,26 +57,57 @@ class MySQL:
         query = query.replace("change", "change_")
         query = query.replace("desc", "desc_")
         query = query.replace(" long ", " long_ ")
-        ## LIMIT offset, count
-        ## count can be -1, for all
-        ## LIMIT -1
-        ## LIMIT offset, -1
+        ## LIMIT -1 [OFFSET ?]
         query = query.replace("LIMIT -1",
                               "LIMIT 18446744073709551615") ##
-        match = re.match(".* LIMIT (.*), (.*) ", query)
-        if match and match.groups():
-            offset, count = match.groups()
-            if count == "-1":
-                count = "18446744073709551615"
-            query = re.sub("(.*) LIMIT (.*), (.*) ",
-                           "\\1 LIMIT %s, %s " % (offset, count),
-                           query)
         return query
 
     def execute(self, query, args=[]):
-        query = self._hack_query(query)
+        query = self.statements.get(query)
         self.cursor.execute(query, args)
 
+    def executemany(self, query, rows):
+        query = self.statements.get(query)
+        self.cursor.executemany(query, rows)
+
+    def iter_rows(self, query, args=None, chunk_size=None):
+        """
+        Executes an SQL query on a cursor of its own, and returns an
+        iterator over the resulting rows, fetched chunk_size (default
+        self.chunk_size) rows at a time. The connection can be used for
+        other statements while iterating.
+
+        Note: this is a buffered cursor; an unbuffered MySQLdb SSCursor
+        would block the connection until all of its rows are read.
+        """
+        query = self.statements.get(query)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, args or [])
+            while True:
+                rows = cursor.fetchmany(chunk_size or self.chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            cursor.close()
+
+    def set_binary_column(self, table, column, binary):
+        """
+        Change the type of a TEXT column to LONGBLOB (binary is True), or
+        back.
+        """
+        self.execute("ALTER TABLE %s MODIFY %s %s;" %
+                     (table, column, "LONGBLOB" if binary else "LONGTEXT"))
+
+    def get_statement_stats(self):
+        """
+        Return a dictionary of the hits, misses, and hit rate of the
+        statement cache.
+        """
+        return self.statements.get_stats()
+
     def fetchone(self):
         return self.cursor.fetchone()
 
@@ -92,5 +128,10 @@ class MySQL:
                             "WHERE table_name='%s';" % table)
         return self.fetchone()[0] != 0
 
+    def index_exists(self, index):
+        self.cursor.execute("SELECT COUNT(*) FROM information_schema.statistics "
+                            "WHERE index_name='%s';" % index)
+        return self.fetchone()[0] != 0
+
     def close(self):
         self.connection.close()
@@ -19,11 +19,18 @@
 #
 
 import psycopg2
+import psycopg2.extras
+import itertools
 import re
 
+from gprime.plugins.db.dbapi.statements import StatementCache
+
 psycopg2.paramstyle = 'format'
 
 class Postgresql:
+    # COUNT(*) OVER () and other window functions:
+    window_functions = True
+
     @classmethod
     def get_summary(cls):
         """
@@ -43,30 +50,30 @@ class Postgresql:
         self.connection = psycopg2.connect(*args, **kwargs)
         self.connection.autocommit = True
         self.cursor = self.connection.cursor()
+        # Number of rows fetched at a time by iter_rows:
+        self.chunk_size = 1000
+        self._cursor_names = ("gprime_cursor_%d" % i
+                              for i in itertools.count())
+        # The queries, translated by _hack_query, by SQL text:
+        self.statements = StatementCache(1000, self._hack_query)
 
     def _hack_query(self, query):
         query = query.replace("?", "%s")
         query = query.replace("REGEXP", "~")
-        query = query.replace("desc", "desc_")
+        # Column desc, but not in string constants (like JSON paths):
+        query = re.sub("'[^']*'|desc",
+                       lambda match: (match.group(0)
+                                      if match.group(0).startswith("'")
+                                      else "desc_"),
+                       query)
         query = query.replace("BLOB", "bytea")
-        ## LIMIT offset, count
-        ## count can be -1, for all
-        ## LIMIT -1
-        ## LIMIT offset, -1
+        ## LIMIT -1 [OFFSET ?]
         query = query.replace("LIMIT -1",
                               "LIMIT all") ##
-        match = re.match(".* LIMIT (.*), (.*) ", query)
-        if match and match.groups():
-            offset, count = match.groups()
-            if count == "-1":
-                count = "all"
-            query = re.sub("(.*) LIMIT (.*), (.*) ",
-                           "\\1 LIMIT %s OFFSET %s " % (count, offset),
-                           query)
         return query
 
     def execute(self, *args, **kwargs):
-        sql = self._hack_query(args[0])
+        sql = self.statements.get(args[0])
         if len(args) > 1:
             args = args[1]
         else:
@@ -77,6 +84,113 @@ class Postgresql:
             self.cursor.execute("rollback")
             raise
 
+    def executemany(self, query, rows):
+        sql = self.statements.get(query)
+        try:
+            psycopg2.extras.execute_batch(self.cursor, sql, rows)
+        except:
+            self.cursor.execute("rollback")
+            raise
+
+    def iter_rows(self, query, args=None, chunk_size=None):
+        """
+        Executes an SQL query on a named, server-side cursor, and returns
+        an iterator over the resulting rows, which are fetched chunk_size
+        (default self.chunk_size) rows at a time. The connection can be
+        used for other statements while iterating.
+        """
+        sql = self.statements.get(query)
+        # WITH HOLD, as the connection is in autocommit mode:
+        cursor = self.connection.cursor(next(self._cursor_names),
+                                        withhold=True)
+        cursor.itersize = chunk_size or self.chunk_size
+        try:
+            cursor.execute(sql, args)
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+    def json_extract(self, expr, path, ptype=None):
+        """
+        Return the SQL expression for the value, of type ptype, in the
+        JSON of the SQL expression expr at path (keys and list
+        positions).
+        """
+        sql = "((%s)::jsonb #>> '{%s}')" % (expr,
+                                            ",".join([str(part)
+                                                      for part in path]))
+        if ptype is bool:
+            return "(%s::boolean::integer)" % sql
+        elif ptype is int:
+            return "(%s::bigint)" % sql
+        elif ptype is float:
+            return "(%s::double precision)" % sql
+        return sql
+
+    def json_each(self, expr, path, alias):
+        """
+        Return a table-valued SQL expression, named alias, with a row for
+        each item of the list in the JSON of the SQL expression expr at
+        path (keys and list positions). The item is alias.value.
+        """
+        return "jsonb_array_elements((%s)::jsonb #> '{%s}') AS %s(value)" % (
+            expr, ",".join([str(part) for part in path]), alias)
+
+    def create_search_table(self):
+        """
+        Create the search table, of (handle, obj_class, text) rows, with
+        a full-text (GIN tsvector) index on the text.
+        """
+        self.execute("CREATE TABLE search (handle VARCHAR(50) PRIMARY KEY, "
+                     "obj_class TEXT, text TEXT);")
+        self.execute("CREATE INDEX search_text ON search "
+                     "USING GIN (to_tsvector('simple', text));")
+
+    def search_query(self, obj_class, words):
+        """
+        Return the SQL, and its arguments, of a query of the
+        search_handle and search_rank (lower is better) of the rows of
+        the search table of obj_class that have a word starting with
+        each of the words.
+        """
+        query = " & ".join(["%s:*" % word for word in words])
+        return ("SELECT handle AS search_handle, "
+                "-ts_rank(to_tsvector('simple', text), "
+                "to_tsquery('simple', ?)) AS search_rank FROM search "
+                "WHERE obj_class = ? AND "
+                "to_tsvector('simple', text) @@ to_tsquery('simple', ?)",
+                [query, obj_class, query])
+
+    def sample_table(self, table, fraction):
+        """
+        Return the SQL, and its arguments, of a table expression, named
+        as the table, of about the fraction of its rows, in blocks
+        spread over the whole table.
+        """
+        return ("%s TABLESAMPLE SYSTEM (?)" % table, [fraction * 100])
+
+    def set_binary_column(self, table, column, binary):
+        """
+        Change the type of a TEXT column to BYTEA (binary is True), or
+        back, keeping its values as UTF-8.
+        """
+        if binary:
+            self.execute("ALTER TABLE %s ALTER COLUMN %s TYPE BYTEA "
+                         "USING convert_to(%s, 'UTF8');" %
+                         (table, column, column))
+        else:
+            self.execute("ALTER TABLE %s ALTER COLUMN %s TYPE TEXT "
+                         "USING convert_from(%s, 'UTF8');" %
+                         (table, column, column))
+
+    def get_statement_stats(self):
+        """
+        Return a dictionary of the hits, misses, and hit rate of the
+        statement cache.
+        """
+        return self.statements.get_stats()
+
     def fetchone(self):
         try:
             return self.cursor.fetchone()
@@ -95,10 +209,23 @@ class Postgresql:
     def rollback(self):
         self.connection.rollback()
 
+    def interrupt(self):
+        """
+        Cancel the statement running on the connection. May be called
+        from another thread.
+        """
+        self.connection.cancel()
+
     def table_exists(self, table):
         self.cursor.execute("SELECT COUNT(*) FROM information_schema.tables "
                             "WHERE table_name=%s;", [table])
         return self.fetchone()[0] != 0
 
+    def index_exists(self, index):
+        # Names that aren't quoted are folded to lower case:
+        self.cursor.execute("SELECT COUNT(*) FROM pg_indexes "
+                            "WHERE indexname=%s;", [index.lower()])
+        return self.fetchone()[0] != 0
+
     def close(self):
         self.connection.close()
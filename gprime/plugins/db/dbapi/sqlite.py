@@ -31,6 +31,13 @@ import sqlite3
 import logging
 import re
 
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.plugins.db.dbapi.statements import StatementCache
+
 sqlite3.paramstyle = 'qmark'
 
 #-------------------------------------------------------------------------
@@ -43,6 +50,9 @@ class Sqlite:
     The Sqlite class is an interface between the DBAPI class which is the Gramps
     backend for the DBAPI interface and the sqlite3 python module.
     """
+    # COUNT(*) OVER () and other window functions, since SQLite 3.25:
+    window_functions = sqlite3.sqlite_version_info >= (3, 25, 0)
+
     @classmethod
     def get_summary(cls):
         """
@@ -74,7 +84,12 @@ class Sqlite:
         self.log = logging.getLogger(".sqlite")
         self.connection = sqlite3.connect(*args, **kwargs)
         self.cursor = self.connection.cursor()
-        self.queries = {}
+        # sqlite3 keeps the compiled statements by SQL text; this
+        # follows the same statements, to count the reuse:
+        self.statements = StatementCache(kwargs.get("cached_statements",
+                                                    128))
+        # Number of rows fetched at a time by iter_rows:
+        self.chunk_size = 1000
         self.connection.create_function("regexp", 2, regexp)
 
     def execute(self, *args, **kwargs):
@@ -87,8 +102,130 @@ class Sqlite:
         :type kwargs: list
         """
         self.log.debug(args)
+        self.statements.get(args[0])
         self.cursor.execute(*args, **kwargs)
 
+    def executemany(self, *args, **kwargs):
+        """
+        Executes an SQL statement once for each set of parameters.
+
+        :param args: arguments to be passed to the sqlite3 executemany
+                     statement
+        :type args: list
+        :param kwargs: arguments to be passed to the sqlite3 executemany
+                       statement
+        :type kwargs: list
+        """
+        self.log.debug(args[0])
+        self.statements.get(args[0])
+        self.cursor.executemany(*args, **kwargs)
+
+    def iter_rows(self, query, args=None, chunk_size=None):
+        """
+        Executes an SQL query on a cursor of its own, and returns an
+        iterator over the resulting rows, which are fetched chunk_size
+        (default self.chunk_size) rows at a time. The connection can be
+        used for other statements while iterating.
+
+        :param query: the SQL query
+        :type query: str
+        :param args: the query parameters
+        :type args: list
+        :param chunk_size: number of rows to fetch at a time
+        :type chunk_size: int
+        """
+        self.log.debug(query)
+        self.statements.get(query)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, args or [])
+            while True:
+                rows = cursor.fetchmany(chunk_size or self.chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            cursor.close()
+
+    def json_extract(self, expr, path, ptype=None):
+        """
+        Return the SQL expression for the value in the JSON of the SQL
+        expression expr at path.
+
+        :param expr: SQL expression of JSON text
+        :type expr: str
+        :param path: keys and list positions
+        :type path: list
+        :param ptype: the type of the value (not needed by sqlite)
+        :type ptype: type
+        """
+        if not path:
+            return expr
+        return "json_extract(%s, '%s')" % (expr, json_path(path))
+
+    def json_each(self, expr, path, alias):
+        """
+        Return a table-valued SQL expression, named alias, with a row for
+        each item of the list in the JSON of the SQL expression expr at
+        path. The item is alias.value.
+
+        :param expr: SQL expression of JSON text
+        :type expr: str
+        :param path: keys and list positions
+        :type path: list
+        :param alias: name of the table
+        :type alias: str
+        """
+        if not path:
+            return "json_each(%s) AS %s" % (expr, alias)
+        return "json_each(%s, '%s') AS %s" % (expr, json_path(path), alias)
+
+    def create_search_table(self):
+        """
+        Create the search table, of (handle, obj_class, text) rows, and
+        its FTS5 full-text index, which triggers keep up to date.
+        """
+        self.execute("CREATE TABLE search (id INTEGER PRIMARY KEY, "
+                     "handle VARCHAR(50) UNIQUE, obj_class TEXT, text TEXT);")
+        self.execute("CREATE VIRTUAL TABLE search_fts USING fts5("
+                     "text, content='search', content_rowid='id');")
+        self.execute("CREATE TRIGGER search_insert AFTER INSERT ON search "
+                     "BEGIN INSERT INTO search_fts (rowid, text) "
+                     "VALUES (new.id, new.text); END;")
+        self.execute("CREATE TRIGGER search_delete AFTER DELETE ON search "
+                     "BEGIN INSERT INTO search_fts (search_fts, rowid, text) "
+                     "VALUES ('delete', old.id, old.text); END;")
+
+    def search_query(self, obj_class, words):
+        """
+        Return the SQL, and its arguments, of a query of the
+        search_handle and search_rank (lower is better) of the rows of
+        the search table of obj_class that have a word starting with
+        each of the words.
+        """
+        return ("SELECT search.handle AS search_handle, "
+                "search_fts.rank AS search_rank FROM search_fts "
+                "JOIN search ON search.id = search_fts.rowid "
+                "WHERE search_fts MATCH ? AND search.obj_class = ?",
+                [" ".join(['"%s"*' % word for word in words]), obj_class])
+
+    def sample_table(self, table, fraction):
+        """
+        Return the SQL, and its arguments, of a table expression, named
+        as the table, of about the fraction of its rows, one in every so
+        many rowids, so that they are spread over the whole table.
+        """
+        return ("(SELECT * FROM %s WHERE rowid %% ? = 0) AS %s" %
+                (table, table), [max(1, round(1 / fraction))])
+
+    def get_statement_stats(self):
+        """
+        Return a dictionary of the hits, misses, and hit rate of the
+        statement cache.
+        """
+        return self.statements.get_stats()
+
     def fetchone(self):
         """
         Fetches the next row of a query result set, returning a single sequence,
@@ -125,6 +262,23 @@ class Sqlite:
         self.log.debug("ROLLBACK;")
         self.connection.rollback()
 
+    def set_wal(self):
+        """
+        Use write-ahead logging, so that reading connections don't wait
+        for writing ones. The journal mode is kept by the database file.
+        Returns the journal mode, which stays "memory" for in-memory
+        databases.
+        """
+        self.execute("PRAGMA journal_mode=WAL;")
+        return self.fetchone()[0]
+
+    def interrupt(self):
+        """
+        Stop the statement running on the connection, which fails with
+        sqlite3.OperationalError. May be called from another thread.
+        """
+        self.connection.interrupt()
+
     def table_exists(self, table):
         """
         Test whether the specified SQL database table exists.
@@ -172,6 +326,18 @@ class Sqlite:
         self.log.debug("closing database...")
         self.connection.close()
 
+def json_path(path):
+    """
+    Return the sqlite JSON path for a list of keys and list positions.
+
+    :param path: keys and list positions
+    :type path: list
+    :returns: the path, such as $.primary_name.surname_list[0].surname
+    :rtype: str
+    """
+    return "$" + "".join([("[%s]" if isinstance(part, int) else ".%s") % part
+                          for part in path])
+
 def regexp(expr, value):
     """
     A user defined function that can be called from within an SQL statement.
@@ -0,0 +1,88 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Cache of SQL statements, for the DB-API backends.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.utils.lru import LRU
+
+#-------------------------------------------------------------------------
+#
+# StatementCache class
+#
+#-------------------------------------------------------------------------
+class StatementCache:
+    """
+    The recently executed SQL statements, by SQL text, as translated
+    for the backend, with the number of hits and misses.
+
+    As the DBAPI queries pass their values as parameters, the same
+    query with other values is a hit.
+    """
+    def __init__(self, size, translate=None):
+        """
+        size - number of statements to keep
+        translate - function to turn the SQL text into the backend's
+                    dialect, or None
+        """
+        self.statements = LRU(size)
+        self.translate = translate
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query):
+        """
+        Return the statement for the SQL text query.
+        """
+        if query in self.statements:
+            self.hits += 1
+            return self.statements[query]
+        self.misses += 1
+        if self.translate:
+            statement = self.translate(query)
+        else:
+            statement = query
+        self.statements[query] = statement
+        return statement
+
+    def get_stats(self):
+        """
+        Return a dictionary of the hits, misses, and hit rate.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def clear(self):
+        """
+        Forget the statements, and the counts.
+        """
+        self.statements.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,141 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the compiled field accessors of get_field """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.lib import Person, Family
+from gprime.lib.handle import Handle
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+FIELDS = {
+    Person: ["gid", "gender", "primary_name.first_name",
+             "primary_name.surname_list.surname",
+             "primary_name.surname_list.0.surname",
+             "primary_name.surname_list.5.surname",
+             "alternate_names.first_name", "event_ref_list",
+             "event_ref_list.ref", "event_ref_list.0.ref",
+             "event_ref_list.ref.description",
+             "event_ref_list.ref.self",
+             "event_ref_list.ref.place.self.gid",
+             "family_list.father_handle.primary_name.first_name",
+             "parent_family_list.child_ref_list.ref.gid",
+             "primary_name.date.year", "no_such_field"],
+    Family: ["father_handle", "father_handle.self",
+             "father_handle.family_list.self",
+             "mother_handle.event_ref_list.ref.date.sortval",
+             "child_ref_list.ref.primary_name.first_name"],
+}
+
+class AccessorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def get(self, function, *args):
+        try:
+            value = function(*args)
+        except Exception as exc:
+            return ("error", str(exc))
+        if isinstance(value, list):
+            return [getattr(item, "handle", item) for item in value]
+        return (type(value), getattr(value, "handle", value))
+
+    def test_same_values(self):
+        for (cls, fields) in FIELDS.items():
+            objects = list(self.db.get_table_func(cls.__name__,
+                                                  "iter_func")())[:50]
+            for field in fields:
+                accessor = cls.get_field_accessor(field)
+                for obj in objects:
+                    for (db, ignore_errors) in [(self.db, True),
+                                                (self.db, False),
+                                                (None, True)]:
+                        self.assertEqual(
+                            self.get(accessor, obj, db, ignore_errors),
+                            self.get(obj._get_field_by_path, field, db,
+                                     ignore_errors),
+                            (obj.gid, field, db, ignore_errors))
+
+    def test_many(self):
+        for (cls, fields) in FIELDS.items():
+            objects = list(self.db.get_table_func(cls.__name__,
+                                                  "iter_func")())[:50]
+            for field in fields:
+                for (db, ignore_errors) in [(self.db, True),
+                                            (self.db, False),
+                                            (None, True)]:
+                    values = [self.get(obj.get_field, field, db,
+                                       ignore_errors) for obj in objects]
+                    if any(isinstance(value, tuple) and value[0] == "error"
+                           for value in values):
+                        with self.assertRaises(Exception):
+                            cls.get_field_values(objects, field, db,
+                                                 ignore_errors)
+                        continue
+                    self.assertEqual(
+                        [self.get(lambda: value) for value in
+                         cls.get_field_values(objects, field, db,
+                                              ignore_errors)],
+                        values, (field, db, ignore_errors))
+
+    def test_select_joins_together(self):
+        calls = []
+        get_objects = self.db.get_objects_from_handles
+        def get_objects_from_handles(table, handles, ignore_errors=False):
+            calls.append(table)
+            return get_objects(table, handles, ignore_errors)
+        self.db.get_objects_from_handles = get_objects_from_handles
+        try:
+            fields = ["gid", "event_ref_list.ref.place.self.gid",
+                      "family_list.father_handle.primary_name.first_name"]
+            rows = list(self.db.Person.limit(count=50).select(*fields))
+        finally:
+            del self.db.get_objects_from_handles
+        self.assertEqual(len(rows), 50)
+        # One for each join, not for each person:
+        self.assertEqual(sorted(calls), ["Event", "Family", "Person",
+                                         "Place"])
+        for row in rows:
+            person = self.db.get_person_from_gid(row["gid"])
+            for field in fields[1:]:
+                self.assertEqual(row[field],
+                                 person.get_field(field, self.db, True))
+
+    def test_cached(self):
+        self.assertIs(Person.get_field_accessor("primary_name.first_name"),
+                      Person.get_field_accessor("primary_name.first_name"))
+        self.assertIs(type(Handle("Person", "a")), type(Handle("Person", "b")))
+        person = self.db.get_person_from_gid("I0044")
+        handle = person.get_field("event_ref_list.0.ref")
+        self.assertEqual(handle.classname, "Event")
+        self.assertEqual(person.get_field("event_ref_list.0.ref.self",
+                                          self.db).handle, handle)
+
+if __name__ == "__main__":
+    unittest.main()
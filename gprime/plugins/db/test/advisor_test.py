@@ -0,0 +1,119 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the DB-API query statistics and index advisor """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class AdvisorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = import_as_dict(EXAMPLE, User())
+        self.advisor = self.db.get_index_advisor()
+
+    def select(self, table, where=None, order_by=None):
+        return list(self.db._select(table, ["gid"], where=where,
+                                    order_by=order_by))
+
+    def test_stats(self):
+        self.select("Person", ("gender", "=", 1), [("gid", "ASC")])
+        self.select("Person", ["AND", [("gender", "=", 1),
+                                       ("primary_name.call", "=", "")]])
+        count = next(self.db._select("Person", ["count(1)"],
+                                     where=("gender", "=", 1)))
+        stats = self.db.get_query_stats()["Person"]
+        self.assertEqual(stats["gender"]["where"], 3)
+        self.assertEqual(stats["gender"]["rows"], count * 2 + len(
+            self.select("Person", ["AND", [("gender", "=", 1),
+                                           ("primary_name.call", "=", "")]])))
+        self.assertEqual(stats["gid"]["order"], 1)
+        self.assertEqual(stats["primary_name.call"]["queries"], 1)
+        self.assertNotIn("handle", stats)
+
+    def test_kinds(self):
+        self.select("Person", ("gender", "=", 1))
+        self.select("Person", ("primary_name.call", "=", ""))
+        self.select("Person", ("primary_name.type", "=", 2))
+        self.select("Person", ("alternate_names.first_name", "=", "Ann"))
+        self.select("Family", ("father_handle.gid", "=", "I0001"))
+        self.select("Person", ("gid", "=", "I0001"))
+        kinds = {(suggestion["table"], suggestion["field"]):
+                 suggestion["kind"]
+                 for suggestion in self.advisor.get_suggestions()}
+        self.assertEqual(kinds, {
+            ("Person", "gender"): "index",
+            ("Person", "primary_name.call"): "column",
+            ("Person", "primary_name.type"): "expression",
+            ("Person", "alternate_names.first_name"): None,
+            ("Family", "father_handle.gid"): None,
+        })
+        self.assertTrue(self.advisor.get_report())
+
+    def test_create(self):
+        where = ["OR", [("primary_name.call", "=", ""),
+                        ("primary_name.type", "=", 2)]]
+        expected = sorted(row["gid"] for row in
+                          DbReadBase._select(self.db, "Person", ["gid"],
+                                             where=where))
+        self.select("Person", where)
+        self.select("Person", ("gender", "=", 1))
+        for suggestion in self.advisor.get_suggestions():
+            self.advisor.create(suggestion)
+        self.assertEqual(self.advisor.get_suggestions(), [])
+        self.assertIn("primary_name.call",
+                      [field for (field, ptype)
+                       in self.db.get_secondary_fields("Person")])
+        self.assertEqual(sorted(row["gid"]
+                                for row in self.select("Person", where)),
+                         expected)
+        # New people get a value in the new column:
+        person = self.db.get_person_from_gid("I0001")
+        person.gid = "I9999"
+        person.handle = "NEWHANDLE"
+        person.primary_name.call = "Called"
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.add_person(person, trans)
+        self.assertEqual(self.select("Person", ("primary_name.call", "=",
+                                                "Called")),
+                         [{"gid": "I9999"}])
+
+    def test_auto_index(self):
+        self.select("Person", ("gender", "=", 1))
+        self.select("Person", ("primary_name.call", "=", "Called"))
+        self.db.set_feature("auto-index", 0.0)
+        self.db.save_query_stats()
+        self.assertTrue(self.db.is_indexed("Person", "primary_name__call"))
+        self.assertTrue(self.db.is_indexed("Person", "gender"))
+        self.assertEqual(self.db.query_stats.get_stats(), {})
+        self.assertEqual(
+            self.db.get_query_stats()["Person"]["gender"]["queries"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
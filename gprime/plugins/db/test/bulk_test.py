@@ -0,0 +1,90 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the DB-API bulk-load path of batch transactions """
+
+import unittest
+
+from gprime.db import make_database
+from gprime.lib import Person, Name, Surname, Family
+
+class BulkLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = make_database("inmemorydb")
+        self.db.load(None)
+
+    def make_person(self, gid, surname):
+        person = Person()
+        person.primary_name = Name()
+        person.primary_name.surname_list.append(Surname())
+        person.primary_name.surname_list[0].surname = surname
+        person.gid = gid
+        return person
+
+    def test_reads_see_queued_rows(self):
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            person = self.make_person("I0001", "Smith")
+            self.db.add_person(person, trans)
+            self.assertTrue(self.db.has_person_handle(person.handle))
+            self.assertTrue(self.db.has_gid(0, "I0001"))
+            self.assertEqual(
+                self.db.get_person_from_gid("I0001").handle, person.handle)
+            # Committing again replaces the queued row:
+            person.gid = "I0002"
+            self.db.commit_person(person, trans)
+            self.assertFalse(self.db.has_gid(0, "I0001"))
+            self.assertEqual(
+                self.db.get_person_from_handle(person.handle).gid, "I0002")
+            # Other reads write out the queued rows first:
+            self.assertEqual(self.db.get_number_of_people(), 1)
+        self.assertEqual(self.db.get_number_of_people(), 1)
+        self.assertEqual(self.db.get_person_from_gid("I0002").handle,
+                         person.handle)
+
+    def test_secondary_values(self):
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            person = self.make_person("I0001", "Smith")
+            self.db.add_person(person, trans)
+            family = Family()
+            family.father_handle = person.handle
+            family.gid = "F0001"
+            self.db.add_family(family, trans)
+        self.db.dbapi.execute(
+            "SELECT gid, father_handle__primary_name__surname_list__0__surname"
+            " FROM family;")
+        self.assertEqual(self.db.dbapi.fetchall(), [("F0001", "Smith")])
+        self.assertEqual(
+            len(list(self.db.find_backlink_handles(person.handle))), 1)
+
+    def test_abort_discards_queued_rows(self):
+        try:
+            with self.db.get_transaction_class()("Test", self.db,
+                                                 batch=True) as trans:
+                self.db.add_person(self.make_person("I0001", "Smith"), trans)
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+        self.assertEqual(self.db.get_number_of_people(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
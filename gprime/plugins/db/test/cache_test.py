@@ -0,0 +1,151 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the object cache of the databases """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.cache import DbCache
+from gprime.lib import Note
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class DbCacheTest(unittest.TestCase):
+
+    def test_stats(self):
+        cache = DbCache(3)
+        self.assertIsNone(cache.get("Note", "a"))
+        for handle in "abcd":
+            cache.put("Note", handle, {"handle": handle})
+        self.assertIsNone(cache.get("Note", "a"))
+        self.assertEqual(cache.get("Note", "d"), {"handle": "d"})
+        cache.invalidate("Note", "d")
+        cache.invalidate("Note", "d")
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"],
+                          stats["invalidations"], stats["count"]),
+                         (1, 2, 1, 1, 2))
+
+    def test_disabled(self):
+        cache = DbCache(0)
+        cache.put("Note", "a", {})
+        self.assertIsNone(cache.get("Note", "a"))
+
+    def test_generation(self):
+        for cache in [DbCache(3), DbCache(3, thread_safe=True)]:
+            self.assertIsNone(cache.get("Note", "a"))
+            generation = cache.generation
+            # Written while being read:
+            cache.put("Note", "a", {"value": "new"})
+            cache.put("Note", "a", {"value": "old"}, generation)
+            self.assertEqual(cache.get("Note", "a"), {"value": "new"})
+            cache.invalidate("Note", "a")
+            self.assertIsNone(cache.get("Note", "a"))
+            generation = cache.generation
+            cache.put("Note", "a", {"value": "read"}, generation)
+            self.assertEqual(cache.get("Note", "a"), {"value": "read"})
+
+class ObjectCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+        cls.handle = cls.db.get_person_handles()[0]
+
+    def setUp(self):
+        self.db.cache.clear()
+        self.db.cache.reset_stats()
+
+    def get_first_name(self):
+        person = self.db.get_person_from_handle(self.handle)
+        return person.primary_name.first_name
+
+    def set_first_name(self, first_name, trans):
+        person = self.db.get_person_from_handle(self.handle)
+        person.primary_name.first_name = first_name
+        self.db.commit_person(person, trans)
+
+    def test_hits(self):
+        first_name = self.get_first_name()
+        self.assertEqual(self.get_first_name(), first_name)
+        self.assertIsNotNone(self.db.get_raw_person_data(self.handle))
+        stats = self.db.get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_commit(self):
+        first_name = self.get_first_name()
+        with self.db.get_transaction_class()("Test", self.db) as trans:
+            self.set_first_name("Cached", trans)
+            # Read from the database, not the cache, in the transaction:
+            self.assertEqual(self.get_first_name(), "Cached")
+        self.db.cache.reset_stats()
+        # Cached when the transaction is committed:
+        self.assertEqual(self.get_first_name(), "Cached")
+        self.assertEqual(self.db.get_cache_stats()["hits"], 1)
+        self.db.undo()
+        self.assertEqual(self.get_first_name(), first_name)
+        self.db.redo()
+        self.assertEqual(self.get_first_name(), "Cached")
+        with self.db.get_transaction_class()("Test", self.db) as trans:
+            self.set_first_name(first_name, trans)
+        self.assertEqual(self.get_first_name(), first_name)
+
+    def test_abort(self):
+        first_name = self.get_first_name()
+        try:
+            with self.db.get_transaction_class()("Test", self.db) as trans:
+                self.set_first_name("Aborted", trans)
+                self.assertEqual(self.get_first_name(), "Aborted")
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(self.get_first_name(), first_name)
+
+    def test_remove(self):
+        note = Note()
+        note.set("A cached note")
+        with self.db.get_transaction_class()("Test", self.db) as trans:
+            self.db.add_note(note, trans)
+        self.assertEqual(self.db.get_note_from_handle(note.handle).get(),
+                         "A cached note")
+        with self.db.get_transaction_class()("Test", self.db) as trans:
+            self.db.remove_note(note.handle, trans)
+        self.assertIsNone(self.db.get_raw_note_data(note.handle))
+        self.db.undo()
+        self.assertEqual(self.db.get_note_from_handle(note.handle).get(),
+                         "A cached note")
+        self.db.redo()
+        self.assertIsNone(self.db.get_raw_note_data(note.handle))
+
+    def test_structs_not_shared(self):
+        person = self.db.get_person_from_handle(self.handle)
+        person.add_tag("not-a-tag")
+        person.primary_name.first_name = "Changed"
+        person = self.db.get_person_from_handle(self.handle)
+        self.assertNotIn("not-a-tag", person.tag_list)
+        self.assertNotEqual(person.primary_name.first_name, "Changed")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the DB-API json_data codecs """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+from gprime.lib import Note
+from gprime.plugins.db.dbapi.codec import CODECS, JSONCodec, get_codec
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class CodecTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = import_as_dict(EXAMPLE, User())
+
+    def get_structs(self):
+        return {person.handle: person.to_struct()
+                for person in self.db.iter_people()}
+
+    def test_round_trip(self):
+        struct = self.db.get_person_from_gid("I0044").to_struct()
+        for name in CODECS:
+            codec = get_codec(name)
+            data = codec.encode(struct)
+            self.assertEqual(isinstance(data, bytes), codec.binary)
+            self.assertEqual(codec.decode(data), struct)
+        self.assertRaises(Exception, get_codec, "nosuchcodec")
+
+    def test_set_codec(self):
+        expected = self.get_structs()
+        for name in ["binary", "compressed", "json", "compressed"]:
+            self.db.set_codec(name)
+            self.assertEqual(self.db.codec.name, name)
+            self.assertEqual(self.db.get_metadata("codec"), name)
+            self.assertEqual(self.get_structs(), expected)
+            self.db.dbapi.execute("SELECT json_data FROM person LIMIT 1;")
+            self.assertIsInstance(self.db.dbapi.fetchone()[0],
+                                  bytes if self.db.codec.binary else str)
+        # Read from the metadata on open:
+        self.db.codec = JSONCodec()
+        self.db.update_schema()
+        self.assertEqual(self.db.codec.name, "compressed")
+
+    def test_select(self):
+        where = ("primary_name.surname_list.surname", "LIKE", "Gar%")
+        expected = sorted(row["gid"] for row in
+                          DbReadBase._select(self.db, "Person", ["gid"],
+                                             where=where))
+        self.db.set_codec("binary")
+        self.assertFalse(self.db.has_json_sql())
+        self.assertEqual(sorted(row["gid"] for row in
+                                self.db._select("Person", ["gid"],
+                                                where=where)),
+                         expected)
+        rows = list(self.db._select("Person", ["gid"],
+                                    order_by=[("primary_name.first_name",
+                                               "ASC")]))
+        self.assertEqual(len(rows), self.db.get_number_of_people())
+
+    def test_json_indexes(self):
+        self.db.add_secondary_index("Person", "primary_name.type")
+        self.assertTrue(self.db.is_indexed("Person", "primary_name__type"))
+        self.db.set_codec("compressed")
+        self.assertFalse(self.db.is_indexed("Person", "primary_name__type"))
+        self.assertEqual(
+            self.db.get_index_advisor().get_kind("Person",
+                                                 "primary_name.type")[0],
+            None)
+        self.db.set_codec("json")
+        self.assertTrue(self.db.is_indexed("Person", "primary_name__type"))
+
+    def test_commit_reindex(self):
+        self.db.set_codec("binary")
+        note = Note()
+        note.set("A binary note")
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.add_note(note, trans)
+        self.assertEqual(self.db.get_note_from_handle(note.handle).get(),
+                         "A binary note")
+        self.db.dbapi.execute("SELECT count(1) FROM reference;")
+        references = self.db.dbapi.fetchone()[0]
+        self.db.reindex_reference_map(lambda percent: None)
+        self.db.dbapi.execute("SELECT count(1) FROM reference;")
+        self.assertEqual(self.db.dbapi.fetchone()[0], references)
+
+if __name__ == "__main__":
+    unittest.main()
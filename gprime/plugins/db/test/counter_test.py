@@ -0,0 +1,175 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the DB-API row counters and paged selects with totals """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+from gprime.lib import Note, Person, Surname
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class CounterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def count_rows(self, table_name):
+        self.db.dbapi.execute("SELECT count(1) FROM %s;" % table_name)
+        return self.db.dbapi.fetchone()[0]
+
+    def test_counters(self):
+        for table in self.db.get_table_func():
+            self.assertEqual(self.db.get_table_func(table, "count_func")(),
+                             self.count_rows(table.lower()))
+
+    def test_add_remove(self):
+        notes = self.db.get_number_of_notes()
+        note = Note()
+        note.set("A counted note")
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.add_note(note, trans)
+            self.assertEqual(self.db.get_number_of_notes(), notes + 1)
+        self.assertEqual(self.db.get_number_of_notes(), notes + 1)
+        self.assertEqual(self.count_rows("note"), notes + 1)
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.remove_note(note.handle, trans)
+        self.assertEqual(self.db.get_number_of_notes(), notes)
+        self.assertEqual(self.count_rows("note"), notes)
+
+    def test_abort(self):
+        notes = self.db.get_number_of_notes()
+        try:
+            with self.db.get_transaction_class()("Test", self.db,
+                                                 batch=True) as trans:
+                self.db.add_note(Note(), trans)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(self.db.get_number_of_notes(), notes)
+        self.assertEqual(self.count_rows("note"), notes)
+
+    def test_rebuild(self):
+        self.db.dbapi.execute("UPDATE counter SET value = 0;")
+        self.db.rebuild_counters()
+        self.test_counters()
+
+    def check_page(self, where=None, search=None, start=0, limit=10):
+        order_by = [("gid", "ASC")] if search is None else None
+        expected = list(DbReadBase._select(self.db, "Person", ["gid"],
+                                           start, limit, where, order_by,
+                                           search))
+        total = next(DbReadBase._select(self.db, "Person", ["count(1)"],
+                                        where=where, search=search))
+        self.assertEqual(self.db._select_page("Person", ["gid"], start,
+                                              limit, where, order_by,
+                                              search),
+                         (expected, total, False))
+        return total
+
+    def test_select_page(self):
+        where = ("gender", "=", 1)
+        self.assertTrue(self.check_page(where))
+        self.check_page(where, start=20)
+        self.check_page(where, start=10000)
+        self.check_page(search="garner")
+        self.check_page()
+        # In Python, for the where on a joined field:
+        self.assertTrue(self.check_page(
+            ("event_ref_list.ref.description", "LIKE", "Birth of%")))
+        rows, total, estimated = self.db.Person.order("gid").select_page(
+            "gid")
+        self.assertEqual(len(rows), total)
+        self.assertEqual(total, self.db.get_number_of_people())
+        # Limited, by offset and by keyset:
+        people = self.db.get_number_of_people()
+        rows, total, estimated = self.db.Person.order("gid").limit(
+            count=10).select_page("gid", "handle")
+        self.assertEqual((len(rows), total), (10, people))
+        rows, total, estimated = self.db.Person.order("gid").after(
+            rows[-1]["gid"], rows[-1]["handle"]).limit(count=10).select_page(
+                "gid", "handle")
+        self.assertEqual((len(rows), total), (10, people))
+        # With a where, the matching rows:
+        queryset = self.db.Person.limit(count=10)
+        queryset.where_by = ("gender", "=", 1)
+        rows, total, estimated = queryset.select_page("gid")
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(total, self.check_page(("gender", "=", 1)))
+
+    def test_estimate(self):
+        where = ("gender", "=", 1)
+        (count, estimated) = self.db._count("Person", where)
+        self.assertFalse(estimated)
+        self.db.ESTIMATE_ROWS = 100
+        try:
+            self.assertEqual(self.db._count("Person", where)[1], True)
+            (rows, total, estimated) = self.db._select_page(
+                "Person", ["gid"], 0, 10, where)
+            self.assertTrue(estimated)
+            self.assertEqual(len(rows), 10)
+            self.assertAlmostEqual(total, count, delta=count // 2)
+        finally:
+            del self.db.ESTIMATE_ROWS
+
+    def test_estimate_last_rows(self):
+        # Only the people added last match, as with a where on a date:
+        people = []
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            for i in range(300):
+                person = Person()
+                person.gid = "Z%04d" % i
+                person.primary_name.add_surname(Surname())
+                self.db.add_person(person, trans)
+                people.append(person)
+        where = ("gid", ">=", "Z")
+        self.db.ESTIMATE_ROWS = 500
+        try:
+            (count, estimated) = self.db._count("Person", where)
+            self.assertTrue(estimated)
+            self.assertAlmostEqual(count, 300, delta=150)
+            # Not fewer than the rows of the page; exact at the last one:
+            self.assertEqual(self.db._select_page(
+                "Person", ["gid"], 280, 25, where)[1:], (300, False))
+            (rows, total, estimated) = self.db._select_page(
+                "Person", ["gid"], 250, 25, where)
+            self.assertEqual(len(rows), 25)
+            self.assertGreaterEqual(total, 275)
+            self.assertLessEqual(self.db._select_page(
+                "Person", ["gid"], 400, 25, where)[1], 400)
+        finally:
+            del self.db.ESTIMATE_ROWS
+            with self.db.get_transaction_class()("Test", self.db,
+                                                 batch=True) as trans:
+                for person in people:
+                    self.db.remove_person(person.handle, trans)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for running database work in threads """
+
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from gprime.dbstate import DbState
+from gprime.db import DbTxn
+from gprime.db.executor import DatabaseExecutor, ExecutorBusy
+from gprime.lib import Person, Surname
+from gprime.errors import HandleError
+
+class DatabaseExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dirpath = os.path.join(self.tmpdir, "database")
+        self.db = DbState().create_database(self.dirpath, "Test")
+        self.executor = DatabaseExecutor(
+            self.db, lambda: DbState().open_database(self.dirpath), 2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def add_person(self, surname):
+        database = self.executor.get_database()
+        person = Person()
+        person.primary_name.add_surname(Surname())
+        person.primary_name.get_primary_surname().set_surname(surname)
+        with DbTxn("Add", database) as trans:
+            database.add_person(person, trans)
+        return person.handle
+
+    def get_first_name(self, handle):
+        database = self.executor.get_database()
+        return database.get_person_from_handle(handle).primary_name.first_name
+
+    def test_databases(self):
+        self.assertIs(self.executor.get_database(), self.db)
+        database = self.executor.submit(self.executor.get_database).result()
+        self.assertIsNot(database, self.db)
+        self.assertIs(database.cache, self.db.cache)
+        handle = self.executor.submit(self.add_person, "Threaded").result()
+        self.assertEqual(self.db.get_number_of_people(), 1)
+        self.assertEqual(self.db.get_surname_counts(), [("Threaded", 1)])
+        self.assertEqual(self.db.get_person_from_handle(handle).handle, handle)
+        # Written in the main thread, through the shared cache:
+        person = self.db.get_person_from_handle(handle)
+        person.primary_name.first_name = "Changed"
+        with DbTxn("Change", self.db) as trans:
+            self.db.commit_person(person, trans)
+        self.assertEqual(
+            self.executor.submit(self.get_first_name, handle).result(),
+            "Changed")
+        self.executor.shutdown()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            database.get_number_of_people()
+
+    def test_remove(self):
+        handle = self.add_person("Removed")
+        other = DbState().open_database(self.dirpath)
+        try:
+            other.set_cache(self.db.cache)
+            self.db.cache.clear()
+            with DbTxn("Remove", self.db) as trans:
+                self.db.remove_person(handle, trans)
+                # Read by the other connection before the commit:
+                self.assertIsNotNone(other.get_person_from_handle(handle))
+            other.dbapi.execute("SELECT count(*) FROM person;")
+            self.assertEqual(other.dbapi.fetchone()[0], 0)
+            self.assertIsNone(self.db.cache.get("Person", handle))
+            with self.assertRaises(HandleError):
+                other.get_person_from_handle(handle)
+        finally:
+            other.close()
+
+    def test_busy(self):
+        executor = DatabaseExecutor(
+            self.db, lambda: DbState().open_database(self.dirpath), 1, 1)
+        try:
+            event = threading.Event()
+            future = executor.submit(event.wait)
+            with self.assertRaises(ExecutorBusy):
+                executor.submit(event.wait)
+            event.set()
+            future.result()
+            executor.submit(time.sleep, 0).result()
+        finally:
+            executor.shutdown()
+
+    def test_interrupt(self):
+        started = threading.Event()
+        def query():
+            database = self.executor.get_database()
+            started.set()
+            database.dbapi.execute(
+                "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL "
+                "SELECT x + 1 FROM c) SELECT count(*) FROM c;")
+        future = self.executor.submit(query)
+        started.wait()
+        # Until the query is running:
+        while not future.done():
+            self.executor.interrupt(future)
+            time.sleep(0.05)
+        self.assertIsInstance(future.exception(), sqlite3.OperationalError)
+        self.assertEqual(self.executor.pending, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for getting objects from many handles together """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.errors import HandleError
+from gprime.proxy import PrivateProxyDb, CacheProxyDb
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class FetchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def get_handles(self, table, count=20):
+        handles = self.db.get_table_func(table, "handles_func")()[:count]
+        return [str(handle, "utf-8") if isinstance(handle, bytes)
+                else handle for handle in handles]
+
+    def test_objects(self):
+        self.db.cache.clear()
+        for table in self.db.get_table_func():
+            handles = self.get_handles(table)
+            handles = handles[::-1] + handles[:2]
+            objects = self.db.get_objects_from_handles(table, handles)
+            self.assertEqual(
+                [obj.to_struct() for obj in objects],
+                [self.db.get_table_func(table, "handle_func")(handle)
+                 .to_struct() for handle in handles])
+
+    def test_table_methods(self):
+        handles = self.get_handles("Person")
+        people = self.db.get_people_from_handles(
+            [bytes(handle, "utf-8") for handle in handles])
+        self.assertEqual([person.handle for person in people], handles)
+        handles = self.get_handles("Media")
+        self.assertEqual([media.handle for media
+                          in self.db.get_media_from_handles(handles)],
+                         handles)
+
+    def test_raw(self):
+        self.db.FETCH_SIZE = 4
+        try:
+            self.db.cache.clear()
+            handles = self.get_handles("Event", 30) + ["missing", None]
+            self.assertEqual(
+                self.db.get_raw_data_from_handles("Event", handles),
+                [self.db.get_raw_event_data(handle) if handle else None
+                 for handle in handles])
+        finally:
+            del self.db.FETCH_SIZE
+
+    def test_missing(self):
+        handles = self.get_handles("Note", 3)
+        with self.assertRaisesRegex(HandleError, "missing1, missing2"):
+            self.db.get_notes_from_handles(
+                [handles[0], "missing1", handles[1], "missing2"])
+        notes = self.db.get_notes_from_handles(
+            [handles[0], "missing1", handles[1]], ignore_errors=True)
+        self.assertEqual([note and note.handle for note in notes],
+                         [handles[0], None, handles[1]])
+
+    def test_proxies(self):
+        handles = self.get_handles("Person", 100)
+        proxy = PrivateProxyDb(self.db)
+        people = proxy.get_people_from_handles(handles)
+        self.assertEqual(
+            [person and person.to_struct() for person in people],
+            [person and person.to_struct() for person
+             in map(proxy.get_person_from_handle, handles)])
+        cache = CacheProxyDb(self.db)
+        first = cache.get_person_from_handle(handles[1])
+        people = cache.get_people_from_handles(handles)
+        self.assertIs(people[1], first)
+        self.assertEqual([person.handle for person in people], handles)
+        self.assertIs(cache.get_person_from_handle(handles[2]), people[2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the chunked DB-API iterators """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class IterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+        cls.db.dbapi.chunk_size = 7 # several chunks per table
+
+    def test_iter_handles(self):
+        handles = [str(handle, "utf-8")
+                   for handle in self.db.get_person_handles()]
+        self.assertEqual(sorted(self.db.iter_person_handles()),
+                         sorted(handles))
+
+    def test_iter_with_queries(self):
+        # Use the connection while iterating:
+        count = 0
+        for person in self.db.iter_people():
+            self.assertEqual(
+                self.db.get_person_from_handle(person.handle).gid,
+                person.gid)
+            count += 1
+        self.assertEqual(count, self.db.get_number_of_people())
+
+    def test_iter_order_by(self):
+        gids = [person.gid for person in
+                self.db.iter_people(order_by=[("gid", "DESC")])]
+        self.assertEqual(gids, sorted(self.db.get_person_gids(),
+                                      reverse=True))
+
+    def test_select(self):
+        rows = list(self.db.Person.order("gid").select("gid"))
+        self.assertEqual([row["gid"] for row in rows],
+                         sorted(self.db.get_person_gids()))
+
+    def test_early_exit(self):
+        rows = self.db.dbapi.iter_rows("SELECT handle FROM person;")
+        self.assertEqual(len(next(rows)), 1)
+        rows.close()
+
+if __name__ == "__main__":
+    unittest.main()
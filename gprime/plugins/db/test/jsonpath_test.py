@@ -0,0 +1,113 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+
+""" Tests for selecting on fields of the json_data in SQL """
+
+import os
+import unittest
+
+from gprime.db.base import DbReadBase
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class JsonPathTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def check_where(self, table, where, order_by=None):
+        secondary_fields = ([self.db._hash_name(table, field)
+                             for (field, ptype) in self.db.get_table_func(
+                                 table, "class_func").get_secondary_fields()]
+                            + ["handle"])
+        # Runs in SQL:
+        self.assertTrue(self.db._check_where_fields(table, where,
+                                                    secondary_fields))
+        order_by = order_by or [("handle", "ASC")]
+        rows = list(self.db._select(table, ["handle"], where=where,
+                                    order_by=order_by))
+        # The same as in Python:
+        expected = list(DbReadBase._select(self.db, table, ["handle"],
+                                           where=where, order_by=order_by))
+        self.assertEqual(rows, expected)
+        return rows
+
+    def test_lists(self):
+        self.assertTrue(self.check_where(
+            "Person", ("alternate_names.first_name", "LIKE", "%o%")))
+        self.assertTrue(self.check_where(
+            "Person", ("alternate_names.surname_list.surname", "LIKE", "G%")))
+        self.assertTrue(self.check_where(
+            "Family", ("child_ref_list.ref", "=", "E04KQC637O9JLP5PNM")))
+        self.assertTrue(self.check_where(
+            "Person", ("parent_family_list", "=", "DY9KQCQRNUULGZQN82")))
+        # Also matches people without alternate names:
+        self.assertTrue(self.check_where(
+            "Person", ("alternate_names.first_name", "!=", "Nobody")))
+
+    def test_types(self):
+        self.assertTrue(self.check_where(
+            "Person", ("event_ref_list.role", "=", "Primary")))
+        self.assertTrue(self.check_where(
+            "Person", ("event_ref_list.role", "!=", "Primary")))
+        self.assertTrue(self.check_where(
+            "Person", ("primary_name.type", "=", 2)))
+        self.assertTrue(self.check_where(
+            "Event", ["AND", [("type", "=", "Birth"),
+                              ("date.sortval", ">", 2400000)]]))
+
+    def test_values(self):
+        self.assertTrue(self.check_where(
+            "Person", ("primary_name.surname_list.0.primary", "=", True)))
+        self.assertTrue(self.check_where(
+            "Person", ["NOT", ("primary_name.call", "=", "")]))
+        self.assertTrue(self.check_where(
+            "Event", ("date.sortval", "BETWEEN", [2400000, 2450000])))
+
+    def test_order(self):
+        self.check_where("Event", ("date.sortval", ">", 2400000),
+                         order_by=[("date.sortval", "DESC"),
+                                   ("handle", "ASC")])
+        self.assertEqual(
+            [person.gid for person in
+             self.db.iter_people(order_by=[("primary_name.call", "DESC"),
+                                           ("gid", "ASC")])],
+            [person.gid for person in
+             self.db.iter_items_order_by_python(
+                 [("primary_name.call", "DESC"), ("gid", "ASC")],
+                 self.db.get_table_func("Person", "class_func"))])
+
+    def test_joins(self):
+        # A join to another table is selected in Python:
+        self.assertIsNone(self.db._get_where_json_path(
+            "Person", ("event_ref_list.ref.description", "LIKE", "Birth%")))
+        rows = list(self.db._select(
+            "Person", ["gid"],
+            where=("event_ref_list.ref.description", "LIKE", "Birth of Garner%")))
+        self.assertTrue(rows)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the keyset pagination of QuerySet """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class KeysetTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def get_offset_pages(self, order, where, size):
+        queryset = self.db.Person.order(*(order + ["handle"]))
+        queryset.where_by = where
+        rows = list(queryset.select(*self.get_fields(order)))
+        return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+    def get_fields(self, order):
+        return [field.lstrip("-") for field in order] + ["handle"]
+
+    def get_keyset(self, row, order):
+        return [row[field] for field in self.get_fields(order)]
+
+    def check_pages(self, order, where=None, size=7):
+        pages = self.get_offset_pages(order, where, size)
+        self.assertTrue(len(pages) > 2)
+        # Forwards, after the last row of each page:
+        keyset_pages = []
+        queryset = self.db.Person.order(*order).limit(count=size)
+        queryset.where_by = where
+        page = list(queryset.select(*self.get_fields(order)))
+        while page:
+            keyset_pages.append(page)
+            queryset = self.db.Person.order(*order).limit(count=size)
+            queryset.where_by = where
+            queryset.after(*self.get_keyset(page[-1], order))
+            page = list(queryset.select(*self.get_fields(order)))
+        self.assertEqual(keyset_pages, pages)
+        # Backwards, before the first row of each page:
+        queryset = self.db.Person.order(*order)
+        queryset.where_by = where
+        last = list(queryset.before().limit(count=len(pages[-1]))
+                    .select(*self.get_fields(order)))
+        self.assertEqual(last, pages[-1])
+        for i in range(len(pages) - 1, 0, -1):
+            queryset = self.db.Person.order(*order).limit(count=size)
+            queryset.where_by = where
+            queryset.before(*self.get_keyset(pages[i][0], order))
+            self.assertEqual(list(queryset.select(*self.get_fields(order))),
+                             pages[i - 1])
+
+    def test_sql(self):
+        self.check_pages(["primary_name.surname_list.0.surname",
+                          "-primary_name.first_name"])
+
+    def test_sql_where(self):
+        self.check_pages(["gid"], ("gender", "=", 1))
+
+    def test_json(self):
+        # Not a secondary field, so selected from the json_data:
+        self.check_pages(["primary_name.call", "-gid"], size=50)
+
+    def test_python(self):
+        # A join, so selected in Python:
+        self.check_pages(["gid"], ("event_ref_list.ref.description",
+                                   "LIKE", "Birth of G%"), size=20)
+
+    def test_count(self):
+        rows = list(self.db.Person.order("gid").select("gid", "handle"))
+        queryset = self.db.Person.order("gid")
+        queryset.after(rows[9]["gid"], rows[9]["handle"])
+        self.assertEqual(queryset.count(), len(rows) - 10)
+
+    def test_keyset_size(self):
+        queryset = self.db.Person.order("gid").after("I0001")
+        self.assertRaises(Exception, list, queryset.select("gid"))
+
+if __name__ == "__main__":
+    unittest.main()
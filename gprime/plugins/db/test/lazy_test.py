@@ -0,0 +1,85 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the lazy objects of a database """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.lib import Surname
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class LazyTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def tearDown(self):
+        self.db.set_feature("skip-lazy-objects", False)
+
+    def test_lazy(self):
+        person = self.db.get_person_from_gid("I0044")
+        self.assertIn("_lazy_struct", person.__dict__)
+        self.assertIn("gid", person.__dict__)
+        self.assertNotIn("primary_name", person.__dict__)
+        self.assertEqual(person.primary_name.first_name, "Lewis Anderson")
+        self.assertIn("primary_name", person.__dict__)
+        self.assertNotIn("event_ref_list", person.__dict__)
+        self.assertRaises(AttributeError, getattr, person, "no_such_field")
+
+    def test_same_structs(self):
+        for table in self.db.get_table_func():
+            cls = self.db.get_table_func(table, "class_func")
+            with self.db.get_table_func(table, "cursor_func")() as cursor:
+                for (handle, struct) in cursor:
+                    self.assertEqual(cls.create(struct, self.db).to_struct(),
+                                     cls.from_struct(struct).to_struct())
+
+    def test_eager(self):
+        self.db.set_feature("skip-lazy-objects", True)
+        person = self.db.get_person_from_gid("I0044")
+        self.assertNotIn("_lazy_struct", person.__dict__)
+        self.assertIn("primary_name", person.__dict__)
+
+    def test_commit(self):
+        person = self.db.get_person_from_gid("I0045")
+        expected = person.to_struct()
+        person = self.db.get_person_from_gid("I0045")
+        surname = Surname()
+        surname.set_surname("Lazy")
+        person.primary_name.add_surname(surname)
+        expected["primary_name"]["surname_list"].append(surname.to_struct())
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.commit_person(person, trans)
+        person = self.db.get_person_from_gid("I0045")
+        self.assertEqual(person.to_struct()["primary_name"],
+                         expected["primary_name"])
+        self.assertEqual(person.to_struct()["event_ref_list"],
+                         expected["event_ref_list"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for sharing a database with other processes """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from gprime.dbstate import DbState
+from gprime.db import DbTxn
+from gprime.lib import Person, Surname
+
+class MultiprocessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        dirpath = os.path.join(self.tmpdir, "database")
+        self.db = DbState().create_database(dirpath, "Test")
+        self.db.enable_multiprocess()
+        # As opened by another process:
+        self.other = DbState().open_database(dirpath)
+        self.other.enable_multiprocess()
+        self.other._process += 1
+        self.handle = self.add_person("Shared")
+
+    def tearDown(self):
+        self.other.close()
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def add_person(self, first_name, trans=None):
+        person = Person()
+        person.primary_name.first_name = first_name
+        person.primary_name.add_surname(Surname())
+        if trans is not None:
+            self.db.add_person(person, trans)
+        else:
+            with DbTxn("Add", self.db) as trans:
+                self.db.add_person(person, trans)
+        return person.handle
+
+    def get_first_name(self, db):
+        return db.get_person_from_handle(self.handle).primary_name.first_name
+
+    def set_first_name(self, first_name):
+        person = self.db.get_person_from_handle(self.handle)
+        person.primary_name.first_name = first_name
+        with DbTxn("Change", self.db) as trans:
+            self.db.commit_person(person, trans)
+
+    def test_wal(self):
+        self.db.dbapi.execute("PRAGMA journal_mode;")
+        self.assertEqual(self.db.dbapi.fetchone()[0], "wal")
+
+    def test_sync(self):
+        self.other.sync_cache()
+        self.assertEqual(self.get_first_name(self.other), "Shared")
+        self.set_first_name("Changed")
+        # Still cached by the other process, until synced:
+        self.assertEqual(self.get_first_name(self.other), "Shared")
+        self.assertEqual(self.other.sync_cache(), [("Person", self.handle)])
+        self.assertEqual(self.get_first_name(self.other), "Changed")
+        self.assertEqual(self.other.sync_cache(), [])
+        # Not the changes of the same process:
+        self.assertEqual(self.db.sync_cache(), [])
+        self.db.undo()
+        self.assertEqual(self.other.sync_cache(), [("Person", self.handle)])
+        self.assertEqual(self.get_first_name(self.other), "Shared")
+
+    def test_abort(self):
+        self.other.sync_cache()
+        try:
+            with DbTxn("Abort", self.db) as trans:
+                self.add_person("Aborted", trans)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(self.other.sync_cache(), [])
+
+    def test_batch(self):
+        self.other.sync_cache()
+        self.get_first_name(self.other)
+        with DbTxn("Batch", self.db, batch=True) as trans:
+            for i in range(3):
+                self.add_person("Batched", trans)
+        self.assertEqual(self.other.sync_cache(), [("*", "")])
+        self.assertEqual(self.other.get_cache_stats()["count"], 0)
+
+    def test_users(self):
+        self.other.sync_cache()
+        self.db.add_user("user", "password", {"edit"}, {})
+        self.db.update_user_data("user", {"css": "Web_Basic-Ash.css"})
+        self.assertEqual(set(self.other.sync_cache()), {("User", "user")})
+        self.assertEqual(self.other.get_user_data("user")["css"],
+                         "Web_Basic-Ash.css")
+
+    def test_expired(self):
+        self.other._change_sync -= self.other.CHANGE_LOG_SECONDS
+        self.assertEqual(self.other.sync_cache(), [("*", "")])
+        self.set_first_name("Changed")
+        self.assertEqual(self.other.sync_cache(), [("Person", self.handle)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for iterating over objects as their JSON text """
+
+import os
+import json
+import tempfile
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+from gprime.proxy import LivingProxyDb
+from gprime.plugins.export.JSONExport import exportData
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class RawJSONTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def get_expected(self, db, table, order_by):
+        return list(DbReadBase.iter_raw_json(db, table, order_by))
+
+    def test_codecs(self):
+        try:
+            for name in ["json", "binary", "compressed"]:
+                self.db.set_codec(name)
+                for order_by in [None, [("gid", "ASC")],
+                                 # Sorted in Python:
+                                 [("primary_name.first_name", "DESC")]]:
+                    self.assertEqual(
+                        list(self.db.iter_raw_json("Person", order_by)),
+                        self.get_expected(self.db, "Person", order_by),
+                        (name, order_by))
+        finally:
+            self.db.set_codec("json")
+
+    def test_proxy(self):
+        proxy = LivingProxyDb(self.db, LivingProxyDb.MODE_EXCLUDE_ALL)
+        raw = list(proxy.iter_raw_json("Person"))
+        self.assertEqual(raw, self.get_expected(proxy, "Person", None))
+        # Without the living people:
+        self.assertLess(len(raw), self.db.get_number_of_people())
+
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "export.json")
+            self.assertTrue(exportData(self.db, filename))
+            with open(filename, encoding="utf-8") as fp:
+                lines = fp.readlines()
+        people = [json.loads(line) for line in lines
+                  if json.loads(line)["_class"] == "Person"]
+        self.assertEqual([person["gid"] for person in people],
+                         sorted(person.gid for person in
+                                self.db.iter_people()))
+        self.assertEqual(people[0], self.db.get_person_from_gid(
+            people[0]["gid"]).to_struct())
+
+if __name__ == "__main__":
+    unittest.main()
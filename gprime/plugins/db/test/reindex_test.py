@@ -0,0 +1,72 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the DB-API reference table rebuild """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class ReindexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def get_references(self):
+        self.db.dbapi.execute("SELECT obj_handle, obj_class, "
+                              "ref_handle, ref_class FROM reference;")
+        return sorted(self.db.dbapi.fetchall())
+
+    def get_object_references(self):
+        references = []
+        for table in self.db.get_table_func():
+            for obj in self.db.get_table_func(table, "iter_func")():
+                references.extend(
+                    (obj.handle, table, ref_handle, ref_class)
+                    for (ref_class, ref_handle)
+                    in set(obj.get_referenced_handles_recursively()))
+        return sorted(references)
+
+    def test_reindex(self):
+        expected = self.get_object_references()
+        self.assertTrue(expected)
+        self.assertEqual(self.get_references(), expected)
+        progress = []
+        self.db.REINDEX_CHUNK = 7 # several chunks per table
+        self.db.reindex_reference_map(progress.append)
+        self.assertEqual(self.get_references(), expected)
+        self.assertEqual(progress[0], 0)
+        self.assertEqual(progress[-1], 100)
+        self.assertEqual(progress, sorted(progress))
+
+    def test_reindex_processes(self):
+        expected = self.get_object_references()
+        self.db.reindex_reference_map(lambda percent: None, processes=2)
+        self.assertEqual(self.get_references(), expected)
+
+if __name__ == "__main__":
+    unittest.main()
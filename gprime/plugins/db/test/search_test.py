@@ -0,0 +1,112 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the DB-API full-text search """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+from gprime.lib import Note
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class SearchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def check_search(self, table, text):
+        expected = DbReadBase._search(self.db, table, text)
+        self.assertEqual(sorted(self.db._search(table, text)),
+                         sorted(expected))
+        queryset = self.db.get_queryset_by_table_name(table)
+        handles = [row["handle"] for row in
+                   queryset.search(text).select("handle")]
+        self.assertEqual(sorted(handles), sorted(expected))
+        return handles
+
+    def test_search(self):
+        self.assertTrue(self.check_search("Person", "garner"))
+        self.assertTrue(self.check_search("Person", "Gar LEW"))
+        self.assertTrue(self.check_search("Place", "gainesville"))
+        self.assertTrue(self.check_search("Source", "world"))
+        self.assertTrue(self.check_search("Note", "the"))
+        self.assertEqual(self.check_search("Person", "nosuchname"), [])
+        self.assertEqual(self.check_search("Person", "--"), [])
+
+    def test_ranked(self):
+        handles = self.check_search("Person", "garner")
+        ranks = self.db._search("Person", "garner")
+        self.assertEqual([ranks[handle] for handle in handles],
+                         sorted(ranks[handle] for handle in handles))
+
+    def test_where_order(self):
+        rows = list(self.db._select("Person", ["gid", "gender"],
+                                    where=("gender", "=", 1),
+                                    order_by=[("gid", "DESC")],
+                                    search="garner"))
+        self.assertTrue(rows)
+        self.assertEqual([row["gid"] for row in rows],
+                         sorted([row["gid"] for row in rows], reverse=True))
+        self.assertEqual(set(row["gender"] for row in rows), set([1]))
+        self.assertEqual(self.db.Person.search("garner").count(),
+                         len(self.check_search("Person", "garner")))
+        # Python where, with the search index:
+        rows = list(self.db._select(
+            "Person", ["gid"], search="garner",
+            where=("event_ref_list.ref.description", "LIKE", "Birth of%")))
+        self.assertTrue(rows)
+
+    def test_commit_remove(self):
+        note = Note()
+        note.set("A unique zyzzyva note")
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.add_note(note, trans)
+            self.assertEqual(self.check_search("Note", "zyzz"), [note.handle])
+        self.assertEqual(self.check_search("Note", "zyzzyva"), [note.handle])
+        note.set("An ordinary note")
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.commit_note(note, trans)
+        self.assertEqual(self.check_search("Note", "zyzzyva"), [])
+        self.assertEqual(self.check_search("Note", "ordinary"), [note.handle])
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            self.db.remove_note(note.handle, trans)
+        self.assertEqual(self.check_search("Note", "ordinary"), [])
+
+    def test_rebuild(self):
+        expected = self.check_search("Place", "gainesville")
+        self.db.rebuild_search()
+        self.assertEqual(self.check_search("Place", "gainesville"), expected)
+
+    def test_no_search_fields(self):
+        self.assertRaises(Exception, list,
+                          self.db.Family.search("smith").select())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the parameterized DB-API select, and the statement cache """
+
+import unittest
+
+from gprime.db import make_database
+from gprime.lib import Person, Name, Surname
+
+class StatementsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = make_database("inmemorydb")
+        cls.db.load(None)
+        with cls.db.get_transaction_class()("Test", cls.db,
+                                            batch=True) as trans:
+            for (gid, surname) in [("I0001", "Smith"), ("I0002", "O'Brien"),
+                                   ("I0003", "Jones"), ("I0004", "Smith")]:
+                person = Person()
+                person.primary_name = Name()
+                person.primary_name.surname_list.append(Surname())
+                person.primary_name.surname_list[0].surname = surname
+                person.gid = gid
+                cls.db.add_person(person, trans)
+
+    def select(self, where, start=0, limit=-1):
+        return [row["gid"] for row in
+                self.db._select("Person", ["gid"], where=where,
+                                order_by=[("gid", "ASC")],
+                                start=start, limit=limit)]
+
+    def test_values(self):
+        surname = "primary_name.surname_list.0.surname"
+        self.assertEqual(self.select((surname, "=", "O'Brien")), ["I0002"])
+        self.assertEqual(self.select((surname, "LIKE", "%i%")),
+                         ["I0001", "I0002", "I0004"])
+        self.assertEqual(self.select((surname, "IN", ["Jones", "O'Brien"])),
+                         ["I0002", "I0003"])
+        self.assertEqual(self.select(("gid", "BETWEEN", ["I0002", "I0003"])),
+                         ["I0002", "I0003"])
+        self.assertEqual(self.select(("private", "=", False)),
+                         ["I0001", "I0002", "I0003", "I0004"])
+        self.assertEqual(self.select(["NOT", (surname, "=", "Smith")]),
+                         ["I0002", "I0003"])
+
+    def test_limit(self):
+        self.assertEqual(self.select(None, start=1), ["I0002", "I0003", "I0004"])
+        self.assertEqual(self.select(None, start=1, limit=2), ["I0002", "I0003"])
+        self.assertEqual(self.select(None, limit=1), ["I0001"])
+        self.assertEqual(next(self.db._select("Person", ["count(1)"],
+                                              start=1, limit=2)), 2)
+
+    def test_statement_cache(self):
+        stats = self.db.dbapi.get_statement_stats()
+        for surname in ["Smith", "Jones", "O'Brien", "Nobody"]:
+            self.select(("primary_name.surname_list.0.surname", "=", surname))
+        new_stats = self.db.dbapi.get_statement_stats()
+        # Only the first one is a new statement:
+        self.assertEqual(new_stats["hits"] - stats["hits"], 3)
+        self.assertTrue(new_stats["misses"] - stats["misses"] <= 1)
+        self.assertTrue(0 < new_stats["hit_rate"] <= 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the person summary table """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+from gprime.lib import Person, Name, Surname, Event, EventType, EventRef
+from gprime.proxy import LivingProxyDb
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+def as_structs(summaries):
+    return [summary and {key: (value.to_struct()
+                               if hasattr(value, "to_struct") else value)
+                         for (key, value) in summary.items()}
+            for summary in summaries]
+
+class PersonSummaryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def assert_current(self, handles):
+        """
+        Assert that the summaries in the table are those made from the
+        people.
+        """
+        self.assertEqual(
+            as_structs(self.db.get_person_summaries(handles)),
+            as_structs(DbReadBase.get_person_summaries(self.db, handles)))
+
+    def find_person(self):
+        """
+        Return a person with a birth event and parents.
+        """
+        for person in self.db.iter_people():
+            if person.get_birth_ref() and person.parent_family_list:
+                return person
+
+    def test_summaries(self):
+        handles = list(self.db.iter_person_handles())
+        self.assert_current(handles + ["missing"])
+        person = self.find_person()
+        summary = self.db.get_person_summary(person.handle)
+        family = self.db.get_family_from_handle(
+            person.get_main_parents_family_handle())
+        self.assertEqual((summary["gid"], summary["father_handle"]),
+                         (person.gid, family.father_handle))
+        self.assertIsNotNone(summary["birth_sortval"])
+        self.assertIsNone(self.db.get_person_summary("missing"))
+
+    def test_commits(self):
+        person = self.find_person()
+        trans_class = self.db.get_transaction_class()
+        with trans_class("Test", self.db) as trans:
+            person.primary_name.first_name = "Summarized"
+            self.db.commit_person(person, trans)
+        self.assertEqual(
+            self.db.get_person_summary(person.handle)["first_name"],
+            "Summarized")
+        event = self.db.get_event_from_handle(person.get_birth_ref().ref)
+        with trans_class("Test", self.db) as trans:
+            event.get_date_object().set_yr_mon_day(1901, 2, 3)
+            self.db.commit_event(event, trans)
+        self.assertEqual(
+            self.db.get_person_summary(person.handle)["birth_date"]
+            .get_ymd(), (1901, 2, 3))
+        family = self.db.get_family_from_handle(
+            person.get_main_parents_family_handle())
+        with trans_class("Test", self.db) as trans:
+            family.set_father_handle(None)
+            self.db.commit_family(family, trans)
+        self.assertIsNone(
+            self.db.get_person_summary(person.handle)["father_handle"])
+        self.assert_current([person.handle])
+        for i in range(3):
+            self.db.undo()
+        self.assert_current([person.handle])
+        self.assertNotEqual(
+            self.db.get_person_summary(person.handle)["first_name"],
+            "Summarized")
+
+    def test_add_remove(self):
+        person = Person()
+        name = Name()
+        name.first_name = "New"
+        name.add_surname(Surname())
+        name.get_primary_surname().set_surname("Person")
+        person.set_primary_name(name)
+        event = Event()
+        event.set_type(EventType.BIRTH)
+        event.get_date_object().set_yr_mon_day(1950, 1, 1)
+        trans_class = self.db.get_transaction_class()
+        with trans_class("Test", self.db) as trans:
+            self.db.add_event(event, trans)
+            ref = EventRef()
+            ref.ref = event.handle
+            person.add_event_ref(ref)
+            person.set_birth_ref(ref)
+            self.db.add_person(person, trans)
+        summary = self.db.get_person_summary(person.handle)
+        self.assertEqual((summary["surname"], summary["first_name"],
+                          summary["birth_date"].get_year()),
+                         ("Person", "New", 1950))
+        with trans_class("Test", self.db) as trans:
+            self.db.remove_event(event.handle, trans)
+        self.assertIsNone(
+            self.db.get_person_summary(person.handle)["birth_date"])
+        with trans_class("Test", self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.assertIsNone(self.db.get_person_summary(person.handle))
+        self.db.undo()
+        self.assertEqual(
+            self.db.get_person_summary(person.handle)["first_name"], "New")
+
+    def test_batch(self):
+        person = self.find_person()
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            person.primary_name.first_name = "Batched"
+            self.db.commit_person(person, trans)
+            # Not in the table until committed:
+            self.assertEqual(
+                self.db.get_person_summary(person.handle)["first_name"],
+                "Batched")
+        self.assertEqual(
+            self.db.get_person_summary(person.handle)["first_name"],
+            "Batched")
+        self.assertFalse(self.db._summaries_stale)
+        self.assert_current(list(self.db.iter_person_handles()))
+
+    def test_rebuild(self):
+        self.db.dbapi.execute("DELETE FROM person_summary;")
+        self.db.rebuild_secondary(lambda progress: None)
+        self.assert_current(list(self.db.iter_person_handles()))
+
+    def test_proxy(self):
+        proxy = LivingProxyDb(self.db, LivingProxyDb.MODE_EXCLUDE_ALL)
+        handles = list(self.db.iter_person_handles())
+        summaries = proxy.get_person_summaries(handles)
+        self.assertIn(None, summaries)
+        self.assertEqual(
+            [summary and summary["handle"] for summary in summaries],
+            [handle if proxy.get_person_from_handle(handle) else None
+             for handle in handles])
+
+if __name__ == "__main__":
+    unittest.main()
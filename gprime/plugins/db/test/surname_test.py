@@ -0,0 +1,133 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Tests for the surname counts """
+
+import os
+import unittest
+
+from gprime.merge.diff import import_as_dict
+from gprime.cli.user import User
+from gprime.const import DATA_DIR
+from gprime.db.base import DbReadBase
+from gprime.lib import Person, Surname
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class SurnameCountTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def assert_current(self):
+        self.assertEqual(self.db.get_surname_counts(),
+                         DbReadBase.get_surname_counts(self.db))
+
+    def get_count(self, surname):
+        return dict(self.db.get_surname_counts(prefix=surname)).get(surname)
+
+    def make_person(self, surname):
+        person = Person()
+        person.primary_name.add_surname(Surname())
+        person.primary_name.get_primary_surname().set_surname(surname)
+        return person
+
+    def test_counts(self):
+        self.assert_current()
+        counts = self.db.get_surname_counts()
+        self.assertEqual([surname for (surname, count) in counts],
+                         self.db.get_surname_list())
+        self.assertEqual(sum(count for (surname, count) in counts),
+                         self.db.get_number_of_people())
+
+    def test_ranges(self):
+        for (prefix, after, count) in [("Ga", None, None), ("G", "Garner", 5),
+                                       ("", "Z", None), ("Zzz", None, 3),
+                                       ("", None, 10)]:
+            self.assertEqual(
+                self.db.get_surname_counts(prefix, after, count),
+                DbReadBase.get_surname_counts(self.db, prefix, after, count))
+        surnames = self.db.get_surname_counts(prefix="Ga")
+        self.assertTrue(surnames)
+        self.assertTrue(all(surname.startswith("Ga")
+                            for (surname, count) in surnames))
+
+    def test_case(self):
+        surnames = self.db.get_surname_counts(prefix="Ga")
+        self.assertEqual(self.db.get_surname_counts(prefix="ga"), surnames)
+        self.assertEqual(self.db.get_surname_counts(prefix="GA"), surnames)
+        self.assertEqual(self.db.get_surname_counts(prefix="ga"),
+                         DbReadBase.get_surname_counts(self.db, "ga"))
+        # Not patterns:
+        self.assertEqual(self.db.get_surname_counts(prefix="%"), [])
+        self.assertEqual(self.db.get_surname_counts(prefix="_a"), [])
+
+    def test_commits(self):
+        trans_class = self.db.get_transaction_class()
+        person = self.make_person("Uncommon")
+        with trans_class("Test", self.db) as trans:
+            self.db.add_person(person, trans)
+            self.assertEqual(self.get_count("Uncommon"), 1)
+        self.assertEqual(self.get_count("Uncommon"), 1)
+        (common, count) = max(self.db.get_surname_counts(),
+                              key=lambda item: item[1])
+        with trans_class("Test", self.db) as trans:
+            person.primary_name.get_primary_surname().set_surname(common)
+            self.db.commit_person(person, trans)
+        self.assertIsNone(self.get_count("Uncommon"))
+        self.assertEqual(self.get_count(common), count + 1)
+        with trans_class("Test", self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.assertEqual(self.get_count(common), count)
+        self.db.undo()
+        self.assertEqual(self.get_count(common), count + 1)
+        self.db.undo()
+        self.assertEqual(self.get_count("Uncommon"), 1)
+        self.db.undo()
+        self.assertIsNone(self.get_count("Uncommon"))
+        self.assert_current()
+
+    def test_abort(self):
+        try:
+            with self.db.get_transaction_class()("Test", self.db) as trans:
+                self.db.add_person(self.make_person("Aborted"), trans)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertIsNone(self.get_count("Aborted"))
+
+    def test_batch(self):
+        with self.db.get_transaction_class()("Test", self.db,
+                                             batch=True) as trans:
+            for i in range(3):
+                self.db.add_person(self.make_person("Batched"), trans)
+        self.assertEqual(self.get_count("Batched"), 3)
+        self.assert_current()
+
+    def test_rebuild(self):
+        counts = self.db.get_surname_counts()
+        self.db.dbapi.execute("DELETE FROM surname;")
+        self.db.build_surname_list()
+        self.assertEqual(self.db.get_surname_counts(), counts)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,13 +19,6 @@
 #
 #
 
-#------------------------------------------------------------------------
-#
-# Python modules
-#
-#------------------------------------------------------------------------
-import json
-
 #------------------------------------------------------------------------
 #
 # Gramps modules
@@ -57,87 +50,90 @@ def exportData(db, filename,
         # ---------------------------------
         # Notes
         # ---------------------------------
-        for obj in db.iter_notes(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Note", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Event
         # ---------------------------------
-        for obj in db.iter_events(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Event", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Person
         # ---------------------------------
-        for obj in db.iter_people(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Person", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Family
         # ---------------------------------
-        for obj in db.iter_families(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Family", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Repository
         # ---------------------------------
-        for obj in db.iter_repositories(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Repository",
+                                          order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Place
         # ---------------------------------
-        for obj in db.iter_places(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Place", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Source
         # ---------------------------------
-        for obj in db.iter_sources(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Source", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Citation
         # ---------------------------------
-        for obj in db.iter_citations(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Citation",
+                                          order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Media
         # ---------------------------------
-        for obj in db.iter_media(order_by=[("gid", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Media", order_by=[("gid", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
         # ---------------------------------
         # Tag
         # ---------------------------------
-        for obj in db.iter_tags(order_by=[("name", "ASC")]):
-            write_line(fp, obj)
+        for json_data in db.iter_raw_json("Tag", order_by=[("name", "ASC")]):
+            write_line(fp, json_data)
             count += 1
             callback(100 * count/total)
 
     return True
 
-def write_line(fp, obj):
+def write_line(fp, json_data):
     """
-    Write a single object to the file.
+    Write the JSON text of a single object to the file, as it comes
+    from the database (see iter_raw_json), without decoding it.
     """
-    fp.write(json.dumps(obj.to_struct(), sort_keys=True) + "\n")
+    fp.write(json_data + "\n")
@@ -27,6 +27,7 @@
 #
 #------------------------------------------------------------------------
 import datetime
+from itertools import islice
 
 #------------------------------------------------------------------------
 #
@@ -93,6 +94,36 @@ def _find_death_date(db, person):
                 return event.get_date_object()
     return None
 
+def _iter_people(db, person_handle_list, size=500):
+    """
+    Yield (handle, person, birth event, families) for the handles,
+    getting the people, their birth events, and their families, size
+    people at a time.
+    """
+    handle_iter = iter(person_handle_list)
+    while True:
+        handles = list(islice(handle_iter, size))
+        if not handles:
+            break
+        people = db.get_people_from_handles(handles)
+        birth_handles = [person.get_birth_ref().ref for person in people
+                         if person and person.get_birth_ref()]
+        births = dict(zip(birth_handles,
+                          db.get_events_from_handles(birth_handles)))
+        family_handles = list(set(
+            family_handle for person in people if person
+            for family_handle in person.get_family_handle_list()))
+        families = dict(zip(family_handles,
+                            db.get_families_from_handles(family_handles)))
+        for (handle, person) in zip(handles, people):
+            if person is None:
+                yield (handle, None, None, [])
+                continue
+            birth_ref = person.get_birth_ref()
+            yield (handle, person, births[birth_ref.ref] if birth_ref else None,
+                   [families[family_handle] for family_handle
+                    in person.get_family_handle_list()])
+
 def find_records(db, filter, top_size, callname,
                  trans_text=glocale.translation.sgettext, name_format=None,
                  living_mode=LivingProxyDb.MODE_INCLUDE_ALL):
@@ -134,20 +165,17 @@ def find_records(db, filter, top_size, callname,
     if filter:
         person_handle_list = filter.apply(db, person_handle_list)
 
-    for person_handle in person_handle_list:
-        person = db.get_person_from_handle(person_handle)
+    for (person_handle, person, birth, families) in _iter_people(
+            db, person_handle_list):
         unfil_person = get_unfiltered_person_from_handle(person_handle)
         if person is None:
             continue
 
         # FIXME this should check for a "fallback" birth also/instead
-        birth_ref = person.get_birth_ref()
-
-        if not birth_ref:
+        if birth is None:
             # No birth event, so we can't calculate any age.
             continue
 
-        birth = db.get_event_from_handle(birth_ref.ref)
         birth_date = birth.get_date_object()
 
         death_date = _find_death_date(db, person)
@@ -172,9 +200,7 @@ def find_records(db, filter, top_size, callname,
                     death_date - birth_date, name, 'Person', person_handle,
                     top_size)
 
-        for family_handle in person.get_family_handle_list():
-            family = db.get_family_from_handle(family_handle)
-
+        for family in families:
             marriage_date = None
             divorce_date = None
             for event_ref in family.get_event_ref_list():
@@ -22,7 +22,8 @@
 Proxy class for the Gramps databases. Caches lookups from handles.
 """
 
-from gprime.utils.lru import LRU
+from gprime.db.base import DbReadBase
+from gprime.utils.lru import LRU, get_size
 
 class CacheProxyDb:
     """
@@ -31,6 +32,9 @@ class CacheProxyDb:
     Does not invalid caches. Should be used only in read-only
     places, and not where caches are altered.
     """
+    # Limit on the bytes used by the cached objects:
+    CACHE_BYTES = 64 * 1024 * 1024
+
     def __init__(self, database):
         """
         CacheProxy will cache items based on their handle.
@@ -55,9 +59,18 @@ class CacheProxyDb:
         specific entry.
         """
         if handle:
-            del self.cache_handle[handle]
+            if handle in self.cache_handle:
+                del self.cache_handle[handle]
         else:
-            self.cache_handle = LRU(100000)
+            self.cache_handle = LRU(100000, self.CACHE_BYTES,
+                                    self._get_object_size)
+
+    def _get_object_size(self, obj):
+        """
+        Return the bytes used by a cached object, but not by the
+        database it refers to.
+        """
+        return get_size(obj, (DbReadBase, CacheProxyDb))
 
     def get_person_from_handle(self, handle):
         """
@@ -66,9 +79,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_person_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_person_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_event_from_handle(self, handle):
         """
@@ -77,9 +92,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_event_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_event_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_family_from_handle(self, handle):
         """
@@ -88,9 +105,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_family_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_family_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_repository_from_handle(self, handle):
         """
@@ -99,9 +118,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_repository_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_repository_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_place_from_handle(self, handle):
         """
@@ -110,9 +131,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_place_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_place_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_place_from_handle(self, handle):
         """
@@ -121,9 +144,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_place_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_place_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_citation_from_handle(self, handle):
         """
@@ -132,9 +157,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_citation_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_citation_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_source_from_handle(self, handle):
         """
@@ -143,9 +170,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_source_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_source_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_note_from_handle(self, handle):
         """
@@ -154,9 +183,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_note_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_note_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_media_from_handle(self, handle):
         """
@@ -165,9 +196,11 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_media_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_media_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_tag_from_handle(self, handle):
         """
@@ -176,6 +209,38 @@ class CacheProxyDb:
         """
         if isinstance(handle, bytes):
             handle = str(handle, "utf-8")
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_tag_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle)
+        if obj is None:
+            obj = self.db.get_tag_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
+
+    def get_objects_from_handles(self, table, handles, ignore_errors=False):
+        """
+        Gets items from cache if they exist, and the others from the
+        database together.
+        """
+        handles = [str(handle, "utf-8") if isinstance(handle, bytes)
+                   else handle for handle in handles]
+        objects = [self.cache_handle.get(handle) for handle in handles]
+        fetch = [handle for (handle, obj) in zip(handles, objects)
+                 if obj is None]
+        if fetch:
+            found = dict(zip(fetch, self.db.get_objects_from_handles(
+                table, fetch, ignore_errors)))
+            for (i, handle) in enumerate(handles):
+                if objects[i] is None and found[handle] is not None:
+                    objects[i] = found[handle]
+                    self.cache_handle[handle] = objects[i]
+        return objects
+
+    get_people_from_handles = DbReadBase.get_people_from_handles
+    get_families_from_handles = DbReadBase.get_families_from_handles
+    get_events_from_handles = DbReadBase.get_events_from_handles
+    get_places_from_handles = DbReadBase.get_places_from_handles
+    get_sources_from_handles = DbReadBase.get_sources_from_handles
+    get_citations_from_handles = DbReadBase.get_citations_from_handles
+    get_media_from_handles = DbReadBase.get_media_from_handles
+    get_repositories_from_handles = DbReadBase.get_repositories_from_handles
+    get_notes_from_handles = DbReadBase.get_notes_from_handles
+    get_tags_from_handles = DbReadBase.get_tags_from_handles
@@ -0,0 +1,76 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmarks for gPrime.
+
+These are not unittests; run each one as a module, for example::
+
+    python3 -m gprime.test.benchmarks.import_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import re
+import time
+import contextlib
+
+ddir = os.path.dirname(__file__)
+EXAMPLE_GEDCOM = os.path.abspath(os.path.join(ddir, "..", "..", "..",
+                                              "example", "gedcom",
+                                              "sample.ged"))
+
+def scale_gedcom(filename, copies, out_filename):
+    """
+    Write a GEDCOM file to out_filename which has the records of filename
+    repeated the given number of copies. The cross-reference ids of
+    each copy are renamed, so every copy is a separate family tree.
+    """
+    with open(filename, encoding="utf-8") as fp:
+        lines = fp.read().splitlines()
+    start = next(i for (i, line) in enumerate(lines)
+                 if re.match(r"0 @[A-Z]+\d+@", line))
+    header = lines[:start]
+    records = [line for line in lines[start:] if line != "0 TRLR"]
+    xref = re.compile(r"@([A-Z]+\d+)@")
+    with open(out_filename, "w", encoding="utf-8") as fp:
+        fp.write("\n".join(header) + "\n")
+        for copy in range(copies):
+            for line in records:
+                fp.write(xref.sub(r"@\1X%d@" % copy, line) + "\n")
+        fp.write("0 TRLR\n")
+    return out_filename
+
+@contextlib.contextmanager
+def timer(results, name):
+    """
+    Context manager which adds the elapsed seconds of its block to
+    results[name].
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[name] = (results.get(name, 0.0) +
+                         time.perf_counter() - start)
@@ -0,0 +1,116 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+json_data codec benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and for each
+codec measures the stored size of all objects, the speed to encode and
+decode them, and the time to select pages of people, as the person
+list view does::
+
+    python3 -m gprime.test.benchmarks.codec_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.plugins.db.dbapi.codec import CODECS, get_codec
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+PAGE_FIELDS = ["gid", "primary_name.first_name",
+               "primary_name.surname_list.0.surname", "gender",
+               "birth_ref_index"]
+
+def get_structs(db):
+    """
+    Return the structs of all primary objects.
+    """
+    structs = []
+    for table in db.get_table_func():
+        with db.get_table_func(table, "cursor_func")() as cursor:
+            structs.extend(data for (handle, data) in cursor)
+    return structs
+
+def select_pages(db, pages, page_size):
+    """
+    Select pages of people, in surname order.
+    """
+    for page in range(pages):
+        list(db._select("Person", PAGE_FIELDS,
+                        order_by=[("primary_name.surname_list.0.surname",
+                                   "ASC")],
+                        start=page * page_size, limit=page_size))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--pages", type=int, default=20,
+                        help="number of pages of people to select")
+    parser.add_argument("--page-size", type=int, default=25,
+                        help="number of people per page")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    structs = get_structs(db)
+    print("%d objects" % len(structs))
+    print("%-12s %12s %8s %12s %12s %12s" %
+          ("Codec", "Bytes", "Ratio", "Encode/s", "Decode/s", "ms/page"))
+    json_size = None
+    for name in sorted(CODECS, key=lambda name: name != "json"):
+        codec = get_codec(name)
+        results = {}
+        with timer(results, "encode"):
+            encoded = [codec.encode(struct) for struct in structs]
+        with timer(results, "decode"):
+            for data in encoded:
+                codec.decode(data)
+        size = sum(len(data.encode("utf-8") if isinstance(data, str)
+                       else data)
+                   for data in encoded)
+        if json_size is None:
+            json_size = size
+        db.set_codec(name)
+        with timer(results, "pages"):
+            select_pages(db, args.pages, args.page_size)
+        print("%-12s %12d %8.2f %12.0f %12.0f %12.2f" % (
+            name, size, size / json_size,
+            len(structs) / results["encode"],
+            len(structs) / results["decode"],
+            1000 * results["pages"] / args.pages))
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+JSON export benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and exports
+it to JSON with each codec, making the objects and encoding them again
+(as before iter_raw_json), and with JSONExport, and reports the objects
+and megabytes per second::
+
+    python3 -m gprime.test.benchmarks.export_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import json
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.plugins.export.JSONExport import exportData
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+TABLES = ["Note", "Event", "Person", "Family", "Repository", "Place",
+          "Source", "Citation", "Media", "Tag"]
+
+def export_objects(db, filename):
+    """
+    Export as JSONExport did, from the objects.
+    """
+    with open(filename, "w", encoding="utf-8") as fp:
+        for table in TABLES:
+            order_by = [("name" if table == "Tag" else "gid", "ASC")]
+            for obj in db.get_table_func(table, "iter_func")(
+                    order_by=order_by):
+                fp.write(json.dumps(obj.to_struct(), sort_keys=True) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+        db.set_cache_size(0)
+        count = sum(db.get_table_func(table, "count_func")()
+                    for table in TABLES)
+        filename = os.path.join(tmpdir, "export.json")
+        print("%-11s %12s %12s %10s %10s %8s" % (
+            "Codec", "Objects/s", "Raw/s", "MB/s", "Raw MB/s", "Speedup"))
+        for codec in ["json", "binary", "compressed"]:
+            db.set_codec(codec)
+            results = {}
+            with timer(results, "objects"):
+                export_objects(db, filename)
+            size = os.path.getsize(filename) / 1e6
+            with timer(results, "raw"):
+                exportData(db, filename)
+            print("%-11s %12.0f %12.0f %10.1f %10.1f %7.2fx" % (
+                codec, count / results["objects"], count / results["raw"],
+                size / results["objects"], size / results["raw"],
+                results["objects"] / results["raw"]))
+    db.close()
+
+if __name__ == "__main__":
+    main()
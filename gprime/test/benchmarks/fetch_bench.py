@@ -0,0 +1,104 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Bulk fetch benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and, with the
+object cache off, gets all people and events one handle at a time, and
+together with get_objects_from_handles, and applies a person filter to
+a list of handles, getting one and FETCH_SIZE people at a time::
+
+    python3 -m gprime.test.benchmarks.fetch_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.filters import GenericFilter
+from gprime.filters.rules.person import IsFemale
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+def best_of(repeat, funcs):
+    """
+    Run each of the {name: function} in turn, repeat times, and return
+    {name: the shortest time}.
+    """
+    best = {}
+    for i in range(repeat):
+        for (name, func) in funcs.items():
+            results = {}
+            with timer(results, name):
+                func()
+            best[name] = min(best.get(name, results[name]), results[name])
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of times to time each, keeping the best")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    db.set_cache_size(0)
+    print("%-25s %12s %12s %8s" % ("Objects", "Single/s", "Bulk/s",
+                                   "Speedup"))
+    for table in ["Person", "Event"]:
+        handles = list(db.get_table_func(table, "handles_func")())
+        handle_func = db.get_table_func(table, "handle_func")
+        results = best_of(args.repeat, {
+            "single": lambda: [handle_func(handle) for handle in handles],
+            "bulk": lambda: db.get_objects_from_handles(table, handles)})
+        print("%-25s %12.0f %12.0f %7.2fx" % (
+            table, len(handles) / results["single"],
+            len(handles) / results["bulk"],
+            results["single"] / results["bulk"]))
+    handles = list(db.iter_person_handles())
+    filter_ = GenericFilter()
+    filter_.add_rule(IsFemale([]))
+    # One object at a time, or FETCH_SIZE:
+    single = GenericFilter(filter_)
+    single.FETCH_SIZE = 1
+    results = best_of(args.repeat, {
+        "single": lambda: single.apply(db, handles),
+        "bulk": lambda: filter_.apply(db, handles)})
+    print("%-25s %12.0f %12.0f %7.2fx" % (
+        "GenericFilter.apply", len(handles) / results["single"],
+        len(handles) / results["bulk"], results["single"] / results["bulk"]))
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Field accessor benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and times the
+Python select and sort loops, which get fields of every person, with
+fields got item by item along their path (as before the accessors) and
+with the compiled field accessors::
+
+    python3 -m gprime.test.benchmarks.field_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.db.base import DbReadBase, sort_objects
+from gprime.lib.tableobj import TableObject
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+SELECT_FIELDS = ["gid", "primary_name.first_name",
+                 "primary_name.surname_list.0.surname",
+                 "event_ref_list.ref.description",
+                 "parent_family_list.father_handle.primary_name.first_name"]
+WHERE = ("event_ref_list.ref.description", "LIKE", "Birth%")
+ORDER_BY = [("primary_name.surname_list.0.surname", "ASC"),
+            ("event_ref_list.0.ref.date.sortval", "DESC")]
+
+def get_by_path(cls, field):
+    """
+    Return an accessor that follows the path of a field item by item.
+    """
+    field = cls.get_field_alias(field)
+    def accessor(obj, db=None, ignore_errors=False):
+        return obj._get_field_by_path(field, db, ignore_errors)
+    def accessor_many(objs, db=None, ignore_errors=False):
+        return [accessor(obj, db, ignore_errors) for obj in objs]
+    accessor.many = accessor_many
+    return accessor
+
+def run(db, results, name):
+    """
+    Time the select and sort loops.
+    """
+    with timer(results, name + " select"):
+        list(DbReadBase._select(db, "Person", SELECT_FIELDS))
+    with timer(results, name + " where"):
+        list(DbReadBase._select(db, "Person", ["gid"], where=WHERE))
+    people = list(db.iter_people())
+    with timer(results, name + " sort"):
+        list(sort_objects(people, ORDER_BY, db))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    print("%d people" % db.get_number_of_people())
+    results = {}
+    get_field_accessor = TableObject.__dict__["get_field_accessor"]
+    TableObject.get_field_accessor = classmethod(get_by_path)
+    try:
+        run(db, results, "path")
+    finally:
+        TableObject.get_field_accessor = get_field_accessor
+    run(db, results, "compiled")
+    print("%-10s %12s %12s %8s" % ("Loop", "Path s", "Compiled s",
+                                   "Speedup"))
+    for loop in ["select", "where", "sort"]:
+        print("%-10s %12.3f %12.3f %7.2fx" % (
+            loop, results["path " + loop], results["compiled " + loop],
+            results["path " + loop] / results["compiled " + loop]))
+    db.close()
+
+if __name__ == "__main__":
+    main()
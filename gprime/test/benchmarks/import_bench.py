@@ -0,0 +1,81 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+GEDCOM import benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, into an
+in-memory DB-API database, once with the row-at-a-time batch path
+("skip-bulk-load") and once with the bulk-load path::
+
+    python3 -m gprime.test.benchmarks.import_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.db import make_database
+from gprime.cli.user import User
+from gprime.plugins.importer.importgedcom import importData
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+
+def import_gedcom(filename, bulk_load):
+    """
+    Import filename into a new in-memory database, and return the database.
+    """
+    db = make_database("inmemorydb")
+    db.load(None)
+    db.set_feature("skip-import-additions", True)
+    db.set_feature("skip-bulk-load", not bulk_load)
+    importData(db, filename, User(quiet=True))
+    return db
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    args = parser.parse_args()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        for (name, bulk_load) in [("row-at-a-time", False),
+                                  ("bulk-load", True)]:
+            with timer(results, name):
+                db = import_gedcom(filename, bulk_load)
+            people = db.get_number_of_people()
+            db.close()
+            print("%-15s %8d people %8.2f seconds %8.0f people/second" %
+                  (name, people, results[name], people / results[name]))
+    print("speedup: %.2fx" % (results["row-at-a-time"] / results["bulk-load"]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Select join benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and, with the
+object cache off, selects pages of people with fields that join events,
+places and families, getting the joined objects of one row, and of
+PREFETCH_ROWS rows, together, and reports the pages per second and the
+queries per page::
+
+    python3 -m gprime.test.benchmarks.join_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+FIELDS = ["gid", "primary_name.first_name",
+          "event_ref_list.ref.date.sortval",
+          "event_ref_list.ref.place.self.title",
+          "family_list.father_handle.primary_name.first_name"]
+WHERE = ("event_ref_list.ref.description", "LIKE", "Birth%")
+
+def run(db, pages, size, where):
+    """
+    Select the first pages of size rows; return the number of queries.
+    """
+    before = db.dbapi.get_statement_stats()
+    for page in range(pages):
+        list(db._select("Person", list(FIELDS), page * size, size,
+                        where=where))
+    after = db.dbapi.get_statement_stats()
+    return ((after["hits"] + after["misses"]) -
+            (before["hits"] + before["misses"]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--pages", type=int, default=20,
+                        help="number of pages to select")
+    parser.add_argument("--size", type=int, default=25,
+                        help="number of rows of a page")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    db.set_cache_size(0)
+    print("%-10s %12s %12s %10s %10s" % ("Select", "Row pages/s",
+                                         "Joined/s", "Row q/page",
+                                         "Joined q"))
+    for (name, where) in [("SQL", None), ("Python", WHERE)]:
+        results = {}
+        queries = {}
+        db.PREFETCH_ROWS = 1
+        with timer(results, "row"):
+            queries["row"] = run(db, args.pages, args.size, where)
+        del db.PREFETCH_ROWS
+        with timer(results, "joined"):
+            queries["joined"] = run(db, args.pages, args.size, where)
+        print("%-10s %12.1f %12.1f %10.0f %10.0f" % (
+            name, args.pages / results["row"],
+            args.pages / results["joined"],
+            queries["row"] / args.pages, queries["joined"] / args.pages))
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Lazy object benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and gets every
+person with get_person_from_handle, reading one field, with eager objects
+(the "skip-lazy-objects" feature) and lazy ones::
+
+    python3 -m gprime.test.benchmarks.lazy_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+ACCESSES = [
+    ("gid", lambda person: person.gid),
+    ("primary_name.first_name",
+     lambda person: person.primary_name.first_name),
+    ("get_field surname",
+     lambda person: person.get_field("primary_name.surname_list.0.surname")),
+    ("to_struct", lambda person: person.to_struct()),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of times to get each person")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    handles = list(db.iter_person_handles()) * args.repeat
+    print("%-25s %12s %12s %8s" % ("Access", "Eager/s", "Lazy/s", "Speedup"))
+    for (name, access) in ACCESSES:
+        results = {}
+        for mode in ["eager", "lazy"]:
+            db.set_feature("skip-lazy-objects", mode == "eager")
+            with timer(results, mode):
+                for handle in handles:
+                    access(db.get_person_from_handle(handle))
+        print("%-25s %12.0f %12.0f %7.2fx" % (
+            name, len(handles) / results["eager"],
+            len(handles) / results["lazy"],
+            results["eager"] / results["lazy"]))
+    db.close()
+
+if __name__ == "__main__":
+    main()
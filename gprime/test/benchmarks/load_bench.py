@@ -0,0 +1,167 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Server load benchmark.
+
+Logs in to a running gPrime server, and has --users concurrent users
+each get --requests pages, from a mix of person, event and family
+lists, person searches, person views and surname completions, and
+prints the latency percentiles of each kind of page. Run it against the
+server started with --workers=0, which runs every request on the
+IOLoop, and with --workers=4, to compare::
+
+    python3 -m gprime.app --site-dir=SITE --workers=0 --open-browser=False
+    python3 -m gprime.test.benchmarks.load_bench --user USER --password PW
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import re
+import time
+import random
+import argparse
+import threading
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+
+PERSON_LINK = re.compile(r'/person/([0-9a-f]{12,})[?"]')
+
+def login(url, user, password):
+    """
+    Log in, and return an opener with the cookies of the session.
+    """
+    cookies = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(cookies))
+    opener.open(url + "/login").read()
+    xsrf = [cookie.value for cookie in cookies if cookie.name == "_xsrf"]
+    data = {"username": user, "password": password}
+    if xsrf:
+        data["_xsrf"] = xsrf[0]
+    opener.open(url + "/login",
+                urllib.parse.urlencode(data).encode()).read()
+    if not any(cookie.name == "user" for cookie in cookies):
+        raise Exception("Login failed for user %r" % user)
+    return opener
+
+def make_pages(url, opener):
+    """
+    Return a list of (kind, url) to get.
+    """
+    html = opener.open(url + "/person/").read().decode("utf-8")
+    handles = sorted(set(PERSON_LINK.findall(html)))
+    if not handles:
+        raise Exception("No people found at %s/person/" % url)
+    pages = []
+    for page in range(1, 6):
+        for table in ["person", "event", "family"]:
+            pages.append(("list", "%s/%s/?page=%d" % (url, table, page)))
+    for search in ["a", "sm", "john", "Garner"]:
+        pages.append(("search", "%s/person/?search=%s" % (
+            url, urllib.parse.quote(search))))
+    for handle in handles[:20]:
+        pages.append(("view", "%s/person/%s" % (url, handle)))
+    for prefix in ["", "A", "Ga", "S"]:
+        pages.append(("json", "%s/json/?field=surname&q=%s" % (url, prefix)))
+    return pages
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percent percentile of the sorted values.
+    """
+    rank = max(int(len(values) * percent / 100.0 + 0.5), 1)
+    return values[min(rank, len(values)) - 1]
+
+def run_user(url, opener, pages, count, results, errors, lock):
+    """
+    Get count pages at random, and add the (kind, seconds) to results.
+    """
+    rand = random.Random()
+    for i in range(count):
+        (kind, page) = rand.choice(pages)
+        start = time.perf_counter()
+        try:
+            response = opener.open(page)
+            response.read()
+        except urllib.error.HTTPError as exc:
+            with lock:
+                errors[exc.code] = errors.get(exc.code, 0) + 1
+            continue
+        if urllib.parse.urlparse(response.geturl()).path.endswith("/login"):
+            # Redirected, as the session wasn't accepted:
+            with lock:
+                errors["login"] = errors.get("login", 0) + 1
+            continue
+        seconds = time.perf_counter() - start
+        with lock:
+            results.append((kind, seconds))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000",
+                        help="URL of the gPrime server, with any prefix")
+    parser.add_argument("--user", required=True, help="user to log in as")
+    parser.add_argument("--password", required=True, help="of the user")
+    parser.add_argument("--users", type=int, default=50,
+                        help="number of concurrent users")
+    parser.add_argument("--requests", type=int, default=40,
+                        help="number of pages each user gets")
+    args = parser.parse_args()
+    url = args.url.rstrip("/")
+    opener = login(url, args.user, args.password)
+    pages = make_pages(url, opener)
+    results = []
+    errors = {}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=run_user,
+                                args=(url, opener, pages, args.requests,
+                                      results, errors, lock))
+               for i in range(args.users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    print("%d users, %d pages in %.1f seconds: %.1f pages/s" % (
+        args.users, len(results), seconds, len(results) / seconds))
+    if errors:
+        print("Errors: %s" % ", ".join("%d x %s" % (count, code) for
+                                       (code, count) in sorted(
+                                           errors.items(), key=str)))
+    print("%-10s %8s %10s %10s %10s %10s" % ("Pages", "Count", "p50 ms",
+                                             "p90 ms", "p99 ms", "Max ms"))
+    for kind in ["list", "search", "view", "json", "all"]:
+        times = sorted(time_ for (kind_, time_) in results
+                       if kind in [kind_, "all"])
+        if times:
+            print("%-10s %8d %10.1f %10.1f %10.1f %10.1f" % (
+                kind, len(times), percentile(times, 50) * 1000,
+                percentile(times, 90) * 1000, percentile(times, 99) * 1000,
+                times[-1] * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+LRU cache benchmark.
+
+Looks up --lookups keys, skewed so that a few keys are used often, in
+a cache of --size items, setting the missing ones, with the previous
+linked list LRU, the LRU, and the ThreadSafeLRU, and reports the
+lookups per second and the hit rates::
+
+    python3 -m gprime.test.benchmarks.lru_bench --lookups 1000000
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import argparse
+import random
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.utils.lru import LRU, ThreadSafeLRU
+from . import timer
+
+class LinkedLRU:
+    """
+    The previous LRU, a linked list of nodes, for comparison: getting
+    an item doesn't make it the most recently used.
+    """
+    class Node:
+        def __init__(self, prev, value):
+            self.prev = prev
+            self.value = value
+            self.next = None
+
+    def __init__(self, count):
+        self.count = count
+        self.data = {}
+        self.first = None
+        self.last = None
+
+    def __contains__(self, obj):
+        return obj in self.data
+
+    def __getitem__(self, obj):
+        return self.data[obj].value[1]
+
+    def __setitem__(self, obj, val):
+        if self.count <= 1:
+            return
+        if obj in self.data:
+            del self[obj]
+        nobj = self.Node(self.last, (obj, val))
+        if self.first is None:
+            self.first = nobj
+        if self.last:
+            self.last.next = nobj
+        self.last = nobj
+        self.data[obj] = nobj
+        if len(self.data) > self.count:
+            if self.first == self.last:
+                self.first = None
+                self.last = None
+                return
+            lnk = self.first
+            lnk.next.prev = None
+            self.first = lnk.next
+            lnk.next = None
+            if lnk.value[0] in self.data:
+                del self.data[lnk.value[0]]
+
+    def __delitem__(self, obj):
+        nobj = self.data[obj]
+        if nobj.prev:
+            nobj.prev.next = nobj.next
+        else:
+            self.first = nobj.next
+        if nobj.next:
+            nobj.next.prev = nobj.prev
+        else:
+            self.last = nobj.prev
+        del self.data[obj]
+
+def lookup(cache, keys):
+    """
+    Get each key from the cache, as CacheProxyDb does, setting the
+    missing ones; return the number of hits.
+    """
+    hits = 0
+    if isinstance(cache, LinkedLRU):
+        for key in keys:
+            if key in cache:
+                cache[key]
+                hits += 1
+            else:
+                cache[key] = key
+    else:
+        get = cache.get
+        for key in keys:
+            if get(key) is None:
+                cache[key] = key
+            else:
+                hits += 1
+    return hits
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--lookups", type=int, default=500000,
+                        help="number of keys to look up")
+    parser.add_argument("--keys", type=int, default=50000,
+                        help="number of different keys")
+    parser.add_argument("--size", type=int, default=5000,
+                        help="number of items kept by the caches")
+    args = parser.parse_args()
+    rand = random.Random(0)
+    # Most lookups are of a few keys:
+    keys = [int(args.keys * rand.random() ** 3)
+            for i in range(args.lookups)]
+    print("%-15s %12s %10s" % ("Cache", "Lookups/s", "Hit rate"))
+    for cache_class in [LinkedLRU, LRU, ThreadSafeLRU]:
+        results = {}
+        cache = cache_class(args.size)
+        with timer(results, "lookup"):
+            hits = lookup(cache, keys)
+        print("%-15s %12.0f %9.1f%%" % (
+            cache_class.__name__, len(keys) / results["lookup"],
+            100.0 * hits / len(keys)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Memory footprint benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, loads up to
+--people fully made people, and reports the bytes they use, and the
+number of objects in them, per person::
+
+    python3 -m gprime.test.benchmarks.memory_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.lib.baseobj import BaseObject
+from gprime.lib.date import Date
+from gprime.lib.grampstype import GrampsType
+from . import EXAMPLE_GEDCOM, scale_gedcom
+from .import_bench import import_gedcom
+
+def count_objects(obj, counter):
+    """
+    Count obj, and the data objects, dates and types in it, by class.
+    """
+    if isinstance(obj, list):
+        for item in obj:
+            count_objects(item, counter)
+    elif isinstance(obj, (BaseObject, Date, GrampsType)):
+        counter[obj.__class__.__name__] += 1
+        if hasattr(obj, "__dict__"):
+            counter["with __dict__"] += 1
+        names = list(getattr(obj, "__dict__", {}))
+        for cls in obj.__class__.__mro__:
+            names.extend(getattr(cls, "__slots__", ()))
+        for name in names:
+            if name.startswith("__"):
+                name = "_%s%s" % (obj.__class__.__name__, name)
+            count_objects(getattr(obj, name, None), counter)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--people", type=int, default=None,
+                        help="number of people to load (default all)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    # Fully made, rather than lazy, people:
+    db.set_feature("skip-lazy-objects", True)
+    handles = list(db.iter_person_handles())[:args.people]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    people = [db.get_person_from_handle(handle) for handle in handles]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    counter = Counter()
+    for person in people:
+        count_objects(person, counter)
+    print("%d people, %.0f bytes per person" %
+          (len(people), used / len(people)))
+    print("%-20s %12s" % ("Objects", "Per person"))
+    for (name, count) in counter.most_common():
+        print("%-20s %12.2f" % (name, count / len(people)))
+    db.close()
+
+if __name__ == "__main__":
+    main()
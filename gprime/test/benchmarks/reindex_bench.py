@@ -0,0 +1,93 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Reference table rebuild benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and then
+rebuilds the reference table by creating each object (the old way), and
+with DBAPI.reindex_reference_map, serially and with --processes::
+
+    python3 -m gprime.test.benchmarks.reindex_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from . import EXAMPLE_GEDCOM, scale_gedcom, timer
+from .import_bench import import_gedcom
+
+def reindex_objects(db):
+    """
+    Rebuild the reference table one object, and one INSERT, at a time.
+    """
+    db.dbapi.execute("DELETE FROM reference;")
+    for table in db.get_table_func():
+        class_ = db.get_table_func(table, "class_func")
+        with db.get_table_func(table, "cursor_func")() as cursor:
+            for handle, data in cursor:
+                obj = class_.create(data)
+                for (ref_class_name, ref_handle) in set(
+                        obj.get_referenced_handles_recursively()):
+                    db.dbapi.execute(
+                        """INSERT INTO reference (obj_handle, obj_class,
+                                                  ref_handle, ref_class)
+                                                 VALUES(?, ?, ?, ?);""",
+                        [obj.handle, table, ref_handle, ref_class_name])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--processes", type=int, default=4,
+                        help="number of worker processes")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    results = {}
+    with timer(results, "objects"):
+        reindex_objects(db)
+    with timer(results, "chunked"):
+        db.reindex_reference_map(lambda percent: None)
+    with timer(results, "chunked, %d processes" % args.processes):
+        db.reindex_reference_map(lambda percent: None,
+                                 processes=args.processes)
+    db.dbapi.execute("SELECT count(1) FROM reference;")
+    references = db.dbapi.fetchone()[0]
+    db.close()
+    for name, seconds in results.items():
+        print("%-25s %8d references %8.2f seconds %10.0f references/second" %
+              (name, references, seconds, references / seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Person summary benchmark.
+
+Imports example/gedcom/sample.ged, scaled up by --copies, and, with the
+object cache off, gets the names and birth and death dates of pages of
+people, as the person list view did, from the people and their events,
+and from the person summary table::
+
+    python3 -m gprime.test.benchmarks.summary_bench --copies 100
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import argparse
+import tempfile
+
+#-------------------------------------------------------------------------
+#
+# Gprime modules
+#
+#-------------------------------------------------------------------------
+from gprime.db.base import DbReadBase
+from . import EXAMPLE_GEDCOM, scale_gedcom
+from .import_bench import import_gedcom
+from .fetch_bench import best_of
+
+PAGE_SIZE = 25
+
+def from_people(db, handles):
+    """
+    The name and dates of each person, from the person and its events.
+    """
+    for handle in handles:
+        person = db.get_person_from_handle(handle)
+        dates = []
+        for ref in [person.get_birth_ref(), person.get_death_ref()]:
+            event = ref and db.get_event_from_handle(ref.ref)
+            dates.append(event.date if event else "")
+        yield (person.primary_name, dates)
+
+def from_summaries(db, handles, get_summaries):
+    """
+    The name and dates of each person, from their summaries.
+    """
+    for summary in get_summaries(db, handles):
+        yield (summary["primary_name"],
+               [summary["birth_date"] or "", summary["death_date"] or ""])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--copies", type=int, default=20,
+                        help="number of copies of sample.ged to import")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of times to time each, keeping the best")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = scale_gedcom(EXAMPLE_GEDCOM, args.copies,
+                                os.path.join(tmpdir, "sample.ged"))
+        db = import_gedcom(filename, True)
+    db.set_cache_size(0)
+    handles = list(db.iter_person_handles())
+    pages = [handles[start:start + PAGE_SIZE]
+             for start in range(0, len(handles), PAGE_SIZE)]
+    def run(func, *args):
+        for page in pages:
+            list(func(db, page, *args))
+    results = best_of(args.repeat, {
+        "people": lambda: run(from_people),
+        "computed": lambda: run(from_summaries,
+                                DbReadBase.get_person_summaries),
+        "table": lambda: run(from_summaries,
+                             type(db).get_person_summaries)})
+    print("%-25s %12s %8s" % ("Pages from", "Pages/s", "Speedup"))
+    for name in ["people", "computed", "table"]:
+        print("%-25s %12.0f %7.2fx" % (
+            name, len(pages) / results[name],
+            results["people"] / results[name]))
+    db.close()
+
+if __name__ == "__main__":
+    main()
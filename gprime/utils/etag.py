@@ -0,0 +1,86 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Validators of the responses, for conditional GET: ETag and Last-Modified
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import hashlib
+import email.utils
+
+#-------------------------------------------------------------------------
+#
+# gPrime modules
+#
+#-------------------------------------------------------------------------
+from gprime.const import VERSION
+
+def make_etag(*parts):
+    """
+    Return a strong ETag, quoted, for a response made from the parts:
+    the change stamps of what it shows, and the settings it depends on.
+    """
+    return '"%s"' % hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+def format_http_date(stamp):
+    """
+    Return the stamp, in seconds since the epoch, as an HTTP date.
+    """
+    return email.utils.formatdate(stamp, usegmt=True)
+
+def is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+    """
+    Return True if the client's copy, as given by the If-None-Match and
+    If-Modified-Since headers (None if not sent), is still valid for the
+    etag and last_modified stamp of the response, if any. If-Modified-Since
+    is ignored if If-None-Match is sent.
+    """
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in tags:
+            return True
+        # Weak comparison, as gzip may have weakened the tag:
+        return any((tag[2:] if tag.startswith("W/") else tag) == etag
+                   for tag in tags)
+    if if_modified_since and last_modified is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError):
+            return False
+        return int(last_modified) <= since.timestamp()
+    return False
+
+def get_template_version(directory):
+    """
+    Return the version of the templates in the directory: the gPrime
+    version, and the time of the last change of any of them.
+    """
+    last_change = 0
+    for (dirpath, dirnames, filenames) in os.walk(directory):
+        for filename in filenames:
+            last_change = max(last_change, os.path.getmtime(
+                os.path.join(dirpath, filename)))
+    return "%s-%d" % (VERSION, last_change)
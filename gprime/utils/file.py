@@ -33,6 +33,7 @@ import os
 import sys
 import shutil
 import hashlib
+import tempfile
 from collections import defaultdict
 import logging
 LOG = logging.getLogger(".gen.utils.file")
@@ -236,3 +237,19 @@ def create_checksum(full_path):
     except UnicodeEncodeError:
             md5sum = ''
     return md5sum
+
+def write_file(filename, data, mode="w"):
+    """
+    Write data to the file, through a temporary file renamed into place,
+    so that the threads and processes reading it never read it partly
+    written.
+    """
+    (fd, tmpname) = tempfile.mkstemp(dir=os.path.dirname(filename),
+                                     prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode) as fp:
+            fp.write(data)
+        os.replace(tmpname, filename)
+    except:
+        os.unlink(tmpname)
+        raise
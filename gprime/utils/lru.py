@@ -5,6 +5,7 @@
 #
 # Copyright (C) 2003-2006  Josiah Carlson
 # Copyright (C) 2009       Gary Burton
+# Copyright (C) 2017       gPrime developers
 #
 # This program is free software; you can redistribute it and/or modify
 # it under the terms of the GNU General Public License as published by
@@ -25,27 +26,84 @@
 Least recently used algorithm
 """
 
-class Node:
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import sys
+import types
+import threading
+from collections import OrderedDict
+
+_CONTAINERS = (list, tuple, set, frozenset)
+# Objects whose attributes are not counted:
+_ATOMS = (str, bytes, int, float, types.ModuleType)
+
+def get_size(obj, exclude=()):
     """
-    Node to be stored in the LRU structure
+    Return the approximate number of bytes used by obj, and the
+    containers, and instance attributes, in it. Objects that are
+    instances of a class in exclude (such as a database that an object
+    refers to) are not counted.
     """
-    def __init__(self, prev, value):
-        self.prev = prev
-        self.value = value
-        self.next = None
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, exclude):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _CONTAINERS):
+            stack.extend(obj)
+        elif not (isinstance(obj, _ATOMS) or callable(obj)):
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                for name in cls.__dict__.get("__slots__", ()):
+                    if hasattr(obj, name):
+                        stack.append(getattr(obj, name))
+    return size
 
+#-------------------------------------------------------------------------
+#
+# LRU class
+#
+#-------------------------------------------------------------------------
 class LRU:
     """
-    Implementation of a length-limited O(1) LRU cache
+    Implementation of a length-limited O(1) LRU cache, optionally also
+    limited by the total weight (such as the size in bytes) of the
+    values, with the number of hits, misses and evictions.
+
+    Getting an item makes it the most recently used.
     """
-    def __init__(self, count):
+    def __init__(self, count, max_weight=None, weight=None):
         """
-        Set count to 0 or 1 to disable.
+        Set count to 0 or 1 to disable, or None for no limit on the
+        number of items.
+
+        max_weight - the limit on the total weight of the values, or None
+        weight - function that returns the weight of a value; get_size
+                 (bytes) if max_weight is given without it
         """
         self.count = count
-        self.data = {}
-        self.first = None
-        self.last = None
+        self.max_weight = max_weight
+        if weight is None and max_weight is not None:
+            weight = get_size
+        self.weight = weight
+        self.data = OrderedDict()
+        # {key: weight} of the values, if weighed:
+        self.weights = {}
+        self.total_weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
     def __contains__(self, obj):
         """
@@ -53,131 +111,206 @@ class LRU:
         """
         return obj in self.data
 
+    def __len__(self):
+        """
+        Return the number of items in the LRU
+        """
+        return len(self.data)
+
     def __getitem__(self, obj):
         """
-        Return item associated with Obj
+        Return item associated with Obj, and make it the most recently
+        used
+        """
+        try:
+            value = self.data[obj]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.data.move_to_end(obj)
+        self.hits += 1
+        return value
+
+    def get(self, obj, default=None):
+        """
+        Return item associated with Obj, or default
         """
-        return self.data[obj].value[1]
+        data = self.data
+        if obj in data:
+            data.move_to_end(obj)
+            self.hits += 1
+            return data[obj]
+        self.misses += 1
+        return default
 
     def __setitem__(self, obj, val):
         """
-        Set the item in the LRU, removing an old entry if needed
+        Set the item in the LRU, removing old entries if needed
         """
-        if self.count <= 1: # Disabled
+        if self.count is not None and self.count <= 1: # Disabled
             return
-        if obj in self.data:
-            del self[obj]
-        nobj = Node(self.last, (obj, val))
-        if self.first is None:
-            self.first = nobj
-        if self.last:
-            self.last.next = nobj
-        self.last = nobj
-        self.data[obj] = nobj
-        if len(self.data) > self.count:
-            if self.first == self.last:
-                self.first = None
-                self.last = None
-                return
-            lnk = self.first
-            lnk.next.prev = None
-            self.first = lnk.next
-            lnk.next = None
-            if lnk.value[0] in self.data:
-                del self.data[lnk.value[0]]
-            del lnk
+        data = self.data
+        if obj in data:
+            data.move_to_end(obj)
+        data[obj] = val
+        if self.weight is not None:
+            weight = self.weight(val)
+            self.total_weight += weight - self.weights.get(obj, 0)
+            self.weights[obj] = weight
+        # Remove the least recently used; a value that is heavier than
+        # max_weight is removed itself:
+        while data and ((self.count is not None and
+                         len(data) > self.count) or
+                        (self.max_weight is not None and
+                         self.total_weight > self.max_weight)):
+            (key, value) = data.popitem(last=False)
+            if self.weight is not None:
+                self.total_weight -= self.weights.pop(key)
+            self.evictions += 1
 
     def __delitem__(self, obj):
         """
         Delete the object from the LRU
         """
-        nobj = self.data[obj]
-        if nobj.prev:
-            nobj.prev.next = nobj.next
-        else:
-            self.first = nobj.next
-        if nobj.next:
-            nobj.next.prev = nobj.prev
-        else:
-            self.last = nobj.prev
         del self.data[obj]
+        if self.weight is not None:
+            self.total_weight -= self.weights.pop(obj)
 
     def __iter__(self):
         """
-        Iterate over the LRU
+        Iterate over the values in the LRU, least recently used first
         """
-        cur = self.first
-        while cur is not None:
-            cur2 = cur.next
-            yield cur.value[1]
-            cur = cur2
-        raise StopIteration
+        return iter(list(self.data.values()))
 
     def iteritems(self):
         """
         Return items in the LRU using a generator
         """
-        cur = self.first
-        while cur is not None:
-            cur2 = cur.next
-            yield cur.value
-            cur = cur2
-        raise StopIteration
+        return iter(list(self.data.items()))
 
     def iterkeys(self):
         """
         Return keys in the LRU using a generator
         """
-        return iter(self.data)
+        return iter(list(self.data))
 
     def itervalues(self):
         """
-        Return items and keys in the LRU using a generator
+        Return values in the LRU using a generator
         """
-        for data in self.items():
-            yield data[1]
+        return iter(self)
 
     def keys(self):
         """
         Return all keys
         """
-        return [data[0] for data in self.items()]
+        return list(self.data)
 
     def values(self):
         """
         Return all values
         """
-        return [data[1] for data in self.items()]
+        return list(self.data.values())
 
     def items(self):
         """
         Return all items
         """
-        return [data[0] for data in self.items()]
+        return list(self.data.items())
 
     def clear(self):
         """
         Empties LRU
         """
-        # Step through the doubly linked list, setting prev and next to None.
-        # This ensures that each node is unreachable and therefore eligible for
-        # garbage collection. "del" is also called for each node, but it is
-        # unclear whether this actually has any effect, of just removes the
-        # binding to nobj
-        nobj = self.first
-        # The references first and last are removed so that the nodes are not
-        # reachable from these
-        self.first = None
-        self.last = None
-        # The references from self.data are removed
         self.data.clear()
-        while nobj is not None and nobj.next is not None:
-            # each node except the last is processed
-            nobj.next.prev = None
-            nextobj = nobj.next
-            nobj.next = None
-            del nobj
-            nobj = nextobj
-        if nobj is not None:
-            # The last node is processed
-            del nobj
+        self.weights.clear()
+        self.total_weight = 0
+
+    def get_stats(self):
+        """
+        Return a dictionary of the hits, misses, hit rate, evictions,
+        and the number and total weight of the items.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "evictions": self.evictions,
+            "count": len(self.data),
+            "weight": self.total_weight,
+        }
+
+    def reset_stats(self):
+        """
+        Zero the hits, misses and evictions.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+#-------------------------------------------------------------------------
+#
+# ThreadSafeLRU class
+#
+#-------------------------------------------------------------------------
+class ThreadSafeLRU(LRU):
+    """
+    An LRU that may be used by several threads, such as the handlers
+    run in an executor.
+    """
+    def __init__(self, count, max_weight=None, weight=None):
+        LRU.__init__(self, count, max_weight, weight)
+        self.lock = threading.Lock()
+
+    def __getitem__(self, obj):
+        with self.lock:
+            return LRU.__getitem__(self, obj)
+
+    def get(self, obj, default=None):
+        with self.lock:
+            return LRU.get(self, obj, default)
+
+    def __setitem__(self, obj, val):
+        with self.lock:
+            LRU.__setitem__(self, obj, val)
+
+    def __delitem__(self, obj):
+        with self.lock:
+            LRU.__delitem__(self, obj)
+
+    def __iter__(self):
+        with self.lock:
+            return LRU.__iter__(self)
+
+    def iteritems(self):
+        with self.lock:
+            return LRU.iteritems(self)
+
+    def iterkeys(self):
+        with self.lock:
+            return LRU.iterkeys(self)
+
+    def keys(self):
+        with self.lock:
+            return LRU.keys(self)
+
+    def values(self):
+        with self.lock:
+            return LRU.values(self)
+
+    def items(self):
+        with self.lock:
+            return LRU.items(self)
+
+    def clear(self):
+        with self.lock:
+            LRU.clear(self)
+
+    def get_stats(self):
+        with self.lock:
+            return LRU.get_stats(self)
+
+    def reset_stats(self):
+        with self.lock:
+            LRU.reset_stats(self)
@@ -0,0 +1,145 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the validators of the responses """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from gprime.dbstate import DbState
+from gprime.db import DbTxn
+from gprime.lib import Person, Surname, Event, EventRef
+from ..etag import (make_etag, format_http_date, is_not_modified,
+                    get_template_version)
+
+class ETagTest(unittest.TestCase):
+
+    def test_headers(self):
+        etag = make_etag(1500000000, "user", "en", "Web_Mainz.css")
+        self.assertEqual(etag, make_etag(1500000000, "user", "en",
+                                         "Web_Mainz.css"))
+        self.assertNotEqual(etag, make_etag(1500000000, "user", "fr",
+                                            "Web_Mainz.css"))
+        self.assertTrue(is_not_modified(etag, None, etag, 1500000000))
+        self.assertTrue(is_not_modified('"other", W/' + etag, None,
+                                        etag, 1500000000))
+        self.assertTrue(is_not_modified("*", None, etag, 1500000000))
+        self.assertFalse(is_not_modified('"other"', None, etag, 1500000000))
+        date = format_http_date(1500000000)
+        self.assertEqual(date, "Fri, 14 Jul 2017 02:40:00 GMT")
+        self.assertTrue(is_not_modified(None, date, etag, 1500000000))
+        self.assertFalse(is_not_modified(None, date, etag, 1500000001))
+        self.assertFalse(is_not_modified(None, "garbage", etag, 1500000000))
+        self.assertFalse(is_not_modified(None, date, etag, None))
+        # If-None-Match wins:
+        self.assertFalse(is_not_modified('"other"', date, etag, 1500000000))
+        self.assertFalse(is_not_modified(None, None, etag, 1500000000))
+
+    def test_template_version(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "page.html")
+            with open(filename, "w") as fp:
+                fp.write("")
+            os.utime(filename, (1500000000, 1500000000))
+            version = get_template_version(directory)
+            os.utime(filename, (1500000001, 1500000001))
+            self.assertNotEqual(version, get_template_version(directory))
+        finally:
+            shutil.rmtree(directory)
+
+class LastChangeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = DbState().create_database(
+            os.path.join(self.tmpdir, "database"), "Test")
+        self.event = Event()
+        with DbTxn("Add", self.db) as trans:
+            self.db.add_event(self.event, trans)
+            self.person = Person()
+            self.person.primary_name.add_surname(Surname())
+            event_ref = EventRef()
+            event_ref.ref = self.event.handle
+            self.person.add_event_ref(event_ref)
+            self.db.add_person(self.person, trans)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def get_etag(self):
+        """
+        The ETag of the person's page, as made by the handler.
+        """
+        person = self.db.get_person_from_handle(self.person.handle)
+        return make_etag(person.change, self.db.get_last_change())
+
+    def test_edits(self):
+        etag = self.get_etag()
+        self.assertEqual(etag, self.get_etag())
+        # The person, in the same second as the last change:
+        person = self.db.get_person_from_handle(self.person.handle)
+        person.primary_name.first_name = "Changed"
+        with DbTxn("Change", self.db) as trans:
+            self.db.commit_person(person, trans)
+        self.assertNotEqual(etag, self.get_etag())
+        # An event shown on the page:
+        etag = self.get_etag()
+        event = self.db.get_event_from_handle(self.event.handle)
+        event.set_description("Changed")
+        with DbTxn("Change", self.db) as trans:
+            self.db.commit_event(event, trans)
+        self.assertNotEqual(etag, self.get_etag())
+        # Undone:
+        etag = self.get_etag()
+        self.db.undo()
+        self.assertNotEqual(etag, self.get_etag())
+        # Not by reading, nor by an aborted transaction:
+        etag = self.get_etag()
+        try:
+            with DbTxn("Abort", self.db) as trans:
+                self.db.commit_event(event, trans)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(etag, self.get_etag())
+
+    def test_stamps(self):
+        last_change = self.db.get_last_change()
+        self.assertTrue(last_change)
+        with DbTxn("Change", self.db) as trans:
+            self.db.commit_event(self.event, trans)
+        # Its own stamp, even in the same second:
+        self.assertGreater(self.db.get_last_change(), last_change)
+        # Moved by other processes too:
+        other = DbState().open_database(os.path.join(self.tmpdir, "database"))
+        try:
+            with DbTxn("Change", other) as trans:
+                other.commit_event(self.event, trans)
+            self.assertEqual(self.db.get_last_change(),
+                             other.get_last_change())
+        finally:
+            other.close()
+
+if __name__ == "__main__":
+    unittest.main()
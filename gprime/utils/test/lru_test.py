@@ -0,0 +1,115 @@
+#
+# gPrime - A web-based genealogy program
+#
+# Copyright (C) 2017 gPrime developers
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the LRU cache """
+
+import threading
+import unittest
+
+from ..lru import LRU, ThreadSafeLRU, get_size
+
+class LRUTest(unittest.TestCase):
+
+    def test_recency(self):
+        lru = LRU(3)
+        for key in "abc":
+            lru[key] = key.upper()
+        # Getting "a" makes "b" the least recently used:
+        self.assertEqual(lru["a"], "A")
+        lru["d"] = "D"
+        self.assertEqual(lru.keys(), ["c", "a", "d"])
+        self.assertEqual(list(lru), ["C", "A", "D"])
+        self.assertEqual(list(lru.iteritems()),
+                         [("c", "C"), ("a", "A"), ("d", "D")])
+        self.assertEqual(lru.items(), list(lru.iteritems()))
+        self.assertEqual(lru.values(), list(lru.itervalues()))
+        lru["c"] = "C2"
+        self.assertEqual(lru.keys(), ["a", "d", "c"])
+        del lru["d"]
+        self.assertNotIn("d", lru)
+        self.assertEqual(len(lru), 2)
+        lru.clear()
+        self.assertEqual(len(lru), 0)
+
+    def test_stats(self):
+        lru = LRU(2)
+        lru[1] = 1
+        lru[2] = 2
+        lru[3] = 3
+        self.assertEqual(lru.get(3), 3)
+        self.assertIsNone(lru.get(1))
+        with self.assertRaises(KeyError):
+            lru[1]
+        stats = lru.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"],
+                          stats["count"]), (1, 2, 1, 2))
+        lru.reset_stats()
+        self.assertEqual(lru.get_stats()["hits"], 0)
+
+    def test_disabled(self):
+        for count in [0, 1]:
+            lru = LRU(count)
+            lru["a"] = 1
+            self.assertNotIn("a", lru)
+
+    def test_weight(self):
+        lru = LRU(None, 10, len)
+        lru["a"] = "x" * 4
+        lru["b"] = "x" * 4
+        lru["a"]
+        lru["c"] = "x" * 4
+        self.assertEqual(lru.keys(), ["a", "c"])
+        self.assertEqual(lru.get_stats()["weight"], 8)
+        lru["a"] = "x"
+        self.assertEqual(lru.total_weight, 5)
+        # Heavier than the limit, so not kept:
+        lru["d"] = "x" * 11
+        self.assertNotIn("d", lru)
+        self.assertEqual(lru.total_weight, 0)
+
+    def test_size(self):
+        small = get_size({"a": [1, 2]})
+        self.assertGreater(get_size({"a": [1, 2], "b": ["x" * 1000]}),
+                           small + 1000)
+        lru = LRU(None, 10 * small)
+        for i in range(100):
+            lru[i] = {"a": [1, 2]}
+        self.assertLessEqual(lru.total_weight, 10 * small)
+        self.assertGreater(len(lru), 0)
+
+    def test_threads(self):
+        lru = ThreadSafeLRU(50)
+        def work(start):
+            for i in range(2000):
+                key = (start + i) % 100
+                if lru.get(key) is None:
+                    lru[key] = key
+        threads = [threading.Thread(target=work, args=(start,))
+                   for start in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(lru), 50)
+        stats = lru.get_stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 8000)
+
+if __name__ == "__main__":
+    unittest.main()